@@ -0,0 +1,78 @@
+""" This example is a latency benchmark for the local "numpy_mmap" vector store, which keeps the vectors for a
+library in memory-mapped numpy files, with no vector database to install.
+
+    The benchmark builds a store with random vectors at 100K and 1M vectors, in both float32 and float16
+    storage, and reports the build time, the size on disk, and the p50/p99 query latency for a top-10 search.
+
+    To use the numpy_mmap store with a library, just select it as the vector_db:
+
+        library.install_new_embedding(embedding_model_name="mini-lm-sbert", vector_db="numpy_mmap")
+
+    note: the 1M vector runs need ~1.5 GB of disk at 384 dims in float32 - the store is created in a
+    temporary folder and removed at the end of each run.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import statistics
+
+import numpy as np
+
+from llmware.embeddings import _NumpyMMapVectorStore
+
+
+def run_benchmark(vector_count, embedding_dims=384, dtype="float32", queries=50, sample_count=10,
+                  add_batch_size=50000):
+
+    """ Builds a store with vector_count random vectors, and runs a set of queries against it. """
+
+    folder_path = tempfile.mkdtemp(prefix="numpy_mmap_benchmark_")
+
+    rng = np.random.default_rng(0)
+
+    store = _NumpyMMapVectorStore(os.path.join(folder_path, "store"), embedding_dims=embedding_dims, dtype=dtype)
+
+    t0 = time.time()
+
+    for start in range(0, vector_count, add_batch_size):
+        stop = min(start + add_batch_size, vector_count)
+        vectors = rng.standard_normal((stop - start, embedding_dims), dtype="float32")
+        store.add([str(i) for i in range(start, stop)], vectors)
+
+    build_time = time.time() - t0
+
+    disk_size = sum(os.path.getsize(os.path.join(folder_path, "store", fn))
+                    for fn in os.listdir(os.path.join(folder_path, "store")))
+
+    latencies = []
+    for i in range(queries):
+        query_vector = rng.standard_normal(embedding_dims, dtype="float32")
+        t1 = time.time()
+        store.search(query_vector, sample_count=sample_count)
+        latencies.append(time.time() - t1)
+
+    latencies = sorted(latencies)
+
+    shutil.rmtree(folder_path)
+
+    return {"vectors": vector_count,
+            "dtype": dtype,
+            "build_time": round(build_time, 2),
+            "disk_size_mb": round(disk_size / (1024 * 1024), 1),
+            "p50_latency_ms": round(1000 * statistics.median(latencies), 2),
+            "p99_latency_ms": round(1000 * latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))], 2)}
+
+
+if __name__ == "__main__":
+
+    for vector_count in [100000, 1000000]:
+        for dtype in ["float32", "float16"]:
+
+            print(f"\nupdate: starting benchmark - {vector_count} vectors - {dtype}")
+
+            report = run_benchmark(vector_count, dtype=dtype)
+
+            for key, value in report.items():
+                print(f"\t{key}: {value}")
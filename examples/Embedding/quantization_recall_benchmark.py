@@ -0,0 +1,123 @@
+""" This example measures the recall@k of scalar-quantized vector storage against the exact float32 baseline, for
+the local vector stores - "numpy_mmap" and, if installed, "faiss".
+
+    Quantization is set with VectorQuantizationConfig before creating a new embedding, e.g.,
+
+        from llmware.configs import VectorQuantizationConfig
+
+        VectorQuantizationConfig().set_config("quantization", "int8")     # or "fp16"
+        VectorQuantizationConfig().set_config("rerank_factor", 4)         # 0 = no re-ranking
+
+        library.install_new_embedding(embedding_model_name="mini-lm-sbert", vector_db="numpy_mmap")
+
+    With quantization, the first pass of the search runs on the int8 or fp16 codes, and if rerank_factor > 0,
+    the top k * rerank_factor candidates are re-scored with the exact float32 vectors read from a side file.
+
+    The benchmark uses random normalized vectors as a stand-in for embeddings, and reports recall@k (the share of
+    the exact top-k results found) and the query latency for each configuration.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import statistics
+from importlib import util
+
+import numpy as np
+
+from llmware.embeddings import _NumpyMMapVectorStore
+
+
+def make_vectors(count, embedding_dims, rng):
+
+    """ Random unit vectors, with some cluster structure, as a stand-in for embedding vectors. """
+
+    centers = rng.standard_normal((64, embedding_dims), dtype="float32")
+    vectors = centers[rng.integers(0, 64, count)] + 0.5 * rng.standard_normal((count, embedding_dims),
+                                                                               dtype="float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def recall_at_k(results, exact_results):
+
+    """ Share of the exact top-k found in the results, averaged over the queries. """
+
+    return statistics.mean([len(set(r) & set(e)) / len(e) for r, e in zip(results, exact_results)])
+
+
+def run_numpy_mmap(vectors, queries, dtype, rerank_factor, k):
+
+    folder_path = tempfile.mkdtemp(prefix="quantization_benchmark_")
+
+    store = _NumpyMMapVectorStore(os.path.join(folder_path, "store"), embedding_dims=vectors.shape[1],
+                                  dtype=dtype, rerank_factor=rerank_factor)
+
+    for start in range(0, len(vectors), 50000):
+        store.add([str(i) for i in range(start, min(start + 50000, len(vectors)))], vectors[start:start + 50000])
+
+    results = []
+    t0 = time.time()
+    for query in queries:
+        results.append([int(block_id) for block_id, distance in store.search(query, sample_count=k)])
+    latency = (time.time() - t0) / len(queries)
+
+    shutil.rmtree(folder_path)
+
+    return results, latency
+
+
+def run_faiss(vectors, queries, quantization, rerank_factor, k):
+
+    import faiss
+
+    if quantization:
+        quantizer_type = {"int8": faiss.ScalarQuantizer.QT_8bit, "fp16": faiss.ScalarQuantizer.QT_fp16}[quantization]
+        index = faiss.IndexScalarQuantizer(vectors.shape[1], quantizer_type, faiss.METRIC_L2)
+        index.train(vectors[:50000])
+    else:
+        index = faiss.IndexFlatL2(vectors.shape[1])
+
+    index.add(vectors)
+
+    results = []
+    t0 = time.time()
+    for query in queries:
+        distances, positions = index.search(np.array([query]), k * max(rerank_factor, 1))
+        positions = positions[0][positions[0] >= 0]
+        if rerank_factor > 0:
+            # re-score candidates with the exact vectors
+            exact = ((vectors[positions] - query) ** 2).sum(axis=1)
+            positions = positions[np.argsort(exact)]
+        results.append([int(p) for p in positions[:k]])
+    latency = (time.time() - t0) / len(queries)
+
+    return results, latency
+
+
+if __name__ == "__main__":
+
+    vector_count = 200000
+    embedding_dims = 384
+    k = 10
+
+    rng = np.random.default_rng(0)
+    vectors = make_vectors(vector_count, embedding_dims, rng)
+    queries = make_vectors(100, embedding_dims, rng)
+
+    print(f"\nupdate: exact float32 baseline - {vector_count} vectors - {embedding_dims} dims")
+    exact_results, exact_latency = run_numpy_mmap(vectors, queries, "float32", 0, k)
+    print(f"\tlatency_ms: {round(1000 * exact_latency, 2)}")
+
+    for dtype, rerank_factor in [("int8", 0), ("int8", 4), ("float16", 0), ("float16", 4)]:
+        results, latency = run_numpy_mmap(vectors, queries, dtype, rerank_factor, k)
+        print(f"\nupdate: numpy_mmap - {dtype} - rerank_factor {rerank_factor}")
+        print(f"\trecall@{k}: {round(recall_at_k(results, exact_results), 4)}")
+        print(f"\tlatency_ms: {round(1000 * latency, 2)}")
+
+    if util.find_spec("faiss"):
+        for quantization, rerank_factor in [("int8", 0), ("int8", 4), ("fp16", 0)]:
+            results, latency = run_faiss(vectors, queries, quantization, rerank_factor, k)
+            print(f"\nupdate: faiss - {quantization} - rerank_factor {rerank_factor}")
+            print(f"\trecall@{k}: {round(recall_at_k(results, exact_results), 4)}")
+            print(f"\tlatency_ms: {round(1000 * latency, 2)}")
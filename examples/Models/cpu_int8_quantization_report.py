@@ -0,0 +1,125 @@
+""" This example reports the accuracy drift and speed-up of dynamic int8 quantization for PyTorch (HuggingFace)
+generative and embedding models running on cpu.
+
+    Dynamic int8 quantization is a load-time option in ModelCatalog().load_model, e.g.,
+
+        model = ModelCatalog().load_model("llmware/bling-tiny-llama-v0", cpu_quantize="int8", cpu_threads=8)
+
+    The linear layers of the model are quantized to int8 when the model is loaded, and the quantized model is
+    saved in the model repo, so later loads skip the conversion.  cpu_threads sets the torch thread count used
+    by the model - either an int (intra-op threads), or a tuple of (intra-op, inter-op) threads.
+
+    The report runs the same set of RAG questions through the fp32 and int8 versions of a generative model, and
+    compares the answers and the time per answer - and embeds the same passages with the fp32 and int8 versions
+    of an embedding model, and compares the cosine similarity of the embeddings, and the embedding time.
+"""
+
+import time
+
+import numpy as np
+
+from llmware.models import ModelCatalog
+
+
+test_set = [
+    {"context": "Services Vendor Inc. 100 Elm Street Pleasantville, NY. TO Alpha Inc. 5900 1st Street Los Angeles, "
+                "CA. Description: Front End Engineering Service $5000.00, Back End Engineering Service $7500.00, "
+                "Quality Assurance Manager $10,000.00. Total Amount $22,500.00. Payment is due within 30 days.",
+     "questions": ["What is the total amount of the invoice?", "Who is the vendor?", "When is the payment due?"]},
+
+    {"context": "The Executive will receive an annual base salary of $200,000, payable in accordance with the "
+                "Company's normal payroll practices. The Executive will be eligible for a target annual bonus of "
+                "50% of the base salary. The term of the agreement is three years, starting on January 1, 2024.",
+     "questions": ["What is the annual base salary?", "What is the target annual bonus?",
+                   "What is the term of the agreement?"]},
+
+    {"context": "The best time to visit New York City is in the Fall when the weather is nicest. The city has "
+                "five boroughs - Manhattan, Brooklyn, Queens, The Bronx and Staten Island.",
+     "questions": ["When is the best time to visit New York?", "How many boroughs does New York have?"]}
+]
+
+
+def generative_report(model_name="llmware/bling-tiny-llama-v0", cpu_threads=None):
+
+    """ Runs the test set through the fp32 and int8 versions of the model - reports the share of answers that
+    are exactly the same, and the average time per answer. """
+
+    results = {}
+
+    for cpu_quantize in [None, "int8"]:
+
+        t0 = time.time()
+        model = ModelCatalog().load_model(model_name, sample=False, max_output=50, use_gpu=False,
+                                          cpu_quantize=cpu_quantize, cpu_threads=cpu_threads)
+        load_time = time.time() - t0
+
+        answers = []
+        t1 = time.time()
+        for sample in test_set:
+            for question in sample["questions"]:
+                response = model.inference(question, add_context=sample["context"])
+                answers.append(response["llm_response"].strip())
+
+        results[cpu_quantize or "fp32"] = {"answers": answers,
+                                           "load_time": round(load_time, 2),
+                                           "time_per_answer": round((time.time() - t1) / len(answers), 3)}
+
+    matches = [a == b for a, b in zip(results["fp32"]["answers"], results["int8"]["answers"])]
+
+    print(f"\nupdate: generative model - {model_name}")
+    for key in ["fp32", "int8"]:
+        print(f"\t{key} - load_time: {results[key]['load_time']} - "
+              f"time_per_answer: {results[key]['time_per_answer']}")
+
+    print(f"\tint8 speed-up: {round(results['fp32']['time_per_answer'] / results['int8']['time_per_answer'], 2)}")
+    print(f"\tanswers unchanged: {sum(matches)} of {len(matches)}")
+
+    for i, match in enumerate(matches):
+        if not match:
+            print(f"\t\tfp32: {results['fp32']['answers'][i]}")
+            print(f"\t\tint8: {results['int8']['answers'][i]}")
+
+    return results
+
+
+def embedding_report(model_name="mini-lm-sbert", cpu_threads=None):
+
+    """ Embeds the test set passages with the fp32 and int8 versions of the model - reports the cosine
+    similarity between the fp32 and int8 embeddings, and the embedding time. """
+
+    passages = []
+    for sample in test_set:
+        passages.append(sample["context"])
+        passages += sample["questions"]
+
+    embeddings = {}
+    times = {}
+
+    for cpu_quantize in [None, "int8"]:
+
+        model = ModelCatalog().load_model(model_name, use_gpu=False, cpu_quantize=cpu_quantize,
+                                          cpu_threads=cpu_threads)
+
+        t0 = time.time()
+        for i in range(10):
+            vectors = model.embedding(passages)
+        times[cpu_quantize or "fp32"] = (time.time() - t0) / 10
+
+        embeddings[cpu_quantize or "fp32"] = np.array(vectors)
+
+    fp32, int8 = embeddings["fp32"], embeddings["int8"]
+    cosine = (fp32 * int8).sum(axis=1) / (np.linalg.norm(fp32, axis=1) * np.linalg.norm(int8, axis=1))
+
+    print(f"\nupdate: embedding model - {model_name}")
+    print(f"\tfp32 time: {round(times['fp32'], 4)} - int8 time: {round(times['int8'], 4)}")
+    print(f"\tint8 speed-up: {round(times['fp32'] / times['int8'], 2)}")
+    print(f"\tcosine similarity fp32 vs int8 - min: {round(float(cosine.min()), 4)} - "
+          f"mean: {round(float(cosine.mean()), 4)}")
+
+    return cosine
+
+
+if __name__ == "__main__":
+
+    generative_report()
+    embedding_report()
@@ -0,0 +1,87 @@
+""" This example is a cpu throughput benchmark for batched generation with HFGenerativeModel.inference_batch,
+compared with calling .inference one prompt at a time.
+
+    inference_batch takes a list of prompts, with an optional list of contexts (one per prompt), and runs them in
+    groups of batch_size - each group is left-padded and decoded together in a single generation loop with the
+    kv cache, e.g.,
+
+        model = ModelCatalog().load_model("llmware/bling-tiny-llama-v0", sample=False, max_output=50)
+        responses = model.inference_batch(questions, contexts=contexts, batch_size=16)
+
+    Each response has the same format as the output of .inference, with its own usage.
+
+    The benchmark runs a set of short RAG-style questions at batch sizes 1, 4 and 16, and reports the output
+    tokens per second and the total time - note: the model is downloaded from HuggingFace on the first run.
+"""
+
+import time
+
+from llmware.models import ModelCatalog
+
+
+def rag_samples(count):
+
+    """ Short RAG questions with a small context passage. """
+
+    context = ("Services Vendor Inc. 100 Elm Street Pleasantville, NY. TO Alpha Inc. 5900 1st Street Los Angeles, "
+               "CA. Description: Front End Engineering Service $5000.00, Back End Engineering Service $7500.00, "
+               "Quality Assurance Manager $10,000.00. Total Amount $22,500.00. Make all checks payable to Services "
+               "Vendor Inc. Payment is due within 30 days.")
+
+    questions = ["What is the total amount of the invoice?",
+                 "Who is the vendor?",
+                 "When is the payment due?",
+                 "What is the cost of the front end engineering service?",
+                 "Where is Alpha Inc. located?",
+                 "What is the cost of the quality assurance manager?",
+                 "Who should the checks be payable to?",
+                 "What is the address of the vendor?"]
+
+    prompts = [questions[i % len(questions)] for i in range(count)]
+    contexts = [context] * count
+
+    return prompts, contexts
+
+
+def run_benchmark(model_name="llmware/bling-tiny-llama-v0", sample_count=32, max_output=50):
+
+    model = ModelCatalog().load_model(model_name, sample=False, max_output=max_output, use_gpu=False)
+
+    prompts, contexts = rag_samples(sample_count)
+
+    #   warm-up
+    model.inference(prompts[0], add_context=contexts[0])
+
+    reports = []
+
+    #   baseline - one prompt at a time with .inference
+    t0 = time.time()
+    output_tokens = 0
+    for prompt, context in zip(prompts, contexts):
+        response = model.inference(prompt, add_context=context)
+        output_tokens += response["usage"]["output"]
+    total_time = time.time() - t0
+
+    reports.append({"mode": "inference", "batch_size": 1, "total_time": round(total_time, 2),
+                    "tokens_per_second": round(output_tokens / total_time, 1)})
+
+    for batch_size in [1, 4, 16]:
+
+        t0 = time.time()
+        responses = model.inference_batch(prompts, contexts=contexts, batch_size=batch_size)
+        total_time = time.time() - t0
+
+        output_tokens = sum([response["usage"]["output"] for response in responses])
+
+        reports.append({"mode": "inference_batch", "batch_size": batch_size, "total_time": round(total_time, 2),
+                        "tokens_per_second": round(output_tokens / total_time, 1)})
+
+    return reports
+
+
+if __name__ == "__main__":
+
+    for report in run_benchmark():
+        print(f"\nupdate: {report['mode']} - batch_size {report['batch_size']}")
+        print(f"\ttotal_time: {report['total_time']}")
+        print(f"\ttokens_per_second: {report['tokens_per_second']}")
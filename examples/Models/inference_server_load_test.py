@@ -0,0 +1,97 @@
+""" This example is a simple load test for the LLMWareInferenceServer, and is intended to be used in conjunction
+with the "launch_llmware_inference_server.py" example.
+
+    The inference server can be started in two modes:
+
+        -- "flask" (default) - Flask development server, which runs one request at a time
+        -- "async" - Starlette app on uvicorn, with a request queue, micro-batching and backpressure
+
+    To compare the two modes, start one server in each mode on a different port, e.g.,
+
+        LLMWareInferenceServer(model_name, secret_api_key="demo-test", port=8080).start()
+        LLMWareInferenceServer(model_name, secret_api_key="demo-test", port=8081).start(server_mode="async")
+
+    and then run this script with both server URLs:
+
+        python inference_server_load_test.py http://localhost:8080 http://localhost:8081
+
+    note: the async mode requires: pip3 install starlette uvicorn python-multipart
+
+    For each server, the script sends a fixed number of requests at a fixed client concurrency, and reports the
+    p50 and p99 request latency, the throughput in requests per second, and the number of requests that were
+    rejected with a 429 (server busy).
+"""
+
+import sys
+import time
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def send_one_request(server_url, api_key, question, context):
+
+    """ Sends one request to the main index route, and returns the latency and status code. """
+
+    t0 = time.time()
+
+    response = requests.post(server_url, data={"question": question, "context": context, "api_key": api_key})
+
+    return time.time() - t0, response.status_code
+
+
+def run_load_test(server_url, api_key="demo-test", total_requests=200, concurrency=16):
+
+    """ Runs total_requests against the server with concurrency parallel clients, and reports latency
+    percentiles and throughput. """
+
+    question = "What is the total amount of the invoice?"
+    context = "Services Vendor Inc. \n100 Elm Street Pleasantville, NY \nTO Alpha Inc. 5900 1st Street " \
+              "Los Angeles, CA \nDescription Front End Engineering Service $5000.00 \n Back End Engineering" \
+              "Service $7500.00 \n Quality Assurance Manager $10,000.00 \n Total Amount $22,500.00 \n" \
+              "Make all checks payable to Services Vendor Inc. Payment is due within 30 days."
+
+    t0 = time.time()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: send_one_request(server_url, api_key, question, context),
+                                    range(total_requests)))
+
+    total_time = time.time() - t0
+
+    latencies = sorted([latency for latency, status_code in results if status_code == 200])
+    rejected = len([status_code for latency, status_code in results if status_code == 429])
+
+    report = {"server": server_url,
+              "requests": total_requests,
+              "concurrency": concurrency,
+              "completed": len(latencies),
+              "rejected_429": rejected,
+              "p50_latency": None,
+              "p99_latency": None,
+              "throughput_rps": round(len(latencies) / total_time, 2)}
+
+    if latencies:
+        report["p50_latency"] = round(statistics.median(latencies), 3)
+        report["p99_latency"] = round(latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))], 3)
+
+    return report
+
+
+if __name__ == "__main__":
+
+    #   pass one or more server urls on the command line - by default, tests a local server on port 8080
+    server_urls = ["http://localhost:8080"]
+
+    if len(sys.argv) > 1:
+        server_urls = sys.argv[1:]
+
+    for url in server_urls:
+
+        print(f"\nupdate: starting load test - {url}")
+
+        report = run_load_test(url)
+
+        for key, value in report.items():
+            print(f"\t{key}: {value}")
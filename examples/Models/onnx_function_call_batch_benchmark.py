@@ -0,0 +1,96 @@
+""" This example is a throughput comparison for running a SLIM function call over many inputs with an ONNX model,
+comparing .function_call one input at a time with .function_call_batch.
+
+    function_call_batch takes a list of context passages, and runs the same function call over all of them in
+    groups of batch_size - each group is tokenized once, left-padded into a single input array, and generated
+    with one ONNX generator, e.g.,
+
+        model = ModelCatalog().load_model("slim-sentiment-onnx")
+        responses = model.function_call_batch(contexts, batch_size=32)
+
+    Two load-time options also speed up the one-at-a-time path:
+
+        -- cache_instruction_tokens (default False) - the function instruction and keys at the end of a SLIM
+           prompt are tokenized once and re-used, so only the context is tokenized on each call - opt-in, since
+           the split tokenization may not match tokenizing the full prompt for every tokenizer
+        -- decode_at_end (default False) - decodes the full output once, rather than token-by-token
+
+    To use a SLIM model exported to ONNX, register its model card first, using the template below - note: point
+    the hf_repo at the ONNX export of the model (or copy the model files to the model repo path).
+
+    The benchmark runs 256 function calls and reports the total time and the function calls per second.
+"""
+
+import time
+
+from llmware.models import ModelCatalog
+
+
+slim_onnx_model_card = {"model_name": "slim-sentiment-onnx", "display_name": "slim-sentiment-onnx",
+                        "model_family": "ONNXGenerativeModel", "model_category": "generative_local",
+                        "model_location": "llmware_repo", "context_window": 2048, "instruction_following": False,
+                        "prompt_wrapper": "human_bot", "temperature": 0.0, "sample_default": False,
+                        "trailing_space": "",
+                        "hf_repo": "llmware/slim-sentiment-onnx",
+                        "custom_model_files": [], "custom_model_repo": "", "output_type": "dict",
+                        "function_call": True,
+                        "primary_keys": ["sentiment"],
+                        "fc_output_values": ["positive", "neutral", "negative"],
+                        "tokenizer_local": "tokenizer_tl.json",
+                        "function": ["classify"],
+                        "snapshot": True,
+                        "fetch": {"snapshot": True, "module": "llmware.models", "method": "pull_snapshot_from_hf"},
+                        "validation_files": ["model.onnx", "model.onnx.data"]}
+
+
+sample_texts = ["The stock market rallied today, with strong earnings reports from the technology sector.",
+                "Shares fell sharply after the company cut its guidance for the full year.",
+                "The central bank left interest rates unchanged, in line with expectations.",
+                "Customers complained about long delays and poor service at the new location.",
+                "The product launch was a huge success, with record sales in the first week.",
+                "Quarterly revenue was flat compared with the prior year."]
+
+
+def run_benchmark(model_name="slim-sentiment-onnx", sample_count=256, batch_sizes=(8, 32)):
+
+    contexts = [sample_texts[i % len(sample_texts)] for i in range(sample_count)]
+
+    reports = []
+
+    for decode_at_end in [False, True]:
+
+        model = ModelCatalog().load_model(model_name, decode_at_end=decode_at_end, cache_instruction_tokens=True)
+
+        #   warm-up
+        model.function_call(contexts[0], get_logits=False)
+
+        t0 = time.time()
+        for context in contexts:
+            model.function_call(context, get_logits=False)
+        total_time = time.time() - t0
+
+        reports.append({"mode": f"function_call - decode_at_end={decode_at_end}", "total_time": round(total_time, 2),
+                        "calls_per_second": round(sample_count / total_time, 1)})
+
+    for batch_size in batch_sizes:
+
+        t0 = time.time()
+        responses = model.function_call_batch(contexts, batch_size=batch_size)
+        total_time = time.time() - t0
+
+        reports.append({"mode": f"function_call_batch - batch_size {batch_size}", "total_time": round(total_time, 2),
+                        "calls_per_second": round(sample_count / total_time, 1),
+                        "sample_response": responses[0]["llm_response"]})
+
+    return reports
+
+
+if __name__ == "__main__":
+
+    ModelCatalog().register_new_model_card(slim_onnx_model_card)
+
+    for report in run_benchmark():
+        print(f"\nupdate: {report['mode']}")
+        for key, value in report.items():
+            if key != "mode":
+                print(f"\t{key}: {value}")
@@ -30,8 +30,11 @@ import csv
 import os
 import sqlite3
 import json
+import time
+from itertools import islice, chain
+from concurrent.futures import ThreadPoolExecutor
 
-from llmware.models import ModelCatalog, _ModelRegistry
+from llmware.models import ModelCatalog, ModelResources, _ModelRegistry
 from llmware.util import CorpTokenizer, AgentWriter
 from llmware.configs import SQLiteConfig
 from llmware.exceptions import ModelNotFoundException
@@ -63,6 +66,10 @@ class LLMfx:
     analyze_mode : bool, optional, default=True
         Sets whether logits should be retrieved when a tool is called with ``exec_function_call``.
 
+    use_model_pool : bool, optional, default=False
+        Sets whether tool models are loaded through the shared ``ModelResources`` pool, which applies the pool
+        memory budget with least-recently-used eviction, and re-uses models already loaded elsewhere in the process.
+
     Returns
     -------
     llmfx : LLMfx
@@ -70,7 +77,7 @@ class LLMfx:
 
     """
 
-    def __init__(self, api_key=None, verbose=True, analyze_mode=True): 
+    def __init__(self, api_key=None, verbose=True, analyze_mode=True, use_model_pool=False):
 
         self.agent_writer = AgentWriter()
 
@@ -115,6 +122,11 @@ class LLMfx:
         self.tools_deployed = []
         self.inference_calls = 0
 
+        #   if use_model_pool, tool models are fetched from the pool at each call, using the load options
+        #   captured in load_tool, since a pooled model may be evicted between calls
+        self.use_model_pool = use_model_pool
+        self._tool_load_options = {}
+
         #   set by default to localhost, 8080 and using 'demo-test' api_key
         self.api_endpoint = "http://127.0.0.1/8080"
         self.api_key = api_key
@@ -448,10 +460,15 @@ class LLMfx:
                 journal_update = f"loading tool - {tool_type}"
                 self.write_to_journal(journal_update)
 
+                load_options = {"api_key": self.api_key, "sample": sample, "use_gpu": use_gpu,
+                                "get_logits": get_logits, "max_output": max_output, "temperature": temperature}
+
+                if self.use_model_pool:
+                    self._tool_load_options[tool_type] = load_options
+
                 setattr(self, tool_type + "_model",
-                        ModelCatalog().load_model(self._default_tool_map[tool_type],api_key=self.api_key,
-                                                  sample=sample,use_gpu=use_gpu,get_logits=get_logits,max_output=max_output,
-                                                  temperature=temperature))
+                        ModelCatalog().load_model(self._default_tool_map[tool_type],
+                                                  use_model_pool=self.use_model_pool, **load_options))
 
                 model = getattr(self, tool_type + "_model")
 
@@ -498,7 +515,13 @@ class LLMfx:
 
                 model = getattr(self, tool_type + "_model")
 
-                if model:
+                if model and self.use_model_pool:
+
+                    #   pooled models may be shared - release the reference and leave unloading to the pool
+                    self._tool_load_options.pop(tool_type, None)
+                    setattr(self, tool_type + "_model", None)
+
+                elif model:
 
                     model.unload_model()
 
@@ -551,11 +574,7 @@ class LLMfx:
 
             if not self.api_exec:
 
-                model = getattr(self, tool_type + "_model")
-
-                #   if model not yet loaded, then load in-line
-                if not model:
-                    model = self.load_tool(tool_type)
+                model = self._get_tool_model(tool_type)
 
                 function_call = getattr(model, "function_call")
 
@@ -567,112 +586,152 @@ class LLMfx:
                 response = self.fx_over_api_endpoint(context=text,tool_type=tool_type, function=function,params=params,
                                                      get_logits=get_logits)
 
-            self.inference_calls += 1
-            output_response = {}
-            logit_analysis = {}
+            value_output = self._register_function_call_response(tool_type, work_iter, work_dict, response,
+                                                                 get_logits)
 
-            if response:
+        else:
+            raise ModelNotFoundException(tool_type)
 
-                if "llm_response" in response:
+        return value_output
 
-                    llm_response = response["llm_response"]
-                    output_type = response["usage"]["type"]
-                    usage= response["usage"]
+    def _get_tool_model(self, tool_type):
 
-                    if response["usage"]["type"] == "dict":
-                        dict_output = True
-                        self.report[work_iter] = self.report[work_iter] | response["llm_response"]
+        """ Returns the loaded model for the tool, loading it in-line if not yet loaded. """
 
-                    elif response["usage"]["type"] == "list" and tool_type == "summary":
-                        dict_output = True
-                        self.report[work_iter] = self.report[work_iter] | {"summary": response["llm_response"]}
+        model = getattr(self, tool_type + "_model")
 
-                    else:
-                        logging.warning("update: could not automatically convert to dictionary - "
-                                        "keeping as string output")
-                        dict_output = False
+        #   pooled model is fetched from the pool on each call, in case it has been evicted
+        if model and self.use_model_pool and tool_type in self._tool_load_options:
+            model = ModelCatalog().load_model(self._default_tool_map[tool_type], use_model_pool=True,
+                                              **self._tool_load_options[tool_type])
+            setattr(self, tool_type + "_model", model)
 
-                    # assemble output
-                    value_output.update({"llm_response": llm_response,"dict_output": dict_output})
+        #   if model not yet loaded, then load in-line
+        if not model:
+            model = self.load_tool(tool_type)
 
-                    # start journaling update
-                    journal_update = f"executing function call - " \
-                                     f"getting response - {tool_type}\n"
-                    journal_update += f"\t\t\t\t -- llm_response - {str(llm_response)}\n"
-                    journal_update += f"\t\t\t\t -- output type - {output_type}\n"
-                    journal_update += f"\t\t\t\t -- usage - {usage}"
+        return model
 
-                    self.write_to_journal(journal_update)
-                    # end journaling
+    def _register_function_call_response(self, tool_type, work_iter, work_dict, response, get_logits):
 
-                    # default - if not found/applied
-                    confidence_score = -1
+        """ Merges a function call response into the report and response_list, and writes the journal -
+        called from the main thread only, so that state updates are deterministic. """
 
-                    # load the model card
-                    model_name = _ModelRegistry().get_llm_fx_mapping()[tool_type]
-                    model_card = ModelCatalog().lookup_model_card(model_name)
-                    hf_tokenizer_name = model_card["tokenizer"]
+        value_output = {}
+
+        self.inference_calls += 1
+        output_response = {}
+        logit_analysis = {}
 
-                    if get_logits:
-                        logit_analysis = ModelCatalog().logit_analysis(response, model_card,
-                                                                       hf_tokenizer_name,
-                                                                       api_key=self.api_key)
+        if response:
 
-                        confidence_score = logit_analysis["confidence_score"]
-                        ryg = logit_analysis["ryg_string"]
-                        choices = logit_analysis["choices"]
+            if "llm_response" in response:
 
-                        #   will display and add to journal only the 'first' token choice
-                        #   choices for each token captured in 'logit_analysis' metadata
-                        if len(choices) > 1:
-                            choices = choices[0]
+                llm_response = response["llm_response"]
+                output_type = response["usage"]["type"]
+                usage= response["usage"]
 
-                        marker_tokens = logit_analysis["marker_tokens"]
-                        output_response.update({"logit_analysis": logit_analysis})
+                if response["usage"]["type"] == "dict":
+                    dict_output = True
+                    self.report[work_iter] = self.report[work_iter] | response["llm_response"]
 
-                        # start journaling update
-                        journal_update = f"analyzing response - {tool_type}\n"
-                        journal_update += f"\t\t\t\t -- confidence score - {str(confidence_score)}\n"
-                        journal_update += f"\t\t\t\t -- analyzing response - {ryg}\n"
-                        journal_update += f"\t\t\t\t -- analyzing response - {choices}"
-                        if marker_tokens:
-                            journal_update += "\n"
-                            journal_update += f"\t\t\t\t -- analyzing response - {str(marker_tokens)}"
+                elif response["usage"]["type"] == "list" and tool_type == "summary":
+                    dict_output = True
+                    self.report[work_iter] = self.report[work_iter] | {"summary": response["llm_response"]}
 
-                        self.write_to_journal(journal_update)
+                else:
+                    logging.warning("update: could not automatically convert to dictionary - "
+                                    "keeping as string output")
+                    dict_output = False
 
-                        value_output.update({"confidence_score": confidence_score})
-                        if marker_tokens:
-                            value_output.update({"choices": marker_tokens})
+                # assemble output
+                value_output.update({"llm_response": llm_response,"dict_output": dict_output})
 
-                    # assemble output response dictionary
+                # start journaling update
+                journal_update = f"executing function call - " \
+                                 f"getting response - {tool_type}\n"
+                journal_update += f"\t\t\t\t -- llm_response - {str(llm_response)}\n"
+                journal_update += f"\t\t\t\t -- output type - {output_type}\n"
+                journal_update += f"\t\t\t\t -- usage - {usage}"
 
-                    output_response = {"step": self.step, "tool": tool_type, "inference": self.inference_calls,
-                                       "llm_response": llm_response}
+                self.write_to_journal(journal_update)
+                # end journaling
 
-                    if get_logits:
-                        output_response.update({"confidence_score": confidence_score})
+                # default - if not found/applied
+                confidence_score = -1
 
-                    output_response.update({"llm_usage": usage, "work_iteration": work_iter, "dict_output": dict_output})
+                # load the model card
+                model_name = _ModelRegistry().get_llm_fx_mapping()[tool_type]
+                model_card = ModelCatalog().lookup_model_card(model_name)
+                hf_tokenizer_name = model_card["tokenizer"]
 
-                    for keys, values in work_dict.items():
-                        output_response.update({keys:values})
+                if get_logits:
+                    logit_analysis = ModelCatalog().logit_analysis(response, model_card,
+                                                                   hf_tokenizer_name,
+                                                                   api_key=self.api_key)
 
-                    if get_logits:
-                        output_response.update({"logit_analysis": logit_analysis})
+                    confidence_score = logit_analysis["confidence_score"]
+                    ryg = logit_analysis["ryg_string"]
+                    choices = logit_analysis["choices"]
 
-                    # save to response list state tracker
-                    self.response_list.append(output_response)
+                    #   will display and add to journal only the 'first' token choice
+                    #   choices for each token captured in 'logit_analysis' metadata
+                    if len(choices) > 1:
+                        choices = choices[0]
 
-        else:
-            raise ModelNotFoundException(tool_type)
+                    marker_tokens = logit_analysis["marker_tokens"]
+                    output_response.update({"logit_analysis": logit_analysis})
+
+                    # start journaling update
+                    journal_update = f"analyzing response - {tool_type}\n"
+                    journal_update += f"\t\t\t\t -- confidence score - {str(confidence_score)}\n"
+                    journal_update += f"\t\t\t\t -- analyzing response - {ryg}\n"
+                    journal_update += f"\t\t\t\t -- analyzing response - {choices}"
+                    if marker_tokens:
+                        journal_update += "\n"
+                        journal_update += f"\t\t\t\t -- analyzing response - {str(marker_tokens)}"
+
+                    self.write_to_journal(journal_update)
+
+                    value_output.update({"confidence_score": confidence_score})
+                    if marker_tokens:
+                        value_output.update({"choices": marker_tokens})
+
+                # assemble output response dictionary
+
+                output_response = {"step": self.step, "tool": tool_type, "inference": self.inference_calls,
+                                   "llm_response": llm_response}
+
+                if get_logits:
+                    output_response.update({"confidence_score": confidence_score})
+
+                output_response.update({"llm_usage": usage, "work_iteration": work_iter, "dict_output": dict_output})
+
+                for keys, values in work_dict.items():
+                    output_response.update({keys:values})
+
+                if get_logits:
+                    output_response.update({"logit_analysis": logit_analysis})
+
+                # save to response list state tracker
+                self.response_list.append(output_response)
 
         return value_output
 
     def exec_multitool_function_call(self, tool_type_list, text=None, function="classify", params=None,
-                                     get_logits=True):
+                                     get_logits=True, parallel=False):
+
+        """ Executes multiple function calls on the same text with a list of tools in tool_type_list - if
+        parallel is True, then the tools are run concurrently with exec_parallel_function_calls. """
+
+        if parallel:
+
+            if text:
+                self.load_work(text)
+                self.top_of_work_queue()
 
-        """ Executes multiple function calls on the same text with a list of tools in tool_type_list """
+            return self.exec_parallel_function_calls(tool_type_list, work_items=[self.work_iteration],
+                                                     function=function, params=params, get_logits=get_logits)
 
         output_list = []
 
@@ -685,6 +744,114 @@ class LLMfx:
 
         return output_list
 
+    def exec_parallel_function_calls(self, tool_type_list, work_items=None, function="classify", params=None,
+                                     get_logits=True, max_workers=None):
+
+        """ Execution engine that runs the function calls for each (tool x work_item) over a thread pool, and
+        merges the responses into the report and response_list.
+
+            -- with local models, each tool runs as one job on its own worker thread with its own model instance,
+                so that different tools run concurrently, while the calls on the same (non-thread-safe) model run
+                one after another - so the parallelism is up to len(tool_type_list)
+            -- the work items for a tool are passed in one batch only if the tool model implements
+                function_call_batch (currently, ONNX tool models), and get_logits is False (or analyze_mode is
+                off) - batch generation does not return logits, so with the default get_logits=True, or with the
+                default GGUF tools, each work item is a separate function call
+            -- with api_exec, each (tool x work_item) call is a separate job, as there is no shared local model
+            -- work_items is a list of work queue indexes - by default, all of the items in the work queue
+            -- responses are merged in a deterministic order - by work item, and then by the order of the
+                tools in tool_type_list - and the journal is written only from the calling thread
+
+        Returns a list of value outputs in the same order as the merge, e.g., for each work item, one entry
+        per tool. """
+
+        for tool_type in tool_type_list:
+            if tool_type not in self._supported_tools:
+                raise ModelNotFoundException(tool_type)
+
+        if work_items is None:
+            work_items = list(range(len(self.work_queue)))
+
+        if not self.analyze_mode:
+            get_logits = False
+
+        journal_update = f"executing parallel function calls - {str(tool_type_list)} - " \
+                         f"{len(work_items)} work items"
+        self.write_to_journal(journal_update)
+
+        #   each job is (tool_type, list of work items)
+        if self.api_exec:
+            jobs = [(tool_type, [work_iter]) for tool_type in tool_type_list for work_iter in work_items]
+        else:
+            jobs = [(tool_type, work_items) for tool_type in tool_type_list]
+
+        if not max_workers:
+            max_workers = min(len(jobs), 32)
+
+        def run_job(job):
+
+            tool_type, job_items = job
+
+            texts = [self.work_queue[work_iter]["text"] for work_iter in job_items]
+
+            if self.api_exec:
+                return [self.fx_over_api_endpoint(context=text, tool_type=tool_type, function=function,
+                                                  params=params, get_logits=get_logits) for text in texts]
+
+            model = models[tool_type]
+
+            if hasattr(model, "function_call_batch") and len(texts) > 1 and not get_logits:
+                return model.function_call_batch(texts, function=function, params=params, get_logits=get_logits)
+
+            return [model.function_call(text, function=function, params=params, get_logits=get_logits)
+                    for text in texts]
+
+        models = {}
+        pinned = []
+
+        try:
+
+            #   models are loaded up front, from the calling thread - pooled tool models are pinned while in use,
+            #   so that they are not evicted by the load of another tool
+            if not self.api_exec:
+                for tool_type in tool_type_list:
+                    models[tool_type] = self._get_tool_model(tool_type)
+
+                    model_name = self._default_tool_map[tool_type]
+
+                    if self.use_model_pool and model_name not in ModelResources().pool_stats()["pinned_models"]:
+                        ModelResources().pin_model(model_name)
+                        pinned.append(model_name)
+
+            with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+                job_responses = list(executor.map(run_job, jobs))
+
+        finally:
+            for model_name in pinned:
+                ModelResources().unpin_model(model_name)
+
+        #   responses by (tool_type, work_iter)
+        tool_responses = {}
+        for (tool_type, job_items), responses in zip(jobs, job_responses):
+            for work_iter, response in zip(job_items, responses):
+                tool_responses[(tool_type, work_iter)] = response
+
+        output_list = []
+
+        for i, work_iter in enumerate(work_items):
+            for j, tool_type in enumerate(tool_type_list):
+
+                journal_update = f"executing function call - deploying - {tool_type} "
+                self.write_to_journal(journal_update)
+
+                value_output = self._register_function_call_response(tool_type, work_iter,
+                                                                     self.work_queue[work_iter],
+                                                                     tool_responses[(tool_type, work_iter)],
+                                                                     get_logits)
+                output_list.append(value_output)
+
+        return output_list
+
     def sentiment(self, text=None, params=None):
 
         """ Executes sentiment analysis on text, if passed directly, or will pull current work item from the
@@ -1632,40 +1799,139 @@ class SQLTables:
 
         new_record = f"INSERT INTO {table_name} {col_names} VALUES {values_list};"
 
-        logging.info("update: inserting new_record - %s ", new_record)
+        logging.debug("update: inserting new_record - %s ", new_record)
 
         self.conn.cursor().execute(new_record, new_row)
 
         return True
 
-    def create_new_table_from_csv(self,fp=None, fn=None, table_name=None):
+    def _sniff_column_type(self, values):
 
-        """ Designed for rapid prototyping - input is a well-formed csv file with assumed header row with
-        each entry representing a column name, and well-formed rows. """
+        """ Data type for a column, based on a sample of its (non-empty) values - integer if all of the values
+        are integers, real if all of the values are numbers, and text otherwise. """
 
-        #   load csv
-        output = self.load_csv(fp,fn)
+        dt = "integer"
 
-        #   check if table exists
-        if not self.table_exists_check(table_name):
+        for value in values:
 
-            logging.info("update: table does not exist - so creating")
-            # need to build the table
-            column_names = self.create_new_table(output, table_name)
-            logging.info("update: table created - column names - %s ", column_names)
+            if dt == "integer":
+                try:
+                    int(value)
+                    continue
+                except ValueError:
+                    dt = "real"
 
-        else:
-            logging.info("update: table exists - getting column names")
-            column_names = self.get_column_names(table_name)
+            try:
+                float(value)
+            except ValueError:
+                return "text"
+
+        if not values:
+            dt = "text"
+
+        return dt
+
+    def bulk_load_csv(self, fp, fn, table_name, sample_rows=1000, chunk_size=10000):
 
-        # insert records
+        """ Loads a well-formed csv file with a header row into table_name - the csv is streamed, and the
+        column types are derived from the first sample_rows rows, if the table does not exist yet.  The rows
+        are inserted with executemany, with one transaction per chunk of chunk_size rows.  Rows with a
+        different number of entries than the header are skipped.
+
+        Returns a dictionary with the rows loaded, skipped rows, and rows per second. """
+
+        t0 = time.time()
+
+        # csv encoding can vary - utf-8-sig and errors='ignore' seems to be the most resilient for wide range of csv
+        record_file = open(os.path.join(fp, fn), encoding='utf-8-sig', errors='ignore')
+        c = csv.reader(record_file, dialect='excel', doublequote=False, delimiter=',')
+
+        rows_loaded = 0
+        skipped_rows = 0
+
+        try:
 
-        new_record = ""
-        for i in range(1, len(output)):
+            header_row = next(c, None)
+
+            if not header_row:
+                logging.warning("update: bulk_load_csv - no header row found in csv - %s", fn)
+                return {"rows": 0, "skipped_rows": 0, "time": 0, "rows_per_second": 0}
+
+            sample = list(islice(c, sample_rows))
+
+            if not self.table_exists_check(table_name):
+
+                logging.info("update: table does not exist - so creating")
+
+                column_names = []
+                sql_create_table = f"CREATE TABLE {table_name} ("
+
+                for i, entry in enumerate(header_row):
+                    col_name = re.sub("[\xfe\xff]", "", entry)
+                    col_type = self._sniff_column_type([row[i] for row in sample
+                                                        if len(row) == len(header_row) and row[i]])
+                    column_names.append(col_name)
+                    sql_create_table += col_name + " " + col_type + ", "
+
+                sql_create_table = sql_create_table[:-2] + " )"
+
+                self.conn.cursor().execute(sql_create_table)
+
+                logging.info("update: table created - column names - %s ", column_names)
+
+            else:
+                logging.info("update: table exists - getting column names")
+                column_names = self.get_column_names(table_name)
+
+            sql_insert = f"INSERT INTO {table_name} ({', '.join(column_names)}) " \
+                         f"VALUES ({', '.join(['?'] * len(column_names))});"
+
+            chunk = []
+
+            for row in chain(sample, c):
+
+                if len(row) != len(column_names):
+                    skipped_rows += 1
+                    continue
+
+                chunk.append(row)
+
+                if len(chunk) >= chunk_size:
+                    self.conn.executemany(sql_insert, chunk)
+                    self.conn.commit()
+                    rows_loaded += len(chunk)
+                    chunk = []
+
+            if chunk:
+                self.conn.executemany(sql_insert, chunk)
+                rows_loaded += len(chunk)
+
+            self.conn.commit()
+
+        finally:
+            record_file.close()
+
+        elapsed_time = time.time() - t0
+
+        if skipped_rows:
+            logging.warning("update: bulk_load_csv - skipped %s rows that do not match the number of columns",
+                            skipped_rows)
+
+        report = {"rows": rows_loaded, "skipped_rows": skipped_rows, "time": round(elapsed_time, 3),
+                  "rows_per_second": round(rows_loaded / max(elapsed_time, 1e-6), 1)}
+
+        logging.info("update: bulk_load_csv - loaded %s rows into %s - %s rows per second",
+                     rows_loaded, table_name, report["rows_per_second"])
+
+        return report
+
+    def create_new_table_from_csv(self,fp=None, fn=None, table_name=None):
+
+        """ Designed for rapid prototyping - input is a well-formed csv file with assumed header row with
+        each entry representing a column name, and well-formed rows. """
 
-            self.insert_new_row(table_name,column_names,output[i])
+        self.bulk_load_csv(fp, fn, table_name)
 
-        self.conn.commit()
         self.conn.close()
 
         logging.info("update: done inserting records into new table")
@@ -84,7 +84,8 @@ class LLMWareConfig:
            "tmp_path_name": "tmp" + os.sep}
 
     # note: two alias for postgres vector db - "postgres" and "pg_vector" are the same
-    _supported = {"vector_db": ["chromadb", "neo4j", "milvus", "pg_vector", "postgres", "redis", "pinecone", "faiss", "qdrant", "mongo_atlas","lancedb"],
+    _supported = {"vector_db": ["chromadb", "neo4j", "milvus", "pg_vector", "postgres", "redis", "pinecone", "faiss", "qdrant", "mongo_atlas","lancedb",
+                                "numpy_mmap"],
                   "collection_db": ["mongo", "postgres", "sqlite"],
                   "table_db": ["postgres", "sqlite"]}
 
@@ -484,7 +485,8 @@ class VectorDBRegistry:
                       "lancedb": {"module": "llmware.embeddings", "class": "EmbeddingLanceDB"},
                       "faiss": {"module": "llmware.embeddings", "class": "EmbeddingFAISS"},
                       "pinecone": {"module": "llmware.embeddings", "class": "EmbeddingPinecone"},
-                      "mongo_atlas": {"module": "llmware.embeddings", "class": "EmbeddingMongoAtlas"}
+                      "mongo_atlas": {"module": "llmware.embeddings", "class": "EmbeddingMongoAtlas"},
+                      "numpy_mmap": {"module": "llmware.embeddings", "class": "EmbeddingNumpyMMap"}
                       }
     @classmethod
     def get_vector_db_list(cls):
@@ -733,6 +735,174 @@ class LanceDBConfig:
         cls._conf[name] = value
 
 
+class NumpyMMapConfig:
+
+    """Configuration object for the local numpy memory-mapped vector store - note: "float16" storage halves the
+    size on disk, but queries are slower on cpu, due to the conversion to float32 for scoring"""
+
+    _conf = {"dtype": "float32",
+             "search_block_size": 16384,
+             "initial_capacity": 10000}
+
+    @classmethod
+    def get_config(cls,name):
+        if name in cls._conf:
+            return cls._conf[name]
+        raise ConfigKeyException(name)
+
+    @classmethod
+    def set_config(cls, name, value):
+        cls._conf[name] = value
+
+
+class VectorQuantizationConfig:
+
+    """Configuration object for scalar quantization of vectors in the local vector stores ("faiss" and
+    "numpy_mmap") - quantization can be None, "int8" or "fp16", and applies when a new embedding is created.
+    If rerank_factor > 0, then the exact float32 vectors are kept in a side file, and sample_count * rerank_factor
+    candidates from the quantized search are re-scored with the exact vectors."""
+
+    _conf = {"quantization": None,
+             "rerank_factor": 4}
+
+    _supported = [None, "int8", "fp16"]
+
+    @classmethod
+    def get_config(cls,name):
+        if name in cls._conf:
+            return cls._conf[name]
+        raise ConfigKeyException(name)
+
+    @classmethod
+    def set_config(cls, name, value):
+        if name == "quantization" and value not in cls._supported:
+            raise ConfigKeyException(value)
+        cls._conf[name] = value
+
+
+class EmbeddingCacheConfig:
+
+    """Configuration object for the embedding cache, which re-uses embedding vectors by (model_name, text hash)
+    when creating embeddings - off by default, set "enabled" to True to use it - the cache db is created in
+    cache_folder_path (by default, the llmware path)"""
+
+    _conf = {"enabled": False,
+             "max_entries": 250000,
+             "cache_folder_path": "",
+             "db_name": "embedding_cache.db"}
+
+    @classmethod
+    def get_config(cls,name):
+        if name in cls._conf:
+            return cls._conf[name]
+        raise ConfigKeyException(name)
+
+    @classmethod
+    def set_config(cls, name, value):
+        cls._conf[name] = value
+
+
+class QueryCacheConfig:
+
+    """Configuration object for the Query result cache - cached results are validated against the library version,
+    which changes on any block write or embedding install/delete - if disk_cache is True, results are also kept
+    in a sqlite db in disk_cache_path (by default, the llmware path), and shared across processes"""
+
+    _conf = {"enabled": False,
+             "max_entries": 1000,
+             "disk_cache": False,
+             "disk_cache_path": "",
+             "disk_cache_max_entries": 50000,
+             "db_name": "query_cache.db"}
+
+    @classmethod
+    def get_config(cls,name):
+        if name in cls._conf:
+            return cls._conf[name]
+        raise ConfigKeyException(name)
+
+    @classmethod
+    def set_config(cls, name, value):
+        cls._conf[name] = value
+
+
+class StateHistoryConfig:
+
+    """Configuration object for the store of prompt and query state histories - by default ("jsonl"), each
+    state is saved as a jsonl file in the prompt or query path - if "sqlite", all states are kept in a single
+    sqlite db (by default in the llmware path), with one row per record, indexed by the state id and the main
+    lookup keys (e.g., model, time_stamp and human rating fields for prompts), and updated in place"""
+
+    _conf = {"store": "jsonl",
+             "db_folder_path": "",
+             "db_name": "state_history.db"}
+
+    _supported = ["jsonl", "sqlite"]
+
+    @classmethod
+    def get_config(cls,name):
+        if name in cls._conf:
+            return cls._conf[name]
+        raise ConfigKeyException(name)
+
+    @classmethod
+    def set_config(cls, name, value):
+        if name == "store" and value not in cls._supported:
+            raise ConfigKeyException(value)
+        cls._conf[name] = value
+
+
+class OCRConfig:
+
+    """Configuration object for OCR ingestion (tesseract) - by default, images and pdf pages are OCR'd in the
+    calling process - if workers > 1, they are rendered and OCR'd across a pool of worker processes (note: on
+    platforms that 'spawn' new processes, e.g., macOS and Windows, the calling script needs an
+    `if __name__ == "__main__":` guard).  The new text blocks are written to the library in batches of
+    write_batch_size - if checksum_cache is True, the OCR text is kept in a sqlite db (by default in the llmware
+    path) by the sha256 checksum of the image file (or of the pdf file and page), and images already OCR'd are
+    not OCR'd again"""
+
+    _conf = {"workers": 1,
+             "dpi": 200,
+             "lang": "eng",
+             "write_batch_size": 500,
+             "checksum_cache": False,
+             "cache_folder_path": "",
+             "db_name": "ocr_cache.db"}
+
+    @classmethod
+    def get_config(cls,name):
+        if name in cls._conf:
+            return cls._conf[name]
+        raise ConfigKeyException(name)
+
+    @classmethod
+    def set_config(cls, name, value):
+        cls._conf[name] = value
+
+
+class StatusConfig:
+
+    """Configuration object for embedding job progress in Status - progress is counted in-process, and persisted
+    to the status table at most once every persist_interval_secs - if progress_channel is True, progress is also
+    published to a small memory-mapped file per job (by default, in the llmware tmp path), which other processes
+    can read or tail without querying the database"""
+
+    _conf = {"persist_interval_secs": 1.0,
+             "progress_channel": True,
+             "progress_channel_path": ""}
+
+    @classmethod
+    def get_config(cls,name):
+        if name in cls._conf:
+            return cls._conf[name]
+        raise ConfigKeyException(name)
+
+    @classmethod
+    def set_config(cls, name, value):
+        cls._conf[name] = value
+
+
 class SQLiteConfig:
 
     """Configuration object for SQLite"""
@@ -17,19 +17,330 @@
 a variety of 'model-ready' datasets from llmware prompt interactions, parsing and libraries. """
 
 import os
+import re
+import gzip
 import json
+import hashlib
 import random
 import logging
+import importlib
+from importlib import util
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from zipfile import ZipFile, ZIP_DEFLATED
 
 from llmware.util import Utilities
 from llmware.configs import LLMWareConfig
 from llmware.resources import CollectionRetrieval, PromptState
-from llmware.exceptions import FilePathDoesNotExistException, LibraryObjectNotFoundException, DatasetTypeNotFoundException
+from llmware.exceptions import FilePathDoesNotExistException, LibraryObjectNotFoundException, \
+    DatasetTypeNotFoundException, DependencyNotInstalledException, LLMWareException
 
 logger = logging.getLogger(__name__)
 
 
+def _write_export_shard(rows, folder_path, file_name, file_format, compression):
+
+    """ Entry point in worker process for writing one shard of a ShardedExporter export - writes to a temporary
+    file, which is renamed once complete, so that a partial shard is never mistaken for a completed one. """
+
+    tmp_path = os.path.join(folder_path, file_name + ".tmp")
+
+    if file_format == "parquet":
+
+        pa = importlib.import_module("pyarrow")
+        pq = importlib.import_module("pyarrow.parquet")
+
+        #   non-standard types from the db (e.g., ObjectId, datetime) are written as strings
+        safe_rows = []
+        for row in rows:
+            safe_rows.append({key: value if isinstance(value, (str, int, float, bool, list, dict, type(None)))
+                              else str(value) for key, value in row.items()})
+
+        pq.write_table(pa.Table.from_pylist(safe_rows), tmp_path, compression=compression or "none")
+
+    else:
+
+        data = "".join([json.dumps(row, default=str) + "\n" for row in rows]).encode("utf-8")
+
+        if compression == "gzip":
+            data = gzip.compress(data)
+
+        if compression == "zstd":
+            zstd = importlib.import_module("zstandard")
+            data = zstd.ZstdCompressor().compress(data)
+
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+
+    os.replace(tmp_path, os.path.join(folder_path, file_name))
+
+    return {"file_name": file_name,
+            "rows": len(rows),
+            "bytes": os.path.getsize(os.path.join(folder_path, file_name)),
+            "sha256": Utilities().file_checksum(folder_path, file_name)}
+
+
+class ShardedExporter:
+
+    """ ShardedExporter writes a stream of dict rows into fixed-size shards - in the current process, or in parallel
+    worker processes if workers > 1 (note: on platforms that 'spawn' new processes, e.g., macOS and Windows, the
+    calling script then needs an `if __name__ == "__main__":` guard) - as JSONL (optionally gzip or zstd
+    compressed) or Parquet, with a manifest of the row count and sha256 checksum of each shard.
+
+    The rows are consumed in order, and shard i holds rows [i * shard_size, (i+1) * shard_size) - each shard in
+    the manifest has a fingerprint (a rolling sha256 of its rows), and when an export is run again (e.g., after an
+    interruption), a shard already written is skipped only if its rows have the same fingerprint - otherwise it
+    is re-written.  At most one shard per worker, plus the shard being assembled, is held in memory at a time. """
+
+    def __init__(self, output_folder, shard_size=100000, workers=1, file_format="jsonl", compression=None,
+                 file_name_base="shard"):
+
+        if file_format not in ["jsonl", "parquet"]:
+            raise LLMWareException(message=f"ShardedExporter - file_format not supported - {file_format} - "
+                                           f"supported formats are 'jsonl' and 'parquet'")
+
+        if compression not in [None, "gzip", "zstd"]:
+            raise LLMWareException(message=f"ShardedExporter - compression not supported - {compression} - "
+                                           f"supported options are None, 'gzip' and 'zstd'")
+
+        if file_format == "parquet" and not util.find_spec("pyarrow"):
+            raise DependencyNotInstalledException("pyarrow")
+
+        if file_format == "jsonl" and compression == "zstd" and not util.find_spec("zstandard"):
+            raise DependencyNotInstalledException("zstandard")
+
+        self.output_folder = output_folder
+        self.shard_size = shard_size
+        self.workers = workers
+        self.file_format = file_format
+        self.compression = compression
+        self.file_name_base = file_name_base
+
+        self.manifest_file_name = file_name_base + "_manifest.json"
+
+        if not os.path.exists(self.output_folder):
+            os.makedirs(self.output_folder, exist_ok=True)
+
+    def shard_file_name(self, shard_number):
+
+        """ File name for the selected shard. """
+
+        extension = ".parquet" if self.file_format == "parquet" else ".jsonl"
+
+        if self.file_format == "jsonl" and self.compression == "gzip":
+            extension += ".gz"
+
+        if self.file_format == "jsonl" and self.compression == "zstd":
+            extension += ".zst"
+
+        return f"{self.file_name_base}_{str(shard_number).zfill(5)}{extension}"
+
+    def load_manifest(self):
+
+        """ Loads the manifest of the export, if found - otherwise, returns None. """
+
+        manifest_path = os.path.join(self.output_folder, self.manifest_file_name)
+
+        if not os.path.exists(manifest_path):
+            return None
+
+        return json.load(open(manifest_path, "r", encoding="utf-8"))
+
+    def _save_manifest(self, manifest):
+
+        """ Writes the manifest to a temporary file, and then replaces the prior manifest. """
+
+        manifest_path = os.path.join(self.output_folder, self.manifest_file_name)
+
+        with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(json.dumps(manifest, indent=2))
+
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    @staticmethod
+    def _update_fingerprint(fingerprint, row):
+
+        """ Adds one row to the rolling sha256 fingerprint of a shard. """
+
+        fingerprint.update(json.dumps(row, sort_keys=True, default=str).encode("utf-8"))
+        fingerprint.update(b"\n")
+
+        return fingerprint
+
+    def _remove_stale_shards(self, shard_count):
+
+        """ Deletes shard files of this export numbered at or beyond shard_count, e.g., left by a prior run over
+        more rows. """
+
+        shard_name = re.compile("^" + re.escape(self.file_name_base) + r"_(\d{5})" +
+                                re.escape(self.shard_file_name(0)[len(self.file_name_base) + 6:]) + "$")
+
+        removed = []
+
+        for file_name in os.listdir(self.output_folder):
+            match = shard_name.match(file_name)
+            if match and int(match.group(1)) >= shard_count:
+                os.remove(os.path.join(self.output_folder, file_name))
+                removed.append(file_name)
+
+        if removed:
+            logger.info(f"ShardedExporter - removed {len(removed)} stale shards from a prior run")
+
+        return removed
+
+    def _completed_shards(self):
+
+        """ Shards written in a prior run of the same export, confirmed by the size of each shard file - each one
+        is only skipped if the fingerprint of its rows in this run still matches. """
+
+        manifest = self.load_manifest()
+
+        if not manifest:
+            return {}
+
+        if (manifest.get("shard_size") != self.shard_size or manifest.get("file_format") != self.file_format
+                or manifest.get("compression") != self.compression):
+
+            logger.warning(f"ShardedExporter - prior manifest found with different settings - will re-export "
+                           f"all shards - {self.output_folder}")
+            return {}
+
+        completed = {}
+
+        for shard in manifest.get("shards", []):
+
+            if not shard.get("fingerprint"):
+                continue
+
+            fp = os.path.join(self.output_folder, shard["file_name"])
+            if os.path.exists(fp) and os.path.getsize(fp) == shard["bytes"]:
+                completed.update({shard["shard"]: shard})
+
+        return completed
+
+    def export(self, rows):
+
+        """ Writes the rows (any iterable of dicts, e.g., a generator streaming from the db) into shards, and
+        returns the manifest. """
+
+        completed = self._completed_shards()
+
+        if completed:
+            logger.info(f"ShardedExporter - prior export found - {len(completed)} shards will be skipped if "
+                        f"their rows are unchanged")
+
+        manifest = {"file_format": self.file_format,
+                    "compression": self.compression,
+                    "shard_size": self.shard_size,
+                    "complete": False,
+                    "total_rows": 0,
+                    "shards": sorted(completed.values(), key=lambda x: x["shard"]),
+                    "time_stamp": str(Utilities().get_current_time_now())}
+
+        self._save_manifest(manifest)
+
+        executor = None
+        if self.workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        pending = {}
+
+        def record(shard_number, shard_info, fingerprint):
+            shard_info.update({"shard": shard_number, "fingerprint": fingerprint})
+            manifest["shards"] = [shard for shard in manifest["shards"] if shard["shard"] != shard_number]
+            manifest["shards"].append(shard_info)
+            manifest["shards"] = sorted(manifest["shards"], key=lambda x: x["shard"])
+            self._save_manifest(manifest)
+
+        def submit(shard_number, shard_rows, fingerprint):
+
+            fingerprint = fingerprint.hexdigest()
+
+            #   shard written in a prior run with the same rows - skip
+            if shard_number in completed and completed[shard_number]["fingerprint"] == fingerprint \
+                    and completed[shard_number]["rows"] == len(shard_rows):
+                return
+
+            if not executor:
+                record(shard_number, _write_export_shard(shard_rows, self.output_folder,
+                                                         self.shard_file_name(shard_number),
+                                                         self.file_format, self.compression), fingerprint)
+                return
+
+            #   bounded memory - wait for a worker to finish before handing out another shard
+            while len(pending) >= self.workers:
+                done, not_done = wait(list(pending.keys()), return_when=FIRST_COMPLETED)
+                for future in done:
+                    done_shard_number, done_fingerprint = pending.pop(future)
+                    record(done_shard_number, future.result(), done_fingerprint)
+
+            future = executor.submit(_write_export_shard, shard_rows, self.output_folder,
+                                     self.shard_file_name(shard_number), self.file_format, self.compression)
+            pending.update({future: (shard_number, fingerprint)})
+
+        try:
+
+            shard_number = 0
+            shard_rows = []
+            fingerprint = hashlib.sha256()
+            total_rows = 0
+
+            for row in rows:
+
+                total_rows += 1
+
+                shard_rows.append(row)
+                self._update_fingerprint(fingerprint, row)
+
+                if total_rows % self.shard_size == 0:
+
+                    submit(shard_number, shard_rows, fingerprint)
+
+                    shard_number += 1
+                    shard_rows = []
+                    fingerprint = hashlib.sha256()
+
+            if shard_rows:
+                submit(shard_number, shard_rows, fingerprint)
+
+            for future in list(pending.keys()):
+                done_shard_number, done_fingerprint = pending.pop(future)
+                record(done_shard_number, future.result(), done_fingerprint)
+
+        finally:
+            if executor:
+                executor.shutdown(wait=True)
+
+        #   drops any shards from a prior run beyond the end of the current rows
+        shard_count = (total_rows + self.shard_size - 1) // self.shard_size
+        manifest["shards"] = [shard for shard in manifest["shards"] if shard["shard"] < shard_count]
+
+        self._remove_stale_shards(shard_count)
+
+        manifest.update({"complete": True, "total_rows": total_rows,
+                         "time_stamp": str(Utilities().get_current_time_now())})
+
+        self._save_manifest(manifest)
+
+        return manifest
+
+    def verify(self):
+
+        """ Checks the sha256 checksum of each shard in the manifest - returns the list of shards that are missing
+        or do not match. """
+
+        manifest = self.load_manifest() or {}
+
+        failed = []
+
+        for shard in manifest.get("shards", []):
+            fp = os.path.join(self.output_folder, shard["file_name"])
+            if not os.path.exists(fp) or Utilities().file_checksum(self.output_folder, shard["file_name"]) \
+                    != shard["sha256"]:
+                failed.append(shard["file_name"])
+
+        return failed
+
+
 class Datasets:
 
     """Datasets class implements a set of data packaging tools to create 'model-ready' datasets using a variety of
@@ -88,6 +399,9 @@ class Datasets:
 
         self.file_batch_size = 50000
 
+        #   number of blocks pulled from the db (and tokenized) at a time when streaming a library
+        self.stream_batch_size = 1000
+
         #TODO: add more options to package datasets for 'User-Assistant' templates
 
         self.alpaca = {"intro_blurb": "Below is an instruction that describes a task. "
@@ -194,6 +508,133 @@ class Datasets:
         toks = self.tokenizer.encode(text_sample).ids
         return toks
 
+    def batch_token_counter(self, text_samples):
+
+        """ Token counts for a list of text samples - uses the batch encoder of the tokenizer, if available. """
+
+        if hasattr(self.tokenizer, "encode_batch"):
+            return [len(encoding.ids) for encoding in self.tokenizer.encode_batch(text_samples)]
+
+        return [self.token_counter(text_sample) for text_sample in text_samples]
+
+    def _stream_library_blocks(self, filter_dict, selected_keys=None, sort_keys=None):
+
+        """ Generator of the blocks in the library text collection matching the filter_dict, pulled from the db
+        in batches of stream_batch_size, with only the selected_keys, and optional sort_keys - used by the
+        dataset builders to run over large libraries without materializing the full set of blocks. """
+
+        if not self.library:
+            raise LibraryObjectNotFoundException("no-library-loaded-in-Dataset-constructor")
+
+        batches = CollectionRetrieval(self.library_name,
+                                      account_name=self.account_name).iter_batches(selected_keys=selected_keys,
+                                                                                   filter_dict=filter_dict,
+                                                                                   batch_size=self.stream_batch_size,
+                                                                                   sort_keys=sort_keys)
+
+        for batch in batches:
+            for block in batch:
+                yield block
+
+    def _text_ds_samples(self, blocks, min_tokens, max_tokens):
+
+        """ Generator of the samples for build_text_ds - for each block (in doc_ID order), yields the list of
+        (file_source, text, text_out) samples created at that block.
+
+        Blocks are tokenized once, in batches of stream_batch_size, and the token count of the sample being
+        assembled is kept as a running total - with the default (byte-level BPE) tokenizer, the count of
+        sample + " " + block is exactly the count of the sample plus the count of " " + block, so the samples
+        are the same as re-tokenizing the sample each time, in linear time. """
+
+        text_sample = ""
+        sample_tokens = 0
+        current_doc = None
+        first_block = True
+
+        for block_batch in self._batched(blocks, self.stream_batch_size):
+
+            appended_token_counts = self.batch_token_counter([" " + block["text"] for block in block_batch])
+
+            for elements, appended_tokens in zip(block_batch, appended_token_counts):
+
+                samples = []
+
+                if first_block:
+                    current_doc = elements["doc_ID"]
+                    text_sample = elements["text"]
+                    sample_tokens = self.token_counter(text_sample)
+
+                tok_count = sample_tokens
+
+                # if in target range or if last sample in doc
+                if min_tokens <= tok_count <= max_tokens or elements["doc_ID"] != current_doc:
+
+                    samples.append((elements["file_source"], text_sample, text_sample))
+
+                    # edge case for first block
+                    if first_block:
+                        text_sample = ""
+                        sample_tokens = 0
+                    else:
+                        # start fresh
+                        text_sample = elements["text"]
+                        sample_tokens = self.token_counter(text_sample)
+                        current_doc = elements["doc_ID"]
+                else:
+                    if tok_count <= min_tokens:
+                        text_sample += " " + elements["text"]
+                        tok_count += appended_tokens
+
+                    if tok_count >= max_tokens:
+
+                        while tok_count > max_tokens:
+
+                            tokens = self.tokenize_text(text_sample)
+                            chopped = tokens[0:max_tokens]
+                            remainder = tokens[max_tokens:]
+                            remainder_text = self.tokenizer.decode(remainder)
+                            chopped_text = self.tokenizer.decode(chopped)
+
+                            smooth_stop = self._smooth_stopper(chopped_text, 200)
+
+                            new_text_sample = chopped_text[:smooth_stop]
+                            new_remainder = chopped_text[smooth_stop:] + remainder_text
+
+                            samples.append((elements["file_source"], new_text_sample, text_sample))
+
+                            text_sample = new_remainder
+                            tok_count = self.token_counter(text_sample)
+
+                        # pick up last entry, if any
+                        if len(text_sample) > 0:
+                            samples.append((elements["file_source"], text_sample, text_sample))
+
+                    sample_tokens = tok_count
+
+                # pick up last remaining sample, if any
+                if len(text_sample) > 0:
+                    samples.append((elements["file_source"], text_sample, text_sample))
+
+                first_block = False
+
+                yield samples
+
+    @staticmethod
+    def _batched(iterable, batch_size):
+
+        """ Groups an iterable into lists of batch_size. """
+
+        batch = []
+
+        for item in iterable:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
     def get_dataset_sample(self, ds_name, ds_path=None, sample_range=1000):
 
         """ Useful for testing to randomly sample an element from a dataset - based on the input ds_name,
@@ -403,11 +844,10 @@ class Datasets:
                 # by default, will get only text and table entries, but no images (since text is duplicative)
                 filter_list = ["text", "table"]
 
-                if self.library:
-                    results = CollectionRetrieval(self.library_name,
-                                                  account_name=self.account_name).filter_by_key_value_range("content_type",filter_list)
-                else:
-                    raise LibraryObjectNotFoundException("no-library-loaded-in-Dataset-constructor")
+                #   streams the blocks from the db, sorted by doc_ID (and then in order added to the library)
+                results = self._stream_library_blocks({"content_type": {"$in": filter_list}},
+                                                      selected_keys=["_id", "doc_ID", "file_source", "text"],
+                                                      sort_keys=["doc_ID", "_id"])
 
             else:
 
@@ -417,8 +857,10 @@ class Datasets:
                 else:
                     raise LibraryObjectNotFoundException("no-library-loaded-in-Dataset-constructor")
 
+                results = sorted(results, key=lambda x: x["doc_ID"], reverse=False)
+
         else:
-            results = qr
+            results = sorted(qr, key=lambda x: x["doc_ID"], reverse=False)
 
         counter = 0
         batch_counter = 0
@@ -433,87 +875,14 @@ class Datasets:
         validation_files_created = []
         testing_files_created = []
 
-        text_sample = ""
-        current_doc = 0
-
-        results = sorted(results, key=lambda x:x["doc_ID"], reverse=False)
-
-        for i, elements in enumerate(results):
+        for samples in self._text_ds_samples(results, min_tokens, max_tokens):
 
-            if i == 0:
-                current_doc = elements["doc_ID"]
-                text_sample = elements["text"]
+            for file_source, text_sample, text_entry in samples:
 
-            tok_count = self.token_counter(text_sample)
-
-            # if in target range or if last sample in doc
-            if min_tokens <= tok_count <= max_tokens or elements["doc_ID"] != current_doc:
-
-                # create sample
                 # replace in output doc_ID for file_source? "doc_ID" | current_doc
-                new_entry = {"sample_number": counter, "file_source": elements["file_source"], "text": text_sample}
+                new_entry = {"sample_number": counter, "file_source": file_source, "text": text_sample}
                 output.append(new_entry)
-                text_out.append(text_sample)
-                counter += 1
-                batch_counter += 1
-
-                # edge case for i==0
-                if i == 0:
-                    text_sample = ""
-                else:
-                    # start fresh
-                    text_sample = elements["text"]
-                    current_doc = elements["doc_ID"]
-            else:
-                if tok_count <= min_tokens:
-                    text_sample += " " + elements["text"]
-                    tok_count = self.token_counter(text_sample)
-
-                if tok_count >= max_tokens:
-
-                    while tok_count > max_tokens:
-
-                        tokens = self.tokenize_text(text_sample)
-                        chopped = tokens[0:max_tokens]
-                        remainder = tokens[max_tokens:]
-                        remainder_text = self.tokenizer.decode(remainder)
-                        chopped_text = self.tokenizer.decode(chopped)
-
-                        smooth_stop = self._smooth_stopper(chopped_text,200)
-
-                        new_text_sample = chopped_text[:smooth_stop]
-                        new_remainder = chopped_text[smooth_stop:] + remainder_text
-
-                        # replacing doc_ID: current_doc
-                        new_entry = {"sample_number": counter, "file_source": elements["file_source"],
-                                     "text": new_text_sample}
-
-                        output.append(new_entry)
-                        text_out.append(text_sample)
-                        counter += 1
-                        batch_counter += 1
-                        text_sample = new_remainder
-                        tok_count = self.token_counter(text_sample)
-
-                    # pick up last entry, if any
-                    if len(text_sample) > 0:
-
-                        #   replacing "doc_ID" | current_doc
-                        new_entry = {"sample_number": counter, "file_source": elements["file_source"],
-                                     "text": text_sample}
-
-                        output.append(new_entry)
-                        text_out.append(text_sample)
-                        counter += 1
-                        batch_counter += 1
-
-            # pick up last remaining sample, if any
-            if len(text_sample) > 0:
-
-                #   replacing "doc_ID" | current_doc
-                new_entry = {"sample_number": counter, "file_source": elements["file_source"], "text": text_sample}
-                output.append(new_entry)
-                text_out.append(text_sample)
+                text_out.append(text_entry)
                 counter += 1
                 batch_counter += 1
 
@@ -616,11 +985,9 @@ class Datasets:
             #   basic filter to get all text and tables in collection
             filter_list = ["text", "table"]
 
-            if self.library:
-                results = CollectionRetrieval(self.library_name, account_name=self.account_name).\
-                    filter_by_key_value_range("content_type", filter_list)
-            else:
-                raise LibraryObjectNotFoundException("no-library-loaded-in-Dataset-constructor")
+            results = self._stream_library_blocks({"content_type": {"$in": filter_list}},
+                                                  selected_keys=["doc_ID", "file_source", "text", "table",
+                                                                 "header_text"])
 
         else:
             results = qr
@@ -777,11 +1144,9 @@ class Datasets:
         if not qr:
             filter_list = ["text"]  # includes only text - should tables be excluded ?
 
-            if self.library:
-                results = CollectionRetrieval(self.library_name, account_name=self.account_name).\
-                    filter_by_key_value_range("content_type", filter_list)
-            else:
-                raise LibraryObjectNotFoundException("no-library-loaded-in-Dataset-constructor")
+            results = self._stream_library_blocks({"content_type": {"$in": filter_list}},
+                                                  selected_keys=["doc_ID", "file_source", "text", "table",
+                                                                 "header_text"])
 
         else:
             results = qr
@@ -1451,12 +1816,8 @@ class Datasets:
                 # by default, will get only text and table entries, but no images (since text is duplicative)
                 filter_list = ["text", "table"]
 
-                if self.library:
-                    results = CollectionRetrieval(self.library.library_name,
-                                                  account_name=self.library.account_name).filter_by_key_value_range("content_type",
-                                                                                                 filter_list)
-                else:
-                    raise LibraryObjectNotFoundException("no-library-loaded-in-Dataset-constructor")
+                results = self._stream_library_blocks({"content_type": {"$in": filter_list}},
+                                                      selected_keys=["doc_ID", "file_source", "text"])
             else:
 
                 if self.library:
@@ -1768,6 +2129,51 @@ class Datasets:
 
         return output_new, text_out_new, testing_set, validation_set, testing_text, validation_text
 
+    def export_dataset_shards(self, ds_id, output_folder=None, shard_size=100000, workers=1, file_format="jsonl",
+                              compression=None):
+
+        """ Re-packages a dataset built by one of the builders into fixed-size shards for a training pipeline,
+        with a ShardedExporter for each of the training, validation and testing splits - written in the current
+        process, or in parallel worker processes if workers > 1 (which needs an `if __name__ == "__main__":` guard
+        in the calling script on 'spawn' platforms, e.g., macOS and Windows), as JSONL (optionally gzip or zstd
+        compressed) or Parquet, with a manifest of row counts and checksums for each split.  Running again after an interruption skips completed shards.
+
+        Returns a dict with the manifest for each split. """
+
+        ds_folder = os.path.join(self.work_folder, self.ds_base_name + ds_id)
+
+        if not os.path.exists(os.path.join(ds_folder, "manifest.json")):
+            raise FilePathDoesNotExistException(os.path.join(ds_folder, "manifest.json"))
+
+        dataset_dict = json.load(open(os.path.join(ds_folder, "manifest.json"), "r", encoding="utf-8"))
+
+        if not output_folder:
+            output_folder = os.path.join(ds_folder, "shards")
+
+        def stream_samples(files):
+            for fn in files:
+                if fn.endswith(".jsonl"):
+                    with open(os.path.join(ds_folder, fn), "r", encoding="utf-8") as f:
+                        for line in f:
+                            yield json.loads(line)
+
+        export_manifests = {}
+
+        for split in ["training", "validation", "testing"]:
+
+            files = dataset_dict.get(split + "_files", [])
+
+            if not files:
+                continue
+
+            exporter = ShardedExporter(output_folder, shard_size=shard_size, workers=workers,
+                                       file_format=file_format, compression=compression,
+                                       file_name_base=split + "_samples")
+
+            export_manifests.update({split: exporter.export(stream_samples(files))})
+
+        return export_manifests
+
     def save_tr_va_te_sets(self, tr_output, tr_text, va_output, va_text, te_output, te_text, ds_folder, batch_number):
 
         """ Saves the generated datasets into files. """
@@ -20,6 +20,10 @@ _EmbeddingUtils class, which provides a set of functions used by all vector data
 """
 
 import os
+import json
+import shutil
+import hashlib
+import sqlite3
 import logging
 import numpy as np
 import re
@@ -30,7 +34,8 @@ from importlib import util
 import importlib
 
 from llmware.configs import LLMWareConfig, MongoConfig, MilvusConfig, PostgresConfig, RedisConfig, \
-    PineconeConfig, QdrantConfig, Neo4jConfig, LanceDBConfig, ChromaDBConfig, VectorDBRegistry
+    PineconeConfig, QdrantConfig, Neo4jConfig, LanceDBConfig, ChromaDBConfig, NumpyMMapConfig, EmbeddingCacheConfig, \
+    VectorQuantizationConfig, VectorDBRegistry
 from llmware.exceptions import (UnsupportedEmbeddingDatabaseException, EmbeddingModelNotFoundException,
                                 DependencyNotInstalledException, LLMWareException)
 from llmware.resources import CollectionRetrieval, CollectionWriter
@@ -132,9 +137,11 @@ class EmbeddingHandler:
 
         return embedding_status
    
-    def search_index(self, query_vector, embedding_db, model, sample_count=10):
+    def search_index(self, query_vector, embedding_db, model, sample_count=10, filter_dict=None):
 
-        """ Main entry point to vector search query """
+        """ Main entry point to vector search query - if a filter_dict is passed, e.g., {"doc_ID": [2,5]}, and the
+        vector db supports pre-filtering, then the filter is applied inside the vector db search, otherwise the
+        unfiltered top sample_count results are returned, and the filter is applied by the caller. """
 
         # Need to normalize the query_vector.
         # Sometimes it comes in as [[1.1,2.1,3.1]] (from Transformers) and sometimes as [1.1,2.1,3.1]
@@ -144,8 +151,18 @@ class EmbeddingHandler:
             query_vector = query_vector[0]
 
         embedding_class = self._load_embedding_db(embedding_db, model=model)
+
+        if filter_dict and self.supports_filtered_search(embedding_class):
+            return embedding_class.search_index_with_filter(query_vector, filter_dict, sample_count=sample_count)
+
         return embedding_class.search_index(query_vector,sample_count=sample_count)
 
+    def supports_filtered_search(self, embedding_class):
+
+        """ Checks if the vector db class implements search_index_with_filter. """
+
+        return hasattr(embedding_class, "search_index_with_filter")
+
     def delete_index(self, embedding_db, model_name, embedding_dims):
 
         """ Deletes vector embedding - note:  does not delete the underlying text collection """
@@ -200,6 +217,167 @@ class EmbeddingHandler:
         return index_name.lower()
 
 
+class EmbeddingCache:
+
+    """Implements a persistent cache of embedding vectors, keyed by (model_name, sha1 hash of the text), which is
+    consulted by the vector db classes before calling the embedding model, so that text that has already been
+    embedded with the same model - e.g., repeated headers and boilerplate, or the same library embedded into a
+    new vector db - is not embedded again.
+
+    The cache is a SQLite database (by default in the llmware path), and is size-bounded by max_entries, with the
+    least recently used entries evicted first.  The cache is off by default - settings, including "enabled", are
+    in ``EmbeddingCacheConfig``.  Vectors are stored, and returned, as float32.
+
+    Parameters
+    ----------
+    model_name : str
+        Name of the embedding model.
+
+    embedding_dims : int, default=None
+        Dimension of the embedding - cached vectors with different dimension are ignored.
+
+    Returns
+    -------
+    embedding_cache : EmbeddingCache
+        A new ``EmbeddingCache`` object.
+    """
+
+    def __init__(self, model_name, embedding_dims=None):
+
+        self.model_name = model_name
+        self.embedding_dims = embedding_dims
+        self.max_entries = EmbeddingCacheConfig().get_config("max_entries")
+
+        cache_folder_path = EmbeddingCacheConfig().get_config("cache_folder_path")
+        if not cache_folder_path:
+            cache_folder_path = LLMWareConfig().get_llmware_path()
+
+        os.makedirs(cache_folder_path, exist_ok=True)
+
+        self.cache_db_path = os.path.join(cache_folder_path, EmbeddingCacheConfig().get_config("db_name"))
+
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(self.cache_db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS embedding_cache "
+                          "(model_name TEXT, text_hash TEXT, embedding_dims INTEGER, vector BLOB, "
+                          "last_used INTEGER, PRIMARY KEY (model_name, text_hash))")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS embedding_cache_last_used ON embedding_cache (last_used)")
+        self.conn.commit()
+
+    @staticmethod
+    def text_hash(text):
+        return hashlib.sha1(text.encode("utf-8", errors="replace")).hexdigest()
+
+    def get_many(self, sentences):
+
+        """ Returns a dict of sentence index -> cached vector, for the sentences found in the cache """
+
+        found = {}
+        hash_to_index = {}
+
+        for i, sentence in enumerate(sentences):
+            hash_to_index.setdefault(self.text_hash(sentence), []).append(i)
+
+        hashes = list(hash_to_index.keys())
+
+        # sqlite limits the number of parameters in a statement
+        for start in range(0, len(hashes), 500):
+
+            chunk = hashes[start:start + 500]
+            sql_query = (f"SELECT text_hash, embedding_dims, vector FROM embedding_cache WHERE model_name = ? "
+                         f"AND text_hash IN ({','.join(['?'] * len(chunk))})")
+
+            for text_hash, embedding_dims, vector in self.conn.execute(sql_query, [self.model_name] + chunk):
+
+                if self.embedding_dims and embedding_dims != self.embedding_dims:
+                    continue
+
+                vector = np.frombuffer(vector, dtype="float32")
+                for i in hash_to_index[text_hash]:
+                    found.update({i: vector})
+
+        if found:
+            now = time.time_ns()
+            self.conn.executemany("UPDATE embedding_cache SET last_used = ? WHERE model_name = ? AND text_hash = ?",
+                                  [(now, self.model_name, self.text_hash(sentences[i])) for i in found])
+            self.conn.commit()
+
+        self.hits += len(found)
+        self.misses += len(sentences) - len(found)
+
+        return found
+
+    def put_many(self, sentences, vectors):
+
+        """ Adds the sentence vectors to the cache, and evicts the least recently used entries if over the
+        max_entries limit """
+
+        now = time.time_ns()
+
+        rows = []
+        for sentence, vector in zip(sentences, vectors):
+            vector = np.asarray(vector, dtype="float32").reshape(-1)
+            rows.append((self.model_name, self.text_hash(sentence), int(vector.shape[0]), vector.tobytes(), now))
+
+        self.conn.executemany("INSERT OR REPLACE INTO embedding_cache "
+                              "(model_name, text_hash, embedding_dims, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                              rows)
+        self.conn.commit()
+
+        self.evict()
+
+        return len(rows)
+
+    def evict(self):
+
+        """ Removes least recently used entries down to 90% of max_entries, if the cache is over max_entries """
+
+        if not self.max_entries:
+            return 0
+
+        count = self.conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+
+        if count <= self.max_entries:
+            return 0
+
+        remove = count - int(0.9 * self.max_entries)
+
+        self.conn.execute("DELETE FROM embedding_cache WHERE rowid IN "
+                          "(SELECT rowid FROM embedding_cache ORDER BY last_used LIMIT ?)", (remove,))
+        self.conn.commit()
+
+        return remove
+
+    def get_stats(self):
+
+        """ Returns hits, misses and hit rate for this cache instance """
+
+        total = self.hits + self.misses
+        hit_rate = round(self.hits / total, 4) if total > 0 else 0.0
+
+        return {"embedding_cache_hits": self.hits, "embedding_cache_misses": self.misses,
+                "embedding_cache_hit_rate": hit_rate}
+
+    def clear(self, model_name=None):
+
+        """ Removes all entries in the cache - or only the entries for model_name, if passed """
+
+        if model_name:
+            self.conn.execute("DELETE FROM embedding_cache WHERE model_name = ?", (model_name,))
+        else:
+            self.conn.execute("DELETE FROM embedding_cache")
+
+        self.conn.commit()
+
+        return True
+
+    def close(self):
+        self.conn.close()
+
+
 class _EmbeddingUtils:
 
     """Provides functions to vector stores, such as creating names for the text collection database as well
@@ -242,6 +420,7 @@ class _EmbeddingUtils:
         self.embedding_dims = embedding_dims
         self.collection_key= None
         self.collection_name= None
+        self.embedding_cache = None
 
     def create_safe_collection_name(self):
 
@@ -289,6 +468,48 @@ class _EmbeddingUtils:
 
         return all_blocks_cursor, num_of_blocks
 
+    def embedding(self, model, sentences):
+
+        """ Returns the embedding vectors for the sentences - if the embedding cache is enabled, then vectors
+        found in the cache are re-used, and only the remaining sentences are passed to the model - the vectors
+        are returned as float32 in either case, as they are stored in the cache """
+
+        if not EmbeddingCacheConfig().get_config("enabled"):
+            return model.embedding(sentences)
+
+        if not self.embedding_cache:
+            self.embedding_cache = EmbeddingCache(self.model_name, embedding_dims=self.embedding_dims)
+
+        found = self.embedding_cache.get_many(sentences)
+
+        if len(found) == len(sentences):
+            return np.array([found[i] for i in range(len(sentences))], dtype="float32")
+
+        # embed each distinct missing sentence once
+        missing = {}
+        for i, sentence in enumerate(sentences):
+            if i not in found:
+                missing.setdefault(sentence, []).append(i)
+
+        missing_sentences = list(missing.keys())
+        new_vectors = np.asarray(model.embedding(missing_sentences), dtype="float32")
+
+        self.embedding_cache.put_many(missing_sentences, new_vectors)
+
+        if not found and len(missing_sentences) == len(sentences):
+            return new_vectors
+
+        vectors = np.zeros((len(sentences), new_vectors.shape[-1]), dtype="float32")
+
+        for i, vector in found.items():
+            vectors[i] = vector
+
+        for sentence, vector in zip(missing_sentences, new_vectors):
+            for i in missing[sentence]:
+                vectors[i] = vector
+
+        return vectors
+
     def generate_embedding_summary(self, embeddings_created):
 
         """ Common summary dictionary at end of embedding job """
@@ -304,6 +525,14 @@ class _EmbeddingUtils:
                              "embedding_dims": self.embedding_dims,
                              "time_stamp": Utilities().get_current_time_now()}
 
+        if self.embedding_cache:
+            embedding_summary.update(self.embedding_cache.get_stats())
+            self.embedding_cache.close()
+            self.embedding_cache = None
+
+        #   persists the final progress of the job in the status table
+        Status(self.account_name).finish_embedding_status(self.library_name, self.model_name)
+
         return embedding_summary
 
     def update_text_index(self, block_ids, current_index):
@@ -338,6 +567,89 @@ class _EmbeddingUtils:
 
         return block_cursor
 
+    def prep_filter_key_dict(self, filter_dict):
+
+        """ Converts a query filter_dict into a key dict for the text collection - list values are converted
+        into '$in' value ranges, and 'page_num' is mapped to the 'master_index' key in the text collection """
+
+        key_dict = {}
+
+        for key, value in filter_dict.items():
+
+            if key == "page_num":
+                key = "master_index"
+
+            if isinstance(value, (list, tuple, set)):
+                value = {"$in": list(value)}
+
+            key_dict.update({key: value})
+
+        return key_dict
+
+    def lookup_filtered_blocks(self, filter_dict):
+
+        """ Returns the list of blocks in the text collection that match the filter_dict """
+
+        cr = CollectionRetrieval(self.library_name, account_name=self.account_name)
+        block_list = cr.filter_by_key_dict(self.prep_filter_key_dict(filter_dict))
+
+        return block_list
+
+    def lookup_filtered_block_ids(self, filter_dict):
+
+        """ Returns the list of block _ids (as str) in the text collection that match the filter_dict """
+
+        return [str(block["_id"]) for block in self.lookup_filtered_blocks(filter_dict)]
+
+    def lookup_filtered_embedding_flags(self, filter_dict):
+
+        """ Returns the list of embedding flag values (the vector index positions used by FAISS) for the blocks
+        in the text collection that match the filter_dict - blocks that have not been embedded are skipped """
+
+        if not self.collection_key:
+            self.create_db_specific_key()
+
+        flag_values = []
+
+        for block in self.lookup_filtered_blocks(filter_dict):
+
+            flag_value = None
+
+            # mongo - flag is saved as key on the block
+            if self.collection_key in block:
+                flag_value = block[self.collection_key]
+
+            elif "embedding_flags" in block:
+
+                # postgres - flag is saved in embedding_flags json column
+                if isinstance(block["embedding_flags"], dict):
+                    flag_value = block["embedding_flags"].get(self.collection_key, None)
+
+                # sqlite - embedding key saved in embedding_flags, and the index is saved in special_field1
+                elif block["embedding_flags"] == self.collection_key:
+                    flag_value = block.get("special_field1", None)
+
+            if flag_value is not None and str(flag_value) != "":
+                flag_values.append(int(flag_value))
+
+        return flag_values
+
+    def get_doc_id_filter(self, filter_dict):
+
+        """ If the filter_dict only filters on doc_ID, then returns the list of doc_IDs, which can be applied
+        directly on the doc id metadata saved with the vectors, without lookup in the text collection """
+
+        if len(filter_dict) == 1 and "doc_ID" in filter_dict:
+
+            doc_ids = filter_dict["doc_ID"]
+
+            if not isinstance(doc_ids, (list, tuple, set)):
+                doc_ids = [doc_ids]
+
+            return [int(doc_id) for doc_id in doc_ids]
+
+        return None
+
     def unset_text_index(self):
 
         """Removes embedding key flag for library, e.g., 'unsets' a group of blocks in text index """
@@ -531,7 +843,7 @@ class EmbeddingMilvus:
             if len(sentences) > 0:
 
                 # Process the batch
-                vectors = self.model.embedding(sentences)
+                vectors = self.utils.embedding(self.model, sentences)
                 data = [block_ids, doc_ids, vectors]
 
                 if self.use_milvus_lite:
@@ -735,6 +1047,41 @@ class EmbeddingFAISS:
         model_safe_path = re.sub(r"[@\/. ]", "", self.model_name).lower()
         self.embedding_file_path = os.path.join(self.library.embedding_path, model_safe_path, "embedding_file_faiss")
 
+        #   exact float32 vectors, kept for re-ranking when the faiss index stores quantized codes
+        self.float_vectors = _NumpyMMapVectorStore(self.embedding_file_path + "_float_vectors",
+                                                   embedding_dims=self.embedding_dims)
+
+    def _create_index(self):
+
+        """ Creates a new flat index - or a scalar quantizer index with int8 or fp16 codes, if vector
+        quantization is set in VectorQuantizationConfig """
+
+        quantization = VectorQuantizationConfig().get_config("quantization")
+
+        if not quantization:
+            return faiss.IndexFlatL2(self.embedding_dims)
+
+        quantizer_type = {"int8": faiss.ScalarQuantizer.QT_8bit,
+                          "fp16": faiss.ScalarQuantizer.QT_fp16}[quantization]
+
+        return faiss.IndexScalarQuantizer(self.embedding_dims, quantizer_type, faiss.METRIC_L2)
+
+    def _rerank(self, query_embedding_vector, distance_list, index_list, sample_count):
+
+        """ Re-scores the candidates from the quantized index with the exact float32 vectors """
+
+        positions = np.array([int(index) for index in index_list[0] if int(index) >= 0], dtype="int64")
+
+        if len(positions) == 0:
+            return distance_list, index_list
+
+        exact_vectors = self.float_vectors.get_vectors(positions)
+        distances = ((exact_vectors - np.asarray(query_embedding_vector, dtype="float32")) ** 2).sum(axis=1)
+
+        order = np.argsort(distances, kind="stable")[:sample_count]
+
+        return np.array([distances[order]]), np.array([positions[order]])
+
     def create_new_embedding(self, doc_ids=None, batch_size=100):
 
         """ Load or create index """
@@ -752,10 +1099,15 @@ class EmbeddingFAISS:
                     raise DependencyNotInstalledException("faiss-cpu")
             else:
                 try:
-                    self.index = faiss.IndexFlatL2(self.embedding_dims)
+                    self.index = self._create_index()
                 except:
                     raise DependencyNotInstalledException("faiss-cpu")
 
+        # quantized index - exact vectors kept in side file for re-ranking, with the same positions as the index
+        use_rerank = not isinstance(self.index, faiss.IndexFlat) and \
+            VectorQuantizationConfig().get_config("rerank_factor") > 0 and \
+            self.float_vectors.meta["count"] == self.index.ntotal
+
         # get cursor for text collection with blocks requiring embedding
         all_blocks_cursor, num_of_blocks = self.utils.get_blocks_cursor(doc_ids=doc_ids)
 
@@ -790,9 +1142,17 @@ class EmbeddingFAISS:
             
             if len(sentences) > 0:
                 # Process the batch
-                vectors = self.model.embedding(sentences)
+                vectors = self.utils.embedding(self.model, sentences)
+
+                # scalar quantizer learns the per-dimension range from the first batch
+                if not self.index.is_trained:
+                    self.index.train(np.array(vectors, dtype="float32"))
+
                 self.index.add(np.array(vectors))
 
+                if use_rerank:
+                    self.float_vectors.add(block_ids, vectors)
+
                 current_index = self.utils.update_text_index(block_ids,current_index)
 
                 embeddings_created += len(sentences)
@@ -820,7 +1180,14 @@ class EmbeddingFAISS:
         if not self.index:
             self.index = faiss.read_index(self.embedding_file_path)
 
-        distance_list, index_list = self.index.search(np.array([query_embedding_vector]), sample_count)
+        if self.float_vectors.meta["count"] > 0:
+            rerank_factor = max(VectorQuantizationConfig().get_config("rerank_factor"), 1)
+            distance_list, index_list = self.index.search(np.array([query_embedding_vector]),
+                                                          sample_count * rerank_factor)
+            distance_list, index_list = self._rerank(query_embedding_vector, distance_list, index_list,
+                                                     sample_count)
+        else:
+            distance_list, index_list = self.index.search(np.array([query_embedding_vector]), sample_count)
 
         block_list = []
         for i, index in enumerate(index_list[0]):
@@ -839,6 +1206,49 @@ class EmbeddingFAISS:
 
         return block_list
 
+    def search_index_with_filter(self, query_embedding_vector, filter_dict, sample_count=10):
+
+        """ Search FAISS index restricted to the blocks selected by filter_dict, using an IDSelector over the
+        FAISS index positions of the filtered blocks. """
+
+        if not self.index:
+            self.index = faiss.read_index(self.embedding_file_path)
+
+        faiss_ids = self.utils.lookup_filtered_embedding_flags(filter_dict)
+
+        if not faiss_ids:
+            return []
+
+        selector = faiss.IDSelectorBatch(np.array(faiss_ids, dtype="int64"))
+
+        rerank_factor = 1
+        if self.float_vectors.meta["count"] > 0:
+            rerank_factor = max(VectorQuantizationConfig().get_config("rerank_factor"), 1)
+
+        distance_list, index_list = self.index.search(np.array([query_embedding_vector]),
+                                                      min(sample_count * rerank_factor, len(faiss_ids)),
+                                                      params=faiss.SearchParameters(sel=selector))
+
+        if rerank_factor > 1:
+            distance_list, index_list = self._rerank(query_embedding_vector, distance_list, index_list,
+                                                     sample_count)
+
+        block_list = []
+        for i, index in enumerate(index_list[0]):
+
+            index_int = int(index.item())
+
+            #   faiss pads with -1 if fewer results than sample_count
+            if index_int < 0:
+                continue
+
+            block_result_list = self.utils.lookup_embedding_flag(self.collection_key,index_int)
+
+            for block in block_result_list:
+                block_list.append((block, distance_list[0][i]))
+
+        return block_list
+
     def delete_index(self):
 
         """ Delete FAISS index """
@@ -846,6 +1256,8 @@ class EmbeddingFAISS:
         if os.path.exists(self.embedding_file_path):
             os.remove(self.embedding_file_path)
 
+            self.float_vectors.destroy()
+
             # remove emb key - 'unset' the blocks in the text collection
             self.utils.unset_text_index()
 
@@ -994,7 +1406,7 @@ class EmbeddingLanceDB:
                 
                 if len(sentences) > 0:
                     # Process the batch
-                    vectors = self.model.embedding(sentences)
+                    vectors = self.utils.embedding(self.model, sentences)
 
                     # expects records as tuples - (batch of _ids, batch of vectors, batch of dict metadata)
                     # records = zip(block_ids, vectors) #, doc_ids)
@@ -1041,6 +1453,36 @@ class EmbeddingLanceDB:
 
         return block_list
 
+    def search_index_with_filter(self, query_embedding_vector, filter_dict, sample_count=10):
+
+        """ Search LanceDB table with a pre-filter on the ids of the blocks selected by filter_dict. """
+
+        block_ids = self.utils.lookup_filtered_block_ids(filter_dict)
+
+        if not block_ids:
+            return []
+
+        id_range = ", ".join(["'" + block_id.replace("'", "''") + "'" for block_id in block_ids])
+
+        try:
+            result = self.index.search(query=query_embedding_vector.tolist())\
+                .where(f"id IN ({id_range})", prefilter=True)\
+                .select(["id", "vector"])\
+                .limit(sample_count).to_pandas()
+
+            block_list = []
+
+            for (_, id, vec, score) in result.itertuples(name=None):
+                block_result_list = self.utils.lookup_text_index(id)
+
+                for block in block_result_list:
+                    block_list.append((block, score))
+
+        except Exception as e:
+            raise LLMWareException(message=f"Exception: LanceDB - {e}")
+
+        return block_list
+
     def delete_index(self):
 
         self.db.drop_table(self.collection_name)
@@ -1198,7 +1640,7 @@ class EmbeddingPinecone:
             
             if len(sentences) > 0:
                 # Process the batch
-                vectors = self.model.embedding(sentences)
+                vectors = self.utils.embedding(self.model, sentences)
 
                 # expects records as tuples - (batch of _ids, batch of vectors, batch of dict metadata)
                 records = zip(block_ids, vectors) #, doc_ids)
@@ -1400,7 +1842,7 @@ class EmbeddingMongoAtlas:
             
             if len(sentences) > 0:
                 # Process the batch
-                vectors = self.model.embedding(sentences).tolist()
+                vectors = self.utils.embedding(self.model, sentences).tolist()
 
                 docs_to_insert = []
                 for i, vector in enumerate(vectors):
@@ -1674,7 +2116,7 @@ class EmbeddingRedis:
             if len(sentences) > 0:
 
                 # Process the batch
-                vectors = self.model.embedding(sentences)
+                vectors = self.utils.embedding(self.model, sentences)
 
                 pipe = self.r.pipeline()
 
@@ -1883,7 +2325,7 @@ class EmbeddingQdrant:
             if len(sentences) > 0:
 
                 # Process the batch
-                vectors = self.model.embedding(sentences)
+                vectors = self.utils.embedding(self.model, sentences)
 
                 for i, embedding in enumerate(vectors):
 
@@ -1933,6 +2375,39 @@ class EmbeddingQdrant:
 
         return block_list
 
+    def search_index_with_filter(self, query_embedding_vector, filter_dict, sample_count=10):
+
+        """ Search Qdrant collection with a payload filter - doc_ID filters are applied directly on the
+        block_doc_id payload, and other filters on the block_mongo_id of the filtered blocks. """
+
+        doc_ids = self.utils.get_doc_id_filter(filter_dict)
+
+        if doc_ids is not None:
+            condition = qdrant_client.http.models.FieldCondition(
+                key="block_doc_id", match=qdrant_client.http.models.MatchAny(any=doc_ids))
+        else:
+            block_ids = self.utils.lookup_filtered_block_ids(filter_dict)
+
+            if not block_ids:
+                return []
+
+            condition = qdrant_client.http.models.FieldCondition(
+                key="block_mongo_id", match=qdrant_client.http.models.MatchAny(any=block_ids))
+
+        search_results = self.qclient.search(collection_name=self.collection_name,
+                                             query_vector=query_embedding_vector, limit=sample_count,
+                                             query_filter=qdrant_client.http.models.Filter(must=[condition]))
+
+        block_list = []
+        for j, res in enumerate(search_results):
+
+            block_result_list = self.utils.lookup_text_index(res.payload["block_mongo_id"])
+
+            for block in block_result_list:
+                block_list.append((block, res.score))
+
+        return block_list
+
     def delete_index(self):
 
         # delete index - need to add
@@ -2156,7 +2631,7 @@ class EmbeddingPGVector:
             if len(sentences) > 0:
 
                 # Process the batch
-                vectors = self.model.embedding(sentences)
+                vectors = self.utils.embedding(self.model, sentences)
 
                 for i, embedding in enumerate(vectors):
 
@@ -2276,6 +2751,45 @@ class EmbeddingPGVector:
 
         return block_list
 
+    def search_index_with_filter(self, query_embedding_vector, filter_dict, sample_count=10):
+
+        """ Search pgvector table with a WHERE clause - doc_ID filters are applied directly on the block_doc_id
+        column, and other filters on the block_mongo_id of the filtered blocks. """
+
+        query_embedding_vector = np.array(query_embedding_vector)
+
+        doc_ids = self.utils.get_doc_id_filter(filter_dict)
+
+        if doc_ids is not None:
+            where_clause = "block_doc_id = ANY(%s)"
+            filter_values = doc_ids
+        else:
+            filter_values = self.utils.lookup_filtered_block_ids(filter_dict)
+            where_clause = "block_mongo_id = ANY(%s)"
+
+            if not filter_values:
+                self.conn.close()
+                return []
+
+        q = (f"SELECT id, block_mongo_id, embedding <-> %s AS distance, text "
+             f"FROM {self.collection_name} WHERE {where_clause} ORDER BY distance LIMIT %s")
+
+        cursor = self.conn.cursor()
+        results = cursor.execute(q, (query_embedding_vector, filter_values, sample_count))
+
+        block_list = []
+        for j, res in enumerate(results):
+
+            block_result_list = self.utils.lookup_text_index(res[1])
+
+            for block in block_result_list:
+                block_list.append((block, res[2]))
+
+        # Closing the connection
+        self.conn.close()
+
+        return block_list
+
     def delete_index(self, collection_name=None):
 
         # delete index - drop table
@@ -2461,7 +2975,7 @@ class EmbeddingNeo4j:
 
             if len(sentences) > 0:
                 # Process the batch
-                vectors = self.model.embedding(sentences)
+                vectors = self.utils.embedding(self.model, sentences)
                 data = [block_ids, doc_ids, vectors]
 
                 # Insert into Neo4J
@@ -2684,7 +3198,7 @@ class EmbeddingChromaDB:
 
             if len(sentences) > 0:
                 # Process the batch
-                vectors = self.model.embedding(sentences)
+                vectors = self.utils.embedding(self.model, sentences)
 
                 # Insert into ChromaDB
                 ids = [f'{doc_id}-{block_id}' for doc_id, block_id in zip(doc_ids, block_ids)]
@@ -2728,7 +3242,646 @@ class EmbeddingChromaDB:
 
         return block_list
 
+    def search_index_with_filter(self, query_embedding_vector, filter_dict, sample_count=10):
+
+        """ Search ChromaDB collection with a metadata 'where' filter - doc_ID filters are applied directly on the
+        doc_id metadata, and other filters on the block_id metadata of the filtered blocks. """
+
+        block_list = []
+
+        doc_ids = self.utils.get_doc_id_filter(filter_dict)
+
+        if doc_ids is not None:
+            where = {"doc_id": {"$in": doc_ids}}
+        else:
+            block_ids = self.utils.lookup_filtered_block_ids(filter_dict)
+
+            if not block_ids:
+                return block_list
+
+            where = {"block_id": {"$in": block_ids}}
+
+        query_embedding_vector = query_embedding_vector.reshape(1, -1)
+
+        results = self._collection.query(query_embeddings=query_embedding_vector, n_results=sample_count,
+                                         where=where)
+
+        for idx_result, _ in enumerate(results['ids'][0]):
+            block_id = results['metadatas'][0][idx_result]['block_id']
+            block_result_list = self.utils.lookup_text_index(block_id)
+
+            for block in block_result_list:
+                block_list.append((block, results['distances'][0][idx_result]))
+
+        return block_list
+
     def delete_index(self):
 
         self.client.delete_collection(self._collection.name)
         self.utils.unset_text_index()
+
+
+class _NumpyMMapVectorStore:
+
+    """Implements a dependency-free, append-only vector store on memory-mapped numpy .npy files, which is used by
+    ``EmbeddingNumpyMMap``, and can also be used directly as a standalone local vector store.
+
+    The store keeps four parallel arrays in the folder_path - the vectors (float32 or float16), the squared norm of
+    each vector, the block id of each vector, and a 'live' flag used as a tombstone for deleted vectors - plus a
+    small json file with the current count and settings.  Vectors are appended in place, and the files are
+    re-allocated with doubled capacity when full.  Queries run as blocked matrix-vector products over the mmap'd
+    vectors with argpartition to keep the top results, and deleted vectors are skipped until compact() is called.
+
+    The vectors can also be stored as scalar-quantized "int8" codes, with a per-dimension offset and scale fit on
+    the first batch added.  If rerank_factor > 0, then the exact float32 vectors are kept in a side file, and the
+    top sample_count * rerank_factor candidates from the first pass on the codes are re-scored with the exact
+    vectors - only the candidate rows of the side file are read in a query.
+
+    Parameters
+    ----------
+    folder_path : str
+        Folder path for the store files.
+
+    embedding_dims : int, default=None
+        Dimension of the embedding - required when creating a new store.
+
+    dtype : str, default="float32"
+        Storage type of the vectors - "float32", "float16" or "int8".
+
+    search_block_size : int, default=16384
+        Number of vectors scored in each block of the search.
+
+    initial_capacity : int, default=10000
+        Number of vectors allocated when creating a new store.
+
+    id_width : int, default=32
+        Max length of a block id.
+
+    rerank_factor : int, default=0
+        If > 0, keeps the exact float32 vectors in a side file, and re-scores sample_count * rerank_factor
+        candidates in each query - used with "float16" or "int8" storage.
+    """
+
+    def __init__(self, folder_path, embedding_dims=None, dtype="float32", search_block_size=16384,
+                 initial_capacity=10000, id_width=32, rerank_factor=0):
+
+        self.folder_path = folder_path
+        self.meta_path = os.path.join(folder_path, "meta.json")
+        self.quantizer_path = os.path.join(folder_path, "quantizer.npy")
+
+        self.search_block_size = search_block_size
+        self.initial_capacity = initial_capacity
+
+        self.meta = {"count": 0, "capacity": 0, "deleted": 0, "embedding_dims": embedding_dims,
+                     "dtype": dtype, "id_width": id_width, "rerank_factor": rerank_factor}
+
+        if os.path.exists(self.meta_path):
+            self.meta = json.load(open(self.meta_path, "r", encoding="utf-8"))
+
+        if self.meta["dtype"] not in ["float32", "float16", "int8"]:
+            raise LLMWareException(message=f"Exception: _NumpyMMapVectorStore - dtype not supported - "
+                                           f"{self.meta['dtype']} - use 'float32', 'float16' or 'int8'")
+
+        #   int8 quantizer - row 0 is the per-dimension offset, and row 1 is the per-dimension scale
+        self.quantizer = None
+        if os.path.exists(self.quantizer_path):
+            self.quantizer = np.load(self.quantizer_path)
+
+    def _file_path(self, name):
+        return os.path.join(self.folder_path, name + ".npy")
+
+    def _save_meta(self):
+
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _array_specs(self):
+
+        """ Name, dtype and row shape of each of the parallel arrays in the store """
+
+        specs = [("vectors", self.meta["dtype"], (self.meta["embedding_dims"],)),
+                 ("norms", "float32", ()),
+                 ("ids", f"<U{self.meta['id_width']}", ()),
+                 ("live", "bool", ())]
+
+        if self.meta.get("rerank_factor", 0) > 0:
+            specs.append(("float_vectors", "float32", (self.meta["embedding_dims"],)))
+
+        return specs
+
+    def _fit_quantizer(self, vectors):
+
+        """ Fits the per-dimension offset and scale of the int8 codes on the vectors """
+
+        offset = vectors.min(axis=0)
+        scale = (vectors.max(axis=0) - offset) / 255.0
+        scale[scale <= 0] = 1e-8
+
+        self.quantizer = np.stack([offset, scale]).astype("float32")
+        np.save(self.quantizer_path, self.quantizer)
+
+        return self.quantizer
+
+    def _encode(self, vectors):
+
+        """ Converts float32 vectors to the storage dtype - int8 codes are clipped to the fitted range """
+
+        if self.meta["dtype"] != "int8":
+            return vectors.astype(self.meta["dtype"])
+
+        codes = np.rint((vectors - self.quantizer[0]) / self.quantizer[1])
+
+        return (np.clip(codes, 0, 255) - 128).astype("int8")
+
+    def _decode(self, stored):
+
+        """ Converts stored vectors back to float32 """
+
+        if self.meta["dtype"] != "int8":
+            return stored.astype("float32")
+
+        return (stored.astype("float32") + 128) * self.quantizer[1] + self.quantizer[0]
+
+    def _open_arrays(self, mode="r"):
+
+        """ Opens the parallel arrays as memmaps - returns dict of name -> memmap """
+
+        arrays = {}
+        for name, dtype, row_shape in self._array_specs():
+            arrays.update({name: np.lib.format.open_memmap(self._file_path(name), mode=mode)})
+
+        return arrays
+
+    def _reallocate(self, new_capacity, keep=None):
+
+        """ Creates new array files with new_capacity, and copies the current rows - or only the rows selected
+        by the keep mask - then replaces the current files """
+
+        os.makedirs(self.folder_path, exist_ok=True)
+
+        count = self.meta["count"]
+        old_arrays = self._open_arrays(mode="r") if self.meta["capacity"] > 0 else None
+
+        new_count = count
+        if keep is not None:
+            new_count = int(keep.sum())
+
+        for name, dtype, row_shape in self._array_specs():
+
+            tmp_path = self._file_path(name + "_tmp")
+            new_array = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype,
+                                                  shape=(new_capacity,) + row_shape)
+
+            if old_arrays is not None and count > 0:
+
+                # copy in blocks to keep memory use bounded
+                write_pos = 0
+                for start in range(0, count, self.search_block_size):
+                    stop = min(start + self.search_block_size, count)
+                    rows = old_arrays[name][start:stop]
+                    if keep is not None:
+                        rows = rows[keep[start:stop]]
+                    new_array[write_pos:write_pos + len(rows)] = rows
+                    write_pos += len(rows)
+
+            new_array.flush()
+            del new_array
+
+        del old_arrays
+
+        for name, dtype, row_shape in self._array_specs():
+            os.replace(self._file_path(name + "_tmp"), self._file_path(name))
+
+        self.meta["capacity"] = new_capacity
+        self.meta["count"] = new_count
+
+        if keep is not None:
+            self.meta["deleted"] = 0
+
+        self._save_meta()
+
+        return True
+
+    def add(self, block_ids, vectors):
+
+        """ Appends vectors and the parallel block ids to the store - returns the starting position """
+
+        vectors = np.asarray(vectors, dtype="float32")
+
+        if not self.meta["embedding_dims"]:
+            self.meta["embedding_dims"] = int(vectors.shape[-1])
+
+        vectors = vectors.reshape(-1, self.meta["embedding_dims"])
+
+        block_ids = [str(block_id) for block_id in block_ids]
+
+        if len(block_ids) != len(vectors):
+            raise LLMWareException(message=f"Exception: _NumpyMMapVectorStore - number of block ids "
+                                           f"{len(block_ids)} does not match number of vectors {len(vectors)}")
+
+        for block_id in block_ids:
+            if len(block_id) > self.meta["id_width"]:
+                raise LLMWareException(message=f"Exception: _NumpyMMapVectorStore - block id longer than "
+                                               f"id_width - {block_id}")
+
+        start = self.meta["count"]
+        stop = start + len(vectors)
+
+        if self.meta["dtype"] == "int8" and self.quantizer is None:
+            os.makedirs(self.folder_path, exist_ok=True)
+            self._fit_quantizer(vectors)
+
+        if stop > self.meta["capacity"]:
+            self._reallocate(max(stop, 2 * self.meta["capacity"], self.initial_capacity))
+
+        arrays = self._open_arrays(mode="r+")
+
+        stored = self._encode(vectors)
+        arrays["vectors"][start:stop] = stored
+
+        # norms computed from the stored values, so that distances are exact for the stored vectors - for int8
+        # codes, uses the exact norms, as the first pass is re-scored with the exact vectors
+        if self.meta["dtype"] != "int8":
+            stored = stored.astype("float32")
+        else:
+            stored = vectors
+
+        arrays["norms"][start:stop] = np.einsum("ij,ij->i", stored, stored)
+
+        arrays["ids"][start:stop] = block_ids
+        arrays["live"][start:stop] = True
+
+        if "float_vectors" in arrays:
+            arrays["float_vectors"][start:stop] = vectors
+
+        for array in arrays.values():
+            array.flush()
+
+        del arrays
+
+        self.meta["count"] = stop
+        self._save_meta()
+
+        return start
+
+    def search(self, query_vector, sample_count=10, block_ids=None):
+
+        """ Returns list of (block_id, squared l2 distance) for the closest sample_count vectors - if block_ids
+        passed, then only vectors with one of the block_ids are searched """
+
+        count = self.meta["count"]
+
+        if count == 0 or sample_count < 1:
+            return []
+
+        query_vector = np.asarray(query_vector, dtype="float32").reshape(-1)
+        query_norm = float(np.dot(query_vector, query_vector))
+
+        allowed_ids = None
+        if block_ids is not None:
+            allowed_ids = np.array([str(block_id) for block_id in block_ids], dtype=f"<U{self.meta['id_width']}")
+
+        arrays = self._open_arrays(mode="r")
+
+        final_count = sample_count
+
+        # first pass keeps a larger candidate set to be re-scored with the exact vectors
+        rerank = "float_vectors" in arrays
+        if rerank:
+            sample_count = sample_count * self.meta["rerank_factor"]
+
+        # for int8 codes - v = offset + scale * (code + 128), so v.q = code.(scale * q) + q.offset + 128 sum(scale * q)
+        code_query = query_vector
+        code_bias = 0.0
+        if self.meta["dtype"] == "int8":
+            code_query = query_vector * self.quantizer[1]
+            code_bias = float(np.dot(query_vector, self.quantizer[0]) + 128 * code_query.sum())
+
+        best_distances = np.empty(0, dtype="float32")
+        best_positions = np.empty(0, dtype="int64")
+
+        for start in range(0, count, self.search_block_size):
+
+            stop = min(start + self.search_block_size, count)
+
+            mask = arrays["live"][start:stop]
+            if allowed_ids is not None:
+                mask = mask & np.isin(arrays["ids"][start:stop], allowed_ids)
+
+            if not mask.any():
+                continue
+
+            # squared l2 distance = |v|^2 - 2 v.q + |q|^2
+            block_vectors = arrays["vectors"][start:stop].astype("float32", copy=False)
+            distances = arrays["norms"][start:stop] - 2 * (block_vectors @ code_query + code_bias) + query_norm
+            distances[~mask] = np.inf
+
+            k = min(sample_count, stop - start)
+            top = np.argpartition(distances, k - 1)[:k]
+
+            best_distances = np.concatenate([best_distances, distances[top]])
+            best_positions = np.concatenate([best_positions, top + start])
+
+            if len(best_distances) > sample_count:
+                keep = np.argpartition(best_distances, sample_count - 1)[:sample_count]
+                best_distances = best_distances[keep]
+                best_positions = best_positions[keep]
+
+        if rerank:
+
+            best_positions = best_positions[np.isfinite(best_distances)]
+
+            # read only the candidate rows from the side file - in position order for sequential reads
+            best_positions = np.sort(best_positions)
+            exact_vectors = arrays["float_vectors"][best_positions]
+            best_distances = ((exact_vectors - query_vector) ** 2).sum(axis=1)
+
+            if len(best_distances) > final_count:
+                keep = np.argpartition(best_distances, final_count - 1)[:final_count]
+                best_distances = best_distances[keep]
+                best_positions = best_positions[keep]
+
+        order = np.argsort(best_distances, kind="stable")
+
+        results = []
+        for i in order:
+            if np.isfinite(best_distances[i]):
+                results.append((str(arrays["ids"][best_positions[i]]), float(max(best_distances[i], 0.0))))
+
+        del arrays
+
+        return results
+
+    def delete(self, block_ids):
+
+        """ Marks the vectors with the selected block_ids as deleted (tombstone) - returns the number deleted """
+
+        count = self.meta["count"]
+
+        if count == 0:
+            return 0
+
+        delete_ids = np.array([str(block_id) for block_id in block_ids], dtype=f"<U{self.meta['id_width']}")
+
+        arrays = self._open_arrays(mode="r+")
+
+        deleted = 0
+        for start in range(0, count, self.search_block_size):
+            stop = min(start + self.search_block_size, count)
+            hits = arrays["live"][start:stop] & np.isin(arrays["ids"][start:stop], delete_ids)
+            if hits.any():
+                arrays["live"][start:stop] = arrays["live"][start:stop] & ~hits
+                deleted += int(hits.sum())
+
+        arrays["live"].flush()
+        del arrays
+
+        self.meta["deleted"] += deleted
+        self._save_meta()
+
+        return deleted
+
+    def compact(self):
+
+        """ Rewrites the store without the deleted vectors - returns the number of vectors removed """
+
+        removed = self.meta["deleted"]
+
+        if removed == 0 or self.meta["count"] == 0:
+            return 0
+
+        arrays = self._open_arrays(mode="r")
+        keep = np.array(arrays["live"][:self.meta["count"]])
+        del arrays
+
+        self._reallocate(max(int(keep.sum()), self.initial_capacity), keep=keep)
+
+        return removed
+
+    def get_stats(self):
+
+        """ Returns the count of stored, live and deleted vectors, with the settings of the store """
+
+        stats = dict(self.meta)
+        stats.update({"live": self.meta["count"] - self.meta["deleted"]})
+
+        return stats
+
+    def destroy(self):
+
+        """ Removes the store files """
+
+        if os.path.exists(self.folder_path):
+            shutil.rmtree(self.folder_path)
+
+        self.meta.update({"count": 0, "capacity": 0, "deleted": 0})
+        self.quantizer = None
+
+        return True
+
+    def get_vectors(self, positions):
+
+        """ Returns the float32 vectors at the selected positions - exact vectors if kept in the side file """
+
+        arrays = self._open_arrays(mode="r")
+
+        if "float_vectors" in arrays:
+            vectors = np.array(arrays["float_vectors"][positions])
+        else:
+            vectors = self._decode(np.array(arrays["vectors"][positions]))
+
+        del arrays
+
+        return vectors
+
+
+class EmbeddingNumpyMMap:
+
+    """Implements a local vector store on memory-mapped numpy files, with no additional dependencies.
+
+    ``EmbeddingNumpyMMap`` stores the vectors for the library in a ``_NumpyMMapVectorStore`` in the library
+    embedding path, and provides exact (brute force) search, which is a good fit for small and medium size
+    libraries, e.g., up to a few million blocks, with no vector database to install.  It is used by the
+    ``EmbeddingHandler``.
+
+    Parameters
+    ----------
+    library : object
+        A ``Library`` object.
+
+    model : object
+        A model object. See :mod:`models` for available models.
+
+    model_name : str, default=None
+        Name of the model.
+
+    embedding_dims : int, default=None
+        Dimension of the embedding.
+
+    Returns
+    -------
+    embedding_numpy_mmap : EmbeddingNumpyMMap
+        A new ``EmbeddingNumpyMMap`` object.
+    """
+
+    def __init__(self, library, model=None, model_name=None, embedding_dims=None):
+
+        self.library = library
+        self.library_name = library.library_name
+        self.account_name = library.account_name
+
+        # look up model card
+        if not model and not model_name:
+            raise EmbeddingModelNotFoundException("no-model-or-model-name-provided")
+
+        self.model = model
+        self.model_name = model_name
+        self.embedding_dims = embedding_dims
+
+        # if model passed (not None), then use model name and embedding dims
+        if self.model:
+            self.model_name = self.model.model_name
+            self.embedding_dims = self.model.embedding_dims
+
+        self.utils = _EmbeddingUtils(library_name=self.library_name,
+                                     model_name=self.model_name,
+                                     account_name=self.account_name,
+                                     db_name="numpy_mmap",
+                                     embedding_dims=self.embedding_dims)
+
+        self.collection_name = self.utils.create_safe_collection_name()
+        self.collection_key = self.utils.create_db_specific_key()
+
+        # will leave "-" and "_" in file path, but remove "@" and " "
+        model_safe_path = re.sub(r"[@\/. ]", "", self.model_name).lower()
+        self.embedding_folder_path = os.path.join(self.library.embedding_path, model_safe_path,
+                                                  "embedding_numpy_mmap")
+
+        #   if vector quantization is set, then stores int8 or fp16 codes with exact float re-ranking - applies
+        #   when the store is created, and then read from the store settings
+        dtype = NumpyMMapConfig().get_config("dtype")
+        rerank_factor = 0
+
+        quantization = VectorQuantizationConfig().get_config("quantization")
+        if quantization:
+            dtype = {"int8": "int8", "fp16": "float16"}[quantization]
+            rerank_factor = VectorQuantizationConfig().get_config("rerank_factor")
+
+        self.index = _NumpyMMapVectorStore(self.embedding_folder_path,
+                                           embedding_dims=self.embedding_dims,
+                                           dtype=dtype,
+                                           search_block_size=NumpyMMapConfig().get_config("search_block_size"),
+                                           initial_capacity=NumpyMMapConfig().get_config("initial_capacity"),
+                                           rerank_factor=rerank_factor)
+
+    def create_new_embedding(self, doc_ids=None, batch_size=500):
+
+        """ Embeds the blocks in the library not yet embedded, and appends to the numpy mmap store """
+
+        all_blocks_cursor, num_of_blocks = self.utils.get_blocks_cursor(doc_ids=doc_ids)
+
+        # Initialize a new status
+        status = Status(self.account_name)
+        status.new_embedding_status(self.library_name, self.model_name, num_of_blocks)
+
+        embeddings_created = 0
+        finished = False
+
+        while not finished:
+
+            block_ids, sentences = [], []
+
+            # Build the next batch
+            for i in range(batch_size):
+
+                block = all_blocks_cursor.pull_one()
+
+                if not block:
+                    finished = True
+                    break
+
+                text_search = block["text_search"].strip()
+
+                if not text_search or len(text_search) < 1:
+                    continue
+
+                block_ids.append(str(block["_id"]))
+                sentences.append(text_search)
+
+            if len(sentences) > 0:
+
+                # Process the batch
+                vectors = self.utils.embedding(self.model, sentences)
+
+                current_index = self.index.add(block_ids, vectors)
+                self.utils.update_text_index(block_ids, current_index)
+
+                embeddings_created += len(sentences)
+                status.increment_embedding_status(self.library_name, self.model_name, len(sentences))
+
+                logger.info(f"update: embedding_handler - NumpyMMap - Embeddings Created: "
+                            f"{embeddings_created} of {num_of_blocks}")
+
+        embedding_summary = self.utils.generate_embedding_summary(embeddings_created)
+
+        logger.info(f"update: EmbeddingHandler - NumpyMMap - embedding_summary - {embedding_summary}")
+
+        return embedding_summary
+
+    def search_index(self, query_embedding_vector, sample_count=10):
+
+        """ Search numpy mmap store """
+
+        block_list = []
+
+        for block_id, distance in self.index.search(query_embedding_vector, sample_count=sample_count):
+
+            for block in self.utils.lookup_text_index(block_id):
+                block_list.append((block, distance))
+
+        return block_list
+
+    def search_index_with_filter(self, query_embedding_vector, filter_dict, sample_count=10):
+
+        """ Search numpy mmap store restricted to the blocks selected by filter_dict """
+
+        block_ids = self.utils.lookup_filtered_block_ids(filter_dict)
+
+        if not block_ids:
+            return []
+
+        block_list = []
+
+        for block_id, distance in self.index.search(query_embedding_vector, sample_count=sample_count,
+                                                    block_ids=block_ids):
+
+            for block in self.utils.lookup_text_index(block_id):
+                block_list.append((block, distance))
+
+        return block_list
+
+    def delete_blocks(self, block_ids):
+
+        """ Marks the vectors for the selected block ids as deleted - they are skipped in search, and removed
+        from the files by compact() """
+
+        return self.index.delete(block_ids)
+
+    def compact(self):
+
+        """ Removes the deleted vectors from the store files """
+
+        return self.index.compact()
+
+    def delete_index(self):
+
+        """ Delete numpy mmap store """
+
+        self.index.destroy()
+
+        # remove emb key - 'unset' the blocks in the text collection
+        self.utils.unset_text_index()
+
+        return 1
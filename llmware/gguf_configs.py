@@ -925,6 +925,14 @@ class GGUFConfigs:
                   "whisper_output_format": "text",
                   "whisper_default_model": "whisper-cpp-base-english",
 
+                  # long audio - if whisper_chunk_secs > 0, audio is split at silence into overlapping windows of
+                  # ~whisper_chunk_secs, which are transcribed in parallel on whisper_workers states of one model
+                  "whisper_chunk_secs": 0,
+                  "whisper_chunk_overlap_secs": 1.0,
+                  "whisper_silence_search_secs": 10.0,
+                  "whisper_workers": 2,
+                  "whisper_token_details": True,
+
                   # prebuilt shared libraries included in llmware
                   "whisper_mac_metal": "libwhisper_mac_metal_155.dylib",
                   "whisper_mac_metal_no_acc": "libwhisper_mac_metal_no_acc_155.dylib",
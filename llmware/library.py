@@ -24,6 +24,7 @@ import shutil
 import os
 import json
 import logging
+import time
 
 from llmware.configs import LLMWareConfig, LLMWareTableSchema
 from llmware.util import Utilities
@@ -32,6 +33,7 @@ from llmware.parsers import Parser
 from llmware.models import ModelCatalog
 from llmware.resources import CollectionRetrieval, CollectionWriter, CloudBucketManager
 from llmware.embeddings import EmbeddingHandler
+from llmware.dataset_tools import ShardedExporter
 from llmware.exceptions import LibraryNotFoundException, ImportingSentenceTransformerRequiresModelNameException, \
     UnsupportedEmbeddingDatabaseException, InvalidNameException
 
@@ -402,8 +404,81 @@ class Library:
         updater = LibraryCatalog(self).update_library_card(self.library_name, update_dict,
                                                            delete_record=delete_record, account_name=self.account_name)
 
+        #   new or deleted embedding changes semantic query results - invalidates cached query results
+        self.bump_library_version()
+
         return True
 
+    def get_library_version(self):
+        """Returns the version record of the library - a dict with a "version" counter, which is incremented on
+        any change to the blocks or embeddings of the library, and a "time_stamp" of the creation of the version
+        file, which distinguishes a re-created library of the same name.  Used to validate cached query results.
+
+            Returns
+            -------
+            version_record : dict or None
+                Dictionary with "version" and "time_stamp" keys, or None if the library is not loaded.
+        """
+
+        if not self.library_main_path or not os.path.exists(self.library_main_path):
+            return None
+
+        fp = os.path.join(self.library_main_path, "library_version.json")
+
+        version_record = None
+
+        if os.path.exists(fp):
+            try:
+                with open(fp, "r", encoding="utf-8") as f:
+                    version_record = json.load(f)
+            except:
+                logger.warning(f"warning: Library - could not read library version file - {fp}")
+                version_record = None
+
+        if not version_record:
+            version_record = self._write_library_version(0)
+
+        return version_record
+
+    def bump_library_version(self):
+        """Increments the version counter of the library - invoked automatically on any block write (including
+        the end of add_files, add_pdf and add_office), block update, or embedding install or delete - generally, this method does not need to be invoked directly.
+
+            Returns
+            -------
+            version_record : dict or None
+                The new version record, or None if the library is not loaded.
+        """
+
+        version_record = self.get_library_version()
+
+        if not version_record:
+            return None
+
+        return self._write_library_version(version_record["version"] + 1,
+                                           time_stamp=version_record["time_stamp"])
+
+    def _write_library_version(self, version, time_stamp=None):
+
+        """ Writes the library version file - written to tmp file and replaced, so readers see a complete file. """
+
+        if not time_stamp:
+            time_stamp = time.time_ns()
+
+        version_record = {"version": version, "time_stamp": time_stamp}
+
+        fp = os.path.join(self.library_main_path, "library_version.json")
+        tmp_fp = fp + "." + str(os.getpid()) + ".tmp"
+
+        try:
+            with open(tmp_fp, "w", encoding="utf-8") as f:
+                json.dump(version_record, f)
+            os.replace(tmp_fp, fp)
+        except:
+            logger.warning(f"warning: Library - could not write library version file - {fp}")
+
+        return version_record
+
     def get_embedding_status (self):
         """Pulls the embedding record for the current library from the library card.
         
@@ -483,6 +558,24 @@ class Library:
         unique_doc_id = LibraryCatalog(self).get_and_increment_doc_id(self.library_name)
         return unique_doc_id
 
+    def reserve_doc_ids(self, n):
+        """Convenience method in library class - mirrors method in LibraryCatalog - reserves a contiguous block of
+        n unique doc ids for the library in a single transaction.
+
+            Parameters
+            ----------
+            n : int
+                Number of doc ids to reserve.
+
+            Returns
+            -------
+            doc_id_block : range
+                The reserved block of unique document IDs - empty if the reservation could not be made.
+        """
+
+        doc_id_block = LibraryCatalog(self).reserve_doc_ids(self.library_name, n)
+        return doc_id_block
+
     def set_incremental_docs_blocks_images(self, added_docs=0, added_blocks=0, added_images=0, added_pages=0,
                                            added_tables=0):
         """Updates the library card with incremental counters after completing a parsing job.
@@ -517,6 +610,9 @@ class Library:
                                                                           added_pages=added_pages,
                                                                           added_tables=added_tables)
 
+        #   new blocks in the library - invalidates cached query results
+        self.bump_library_version()
+
         return True
 
     def add_file(self, file_path):
@@ -547,7 +643,7 @@ class Library:
                    get_images=True,get_tables=True, smart_chunking=1, max_chunk_size=600,
                    table_grid=True, get_header_text=True, table_strategy=1, strip_header=False,
                    verbose_level=2, copy_files_to_library=True, set_custom_logging=-1,
-                   use_logging_file=False):
+                   use_logging_file=False, workers=1):
 
         """Main method to integrate documents into a Library - pass a local filepath folder and all files will be
         routed to appropriate parser by file type extension.
@@ -599,6 +695,10 @@ class Library:
             use_logging_file : bool, default=False
                 Whether parse should log to stdout (default) or to file (set to True)
 
+            workers : int, default=1
+                Number of worker processes - if > 1, the input files are sharded across a process pool
+                and parsed in parallel.
+
             Returns
             -------
             output_results : dict or None
@@ -626,7 +726,8 @@ class Library:
                                  verbose_level=verbose_level,
                                  copy_files_to_library=copy_files_to_library,
                                  set_custom_logging=set_custom_logging,
-                                 use_logging_file=use_logging_file).ingest(input_folder_path,dupe_check=True)
+                                 use_logging_file=use_logging_file).ingest(input_folder_path,dupe_check=True,
+                                                                           workers=workers)
 
         logger.debug(f"update: parsing results - {parsing_results}")
 
@@ -652,6 +753,9 @@ class Library:
         # LibraryCollection(self).create_index()
         CollectionWriter(self.library_name,account_name=self.account_name).build_text_index()
 
+        #   pdf and office blocks are written directly by the C parsers - invalidates cached query results
+        self.bump_library_version()
+
         return output_results
 
     def export_library_to_txt_file(self, output_fp=None, output_fn=None, include_text=True, include_tables=True,
@@ -759,29 +863,124 @@ class Library:
             # go with default - text only
             filter_list = ["text"]
 
-        results = CollectionRetrieval(self.library_name,
-                                      account_name=self.account_name).filter_by_key_value_range("content_type", filter_list)
+        #   streams the blocks in batches, with only the selected keys, to export in constant memory
+        batches = CollectionRetrieval(self.library_name,
+                                      account_name=self.account_name).iter_batches(selected_keys=dict_keys,
+                                                                                   filter_dict={"content_type":
+                                                                                                {"$in": filter_list}})
 
         file_location = os.path.join(output_fp, output_fn + ".jsonl")
         output_file = open(file_location, "w", encoding='utf-8')
 
-        for elements in results:
+        for batch in batches:
 
-            # package up each jsonl entry as dict with selected keys to extract
-            new_dict_entry = {}
-            for keys in dict_keys:
-                if keys in elements:
-                    new_dict_entry.update({keys:elements[keys]})
+            jsonl_rows = []
 
-            if new_dict_entry:
-                jsonl_row = json.dumps(new_dict_entry)
-                output_file.write(jsonl_row)
-                output_file.write("\n")
+            for elements in batch:
+
+                # package up each jsonl entry as dict with selected keys to extract
+                new_dict_entry = {}
+                for keys in dict_keys:
+                    if keys in elements:
+                        new_dict_entry.update({keys:elements[keys]})
+
+                if new_dict_entry:
+                    jsonl_rows.append(json.dumps(new_dict_entry, default=str) + "\n")
+
+            output_file.writelines(jsonl_rows)
 
         output_file.close()
 
         return file_location
 
+    def export_library_to_shards(self, output_fp=None, output_folder_name=None, shard_size=100000, workers=1,
+                                 file_format="jsonl", compression=None, include_text=True, include_tables=True,
+                                 include_images=False, dict_keys=None):
+        """Exports collection of text chunks into fixed-size shards, written in the current process, or in parallel
+        worker processes if workers > 1, with a manifest of the row count and checksum of each shard.  The blocks are streamed from the db in order,
+        so an interrupted export can be re-run with the same parameters, and will skip completed shards.
+
+            Parameters
+            ----------
+            output_fp : str, default=None
+                The file path where the output folder will be created - defaults to the library output path.
+
+            output_folder_name : str, default=None
+                The name of the output folder for the shards - defaults to library_name + "_export".
+
+            shard_size : int, default=100000
+                The number of blocks in each shard.
+
+            workers : int, default=1
+                The number of worker processes writing shards in parallel - 1 writes in the current process.  Note:
+                on platforms that 'spawn' new processes, e.g., macOS and Windows, workers > 1 requires an
+                `if __name__ == "__main__":` guard in the calling script.
+
+            file_format : str, default="jsonl"
+                Either "jsonl" or "parquet" (requires pyarrow).
+
+            compression : str, default=None
+                Either None, "gzip" or "zstd" (requires zstandard for jsonl).
+
+            include_text : bool, default=True
+                Whether to include text content in the export.
+
+            include_tables : bool, default=True
+                Whether to include tables in the export.
+
+            include_images : bool, default=False
+                Whether to include images in the export.
+
+            dict_keys : list of str, default=None
+                The keys to include in each exported entry. If not provided, uses the library default keys.
+
+            Returns
+            -------
+            manifest : dict
+                The export manifest, with the list of shards, each with file_name, rows, bytes and sha256.
+        """
+
+        if not output_fp:
+            output_fp = self.output_path
+
+        if not output_folder_name:
+            output_folder_name = self.library_name + "_export"
+
+        if not dict_keys:
+            dict_keys = self.default_keys
+
+        filter_list = []
+        if include_text: filter_list.append("text")
+        if include_tables: filter_list.append("table")
+        if include_images: filter_list.append("image")
+
+        if not filter_list:
+            # go with default - text only
+            filter_list = ["text"]
+
+        #   sorted by _id, so that the blocks in each shard are the same if the export is re-started
+        batches = CollectionRetrieval(self.library_name,
+                                      account_name=self.account_name).iter_batches(selected_keys=dict_keys,
+                                                                                   filter_dict={"content_type":
+                                                                                                {"$in": filter_list}},
+                                                                                   sort_keys=["_id"])
+
+        def stream_rows():
+            for batch in batches:
+                for elements in batch:
+                    new_dict_entry = {}
+                    for keys in dict_keys:
+                        if keys in elements:
+                            new_dict_entry.update({keys: elements[keys]})
+                    if new_dict_entry:
+                        yield new_dict_entry
+
+        exporter = ShardedExporter(os.path.join(output_fp, output_folder_name), shard_size=shard_size,
+                                   workers=workers, file_format=file_format, compression=compression,
+                                   file_name_base=self.library_name)
+
+        return exporter.export(stream_rows())
+
     def pull_files_from_cloud_bucket (self, aws_access_key=None, aws_secret_key=None, bucket_name=None):
         """Pull files from private S3 bucket into local cache for further processing.
         
@@ -988,6 +1187,8 @@ class Library:
         completed = (CollectionWriter(self.library_name, account_name=self.account_name).
                      update_block(doc_id, block_id,key,new_value,self.default_keys))
 
+        self.bump_library_version()
+
         return completed
 
     def add_website (self, url, get_links=True, max_links=5):
@@ -1119,6 +1320,9 @@ class Library:
 
         output = Parser(library=self).parse_pdf(input_folder)
 
+        #   blocks are written directly by the C parser - invalidates cached query results
+        self.bump_library_version()
+
         return self
 
     def add_office(self, input_folder=None):
@@ -1140,6 +1344,9 @@ class Library:
 
         output = Parser(library=self).parse_office(input_folder)
 
+        #   blocks are written directly by the C parser - invalidates cached query results
+        self.bump_library_version()
+
         return self
 
     def get_all_library_cards(self, account_name='llmware'):
@@ -1370,6 +1577,21 @@ class LibraryCatalog:
 
         return unique_doc_id
 
+    def reserve_doc_ids (self, library_name, n, account_name="llmware"):
+
+        """ Reserves a contiguous block of n unique doc ids for library in a single transaction """
+
+        if account_name != "llmware":
+           self.account_name = account_name
+
+        if n < 1:
+            return range(0)
+
+        cw = CollectionWriter("library", account_name=self.account_name)
+        doc_id_block = cw.reserve_doc_ids(library_name, n)
+
+        return doc_id_block
+
     def set_incremental_docs_blocks_images(self, added_docs=0, added_blocks=0, added_images=0, added_pages=0,
                                            added_tables=0):
 
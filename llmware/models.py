@@ -17,16 +17,22 @@ implement the interface for each of the supported models. """
 
 import logging
 import json
+import hashlib
 import requests
 import tempfile
 import ast
 import time
-from collections import deque
+import gc
+import inspect
+import threading
+import queue
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import shutil
 import importlib
 from importlib import util
 
-from llmware.util import Utilities, AgentWriter, LocalTokenizer
+from llmware.util import Utilities, AgentWriter, _TokenizerRegistry
 from llmware.configs import LLMWareConfig
 from llmware.exceptions import (DependencyNotInstalledException, ModuleNotFoundException,
                                 ModelCardNotRegisteredException, GGUFLibNotLoadedException, LLMWareException)
@@ -71,6 +77,10 @@ class _ModelRegistry:
     #   pulls default model list from model_configs.py
     registered_models = global_model_repo_catalog_list
 
+    #   name -> model card index over registered_models, rebuilt lazily when the registry changes
+    _model_index = {}
+    _model_index_state = None
+
     #   global list of supported model classes with module lookup - and placeholder for other attributes over time
     model_classes = {"ONNXGenerativeModel": {"module": "llmware.models", "open_source": True},
                      "OVGenerativeModel": {"module": "llmware.models", "open_source": True},
@@ -140,6 +150,43 @@ class _ModelRegistry:
         """ List current view of registered models """
         return cls.registered_models
 
+    @classmethod
+    def _invalidate_model_index(cls):
+        """ Resets the model name index - called whenever the registered models are changed """
+        cls._model_index_state = None
+
+    @classmethod
+    def lookup_model_card(cls, model_name):
+
+        """ Looks up a model card by model_name or display_name in a dict index over the registered models,
+        rather than a linear scan of the list - returns None if not found. """
+
+        #   index is also rebuilt if the registered_models list was replaced or changed size outside of the
+        #   registry methods
+        index_state = (id(cls.registered_models), len(cls.registered_models))
+
+        if cls._model_index_state != index_state:
+
+            model_index = {}
+
+            #   keeps the first match in list order, consistent with the linear scan
+            for model in cls.registered_models:
+                for key in (model.get("model_name"), model.get("display_name")):
+                    if key and key not in model_index:
+                        model_index.update({key: model})
+
+            cls._model_index = model_index
+            cls._model_index_state = index_state
+
+        model_card = cls._model_index.get(model_name, None)
+
+        #   confirm that the indexed card was not renamed in place
+        if model_card and model_name not in (model_card.get("model_name"), model_card.get("display_name")):
+            cls._invalidate_model_index()
+            return cls.lookup_model_card(model_name)
+
+        return model_card
+
     @classmethod
     def get_model_classes(cls):
         """ List of model classes supported in LLMWare. """
@@ -237,6 +284,7 @@ class _ModelRegistry:
             #   go ahead and add model to the catalog
 
             cls.registered_models.append(model_card_dict)
+            cls._invalidate_model_index()
 
         else:
             raise ModelCardNotRegisteredException("New-Model-Card-Missing-Keys")
@@ -258,6 +306,7 @@ class _ModelRegistry:
             if models["model_name"] == model_name_lookup or models["display_name"] == model_name_lookup:
                 del cls.registered_models[i]
                 cls.registered_models.append(new_model_card_dict)
+                cls._invalidate_model_index()
                 updated = True
                 break
 
@@ -274,6 +323,7 @@ class _ModelRegistry:
             # added option to match with display name
             if models["model_name"] == model_name or models["display_name"] == model_name:
                 del cls.registered_models[i]
+                cls._invalidate_model_index()
                 model_found = True
                 break
 
@@ -294,6 +344,8 @@ class _ModelRegistry:
             if cls.validate(model):
                 cls.registered_models.append(model)
 
+        cls._invalidate_model_index()
+
         return True
 
     @classmethod
@@ -798,6 +850,13 @@ class ModelCatalog:
 
         model_card = None
 
+        #   fast path - dict index lookup, if the catalog is reading the live model registry
+        if self.global_model_list is _ModelRegistry.registered_models:
+            model_card = _ModelRegistry.lookup_model_card(selected_model_name)
+            if model_card:
+                model_card.update({"standard": True})
+                return model_card
+
         # first check in the global_model_repo + confirm location
         for models in self.global_model_list:
             # add option to match with display_name as alternative alias for model
@@ -895,10 +954,25 @@ class ModelCatalog:
 
     def load_model (self, selected_model, api_key=None, use_gpu=True, sample=True,get_logits=False,
                     max_output=100, temperature=-99, force_reload=False, api_endpoint=None,
-                    custom_loader=None, **kwargs):
+                    custom_loader=None, use_model_pool=False, **kwargs):
 
         """ Main method for loading and fully instantiating a model with lookup based on the model_name in
-         the ModelCatalog. """
+         the ModelCatalog.
+
+         If use_model_pool is True, then the model is served from the shared ModelResources pool, which
+         re-uses an already loaded instance with the same load options, and applies the pool memory budget
+         with least-recently-used eviction.
+
+         For PyTorch (HuggingFace) generative and embedding models on cpu, pass cpu_quantize="int8" to apply
+         dynamic int8 quantization to the linear layers - the quantized model is cached in the model repo, so
+         later loads skip the conversion - and cpu_threads, either an int or a tuple of (intra-op, inter-op)
+         threads, to set the torch thread counts used by the model. """
+
+        if use_model_pool:
+            return ModelResources().get_model(selected_model, api_key=api_key, use_gpu=use_gpu, sample=sample,
+                                              get_logits=get_logits, max_output=max_output,
+                                              temperature=temperature, force_reload=force_reload,
+                                              api_endpoint=api_endpoint, custom_loader=custom_loader, **kwargs)
 
         # apply optional attributes - will be available to the loaded model
         self.use_gpu=use_gpu
@@ -1644,13 +1718,15 @@ class ModelCatalog:
 
             logits = response["logits"]
 
-            # tokenizer load
+            # tokenizer load - cached in the process-wide tokenizer registry after first use
             if "tokenizer_local" in model_card:
-                tokenizer = LocalTokenizer(tokenizer_fn=model_card["tokenizer_local"])
+                tokenizer = _TokenizerRegistry.get_local_tokenizer(tokenizer_fn=model_card["tokenizer_local"])
             elif util.find_spec("transformers"):
                 # hf tokenizer name
-                pt_loader = PyTorchLoader(api_key=api_key, trust_remote_code=True, custom_loader=None)
-                tokenizer = pt_loader.get_tokenizer(hf_tokenizer_name)
+                tokenizer = _TokenizerRegistry.get_tokenizer(
+                    ("hf", hf_tokenizer_name),
+                    lambda: PyTorchLoader(api_key=api_key, trust_remote_code=True,
+                                          custom_loader=None).get_tokenizer(hf_tokenizer_name))
             else:
                 raise LLMWareException(message="Exception: could not identify tokenizer to use")
 
@@ -2070,11 +2146,13 @@ class ModelCatalog:
 
         # tokenizer load
         if tokenizer_local:
-            tokenizer = LocalTokenizer(tokenizer_fn=model_card["tokenizer_local"])
+            tokenizer = _TokenizerRegistry.get_local_tokenizer(tokenizer_fn=model_card["tokenizer_local"])
         elif hf_tokenizer_name and util.find_spec("transformers"):
             # hf tokenizer name
-            pt_loader = PyTorchLoader(api_key=api_key, trust_remote_code=True, custom_loader=None)
-            tokenizer = pt_loader.get_tokenizer(hf_tokenizer_name)
+            tokenizer = _TokenizerRegistry.get_tokenizer(
+                ("hf", hf_tokenizer_name),
+                lambda: PyTorchLoader(api_key=api_key, trust_remote_code=True,
+                                      custom_loader=None).get_tokenizer(hf_tokenizer_name))
         else:
             raise LLMWareException(message="Exception: could not identify tokenizer to use")
 
@@ -2719,7 +2797,8 @@ class ONNXGenerativeModel(BaseModel):
      and x86 architectures. """
 
     def __init__(self, model_name=None, api_key=None, model_card=None, instruction_following=False, context_window=2048,
-                 sample=True, max_output=100, temperature=0.3, get_logits=False, api_endpoint=None, **kwargs):
+                 sample=True, max_output=100, temperature=0.3, get_logits=False, api_endpoint=None,
+                 decode_at_end=False, cache_instruction_tokens=False, **kwargs):
 
         super().__init__()
 
@@ -2741,6 +2820,15 @@ class ONNXGenerativeModel(BaseModel):
         self.get_logits = get_logits
         self.auto_remediate_function_call_output = True
 
+        #   if True, decodes the full output once at the end of generation, rather than token-by-token
+        self.decode_at_end = decode_at_end
+
+        #   if True, the tokens of the function call instruction (which is the same across many inputs) are
+        #   cached, and only the context is tokenized on each function call - off by default, since tokenizing
+        #   the context and the instruction separately may not match tokenizing the full prompt for every tokenizer
+        self.cache_instruction_tokens = cache_instruction_tokens
+        self._instruction_token_cache = {}
+
         # Function Call parameters
         self.model_card = model_card
         self.logits_record = []
@@ -2863,6 +2951,8 @@ class ONNXGenerativeModel(BaseModel):
 
         # use 0 as eos token id by default in generation -> but try to pull from model config
         self.eos_token_id = 0
+        self.pad_token_id = 0
+        self.search_options = {}
 
         #   will load model and inference onto gpu,
         #   if (a) CUDA available and (b) use_gpu_if_available set to True (default)
@@ -2947,9 +3037,26 @@ class ONNXGenerativeModel(BaseModel):
 
         search_options['max_length'] = max_length
 
+        self.search_options = search_options
+
         self.params = og.GeneratorParams(self.model)
         self.params.set_search_options(**search_options)
 
+        #   eos and pad token ids used in batch generation - pulled from the onnx genai model config, if found
+        genai_config_path = os.path.join(onnx_model_path, "genai_config.json")
+
+        if os.path.exists(genai_config_path):
+            try:
+                genai_config = json.load(open(genai_config_path, "r", encoding="utf-8"))
+                self.eos_token_id = genai_config["model"].get("eos_token_id", self.eos_token_id)
+                self.pad_token_id = genai_config["model"].get("pad_token_id", self.pad_token_id)
+            except:
+                logger.warning(f"ONNXGenerativeModel - could not read eos and pad token ids from genai config - "
+                               f"{genai_config_path}")
+
+        if isinstance(self.pad_token_id, list):
+            self.pad_token_id = self.pad_token_id[0]
+
         return self
 
     def unload_model(self):
@@ -3121,6 +3228,7 @@ class ONNXGenerativeModel(BaseModel):
         self.params.input_ids = input_tokens
         token_count = 0
         output = ""
+        generated_tokens = []
 
         try:
             generator = og.Generator(self.model, self.params)
@@ -3158,7 +3266,10 @@ class ONNXGenerativeModel(BaseModel):
             if self.get_logits:
                 self.output_tokens.append(new_token)
 
-            output += self.tokenizer_stream.decode(new_token)
+            generated_tokens.append(new_token)
+
+            if not self.decode_at_end:
+                output += self.tokenizer_stream.decode(new_token)
 
             #   add stream on/off options
             # print(self.tokenizer_stream.decode(new_token), end="", flush=True)
@@ -3169,6 +3280,9 @@ class ONNXGenerativeModel(BaseModel):
         # direct deletion of generator recommended in onnxruntime_genai examples
         del generator
 
+        if self.decode_at_end:
+            output = self.tokenizer.decode(generated_tokens)
+
         llm_response = {"llm_response": output, "usage": {}}
 
         usage = {"input": len(input_tokens),
@@ -3310,10 +3424,11 @@ class ONNXGenerativeModel(BaseModel):
 
         prompt = self.fc_prompt_engineer(self.context, params=self.primary_keys, function=self.function)
 
-        input_tokens = self.tokenizer.encode(prompt)
+        input_tokens = self._encode_fc_prompt(self.context, prompt)
         self.params.input_ids = input_tokens
         token_count = 0
         output = ""
+        generated_tokens = []
 
         try:
             generator = og.Generator(self.model, self.params)
@@ -3340,7 +3455,10 @@ class ONNXGenerativeModel(BaseModel):
             if self.get_logits:
                 self.output_tokens.append(new_token)
 
-            output += self.tokenizer_stream.decode(new_token)
+            generated_tokens.append(new_token)
+
+            if not self.decode_at_end:
+                output += self.tokenizer_stream.decode(new_token)
 
             # add as streaming option to turn on/off
             # print(self.tokenizer_stream.decode(new_token), end="", flush=True)
@@ -3351,7 +3469,8 @@ class ONNXGenerativeModel(BaseModel):
         # done with generator
         del generator
 
-        llm_response = {"llm_response": output, "usage": {}}
+        if self.decode_at_end:
+            output = self.tokenizer.decode(generated_tokens)
 
         usage = {"input": len(input_tokens),
                  "output": token_count,
@@ -3359,9 +3478,28 @@ class ONNXGenerativeModel(BaseModel):
                  "metric": "tokens",
                  "processing_time": time.time() - t0}
 
-        output_response = {"llm_response": output, "usage": usage}
+        output_value = self._post_process_function_call(output, usage)
 
-        # end - post-processing
+        output_response = {"llm_response": output_value, "usage": usage}
+
+        if get_logits:
+            output_response.update({"logits": self.logits_record})
+            output_response.update({"output_tokens": self.output_tokens})
+            self.logits = self.logits_record
+
+        # output inference parameters
+        self.llm_response = output_value
+        self.usage = usage
+        self.final_prompt = prompt
+
+        self.register()
+
+        return output_response
+
+    def _post_process_function_call(self, output, usage):
+
+        """ Converts the function call output string into a python object, with remediation if the automatic
+        conversion fails - updates usage with the output type, and returns the output value. """
 
         try:
             import ast
@@ -3381,8 +3519,6 @@ class ONNXGenerativeModel(BaseModel):
             usage.update({"type": output_type})
             output_value = output
 
-            # INSERT NEW HERE
-
             if self.auto_remediate_function_call_output:
                 # attempt to remediate
                 output_type, output_rem = ModelCatalog().remediate_function_call_string(output)
@@ -3397,23 +3533,288 @@ class ONNXGenerativeModel(BaseModel):
                 logger.info(f"ONNXGenerativeModel - function call output could not be automatically converted, but "
                             f"remediation was successful to type -{output_type}")
 
-        # INSERT ENDS HERE
+        return output_value
 
-        output_response = {"llm_response": output_value, "usage": usage}
+    def _encode_fc_prompt(self, context, prompt):
 
-        if get_logits:
-            output_response.update({"logits": self.logits_record})
-            output_response.update({"output_tokens": self.output_tokens})
-            self.logits = self.logits_record
+        """ Tokenizes a function call prompt.  In SLIM prompts, the function instruction and keys follow the
+        context, and are the same across all of the inputs for a tool - if cache_instruction_tokens is True, the
+        instruction tokens are cached on first use, and only the leading part of the prompt with the context is
+        tokenized on each call. """
 
-        # output inference parameters
-        self.llm_response = output_value
-        self.usage = usage
-        self.final_prompt = prompt
+        prompt_head = "<human>: " + context
 
-        self.register()
+        if not self.cache_instruction_tokens or not prompt.startswith(prompt_head):
+            return self.tokenizer.encode(prompt)
 
-        return output_response
+        instruction = prompt[len(prompt_head):]
+
+        if instruction not in self._instruction_token_cache:
+            self._instruction_token_cache[instruction] = self._get_instruction_tokens(instruction)
+
+        instruction_tokens = self._instruction_token_cache[instruction]
+
+        #   if the instruction does not tokenize independently of the context, then tokenize the full prompt
+        if instruction_tokens is None:
+            return self.tokenizer.encode(prompt)
+
+        return np.concatenate([np.asarray(self.tokenizer.encode(prompt_head), dtype=np.int32),
+                               instruction_tokens])
+
+    def _get_instruction_tokens(self, instruction):
+
+        """ Gets the tokens for the instruction part of a function call prompt, by tokenizing sample prompts with and
+        without the instruction - returns None if the instruction tokens are not the same for each sample, e.g.,
+        if the tokenizer merges the instruction with the end of the context. """
+
+        sample_heads = ["<human>: The total amount is $22,500.", "<human>: Stock markets fell sharply today"]
+
+        instruction_tokens = None
+
+        for head in sample_heads:
+
+            head_tokens = list(self.tokenizer.encode(head))
+            full_tokens = list(self.tokenizer.encode(head + instruction))
+
+            if full_tokens[:len(head_tokens)] != head_tokens:
+                return None
+
+            tokens = full_tokens[len(head_tokens):]
+
+            if instruction_tokens is not None and tokens != instruction_tokens:
+                return None
+
+            instruction_tokens = tokens
+
+        return np.asarray(instruction_tokens, dtype=np.int32)
+
+    def inference_batch(self, prompts, contexts=None, add_prompt_engineering=None, inference_dict=None,
+                        batch_size=16):
+
+        """ Executes generation inference on a list of prompts, with optional list of contexts (one per prompt),
+        in batches of batch_size prompts, with a single ONNX generator for each batch.  Returns a list of output
+        dicts, in the same order as the prompts, each with its own usage. """
+
+        if isinstance(prompts, str):
+            prompts = [prompts]
+
+        if not contexts:
+            contexts = [None] * len(prompts)
+
+        if len(contexts) != len(prompts):
+            raise LLMWareException(message=f"ONNXGenerativeModel - inference_batch - expects one context per "
+                                           f"prompt - received {len(prompts)} prompts and {len(contexts)} "
+                                           f"contexts.")
+
+        if inference_dict:
+
+            if "temperature" in inference_dict:
+                self.temperature = inference_dict["temperature"]
+
+            if "max_tokens" in inference_dict:
+                self.target_requested_output_tokens = inference_dict["max_tokens"]
+
+        #   route to api endpoint - one request per prompt
+        if self.api_endpoint:
+            return [self.inference(prompt, add_context=context, add_prompt_engineering=add_prompt_engineering,
+                                   inference_dict=inference_dict) for prompt, context in zip(prompts, contexts)]
+
+        #   prepare each prompt in the same way as .inference
+        text_prompts = []
+
+        for prompt, context in zip(prompts, contexts):
+
+            prompt_engineering = add_prompt_engineering or self.add_prompt_engineering
+            if not prompt_engineering:
+                prompt_engineering = "default_with_context" if context else "default_no_context"
+
+            self.add_prompt_engineering = prompt_engineering
+            self.add_context = context
+
+            prompt_enriched = self.prompt_engineer(prompt, context, inference_dict=inference_dict)
+            text_prompts.append(prompt_enriched + self.trailing_space)
+
+        token_ids = [self.tokenizer.encode(text_prompt) for text_prompt in text_prompts]
+
+        outputs = self._generate_in_batches(token_ids, batch_size, self.max_output)
+
+        for prompt, text_prompt, output in zip(prompts, text_prompts, outputs):
+
+            self.prompt = prompt
+            self.llm_response = output["llm_response"]
+            self.usage = output["usage"]
+            self.final_prompt = text_prompt
+
+            self.register()
+
+        return outputs
+
+    def function_call_batch(self, contexts, function=None, params=None, get_logits=False, batch_size=16,
+                            max_output=None):
+
+        """ Runs a function call over a list of context passages, with the same function and params, in batches
+        of batch_size contexts, with a single ONNX generator for each batch - this is the fast path to run a
+        SLIM tool over many inputs.  Returns a list of output dicts, in the same order as the contexts, with
+        the same format as .function_call - logits are not captured in the batch generation, so if get_logits
+        is True, then each context is run with .function_call. """
+
+        if isinstance(contexts, str):
+            contexts = [contexts]
+
+        if not self.fc_supported:
+            logger.warning(f"ONNXGenerativeModel - loaded model does not support function calls.  "
+                           "Please either use the standard .inference method with this model, or use a  "
+                           "model that has 'function_calls' key set to True in its model card.")
+            return []
+
+        if max_output:
+            self.target_requested_output_tokens = max_output
+
+        if params:
+            self.primary_keys = params
+
+        if function:
+            self.function = function
+
+        if not self.primary_keys:
+            logger.warning(f"ONNXGenerativeModel - function call - no keys provided - "
+                           f"function call may yield unpredictable results")
+
+        #   route to api endpoint, or capture logits - one call per context
+        if self.api_endpoint or get_logits:
+            return [self.function_call(context, function=self.function, params=self.primary_keys,
+                                       get_logits=get_logits) for context in contexts]
+
+        prompts = [self.fc_prompt_engineer(context, params=self.primary_keys, function=self.function)
+                   for context in contexts]
+
+        token_ids = [self._encode_fc_prompt(context, prompt) for context, prompt in zip(contexts, prompts)]
+
+        outputs = self._generate_in_batches(token_ids, batch_size, self.max_output - 1)
+
+        for context, prompt, output in zip(contexts, prompts, outputs):
+
+            output["llm_response"] = self._post_process_function_call(output["llm_response"], output["usage"])
+
+            self.context = context
+            self.llm_response = output["llm_response"]
+            self.usage = output["usage"]
+            self.final_prompt = prompt
+
+            self.register()
+
+        return outputs
+
+    def _generate_in_batches(self, token_ids, batch_size, max_steps):
+
+        """ Groups the tokenized prompts by length, to minimize padding, and runs each group as a batch - returns
+        the outputs in the same order as token_ids. """
+
+        order = sorted(range(len(token_ids)), key=lambda x: len(token_ids[x]))
+
+        outputs = [None] * len(token_ids)
+
+        for start in range(0, len(order), batch_size):
+
+            group = order[start:start + batch_size]
+
+            group_outputs = self._generate_batch([token_ids[i] for i in group], max_steps)
+
+            for i, output in zip(group, group_outputs):
+                outputs[i] = output
+
+        return outputs
+
+    def _generate_batch(self, token_ids, max_steps):
+
+        """ Shared generation loop for a batch of tokenized prompts - the prompts are left-padded with the pad
+        token into a single input array, one ONNX generator runs the batch, and eos is tracked per sequence.
+        Each output is decoded once at the end of generation. """
+
+        global og
+
+        t0 = time.time()
+
+        batch_size = len(token_ids)
+        input_lens = [len(ids) for ids in token_ids]
+        seq_len = max(input_lens)
+
+        input_ids = np.full((batch_size, seq_len), self.pad_token_id, dtype=np.int32)
+
+        for i, ids in enumerate(token_ids):
+            input_ids[i, seq_len - len(ids):] = ids
+
+        eos_token_ids = self.eos_token_id if isinstance(self.eos_token_id, list) else [self.eos_token_id]
+
+        search_options = dict(self.search_options)
+        search_options.update({"batch_size": batch_size})
+
+        try:
+            params = og.GeneratorParams(self.model)
+            params.set_search_options(**search_options)
+
+            #   newer versions of onnxruntime_genai take the input tokens on the generator, rather than the params
+            if hasattr(og.Generator, "append_tokens"):
+                generator = og.Generator(self.model, params)
+                generator.append_tokens(input_ids)
+            else:
+                params.input_ids = input_ids
+                generator = og.Generator(self.model, params)
+
+        except:
+            raise LLMWareException(message=f"ONNXGenerativeModel - attempt to instantiate ONNX generator with "
+                                           f"model and batch of {batch_size} prompts failed.  This is most likely "
+                                           f"due to an error in the installation of the onnxruntime, or a "
+                                           f"problem with loading either the model or the input tokens.")
+
+        output_tokens = [[] for _ in range(batch_size)]
+        finished = [False] * batch_size
+        step_count = 0
+
+        while not generator.is_done() and step_count <= max_steps:
+
+            step_count += 1
+
+            if hasattr(generator, "compute_logits"):
+                generator.compute_logits()
+
+            generator.generate_next_token()
+
+            new_tokens = generator.get_next_tokens()
+
+            for i in range(batch_size):
+
+                if finished[i]:
+                    continue
+
+                new_token = int(new_tokens[i])
+
+                if new_token in eos_token_ids:
+                    finished[i] = True
+                else:
+                    output_tokens[i].append(new_token)
+
+            if all(finished):
+                break
+
+        del generator
+
+        processing_time = time.time() - t0
+
+        outputs = []
+
+        for i in range(batch_size):
+
+            usage = {"input": input_lens[i],
+                     "output": len(output_tokens[i]),
+                     "total": input_lens[i] + len(output_tokens[i]),
+                     "metric": "tokens",
+                     "processing_time": processing_time,
+                     "batch_size": batch_size}
+
+            outputs.append({"llm_response": self.tokenizer.decode(output_tokens[i]), "usage": usage})
+
+        return outputs
 
     def stream(self, prompt, add_context=None, add_prompt_engineering=None, api_key=None,
                inference_dict=None):
@@ -4042,7 +4443,7 @@ class OVGenerativeModel(BaseModel):
 
         if "tokenizer_local" in self.model_card:
             tok_local_name = self.model_card["tokenizer_local"]
-            self.tokenizer = LocalTokenizer(tokenizer_fn=tok_local_name)
+            self.tokenizer = _TokenizerRegistry.get_local_tokenizer(tokenizer_fn=tok_local_name)
         else:
             # if no tokenizer found, then falls back to default tokenizer for 'approximate' count
             self.tokenizer = Utilities().get_default_tokenizer()
@@ -7108,7 +7509,8 @@ class HFEmbeddingModel(BaseModel):
     """HFEmbeddingModel class implements the API for HuggingFace embedding models. """
 
     def __init__(self, model=None, tokenizer=None, model_name=None, api_key=None, model_card=None,
-                 embedding_dims=None, trust_remote_code=False, use_gpu_if_available=True, max_len=None, **kwargs):
+                 embedding_dims=None, trust_remote_code=False, use_gpu_if_available=True, max_len=None,
+                 cpu_quantize=None, cpu_threads=None, **kwargs):
 
         super().__init__(**kwargs)
 
@@ -7167,13 +7569,21 @@ class HFEmbeddingModel(BaseModel):
                 if "hf_repo" in self.model_card:
                     hf_repo_name = self.model_card["hf_repo"]
 
-            pt_loader = PyTorchLoader(api_key=api_key,trust_remote_code=trust_remote_code,custom_loader=None)
+            pt_loader = PyTorchLoader(api_key=api_key,trust_remote_code=trust_remote_code,custom_loader=None,
+                                      cpu_quantize=cpu_quantize)
 
             self.model=pt_loader.get_embedding_model(hf_repo_name)
             self.tokenizer=pt_loader.get_tokenizer(hf_repo_name)
 
         self.use_gpu = torch.cuda.is_available() and use_gpu_if_available
 
+        #   cpu options - dynamic int8 quantized models run on cpu only
+        self.cpu_quantize = cpu_quantize
+        self.cpu_threads = cpu_threads
+
+        if self.cpu_quantize:
+            self.use_gpu = False
+
         if self.model:
 
             self.config = self.model.config.to_dict()
@@ -7270,6 +7680,9 @@ class HFEmbeddingModel(BaseModel):
         else:
             sequence = [self.text_sample]
 
+        if self.cpu_threads:
+            PyTorchLoader.set_cpu_threads(self.cpu_threads)
+
         model_inputs = self.tokenizer(sequence, truncation=True, max_length=self.max_len, return_tensors="pt",padding=True)
 
         if self.use_gpu:
@@ -7310,7 +7723,7 @@ class HFGenerativeModel(BaseModel):
     def __init__(self, model=None, tokenizer=None, model_name=None, api_key=None, model_card=None,
                  prompt_wrapper=None, instruction_following=False, context_window=2048,
                  use_gpu_if_available=True, trust_remote_code=True, sample=True,max_output=100, temperature=0.3,
-                 get_logits=False, api_endpoint=None, **kwargs):
+                 get_logits=False, api_endpoint=None, cpu_quantize=None, cpu_threads=None, **kwargs):
 
         super().__init__(**kwargs)
 
@@ -7385,7 +7798,8 @@ class HFGenerativeModel(BaseModel):
                     hf_repo_name = self.model_card["hf_repo"]
                     self.hf_tokenizer_name = hf_repo_name
 
-            pt_loader = PyTorchLoader(api_key=api_key, trust_remote_code=trust_remote_code, custom_loader=None)
+            pt_loader = PyTorchLoader(api_key=api_key, trust_remote_code=trust_remote_code, custom_loader=None,
+                                      cpu_quantize=cpu_quantize)
             self.model = pt_loader.get_generative_model(hf_repo_name)
             self.tokenizer = pt_loader.get_tokenizer(hf_repo_name)
 
@@ -7447,6 +7861,13 @@ class HFGenerativeModel(BaseModel):
         else:
             self.use_gpu = False
 
+        #   cpu options - dynamic int8 quantized models run on cpu only
+        self.cpu_quantize = cpu_quantize
+        self.cpu_threads = cpu_threads
+
+        if self.cpu_quantize:
+            self.use_gpu = False
+
         if self.model:
 
             if isinstance(self.model.config, dict):
@@ -7663,6 +8084,9 @@ class HFGenerativeModel(BaseModel):
 
             text_prompt = prompt_final + self.trailing_space
 
+        if self.cpu_threads:
+            PyTorchLoader.set_cpu_threads(self.cpu_threads)
+
         # second - tokenize to get the input_ids
 
         tokenizer_output = self.tokenizer.encode(text_prompt)
@@ -7832,29 +8256,7 @@ class HFGenerativeModel(BaseModel):
 
         output_only = outputs_np[input_token_len:]
 
-        output_str = self.tokenizer.decode(output_only)
-
-        # post-processing clean-up - stop at endoftext
-        eot = output_str.find("<|endoftext|>")
-        if eot > -1:
-            output_str = output_str[:eot]
-
-        # new post-processing clean-up - stop at </s>
-        eots = output_str.find("</s>")
-        if eots > -1:
-            output_str = output_str[:eots]
-
-        # post-processing clean-up - start after bot wrapper
-        bot = output_str.find("<bot>:")
-        if bot > -1:
-            output_str = output_str[bot + len("<bot>:"):]
-
-        # new post-processing cleanup - skip repeating starting <s>
-        boss = output_str.find("<s>")
-        if boss > -1:
-            output_str = output_str[boss + len("<s>"):]
-
-        # end - post-processing
+        output_str = self._post_process_output(self.tokenizer.decode(output_only))
 
         total_len = len(outputs_np)
 
@@ -7883,34 +8285,265 @@ class HFGenerativeModel(BaseModel):
 
         return output_response
 
-    def fc_prompt_engineer(self, context, params=None, function=None):
-
-        """ Prompt engineering for Function Call prompts. """
+    def _post_process_output(self, output_str):
 
-        if not params:
-            params = self.primary_keys
+        """ Post-processing clean-up of the decoded output - removes end of text markers and bot wrapper. """
 
-        #   add safety check in looking for default self.function pulled from model card
-        if not function:
-            if self.function:
-                if isinstance(self.function,list):
-                    if len(self.function) > 0:
-                        function = self.function[0]
-                else:
-                    function = self.function
+        # post-processing clean-up - stop at endoftext
+        eot = output_str.find("<|endoftext|>")
+        if eot > -1:
+            output_str = output_str[:eot]
 
-        #   if not successful identifying a function, then choose 'classify' by default
-        if not function:
-            function = "classify"
+        # new post-processing clean-up - stop at </s>
+        eots = output_str.find("</s>")
+        if eots > -1:
+            output_str = output_str[:eots]
 
-        # prepare SLIM prompt
-        class_str = ""
-        for key in params:
-            class_str += str(key) + ", "
-        if class_str.endswith(", "):
-            class_str = class_str[:-2]
+        # post-processing clean-up - start after bot wrapper
+        bot = output_str.find("<bot>:")
+        if bot > -1:
+            output_str = output_str[bot + len("<bot>:"):]
 
-        f = str(function)
+        # new post-processing cleanup - skip repeating starting <s>
+        boss = output_str.find("<s>")
+        if boss > -1:
+            output_str = output_str[boss + len("<s>"):]
+
+        return output_str
+
+    def inference_batch(self, prompts, contexts=None, add_prompt_engineering=None, inference_dict=None,
+                        batch_size=16):
+
+        """ Executes generation inference on a list of prompts, with optional list of contexts (one per prompt),
+        in batches of batch_size prompts - each batch is left-padded and runs a single shared generation loop,
+        with the kv cache, so many short prompts (e.g., RAG questions) run in a fraction of the time of
+        calling .inference one prompt at a time.  Greedy decoding results are the same as .inference, and each
+        output has its own usage.  Returns a list of output dicts, in the same order as the prompts. """
+
+        if isinstance(prompts, str):
+            prompts = [prompts]
+
+        if not contexts:
+            contexts = [None] * len(prompts)
+
+        if len(contexts) != len(prompts):
+            raise LLMWareException(message=f"HFGenerativeModel - inference_batch - expects one context per "
+                                           f"prompt - received {len(prompts)} prompts and {len(contexts)} "
+                                           f"contexts.")
+
+        if inference_dict:
+
+            if "temperature" in inference_dict:
+                self.temperature = inference_dict["temperature"]
+
+            if "max_tokens" in inference_dict:
+                self.target_requested_output_tokens = inference_dict["max_tokens"]
+
+        #   route to api endpoint - one request per prompt
+        if self.api_endpoint:
+            return [self.inference(prompt, add_context=context, add_prompt_engineering=add_prompt_engineering,
+                                   inference_dict=inference_dict) for prompt, context in zip(prompts, contexts)]
+
+        if self.get_logits:
+            logger.warning("warning: HFGenerativeModel - inference_batch - logits are not captured in "
+                           "batch generation - use .inference to get logits.")
+
+        #   prepare each prompt in the same way as .inference
+        text_prompts = []
+
+        for prompt, context in zip(prompts, contexts):
+
+            prompt_engineering = add_prompt_engineering or self.add_prompt_engineering
+            if not prompt_engineering:
+                prompt_engineering = "default_with_context" if context else "default_no_context"
+
+            self.add_prompt_engineering = prompt_engineering
+            self.add_context = context
+
+            prompt_enriched = self.prompt_engineer(prompt, context, inference_dict=inference_dict)
+            text_prompts.append(prompt_enriched + self.trailing_space)
+
+        token_ids = [self.tokenizer.encode(text_prompt) for text_prompt in text_prompts]
+
+        #   group prompts of similar length together to minimize padding, and restore order at the end
+        order = sorted(range(len(token_ids)), key=lambda x: len(token_ids[x]))
+
+        outputs = [None] * len(token_ids)
+
+        for start in range(0, len(order), batch_size):
+
+            group = order[start:start + batch_size]
+
+            group_outputs = self._generate_batch([token_ids[i] for i in group])
+
+            for i, output in zip(group, group_outputs):
+                outputs[i] = output
+
+        #   register each output, in the same way as .inference
+        for prompt, text_prompt, output in zip(prompts, text_prompts, outputs):
+
+            self.prompt = prompt
+            self.llm_response = output["llm_response"]
+            self.usage = output["usage"]
+            self.final_prompt = text_prompt
+
+            self.register()
+
+        return outputs
+
+    def _generate_batch(self, token_ids):
+
+        """ Shared generation loop for a batch of tokenized prompts - left-pads the prompts, preallocates the
+        attention mask and output buffer for the maximum output length, and tracks eos per sequence. """
+
+        device = "cuda" if self.use_gpu else "cpu"
+
+        if self.cpu_threads:
+            PyTorchLoader.set_cpu_threads(self.cpu_threads)
+
+        eos_token_id = self.eos_token_id if isinstance(self.eos_token_id, list) else [self.eos_token_id]
+        eos_token_id_tensor = torch.tensor(eos_token_id, device=device)
+
+        pad_token_id = eos_token_id[0]
+        if getattr(self.tokenizer, "pad_token_id", None) is not None:
+            pad_token_id = self.tokenizer.pad_token_id
+
+        batch_size = len(token_ids)
+        input_lens = [len(ids) for ids in token_ids]
+        seq_len = max(input_lens)
+        max_new_tokens = self.target_requested_output_tokens
+
+        #   left-pad inputs, and preallocate the attention mask for the full generation
+        input_ids = torch.full((batch_size, seq_len), pad_token_id, dtype=torch.long)
+        attn_mask = torch.zeros((batch_size, seq_len + max_new_tokens), dtype=torch.long)
+
+        for i, ids in enumerate(token_ids):
+            input_ids[i, seq_len - len(ids):] = torch.tensor(ids, dtype=torch.long)
+            attn_mask[i, seq_len - len(ids):seq_len] = 1
+
+        input_ids = input_ids.to(device)
+        attn_mask = attn_mask.to(device)
+
+        #   positions start at 0 at the first real token of each prompt
+        position_ids = (attn_mask[:, :seq_len].cumsum(dim=-1) - 1).clamp(min=0)
+        next_position = position_ids[:, -1:] + 1
+
+        output_tokens = torch.full((batch_size, max_new_tokens), pad_token_id, dtype=torch.long, device=device)
+        output_counts = torch.zeros(batch_size, dtype=torch.long, device=device)
+        unfinished_sequences = torch.ones(batch_size, dtype=torch.long, device=device)
+
+        time_start = time.time()
+        first_token_processing_time = -1.0
+
+        #   most models accept explicit position ids, which are needed to generate correctly with left-padding
+        use_position_ids = "position_ids" in inspect.signature(self.model.forward).parameters
+
+        pkv = None
+        inp = input_ids
+        inp_positions = position_ids
+        new_tokens_generated = 0
+
+        while new_tokens_generated < max_new_tokens:
+
+            #   context manager to avoid saving/computing grads in forward pass
+            with torch.no_grad():
+                model_inputs = {"input_ids": inp,
+                                "attention_mask": attn_mask[:, :seq_len + new_tokens_generated],
+                                "past_key_values": pkv,
+                                "return_dict": True}
+
+                if use_position_ids:
+                    model_inputs.update({"position_ids": inp_positions})
+
+                outputs = self.model(**model_inputs)
+
+            if new_tokens_generated == 0:
+                first_token_processing_time = time.time() - time_start
+
+            next_token_logits = outputs.logits[:, -1, :]
+
+            if self.temperature and self.sample:
+                probs = torch.nn.functional.softmax(next_token_logits / self.temperature, dim=-1)
+                next_tokens = torch.multinomial(probs, num_samples=1).squeeze(1)
+            else:
+                next_tokens = torch.argmax(next_token_logits, dim=-1)
+
+            # finished sequences get the padding token
+            next_tokens = next_tokens * unfinished_sequences + pad_token_id * (1 - unfinished_sequences)
+
+            output_tokens[:, new_tokens_generated] = next_tokens
+            output_counts += unfinished_sequences
+
+            # extend the attention mask for the new token in place - no re-allocation in the loop
+            attn_mask[:, seq_len + new_tokens_generated] = 1
+
+            new_tokens_generated += 1
+
+            unfinished_sequences = unfinished_sequences.mul(
+                next_tokens.tile(eos_token_id_tensor.shape[0], 1).ne(eos_token_id_tensor.unsqueeze(1)).prod(dim=0))
+
+            if unfinished_sequences.max() == 0:
+                break
+
+            pkv = outputs.past_key_values
+            inp = next_tokens[:, None]
+            inp_positions = next_position
+            next_position = next_position + 1
+
+        processing_time = time.time() - time_start
+
+        output_tokens = output_tokens.to("cpu")
+        output_counts = output_counts.to("cpu")
+
+        results = []
+
+        for i in range(batch_size):
+
+            output_only = np.array(output_tokens[i, :int(output_counts[i])])
+            output_str = self._post_process_output(self.tokenizer.decode(output_only))
+
+            usage = {"input": input_lens[i],
+                     "output": int(output_counts[i]),
+                     "total": input_lens[i] + int(output_counts[i]),
+                     "metric": "tokens",
+                     "processing_time": processing_time,
+                     "batch_size": batch_size}
+
+            if GGUFConfigs().get_config("get_first_token_speed"):
+                usage.update({"first_token_processing_time": first_token_processing_time})
+
+            results.append({"llm_response": output_str, "usage": usage})
+
+        return results
+
+    def fc_prompt_engineer(self, context, params=None, function=None):
+
+        """ Prompt engineering for Function Call prompts. """
+
+        if not params:
+            params = self.primary_keys
+
+        #   add safety check in looking for default self.function pulled from model card
+        if not function:
+            if self.function:
+                if isinstance(self.function,list):
+                    if len(self.function) > 0:
+                        function = self.function[0]
+                else:
+                    function = self.function
+
+        #   if not successful identifying a function, then choose 'classify' by default
+        if not function:
+            function = "classify"
+
+        # prepare SLIM prompt
+        class_str = ""
+        for key in params:
+            class_str += str(key) + ", "
+        if class_str.endswith(", "):
+            class_str = class_str[:-2]
+
+        f = str(function)
 
         # key templating format for SLIM function calls
         full_prompt = "<human>: " + context + "\n" + "<{}> {} </{}>".format(f, class_str, f) + "\n<bot>:"
@@ -8003,6 +8636,9 @@ class HFGenerativeModel(BaseModel):
 
         prompt = self.fc_prompt_engineer(self.context, params=self.primary_keys, function=self.function)
 
+        if self.cpu_threads:
+            PyTorchLoader.set_cpu_threads(self.cpu_threads)
+
         # second - tokenize to get the input_ids
 
         tokenizer_output = self.tokenizer.encode(prompt)
@@ -9852,6 +10488,17 @@ class WhisperCPPModel(BaseModel):
         self.temperature_inc = GGUFConfigs().get_config("whisper_temperature_inc")
 
         self.remove_segment_markers = GGUFConfigs().get_config("whisper_remove_segment_markers")
+
+        #   long audio options - if chunk_secs > 0, the audio is split at silence into overlapping windows, which
+        #   are transcribed in parallel on a pool of whisper states sharing the one loaded model
+        self.chunk_secs = GGUFConfigs().get_config("whisper_chunk_secs")
+        self.chunk_overlap_secs = GGUFConfigs().get_config("whisper_chunk_overlap_secs")
+        self.silence_search_secs = GGUFConfigs().get_config("whisper_silence_search_secs")
+        self.workers = GGUFConfigs().get_config("whisper_workers")
+
+        #   if False, skips the per-token ctypes calls, and segments are returned with an empty token list
+        self.token_details = GGUFConfigs().get_config("whisper_token_details")
+
         self.model_card = model_card
         self.model_name = model_name
         self._lib = None
@@ -10076,12 +10723,7 @@ class WhisperCPPModel(BaseModel):
 
         self.prompt=prompt
 
-        if inference_dict:
-            if "translate" in inference_dict:
-                self.translate=inference_dict["translate"]
-
-            if "remove_segment_markers" in inference_dict:
-                self.remove_segment_markers = inference_dict["remove_segment_markers"]
+        self._set_inference_options(inference_dict)
 
         #   preview before starting inference
         self.preview()
@@ -10098,9 +10740,11 @@ class WhisperCPPModel(BaseModel):
             logger.info("update: WhisperCPPModel - inference - input file needs to be converted to .wav - "
                          "will try to do right now.")
 
+            #   unique tmp file name per conversion - safe to run in parallel threads or processes
             new_file_path = Utilities().convert_media_file_to_wav(self.prompt,
                                                                   save_path=LLMWareConfig().get_tmp_path(),
-                                                                  file_out="converted_file_tmp.wav")
+                                                                  file_out=f"converted_file_tmp_{os.getpid()}_"
+                                                                           f"{time.time_ns()}.wav")
 
             if not new_file_path:
                 logger.warning("update: WhisperCPPModel - inference - conversion was not successful.  "
@@ -10122,46 +10766,54 @@ class WhisperCPPModel(BaseModel):
 
                 file = new_file_path
 
-        # loading new dependencies starts here
-
         try:
-            import soundfile as sf
-            import soxr
-        except:
-            raise LLMWareException("WhisperCPPModel class requires dependencies of soundfile and soxr,"
-                                   "e.g., `pip install soundfile` and `pip install soxr`")
+            response = self._transcribe(file=file, prompt=prompt)
 
-        sfo = sf.SoundFile(file)
+        finally:
+            if file != prompt and os.path.exists(file):
+                os.remove(file)
 
-        with sfo as sf_desc:
-            sr = sf_desc.samplerate
-            frame_duration = -1
+        return response
 
-            data = sf_desc.read(frames=frame_duration, dtype=np.float32, always_2d=False).T
+    def transcribe_samples(self, samples, inference_dict=None):
 
-            if self.WHISPER_SR != sr:
+        """ Transcribes audio that is already decoded in memory - samples is a 1-d array of float32 mono samples
+        at the whisper sample rate (16000) - takes the same inference_dict options as .inference, and returns
+        the same response dictionary. """
 
-                # y = resample(data, orig_sr=sr_native, target_sr=sr, res_type="soxr_hq")
+        self.prompt = ""
+        self.params.initial_prompt = None
 
-                ratio = float(sr) / self.WHISPER_SR
-                axis = -1
-                n_samples = int(np.ceil(data.shape[axis] * ratio))
+        self._set_inference_options(inference_dict)
 
-                yhat = np.apply_along_axis(soxr.resample, axis=axis, arr=data,
-                                           in_rate=sr, out_rate=self.WHISPER_SR, quality="soxr_hq")
+        self.preview()
 
-                data = np.asarray(yhat, dtype=np.float32)
+        return self._transcribe(samples=np.ascontiguousarray(samples, dtype=np.float32))
 
-        # new dependencies end here
-        # replacing previous:   data, sr = librosa.load(file, sr=self.WHISPER_SR)
+    def _set_inference_options(self, inference_dict):
 
-        try:
-            self.duration = float(data.shape[-1]) / self.WHISPER_SR
-            # self.duration = librosa.get_duration(y=data, sr=self.WHISPER_SR)
-        except:
-            self.duration = float(0.0)
+        """ Applies the optional per-call settings in the inference_dict. """
+
+        if inference_dict:
+            if "translate" in inference_dict:
+                self.translate=inference_dict["translate"]
+
+            if "remove_segment_markers" in inference_dict:
+                self.remove_segment_markers = inference_dict["remove_segment_markers"]
+
+            if "chunk_secs" in inference_dict:
+                self.chunk_secs = inference_dict["chunk_secs"]
+
+            if "workers" in inference_dict:
+                self.workers = inference_dict["workers"]
+
+            if "token_details" in inference_dict:
+                self.token_details = inference_dict["token_details"]
+
+    def _transcribe(self, file=None, samples=None, prompt=None):
+
+        """ Runs the transcription on the audio file, or on the decoded samples, and prepares the response. """
 
-        data.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
         self.params.language = self.language.encode('utf-8')
         if prompt:
             self.params.initial_prompt = prompt.encode('utf-8')
@@ -10170,7 +10822,25 @@ class WhisperCPPModel(BaseModel):
 
         self.params.translate = self.translate
 
-        result = self._generate(data)
+        if self.chunk_secs and self.chunk_secs > 0:
+            if samples is not None:
+                result = self._generate_in_chunks([samples])
+            else:
+                result = self._generate_in_chunks(self._iter_audio_blocks(file))
+
+        else:
+            if samples is not None:
+                data = samples
+            else:
+                data = self._load_audio(file)
+
+            try:
+                self.duration = float(data.shape[-1]) / self.WHISPER_SR
+                # self.duration = librosa.get_duration(y=data, sr=self.WHISPER_SR)
+            except:
+                self.duration = float(0.0)
+
+            result = self._generate(data)
 
         #   output format options
 
@@ -10202,104 +10872,345 @@ class WhisperCPPModel(BaseModel):
 
         return response
 
-    def _generate(self, data):
+    def _load_audio(self, file):
 
-        """ Executes lib_whisper generation on data from audio file. """
+        """ Loads the full audio file, resampled to the whisper sample rate. """
 
-        w = self._lib.whisper_full(ctypes.c_void_p(self.context),
-                                   self.params,
-                                   data.ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
-                                   len(data))
+        try:
+            import soundfile as sf
+            import soxr
+        except:
+            raise LLMWareException("WhisperCPPModel class requires dependencies of soundfile and soxr,"
+                                   "e.g., `pip install soundfile` and `pip install soxr`")
 
-        if w != 0:
-            raise LLMWareException(message=f"Exception: WhisperCPPModel - inference: {w}")
+        sfo = sf.SoundFile(file)
 
-        segments = []
-        all_text = ""
-        text_chunks = []
-        n_segments = self._lib.whisper_full_n_segments(ctypes.c_void_p(self.context))
+        with sfo as sf_desc:
+            sr = sf_desc.samplerate
+            frame_duration = -1
 
-        for i in range(n_segments):
+            data = sf_desc.read(frames=frame_duration, dtype=np.float32, always_2d=False).T
 
-            t0 = self._lib.whisper_full_get_segment_t0(ctypes.c_void_p(self.context), i)/100.0
-            t1 = self._lib.whisper_full_get_segment_t1(ctypes.c_void_p(self.context), i)/100.0
-            txt = self._lib.whisper_full_get_segment_text(ctypes.c_void_p(self.context), i).decode('utf-8-sig',
-                                                                                                   errors='ignore')
+            if self.WHISPER_SR != sr:
 
-            if self.tiny_diarize:
+                # y = resample(data, orig_sr=sr_native, target_sr=sr, res_type="soxr_hq")
 
-                # look for [_SOLM_] token to break segment - and will keep aggregating until found
-                if "[_SOLM_]" in txt:
-                    txt += "\n\n"
+                ratio = float(sr) / self.WHISPER_SR
+                axis = -1
+                n_samples = int(np.ceil(data.shape[axis] * ratio))
 
-            if self.remove_segment_markers:
+                yhat = np.apply_along_axis(soxr.resample, axis=axis, arr=data,
+                                           in_rate=sr, out_rate=self.WHISPER_SR, quality="soxr_hq")
 
-                #   removes leading [_BEG_] & trailing [_TT_XYZ] special tokens
+                data = np.asarray(yhat, dtype=np.float32)
 
-                txt_split = txt.split("[_TT_")[0]
-                txt_split = txt_split.strip()
-                if txt_split.startswith("[_BEG_]"):
-                    txt_split= txt_split[len("[_BEG_]"):]
-                txt = " " + txt_split + " "
+        # replacing previous:   data, sr = librosa.load(file, sr=self.WHISPER_SR)
 
-            all_text += txt
-            text_chunks.append(txt)
+        return data
 
-            n_tokens = self._lib.whisper_full_n_tokens(ctypes.c_void_p(self.context), i)
-            tokens = []
+    def _iter_audio_blocks(self, file, block_secs=30):
 
-            for j in range(n_tokens):
-                token_data = self._lib.whisper_full_get_token_data(ctypes.c_void_p(self.context), i, j)
+        """ Reads the audio file in blocks of block_secs, as mono float32 samples resampled to the whisper
+        sample rate - the full waveform is never held in memory. """
 
-                tokens.append({
-                    "id": token_data.id,
-                    "prob": token_data.p,
-                    "logprob": token_data.plog,
-                    "pt": token_data.pt,
-                    "pt_sum": token_data.ptsum,
-                })
+        try:
+            import soundfile as sf
+            import soxr
+        except:
+            raise LLMWareException("WhisperCPPModel class requires dependencies of soundfile and soxr,"
+                                   "e.g., `pip install soundfile` and `pip install soxr`")
 
-            segments.append({
-                "start": t0,
-                "end": t1,
-                "text": txt,
-                "tokens": tokens,
-            })
+        with sf.SoundFile(file) as sf_desc:
 
-        result = {"text": all_text.strip(), "text_chunks": text_chunks, "segments": segments}
+            sr = sf_desc.samplerate
+            frames = int(block_secs * sr)
 
-        return result
+            resampler = None
+            if sr != self.WHISPER_SR:
+                resampler = soxr.ResampleStream(sr, self.WHISPER_SR, 1, dtype="float32", quality="soxr_hq")
 
-    def __dealloc__(self):
-        # free the memory
-        self._lib.whisper_free(ctypes.c_void_p(self.context))
+            while True:
 
-    def unload_model(self):
+                block = sf_desc.read(frames=frames, dtype=np.float32, always_2d=True)
+                last = len(block) < frames
 
-        self._lib = None
+                # downmix to mono
+                block = block.mean(axis=1, dtype=np.float32)
 
-    @staticmethod
-    def _format_time(t):
+                if resampler:
+                    block = resampler.resample_chunk(block, last=last)
 
-        """ Helper utility that formats the time. """
+                if len(block) > 0:
+                    yield block
 
-        msec = t * 10
-        hr = msec / (1000 * 60 * 60)
-        msec = msec - hr * (1000 * 60 * 60)
-        minu = msec / (1000 * 60)
-        msec = msec - minu * (1000 * 60)
-        sec = msec / 1000
-        msec = msec - sec * 1000
+                if last:
+                    break
 
-        return f'{int(hr):02}:{int(minu):02}:{int(sec):02}.{int(msec):03}'
+    @staticmethod
+    def _find_silence(samples, start, stop, frame_size):
 
-    def abort_call_back(self, data):
-        do_nothing = 0
+        """ Returns the sample index at the center of the lowest energy frame in samples[start:stop]. """
 
-    def callback(self, ctx, state, i, p):
-        do_nothing = 0
+        n_frames = (stop - start) // frame_size
 
-    def add_ctypes_configs(self):
+        if n_frames < 1:
+            return stop
+
+        frames = samples[start:start + n_frames * frame_size].reshape(n_frames, frame_size)
+        energy = np.square(frames).mean(axis=1)
+
+        return start + int(np.argmin(energy)) * frame_size + frame_size // 2
+
+    def _iter_audio_windows(self, blocks):
+
+        """ Splits the stream of audio blocks into windows of ~chunk_secs, cut at the quietest point in the last
+        silence_search_secs of each window.  Each window extends chunk_overlap_secs past its cut on both sides,
+        and 'owns' the audio between its cut points, which is used to stitch the segments of the windows. """
+
+        sr = self.WHISPER_SR
+        window_size = int(self.chunk_secs * sr)
+        overlap = int(self.chunk_overlap_secs * sr)
+        search = min(int(self.silence_search_secs * sr), window_size // 2)
+        frame_size = int(0.02 * sr)
+
+        buffer = np.zeros(0, dtype=np.float32)
+        buffer_start = 0
+        own_start = 0
+
+        for block in blocks:
+
+            buffer = np.concatenate([buffer, block])
+
+            while len(buffer) >= window_size + overlap:
+
+                cut = self._find_silence(buffer, window_size - search, window_size, frame_size)
+
+                yield {"samples": buffer[:cut + overlap], "offset": buffer_start,
+                       "own_start": own_start, "own_end": buffer_start + cut}
+
+                next_start = max(cut - overlap, 0)
+                own_start = buffer_start + cut
+                buffer = buffer[next_start:]
+                buffer_start += next_start
+
+        if len(buffer) > 0:
+            yield {"samples": buffer, "offset": buffer_start, "own_start": own_start, "own_end": None}
+
+    def _generate_in_chunks(self, blocks):
+
+        """ Transcribes the stream of audio blocks in overlapping windows, cut at silence, on a pool of whisper
+        states that share the loaded model - the segments of each window are shifted to the absolute time in the
+        file, and only the segments centered within the window's own range (between its cut points) are kept. """
+
+        workers = max(1, int(self.workers))
+
+        #   copy of the params for the windows - realtime display would interleave the windows, and the
+        #   initial prompt is not carried across windows
+        params = whisper_full_params.from_buffer_copy(self.params)
+        params.print_realtime = False
+        params.print_progress = False
+        params.initial_prompt = None
+
+        states = queue.Queue()
+        state_list = [self._lib.whisper_init_state(ctypes.c_void_p(self.context)) for i in range(workers)]
+        for state in state_list:
+            states.put(state)
+
+        def transcribe_window(window):
+
+            samples = np.ascontiguousarray(window["samples"], dtype=np.float32)
+            offset = window["offset"] / self.WHISPER_SR
+
+            state = states.get()
+
+            try:
+                w = self._lib.whisper_full_with_state(ctypes.c_void_p(self.context), ctypes.c_void_p(state), params,
+                                                      samples.ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
+                                                      len(samples))
+
+                if w != 0:
+                    raise LLMWareException(message=f"Exception: WhisperCPPModel - inference: {w}")
+
+                segments = self._read_segments(state=state)
+
+            finally:
+                states.put(state)
+
+            own_start = window["own_start"] / self.WHISPER_SR
+            own_end = window["own_end"] / self.WHISPER_SR if window["own_end"] is not None else float("inf")
+
+            kept = []
+            for segment in segments:
+                segment["start"] += offset
+                segment["end"] += offset
+                if own_start <= (segment["start"] + segment["end"]) / 2 < own_end:
+                    kept.append(segment)
+
+            return kept
+
+        results = {}
+        total_samples = 0
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+
+                pending = {}
+
+                for i, window in enumerate(self._iter_audio_windows(blocks)):
+
+                    total_samples = window["offset"] + len(window["samples"])
+                    pending[executor.submit(transcribe_window, window)] = i
+
+                    #   bounds the number of windows held in memory
+                    if len(pending) >= 2 * workers:
+                        done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            results[pending.pop(future)] = future.result()
+
+                for future, i in pending.items():
+                    results[i] = future.result()
+
+        finally:
+            for state in state_list:
+                self._lib.whisper_free_state(ctypes.c_void_p(state))
+
+        self.duration = float(total_samples) / self.WHISPER_SR
+
+        segments = []
+        for i in sorted(results.keys()):
+            segments += results[i]
+
+        text_chunks = [segment["text"] for segment in segments]
+
+        logger.debug(f"update: WhisperCPPModel - transcribed {len(results)} windows - {len(segments)} segments - "
+                     f"{self.duration} seconds")
+
+        result = {"text": "".join(text_chunks).strip(), "text_chunks": text_chunks, "segments": segments}
+
+        return result
+
+    def _generate(self, data):
+
+        """ Executes lib_whisper generation on data from audio file. """
+
+        w = self._lib.whisper_full(ctypes.c_void_p(self.context),
+                                   self.params,
+                                   data.ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
+                                   len(data))
+
+        if w != 0:
+            raise LLMWareException(message=f"Exception: WhisperCPPModel - inference: {w}")
+
+        segments = self._read_segments()
+        text_chunks = [segment["text"] for segment in segments]
+
+        result = {"text": "".join(text_chunks).strip(), "text_chunks": text_chunks, "segments": segments}
+
+        return result
+
+    def _read_segments(self, state=None):
+
+        """ Reads the segments of the last whisper_full call - from the whisper state, if provided, or from the
+        default state of the model context. """
+
+        if state is None:
+            handle = ctypes.c_void_p(self.context)
+            n_segments_fn = self._lib.whisper_full_n_segments
+            t0_fn = self._lib.whisper_full_get_segment_t0
+            t1_fn = self._lib.whisper_full_get_segment_t1
+            text_fn = self._lib.whisper_full_get_segment_text
+            n_tokens_fn = self._lib.whisper_full_n_tokens
+            token_data_fn = self._lib.whisper_full_get_token_data
+        else:
+            handle = ctypes.c_void_p(state)
+            n_segments_fn = self._lib.whisper_full_n_segments_from_state
+            t0_fn = self._lib.whisper_full_get_segment_t0_from_state
+            t1_fn = self._lib.whisper_full_get_segment_t1_from_state
+            text_fn = self._lib.whisper_full_get_segment_text_from_state
+            n_tokens_fn = self._lib.whisper_full_n_tokens_from_state
+            token_data_fn = self._lib.whisper_full_get_token_data_from_state
+
+        segments = []
+        n_segments = n_segments_fn(handle)
+
+        for i in range(n_segments):
+
+            t0 = t0_fn(handle, i)/100.0
+            t1 = t1_fn(handle, i)/100.0
+            txt = text_fn(handle, i).decode('utf-8-sig', errors='ignore')
+
+            if self.tiny_diarize:
+
+                # look for [_SOLM_] token to break segment - and will keep aggregating until found
+                if "[_SOLM_]" in txt:
+                    txt += "\n\n"
+
+            if self.remove_segment_markers:
+
+                #   removes leading [_BEG_] & trailing [_TT_XYZ] special tokens
+
+                txt_split = txt.split("[_TT_")[0]
+                txt_split = txt_split.strip()
+                if txt_split.startswith("[_BEG_]"):
+                    txt_split= txt_split[len("[_BEG_]"):]
+                txt = " " + txt_split + " "
+
+            tokens = []
+
+            if self.token_details:
+
+                n_tokens = n_tokens_fn(handle, i)
+
+                for j in range(n_tokens):
+                    token_data = token_data_fn(handle, i, j)
+
+                    tokens.append({
+                        "id": token_data.id,
+                        "prob": token_data.p,
+                        "logprob": token_data.plog,
+                        "pt": token_data.pt,
+                        "pt_sum": token_data.ptsum,
+                    })
+
+            segments.append({
+                "start": t0,
+                "end": t1,
+                "text": txt,
+                "tokens": tokens,
+            })
+
+        return segments
+
+    def __dealloc__(self):
+        # free the memory
+        self._lib.whisper_free(ctypes.c_void_p(self.context))
+
+    def unload_model(self):
+
+        self._lib = None
+
+    @staticmethod
+    def _format_time(t):
+
+        """ Helper utility that formats the time. """
+
+        msec = t * 10
+        hr = msec / (1000 * 60 * 60)
+        msec = msec - hr * (1000 * 60 * 60)
+        minu = msec / (1000 * 60)
+        msec = msec - minu * (1000 * 60)
+        sec = msec / 1000
+        msec = msec - sec * 1000
+
+        return f'{int(hr):02}:{int(minu):02}:{int(sec):02}.{int(msec):03}'
+
+    def abort_call_back(self, data):
+        do_nothing = 0
+
+    def callback(self, ctx, state, i, p):
+        do_nothing = 0
+
+    def add_ctypes_configs(self):
 
         self._lib.whisper_init_from_file.argtypes = [ctypes.c_char_p]
         self._lib.whisper_init_from_file.restype = ctypes.c_void_p
@@ -10349,6 +11260,35 @@ class WhisperCPPModel(BaseModel):
         self._lib.whisper_free.argtypes = [ctypes.c_void_p]
         self._lib.whisper_free.restype = None
 
+        #   whisper states - used to run windows of long audio in parallel on one model
+        self._lib.whisper_init_state.argtypes = [ctypes.c_void_p]
+        self._lib.whisper_init_state.restype = ctypes.c_void_p
+
+        self._lib.whisper_free_state.argtypes = [ctypes.c_void_p]
+        self._lib.whisper_free_state.restype = None
+
+        self._lib.whisper_full_with_state.argtypes = [ctypes.c_void_p, ctypes.c_void_p, whisper_full_params,
+                                                      ctypes.POINTER(ctypes.c_float), ctypes.c_int]
+        self._lib.whisper_full_with_state.restype = ctypes.c_int
+
+        self._lib.whisper_full_n_segments_from_state.argtypes = [ctypes.c_void_p]
+        self._lib.whisper_full_n_segments_from_state.restype = ctypes.c_int
+
+        self._lib.whisper_full_get_segment_t0_from_state.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self._lib.whisper_full_get_segment_t0_from_state.restype = ctypes.c_int64
+
+        self._lib.whisper_full_get_segment_t1_from_state.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self._lib.whisper_full_get_segment_t1_from_state.restype = ctypes.c_int64
+
+        self._lib.whisper_full_get_segment_text_from_state.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self._lib.whisper_full_get_segment_text_from_state.restype = ctypes.c_char_p
+
+        self._lib.whisper_full_n_tokens_from_state.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self._lib.whisper_full_n_tokens_from_state.restype = ctypes.c_int
+
+        self._lib.whisper_full_get_token_data_from_state.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int]
+        self._lib.whisper_full_get_token_data_from_state.restype = whisper_token_data
+
         self._lib.whisper_log_set.artypes = [ctypes.c_void_p, ctypes.c_void_p]
         self._lib.whisper_log_set.restype = None
 
@@ -10487,12 +11427,227 @@ class LLMWareSemanticModel(BaseModel):
 class ModelResources:
 
     """ ModelResources is a global state mechanism used in conjunction with deploying the LLMWare Inference
-    Server class.   It manages the persistent loading of multiple models behind the server. """
+    Server class.   It manages the persistent loading of multiple models behind the server.
+
+    Loaded models are held in a model pool, with an optional RAM budget - when loading a new model would
+    exceed the budget, the least-recently-used models that are not pinned are evicted, with a call to
+    each model's unload_model.   The pool can also be used through ModelCatalog().load_model(...,
+    use_model_pool=True) and LLMfx(use_model_pool=True), so that multi-tool pipelines stay within memory
+    without repeated cold loads. """
 
     class _ModelState:
         models_loaded = 0
         models_list = []
 
+    #   pool entries keyed by (model_name, load_options) in least-recently-used order
+    _pool = OrderedDict()
+
+    #   RAM budget in bytes - None = no budget, and models are only unloaded explicitly
+    _memory_budget = None
+
+    _pool_lock = threading.RLock()
+
+    _pool_stats = {"hits": 0, "misses": 0, "loads": 0, "evictions": 0, "load_time": 0.0}
+
+    @classmethod
+    def set_memory_budget(cls, max_memory_gb=None):
+
+        """ Sets the RAM budget for the model pool in GB - pass None to remove the budget. """
+
+        with cls._pool_lock:
+            if max_memory_gb is None:
+                cls._memory_budget = None
+            else:
+                cls._memory_budget = int(max_memory_gb * (1024 ** 3))
+                cls._evict(0)
+
+        return cls._memory_budget
+
+    @classmethod
+    def get_memory_budget(cls):
+
+        """ Returns the RAM budget for the model pool in bytes. """
+
+        return cls._memory_budget
+
+    @staticmethod
+    def _pool_key(model_name, load_options):
+
+        """ Pool key - models loaded with different options are pooled as separate instances. """
+
+        return model_name, tuple(sorted((k, repr(v)) for k, v in load_options.items()))
+
+    @staticmethod
+    def _estimate_model_size(model_name, model=None):
+
+        """ Estimates the memory footprint of a model in bytes - uses the parameter size of a loaded
+        Pytorch model if available, and otherwise the size of the model files in the local model repo,
+        which is a good proxy for GGUF, ONNX and OpenVino models.  Returns 0 for API-based models. """
+
+        if model is not None:
+
+            pt_model = getattr(model, "model", None)
+
+            if hasattr(pt_model, "parameters"):
+                try:
+                    return sum(p.numel() * p.element_size() for p in pt_model.parameters())
+                except:
+                    pass
+
+        model_location = os.path.join(LLMWareConfig.get_model_repo_path(), model_name.split("/")[-1])
+
+        size_bytes = 0
+
+        if os.path.exists(model_location):
+            for root, dirs, files in os.walk(model_location):
+                for file in files:
+                    size_bytes += os.path.getsize(os.path.join(root, file))
+
+        return size_bytes
+
+    @classmethod
+    def _pool_size(cls):
+        return sum(entry["size"] for entry in cls._pool.values())
+
+    @classmethod
+    def _evict(cls, required_bytes):
+
+        """ Evicts least-recently-used unpinned models until required_bytes fits within the budget. """
+
+        if cls._memory_budget is None:
+            return 0
+
+        evicted = 0
+
+        for key in list(cls._pool.keys()):
+
+            if cls._pool_size() + required_bytes <= cls._memory_budget:
+                break
+
+            if cls._pool[key]["pinned"]:
+                continue
+
+            cls._remove_from_pool(key)
+            cls._pool_stats["evictions"] += 1
+            evicted += 1
+
+            logger.info(f"update: ModelResources - evicted model from pool - {key[0]}")
+
+        if cls._pool_size() + required_bytes > cls._memory_budget:
+            logger.warning(f"update: ModelResources - pinned models prevent staying within memory budget - "
+                           f"{cls._pool_size() + required_bytes} > {cls._memory_budget}")
+
+        return evicted
+
+    @classmethod
+    def _remove_from_pool(cls, key):
+
+        entry = cls._pool.pop(key)
+
+        try:
+            entry["model"].unload_model()
+        except:
+            logger.debug(f"update: ModelResources - could not call unload_model - {key[0]}")
+
+        model_name = key[0]
+
+        if not any(k[0] == model_name for k in cls._pool):
+            if model_name in cls._ModelState.models_list:
+                cls._ModelState.models_list.remove(model_name)
+                cls._ModelState.models_loaded -= 1
+
+        gc.collect()
+
+    @classmethod
+    def add_model(cls, model_name, model, pin=False, **load_options):
+
+        """ Adds an already instantiated model to the pool. """
+
+        with cls._pool_lock:
+
+            size = cls._estimate_model_size(model_name, model=model)
+            cls._evict(size)
+
+            cls._pool[cls._pool_key(model_name, load_options)] = {"model": model, "size": size, "pinned": pin}
+
+            if model_name not in cls._ModelState.models_list:
+                cls._ModelState.models_list.append(model_name)
+                cls._ModelState.models_loaded += 1
+
+        return model
+
+    @classmethod
+    def get_model(cls, model_name, pin=False, **load_options):
+
+        """ Returns a model from the pool, loading it with ModelCatalog().load_model on a miss - load_options
+        are passed to load_model and are part of the pool key. """
+
+        key = cls._pool_key(model_name, load_options)
+
+        with cls._pool_lock:
+
+            if key in cls._pool:
+                cls._pool.move_to_end(key)
+                cls._pool_stats["hits"] += 1
+                if pin:
+                    cls._pool[key]["pinned"] = True
+                return cls._pool[key]["model"]
+
+            cls._pool_stats["misses"] += 1
+
+            #   make room ahead of the load, based on the size of the model files, if available locally
+            cls._evict(cls._estimate_model_size(model_name))
+
+            t0 = time.time()
+            model = ModelCatalog().load_model(model_name, use_model_pool=False, **load_options)
+            load_time = time.time() - t0
+
+            cls._pool_stats["loads"] += 1
+            cls._pool_stats["load_time"] += load_time
+
+            logger.info(f"update: ModelResources - loaded model into pool - {model_name} - {load_time}")
+
+            return cls.add_model(model_name, model, pin=pin, **load_options)
+
+    @classmethod
+    def pin_model(cls, model_name):
+
+        """ Pins all pooled instances of model_name, so that they are never evicted. """
+
+        with cls._pool_lock:
+            for key, entry in cls._pool.items():
+                if key[0] == model_name:
+                    entry["pinned"] = True
+
+    @classmethod
+    def unpin_model(cls, model_name):
+
+        """ Unpins all pooled instances of model_name, so that they can be evicted. """
+
+        with cls._pool_lock:
+            for key, entry in cls._pool.items():
+                if key[0] == model_name:
+                    entry["pinned"] = False
+
+    @classmethod
+    def pool_stats(cls):
+
+        """ Returns model pool metrics - hit rate, loads, evictions, load time and memory in use. """
+
+        with cls._pool_lock:
+
+            stats = dict(cls._pool_stats)
+
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups > 0 else 0.0
+            stats["avg_load_time"] = stats["load_time"] / stats["loads"] if stats["loads"] > 0 else 0.0
+            stats["models_in_pool"] = [key[0] for key in cls._pool]
+            stats["pinned_models"] = [key[0] for key, entry in cls._pool.items() if entry["pinned"]]
+            stats["memory_in_use"] = cls._pool_size()
+            stats["memory_budget"] = cls._memory_budget
+
+        return stats
+
     @classmethod
     def load_model(cls, model_name, sample=False, temperature=0.0, get_logits=True, max_output=200, api_key=None,
                    use_gpu=True):
@@ -10501,20 +11656,21 @@ class ModelResources:
 
         if model_card and model_name not in cls._ModelState.models_list:
 
-            setattr(cls._ModelState, model_name, ModelCatalog().load_model(model_name, api_key=api_key,
-                                                                           sample=sample, use_gpu=use_gpu,
-                                                                           get_logits=get_logits, max_output=max_output,
-                                                                           temperature=temperature))
-
-            cls._ModelState.models_list.append(model_name)
-            cls._ModelState.models_loaded += 1
+            cls.get_model(model_name, api_key=api_key, sample=sample, use_gpu=use_gpu, get_logits=get_logits,
+                          max_output=max_output, temperature=temperature)
 
             logger.info(f"update: ModelResources - {cls._ModelState.models_loaded} - "
                          f"{cls._ModelState.models_list}")
 
     @classmethod
     def unload_model(cls, model_name):
-        """ Not implemented currently. """
+
+        """ Unloads all pooled instances of model_name, and calls unload_model on each. """
+
+        with cls._pool_lock:
+            for key in [k for k in cls._pool if k[0] == model_name]:
+                cls._remove_from_pool(key)
+
         return 0
 
     @classmethod
@@ -10529,9 +11685,140 @@ class ModelResources:
     @classmethod
     def fetch_model(cls, model_name):
 
-        """ Returns the instantiated model that is already loaded in memory. """
+        """ Returns the instantiated model that is already loaded in memory - most recently used instance,
+        if more than one instance of the model is in the pool. """
+
+        with cls._pool_lock:
+
+            for key in reversed(cls._pool):
+                if key[0] == model_name:
+                    cls._pool.move_to_end(key)
+                    cls._pool_stats["hits"] += 1
+                    return cls._pool[key]["model"]
+
+        return None
+
 
-        return getattr(cls._ModelState, model_name)
+class _InferenceMicroBatcher:
+
+    """ _InferenceMicroBatcher is used by the async mode of LLMWareInferenceServer - it collects requests from
+    an asyncio queue, groups requests targeting the same model and route into micro-batches within a short
+    batch window, and executes each group on a single model worker thread.
+
+    If the model exposes an 'inference_batch' method, then a group of index requests is run as one batched
+    call - otherwise, the requests in the group are run back-to-back on the worker thread, which still avoids
+    the overhead of a thread switch per request. """
+
+    def __init__(self, server, max_batch_size=8, batch_window_ms=10, max_queue_size=256):
+
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.server = server
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window_ms / 1000
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+
+        #   models are not thread-safe - all model calls are serialized on a single worker thread
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+        self.batches_run = 0
+        self.requests_run = 0
+
+    def submit(self, job):
+
+        """ Adds a job to the queue and returns a future for the result - raises asyncio.QueueFull if the
+        queue is at capacity, which is surfaced by the server as a 429. """
+
+        import asyncio
+
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((job, future))
+
+        return future
+
+    async def run(self):
+
+        """ Main batcher loop - runs as a background task for the lifetime of the server. """
+
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+
+            while len(batch) < self.max_batch_size:
+
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            groups = {}
+            for job, future in batch:
+                groups.setdefault((job["route"], job["model_name"]), []).append((job, future))
+
+            for (route, model_name), items in groups.items():
+
+                jobs = [job for job, future in items]
+
+                results = await loop.run_in_executor(self.executor, self._run_group, route, model_name, jobs)
+
+                for (job, future), result in zip(items, results):
+                    if future.done():
+                        continue
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+
+                self.batches_run += 1
+                self.requests_run += len(jobs)
+
+    def _run_group(self, route, model_name, jobs):
+
+        """ Executes a group of jobs for the same model and route on the model worker thread - returns one
+        result per job, with any exception captured in place of the result. """
+
+        if route == "index" and len(jobs) > 1:
+
+            if not ModelResources().check_if_model_loaded(model_name):
+                self.server._load_model(model_name, get_logits=False, sample=False, temperature=0.0,
+                                        max_output=200)
+
+            model = ModelResources().fetch_model(model_name)
+
+            if hasattr(model, "inference_batch"):
+                try:
+                    outputs = model.inference_batch([job["question"] for job in jobs],
+                                                    contexts=[job["context"] for job in jobs])
+                    for output in outputs:
+                        if "logits" in output:
+                            output["logits"] = str(output["logits"])
+                    return outputs
+                except Exception as e:
+                    inference_server_logger.warning(f"update: inference_batch failed - running jobs one by one - "
+                                                    f"{e}")
+
+        results = []
+
+        for job in jobs:
+            try:
+                if route == "index":
+                    results.append(self.server._llmware_inference(job["question"], job["context"], model_name))
+                else:
+                    results.append(self.server._llmware_agent_function_call(**job["kwargs"]))
+            except Exception as e:
+                results.append(e)
+
+        return results
 
 
 class LLMWareInferenceServer:
@@ -10542,10 +11829,18 @@ class LLMWareInferenceServer:
         1.  /      - main inference of general purpose LLM deployed on inference server at time of start.
         2.  /agent - supports agent process over API with multiple SLIM models deployed.
 
+    The server can be started in one of two modes:
+
+        1.  "flask" (default) - Flask development server, which runs one request at a time.
+        2.  "async" - Starlette app on uvicorn, with a request queue, dynamic micro-batching per model,
+            a concurrency cap with backpressure (429), and server-sent-event streaming of generated tokens
+            for models that implement stream(), by passing stream=true in the request form.
     """
 
     def __init__(self, model_name, model_catalog=None, hf_api_key=None, secret_api_key=None, home_path=None,
-                 port=8080, verbose=True, temperature=0.0, sample=False, max_output=100, debug=False):
+                 port=8080, verbose=True, temperature=0.0, sample=False, max_output=100, debug=False,
+                 max_batch_size=8, batch_window_ms=10, max_concurrency=64, max_queue_size=256,
+                 max_memory_gb=None):
 
         self.HOME_PATH = home_path
         self.hf_api_key = hf_api_key
@@ -10561,8 +11856,24 @@ class LLMWareInferenceServer:
         self.model = self.model_catalog.load_model(model_name, api_key=self.hf_api_key,
                                                    temperature=temperature, sample=sample, max_output=max_output)
 
+        #   main model is pinned in the model pool - any other models, e.g., SLIM tools on the /agent route,
+        #   are loaded into the pool on demand, and evicted as needed to stay within max_memory_gb
+        if max_memory_gb:
+            ModelResources().set_memory_budget(max_memory_gb)
+
+        ModelResources().add_model(model_name, self.model, pin=True)
+
         self.verbose = verbose
 
+        # async server mode settings
+        self.max_batch_size = max_batch_size
+        self.batch_window_ms = batch_window_ms
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self._batcher = None
+        self._batcher_task = None
+        self._in_flight = 0
+
         import logging
         logging.basicConfig(level=30)
         global inference_server_logger
@@ -10578,17 +11889,21 @@ class LLMWareInferenceServer:
                 # keep logging at "WARNING"
                 inference_server_logger.setLevel(level=30)
 
-    def start(self):
+    def start(self, server_mode="flask"):
+
+        """ Starts the server runtime - server_mode is either "flask" (default) or "async". """
+
+        if server_mode == "async":
+            return self.start_async()
 
-        """ Starts the server runtime. """
         # if inference server started, then try to get flask dependency
         try:
             global flask
-            from flask import Flask, request, jsonify
-        except:
+            import flask
+        except ImportError:
             raise DependencyNotInstalledException("flask")
 
-        app = Flask(__name__, template_folder=self.HOME_PATH, static_folder=self.HOME_PATH)
+        app = flask.Flask(__name__, template_folder=self.HOME_PATH, static_folder=self.HOME_PATH)
         app.add_url_rule("/", methods=['GET', 'POST'], view_func=self.index_route)
         app.add_url_rule("/agent", methods=['GET','POST'], view_func=self.agent_route)
 
@@ -10608,6 +11923,38 @@ class LLMWareInferenceServer:
         my_port = self.port
         app.run(host=my_host, port=my_port)
 
+    def start_async(self):
+
+        """ Starts the server runtime as an asyncio Starlette app on uvicorn, with micro-batching,
+        backpressure and streaming. """
+
+        try:
+            import uvicorn
+            from starlette.applications import Starlette
+            from starlette.routing import Route
+        except ImportError:
+            raise DependencyNotInstalledException("starlette, uvicorn and python-multipart")
+
+        import asyncio
+
+        async def on_startup():
+            self._batcher = _InferenceMicroBatcher(self, max_batch_size=self.max_batch_size,
+                                                   batch_window_ms=self.batch_window_ms,
+                                                   max_queue_size=self.max_queue_size)
+            self._batcher_task = asyncio.create_task(self._batcher.run())
+
+        async def on_shutdown():
+            if self._batcher_task:
+                self._batcher_task.cancel()
+            if self._batcher:
+                self._batcher.executor.shutdown(wait=False)
+
+        app = Starlette(routes=[Route("/", self.async_index_route, methods=["GET", "POST"]),
+                                Route("/agent", self.async_agent_route, methods=["GET", "POST"])],
+                        on_startup=[on_startup], on_shutdown=[on_shutdown])
+
+        uvicorn.run(app, host='0.0.0.0', port=self.port, log_level="warning")
+
     def _llmware_inference(self, prompt, context, model_name):
 
         """ Executes a LLM model inference from the main index route. """
@@ -10631,73 +11978,39 @@ class LLMWareInferenceServer:
 
         return output
 
-    def index_route(self):
-
-        """ Main index route to execute a model inference from the server. """
+    def _parse_index_form(self, form):
 
-        # defaults
-        api_key = ""
-        question = ""
-        context = ""
-        model_name = ""
+        """ Unpacks the request form of the main index route. """
 
-        # if inference server started, then try to get flask dependency
-        try:
-            from flask import Flask, request, jsonify
-        except:
-            raise DependencyNotInstalledException("flask")
+        request_dict = {"api_key": "", "question": "", "context": "", "model_name": "", "stream": False}
 
-        for keys in request.form:
+        for keys in form:
 
-            inference_server_logger.debug(f"update: keys / values input received - {keys} - {request.form.get(keys)}")
+            inference_server_logger.debug(f"update: keys / values input received - {keys} - {form.get(keys)}")
 
             if keys == "context":
-                context = request.form.get(keys)
+                request_dict["context"] = form.get(keys)
 
             if keys == "question":
-                question = request.form.get(keys)
-
-            if keys == "max_output_tokens":
-                max_output_len = request.form.get(keys)
-                try:
-                    max_output_len = int(max_output_len)
-                except:
-                    max_output_len = 200
+                request_dict["question"] = form.get(keys)
 
             if keys == "api_key":
-                api_key = request.form.get(keys)
+                request_dict["api_key"] = form.get(keys)
 
             if keys == "model_name":
-                model_name = request.form.get(keys)
-
-        t1 = time.time()
+                request_dict["model_name"] = form.get(keys)
 
-        if not question and not context:
-            output_str = "Got your message - No content found to process"
-            return jsonify({"message": output_str})
+            if keys == "stream":
+                request_dict["stream"] = form.get(keys) in ["True", "true", "1"]
 
-        if api_key != self.current_api_key:
-            output_str = "Got your message - Thanks for testing - API key not confirmed!"
-            return jsonify({"message": output_str})
+        if not request_dict["model_name"]:
+            request_dict["model_name"] = self.model_name
 
-        if not model_name:
-            model_name = self.model_name
-        # start processing here
+        return request_dict
 
-        output = self._llmware_inference(question, context, model_name)
+    def _parse_agent_form(self, form):
 
-        # cuda.empty_cache()
-
-        return jsonify(output)
-
-    def agent_route(self):
-
-        """ New InferenceServer API Route - to handle an Agent process deployed over a Remote Endpoint server. """
-
-        try:
-            from flask import Flask, request, jsonify
-        except:
-            raise DependencyNotInstalledException("flask")
+        """ Unpacks the request form of the agent route. """
 
         context = ""
         fx = ""
@@ -10711,28 +12024,28 @@ class LLMWareInferenceServer:
         max_output = 50
         tool_type = ""
 
-        for keys in request.form:
+        for keys in form:
 
-            inference_server_logger.debug(f"update: keys / values input received: {keys} - {request.form.get(keys)}")
+            inference_server_logger.debug(f"update: keys / values input received: {keys} - {form.get(keys)}")
 
             if keys == "context":
-                context = request.form.get(keys)
+                context = form.get(keys)
 
             if keys == "tool_type":
-                tool_type = request.form.get(keys)
+                tool_type = form.get(keys)
 
             if keys == "function":
-                fx = request.form.get(keys)
+                fx = form.get(keys)
 
             if keys == "model" or keys == "model_name":
-                model = request.form.get(keys)
+                model = form.get(keys)
 
             if keys == "params":
-                params = request.form.get(keys)
+                params = form.get(keys)
 
             if keys == "get_logits":
 
-                get_logits = request.form.get(keys)
+                get_logits = form.get(keys)
 
                 if get_logits in ["False", "false"]:
                     get_logits = False
@@ -10740,42 +12053,227 @@ class LLMWareInferenceServer:
                     get_logits =True
 
             if keys == "temperature":
-                temperature = request.form.get(keys)
+                temperature = form.get(keys)
 
             if keys == "sample":
-                sample = request.form.get(keys)
+                sample = form.get(keys)
 
             if keys == "question" or keys == "prompt":
-                prompt = request.form.get(keys)
+                prompt = form.get(keys)
 
             if keys == "max_output_tokens" or keys == "max_output":
-                max_output_len = request.form.get(keys)
+                max_output_len = form.get(keys)
                 try:
                     max_output = int(max_output_len)
                 except:
                     max_output = 200
 
             if keys == "api_key":
-                api_key = request.form.get(keys)
+                api_key = form.get(keys)
 
-        t1 = time.time()
+        kwargs = {"context": context, "tool_type": tool_type, "model_name": model, "function": fx,
+                  "temperature": temperature, "sample": sample, "params": params, "max_output": max_output,
+                  "prompt": prompt, "get_logits": get_logits}
+
+        return api_key, kwargs
+
+    def index_route(self):
+
+        """ Main index route to execute a model inference from the server. """
+
+        request_dict = self._parse_index_form(flask.request.form)
+
+        if not request_dict["question"] and not request_dict["context"]:
+            output_str = "Got your message - No content found to process"
+            return flask.jsonify({"message": output_str})
+
+        if request_dict["api_key"] != self.current_api_key:
+            output_str = "Got your message - Thanks for testing - API key not confirmed!"
+            return flask.jsonify({"message": output_str})
+
+        # start processing here
 
-        if not context and not (fx or model):
+        output = self._llmware_inference(request_dict["question"], request_dict["context"],
+                                         request_dict["model_name"])
+
+        # cuda.empty_cache()
+
+        return flask.jsonify(output)
+
+    def agent_route(self):
+
+        """ New InferenceServer API Route - to handle an Agent process deployed over a Remote Endpoint server. """
+
+        api_key, kwargs = self._parse_agent_form(flask.request.form)
+
+        if not kwargs["context"] and not (kwargs["function"] or kwargs["model_name"]):
             output_str = "Got your message - No content found to process"
-            return jsonify({"message": output_str})
+            return flask.jsonify({"message": output_str})
 
         if api_key != self.current_api_key:
             output_str = "Got your message - Thanks for testing - API key not confirmed!"
-            return jsonify({"message": output_str})
+            return flask.jsonify({"message": output_str})
 
         # start processing here
 
-        output = self._llmware_agent_function_call(context=context, tool_type=tool_type, model_name=model, function=fx,
-                                                  temperature=temperature, sample=sample,params=params,
-                                                  max_output=max_output, prompt=prompt,get_logits=get_logits)
+        output = self._llmware_agent_function_call(**kwargs)
+
         # cuda.empty_cache()
 
-        return jsonify(output)
+        return flask.jsonify(output)
+
+    async def _async_submit(self, job):
+
+        """ Submits a job to the micro-batcher, applying the concurrency cap - returns a tuple of
+        (output, status_code). """
+
+        import asyncio
+
+        if self._in_flight >= self.max_concurrency:
+            return {"message": "Server busy - too many concurrent requests - please retry"}, 429
+
+        self._in_flight += 1
+
+        try:
+            future = self._batcher.submit(job)
+        except asyncio.QueueFull:
+            self._in_flight -= 1
+            return {"message": "Server busy - request queue is full - please retry"}, 429
+
+        try:
+            output = await future
+            status_code = 200
+        except Exception as e:
+            inference_server_logger.error(f"update: async inference failed - {e}")
+            output = {"message": f"Inference failed - {e}"}
+            status_code = 500
+        finally:
+            self._in_flight -= 1
+
+        return output, status_code
+
+    async def _async_stream(self, request_dict):
+
+        """ Streams tokens from the model stream() generator as server-sent events - the generator is run
+        on the model worker thread, and tokens are handed back to the event loop through a queue.  The request is
+        counted in _in_flight when it is admitted, and released here when the stream ends. """
+
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        token_queue = asyncio.Queue()
+        end_of_stream = object()
+
+        model_name = request_dict["model_name"]
+
+        def run_stream():
+
+            try:
+                if not ModelResources().check_if_model_loaded(model_name):
+                    self._load_model(model_name, get_logits=False, sample=False, temperature=0.0, max_output=200)
+
+                model = ModelResources().fetch_model(model_name)
+
+                if hasattr(model, "stream"):
+                    for token in model.stream(request_dict["question"], add_context=request_dict["context"],
+                                              add_prompt_engineering=True):
+                        loop.call_soon_threadsafe(token_queue.put_nowait, {"token": token})
+                else:
+                    output = self._llmware_inference(request_dict["question"], request_dict["context"],
+                                                     model_name)
+                    loop.call_soon_threadsafe(token_queue.put_nowait, {"token": output["llm_response"]})
+
+            except Exception as e:
+                loop.call_soon_threadsafe(token_queue.put_nowait, {"error": str(e)})
+
+            loop.call_soon_threadsafe(token_queue.put_nowait, end_of_stream)
+
+        try:
+            loop.run_in_executor(self._batcher.executor, run_stream)
+
+            while True:
+                event = await token_queue.get()
+                if event is end_of_stream:
+                    break
+                yield f"data: {json.dumps(event)}\n\n"
+
+            yield "data: [DONE]\n\n"
+
+        finally:
+            self._in_flight -= 1
+
+    async def async_index_route(self, request):
+
+        """ Main index route in async server mode. """
+
+        from starlette.responses import JSONResponse, StreamingResponse
+
+        form = await request.form()
+        request_dict = self._parse_index_form(form)
+
+        if not request_dict["question"] and not request_dict["context"]:
+            output_str = "Got your message - No content found to process"
+            return JSONResponse({"message": output_str})
+
+        if request_dict["api_key"] != self.current_api_key:
+            output_str = "Got your message - Thanks for testing - API key not confirmed!"
+            return JSONResponse({"message": output_str})
+
+        if request_dict["stream"]:
+
+            if self._in_flight >= self.max_concurrency:
+                return JSONResponse({"message": "Server busy - too many concurrent requests - please retry"},
+                                    status_code=429)
+
+            #   counted at admission, so that concurrent requests can not all pass the cap before streaming starts
+            self._in_flight += 1
+
+            try:
+                return StreamingResponse(self._async_stream(request_dict), media_type="text/event-stream")
+            except Exception:
+                self._in_flight -= 1
+                raise
+
+        job = {"route": "index", "model_name": request_dict["model_name"],
+               "question": request_dict["question"], "context": request_dict["context"]}
+
+        output, status_code = await self._async_submit(job)
+
+        return JSONResponse(output, status_code=status_code)
+
+    async def async_agent_route(self, request):
+
+        """ Agent route in async server mode. """
+
+        from starlette.responses import JSONResponse
+
+        form = await request.form()
+        api_key, kwargs = self._parse_agent_form(form)
+
+        if not kwargs["context"] and not (kwargs["function"] or kwargs["model_name"]):
+            output_str = "Got your message - No content found to process"
+            return JSONResponse({"message": output_str})
+
+        if api_key != self.current_api_key:
+            output_str = "Got your message - Thanks for testing - API key not confirmed!"
+            return JSONResponse({"message": output_str})
+
+        # batch key uses the resolved model name, so that tool_type and model_name requests group together
+        model_name = kwargs["model_name"]
+        if kwargs["tool_type"]:
+
+            llm_fx_mapping = _ModelRegistry().get_llm_fx_mapping()
+
+            if kwargs["tool_type"] not in llm_fx_mapping:
+                return JSONResponse({"message": f"Unknown tool_type - {kwargs['tool_type']}"}, status_code=400)
+
+            model_name = llm_fx_mapping[kwargs["tool_type"]]
+
+        job = {"route": "agent", "model_name": model_name, "kwargs": kwargs}
+
+        output, status_code = await self._async_submit(job)
+
+        return JSONResponse(output, status_code=status_code)
 
     def _llmware_agent_function_call(self, prompt=None, context=None, tool_type=None, model_name=None,
                                     function=None, temperature=0.0, sample=False, params=None,
@@ -10822,21 +12320,16 @@ class LLMWareInferenceServer:
         model_name = ""
         tool = ""
 
-        # if inference server started, then try to get flask dependency
-        try:
-            from flask import Flask, request, jsonify
-        except:
-            raise DependencyNotInstalledException("flask")
-
-        for keys in request.form:
+        for keys in flask.request.form:
 
-            inference_server_logger.debug(f"update: keys / values input received - {keys} - {request.form.get(keys)}")
+            inference_server_logger.debug(f"update: keys / values input received - {keys} - "
+                                          f"{flask.request.form.get(keys)}")
 
             if keys == "model" or keys == "model_name":
-                model_name = request.form.get(keys)
+                model_name = flask.request.form.get(keys)
 
             if keys == "tool" or keys == "tool_type":
-                tool = request.form.get(keys)
+                tool = flask.request.form.get(keys)
 
         if tool and not model_name:
             model_name = _ModelRegistry().get_llm_fx_mapping()[tool]
@@ -10845,7 +12338,7 @@ class LLMWareInferenceServer:
             self._load_model(model_name)
             output = {"model": f"loaded-{model_name}"}
 
-        return jsonify(output)
+        return flask.jsonify(output)
 
     def _load_model(self, model_name, sample=False, temperature=0.0, get_logits=False,max_output=200):
 
@@ -10866,13 +12359,144 @@ class PyTorchLoader:
     provided by the transformers library in terms of configs and model class code.  This also enables a single
     point to customize the behavior of transformers configurations.   """
 
-    def __init__(self, api_key=None, trust_remote_code=True,custom_loader=None):
+    #   supported options for cpu_quantize
+    _cpu_quantize_options = ["int8"]
+
+    #   inter-op threads can only be set once per process in torch
+    _inter_op_threads_set = False
+
+    def __init__(self, api_key=None, trust_remote_code=True,custom_loader=None, cpu_quantize=None):
 
         self.model_name = None
         self.api_key=api_key
         self.trust_remote_code = trust_remote_code
         self.custom_loader = custom_loader
 
+        #   optional - apply dynamic quantization to the linear layers of the model for cpu inference
+        if cpu_quantize and cpu_quantize not in self._cpu_quantize_options:
+            raise LLMWareException(message=f"Exception: PyTorchLoader - cpu_quantize option not supported - "
+                                           f"{cpu_quantize} - supported options - {self._cpu_quantize_options}")
+
+        self.cpu_quantize = cpu_quantize
+
+    @classmethod
+    def set_cpu_threads(cls, cpu_threads):
+
+        """ Sets the torch cpu thread counts - cpu_threads is either an int, for the intra-op threads, or a tuple
+        of (intra-op threads, inter-op threads).  Note: torch thread settings are process-wide, and the inter-op
+        threads can only be set once per process. """
+
+        if isinstance(cpu_threads, (list, tuple)):
+            intra_op_threads, inter_op_threads = cpu_threads
+        else:
+            intra_op_threads, inter_op_threads = cpu_threads, None
+
+        if intra_op_threads and torch.get_num_threads() != intra_op_threads:
+            torch.set_num_threads(intra_op_threads)
+
+        if inter_op_threads and not cls._inter_op_threads_set:
+            try:
+                torch.set_num_interop_threads(inter_op_threads)
+            except RuntimeError:
+                logger.warning("warning: PyTorchLoader - could not set inter-op threads - needs to be set before "
+                               "the first inference in the process.")
+            cls._inter_op_threads_set = True
+
+        return True
+
+    def _get_quantized_cache_path(self, model_name, caller):
+
+        """ Path in the model repo for the cached quantized model state dict. """
+
+        model_folder = os.path.join(LLMWareConfig.get_model_repo_path(), model_name.split("/")[-1])
+
+        return os.path.join(model_folder, f"pytorch_dynamic_{self.cpu_quantize}_{caller}_state_dict.pt")
+
+    def _get_quantized_cache_key(self, model_name, config):
+
+        """ Key for the cached quantized state dict - the model revision (the commit hash of the HF repo, or a
+        hash of the config for a local model), and the torch and transformers versions. """
+
+        import transformers
+
+        revision = getattr(config, "_commit_hash", None)
+
+        if not revision:
+            revision = hashlib.sha256(config.to_json_string().encode("utf-8")).hexdigest()
+
+        return {"model_name": model_name, "cpu_quantize": self.cpu_quantize, "revision": revision,
+                "torch_version": torch.__version__, "transformers_version": transformers.__version__}
+
+    def _load_quantized_cache(self, model_name, caller, model_class):
+
+        """ Loads the cached quantized state dict, if found with the same cache key - the model is built from
+        its config (with no weight init and no weight files read), quantized, and then the state dict is loaded
+        with weights_only=True, so no code is unpickled.  Returns None if there is no valid cache. """
+
+        cache_path = self._get_quantized_cache_path(model_name, caller)
+        meta_path = cache_path + ".json"
+
+        if not os.path.exists(cache_path) or not os.path.exists(meta_path):
+            return None
+
+        try:
+            from transformers import AutoConfig
+            from transformers.modeling_utils import no_init_weights
+
+            config = AutoConfig.from_pretrained(model_name, token=self.api_key,
+                                                trust_remote_code=self.trust_remote_code)
+
+            meta = json.load(open(meta_path, "r"))
+
+            if meta != self._get_quantized_cache_key(model_name, config):
+                logger.info(f"update: PyTorchLoader - quantized model cache saved with different model revision "
+                            f"or library versions - will re-create - {cache_path}")
+                return None
+
+            state_dict = torch.load(cache_path, weights_only=True)
+
+            with no_init_weights():
+                model = model_class.from_config(config, trust_remote_code=self.trust_remote_code)
+
+            model.eval()
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            model.load_state_dict(state_dict)
+
+            logger.info(f"update: PyTorchLoader - loaded quantized model from cache - {cache_path}")
+
+        except Exception as e:
+            logger.warning(f"warning: PyTorchLoader - could not load quantized model cache - {cache_path} - {e}")
+            model = None
+
+        return model
+
+    def quantize_for_cpu(self, model, model_name, caller):
+
+        """ Applies dynamic int8 quantization to the linear layers of the model, and saves the quantized state
+        dict in the model repo, so later loads skip the conversion. """
+
+        if not model or not self.cpu_quantize:
+            return model
+
+        t0 = time.time()
+
+        model.eval()
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+        logger.info(f"update: PyTorchLoader - applied dynamic {self.cpu_quantize} quantization - {model_name} - "
+                    f"time - {round(time.time() - t0, 2)}")
+
+        cache_path = self._get_quantized_cache_path(model_name, caller)
+
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            torch.save(model.state_dict(), cache_path)
+            json.dump(self._get_quantized_cache_key(model_name, model.config), open(cache_path + ".json", "w"))
+        except Exception as e:
+            logger.warning(f"warning: PyTorchLoader - could not save quantized model cache - {cache_path} - {e}")
+
+        return model
+
     def get_generative_model(self, model_name, **kwargs):
 
         """ Retrieves and instantiates a Pytorch Generative model.  Takes a model_name as input, which is
@@ -10914,6 +12538,11 @@ class PyTorchLoader:
                 else:
                     raise LLMWareException(message="Exception: need to import torch to use this class.")
 
+            if self.cpu_quantize:
+                model = self._load_quantized_cache(model_name, "generative_model", AutoModelForCausalLM)
+                if model:
+                    return model
+
             if self.api_key:
 
                 if torch.cuda.is_available():
@@ -10931,6 +12560,8 @@ class PyTorchLoader:
                 else:
                     model = AutoModelForCausalLM.from_pretrained(model_name, trust_remote_code=self.trust_remote_code)
 
+            model = self.quantize_for_cpu(model, model_name, "generative_model")
+
         return model
 
     def get_embedding_model(self, model_name, **kwargs):
@@ -10973,6 +12604,11 @@ class PyTorchLoader:
                 else:
                     raise LLMWareException(message="Exception: need to import torch to use this class.")
 
+            if self.cpu_quantize:
+                model = self._load_quantized_cache(model_name, "embedding_model", AutoModel)
+                if model:
+                    return model
+
             if self.api_key:
 
                 if torch.cuda.is_available():
@@ -10990,6 +12626,8 @@ class PyTorchLoader:
                 else:
                     model = AutoModel.from_pretrained(model_name, trust_remote_code=self.trust_remote_code)
 
+            model = self.quantize_for_cpu(model, model_name, "embedding_model")
+
         return model
 
     def get_reranker_model(self, model_name, **kwargs):
@@ -40,6 +40,11 @@ set of text chunks, e.g., blocks, indexed with metadata, in a database.
 import time
 import json
 import os
+import copy
+import hashlib
+import sqlite3
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from zipfile import ZipFile, ZIP_DEFLATED
 import shutil
 
@@ -48,7 +53,8 @@ import random
 from ctypes import *
 import platform
 
-from llmware.configs import LLMWareConfig, LLMWareTableSchema
+from llmware.configs import LLMWareConfig, LLMWareTableSchema, MongoConfig, PostgresConfig, SQLiteConfig, \
+    OCRConfig
 from llmware.util import Utilities, TextChunker
 from llmware.web_services import WikiKnowledgeBase, WebSiteParser
 from llmware.resources import CollectionRetrieval, CollectionWriter, ParserState
@@ -60,6 +66,73 @@ logger = logging.getLogger(__name__)
 logger.setLevel(level=LLMWareConfig().get_logging_level_by_module(__name__))
 
 
+def _get_parser_worker_config_state():
+
+    """ Captures the in-memory global configs, so that they can be re-applied in a parser worker process,
+    e.g., if the worker process is started by 'spawn' rather than 'fork'. """
+
+    config_state = {"llmware_base_fp": dict(LLMWareConfig._base_fp),
+                    "llmware_fp": dict(LLMWareConfig._fp),
+                    "llmware_conf": dict(LLMWareConfig._conf),
+                    "mongo_conf": dict(MongoConfig._conf),
+                    "postgres_conf": dict(PostgresConfig._conf),
+                    "sqlite_conf": dict(SQLiteConfig._conf)}
+
+    return config_state
+
+
+def _parse_work_folders_worker(shard_parser, shard_order, config_state):
+
+    """ Entry point in worker process for parsing one shard of an ingest work order. """
+
+    LLMWareConfig._base_fp.update(config_state["llmware_base_fp"])
+    LLMWareConfig._fp.update(config_state["llmware_fp"])
+    LLMWareConfig._conf.update(config_state["llmware_conf"])
+    MongoConfig._conf.update(config_state["mongo_conf"])
+    PostgresConfig._conf.update(config_state["postgres_conf"])
+    SQLiteConfig._conf.update(config_state["sqlite_conf"])
+
+    shard_parser._parse_work_folders(shard_order)
+
+    return shard_order
+
+
+def _ocr_worker_init():
+
+    """ Initializer for ocr worker processes - one tesseract thread per worker, as the parallelism comes from
+    the pool. """
+
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
+def _ocr_worker(fp, page_num=None, dpi=200, lang="eng"):
+
+    """ Entry point in worker process for OCR of one image file - or, if page_num is passed, of one page of a pdf
+    file, which is rendered in the worker, and not saved to disk.  Returns (text, missing_dependency). """
+
+    import pytesseract
+    from pytesseract.pytesseract import TesseractNotFoundError
+
+    image = fp
+
+    if page_num is not None:
+
+        from pdf2image import convert_from_path
+        from pdf2image.exceptions import PDFInfoNotInstalledError
+
+        try:
+            image = convert_from_path(fp, dpi=dpi, first_page=page_num, last_page=page_num)[0]
+        except PDFInfoNotInstalledError:
+            return None, "poppler"
+
+    try:
+        text = pytesseract.image_to_string(image, lang=lang)
+    except TesseractNotFoundError:
+        return None, "tesseract"
+
+    return text, None
+
+
 class Parser:
 
     def __init__(self, library=None, account_name="llmware", parse_to_db=False, file_counter=1,
@@ -116,6 +189,9 @@ class Parser:
         # by default, parse_to_db = False
         self.parse_to_db = parse_to_db
 
+        # block of doc ids reserved from the library - parsers draw new doc ids locally from this block
+        self._reserved_doc_ids = deque()
+
         self.parser_job_id = ParserState().issue_new_parse_job_id()
 
         # if library is passed to parser, then assumes will write to library db, if available
@@ -385,13 +461,16 @@ class Parser:
 
         return work_order
 
-    def ingest (self, input_folder_path, dupe_check=True):
+    def ingest (self, input_folder_path, dupe_check=True, workers=1):
 
         """ Main method for large-scale parsing. Takes only a single input which is the local input folder path
          containing the files to be parsed.
 
          Optional dupe_check parameter set to True to restrict ingesting a file with the same name as a file
-         already in the library. """
+         already in the library.
+
+         Optional workers parameter - if > 1, the collated work order is sharded into per-worker subfolders,
+         and each shard is parsed in a separate process, with the results merged at the end. """
 
         # input_folder_path = where the input files are located
 
@@ -412,8 +491,65 @@ class Parser:
         # collate and sort the file types in the work path
         work_order = self._collator(input_folder_path, dupe_check=dupe_check)
 
-        #   write to db - True only if library loaded + collection connect in place
-        write_to_db = self.parse_to_db
+        if workers > 1:
+            self._parse_work_folders_in_pool(work_order, workers)
+        else:
+            self._parse_work_folders(work_order)
+
+        # need to systematically capture list of rejected docs
+
+        processed, not_processed = self.input_ingestion_comparison(work_order["file_list"])
+
+        parsing_results = {"processed_files": processed,
+                           "rejected_files": not_processed,
+                           "duplicate_files": work_order["duplicate_files"]}
+
+        return parsing_results
+
+    def reserve_doc_ids(self, n):
+
+        """ Tops up the local block of reserved doc ids to at least n, by reserving the shortfall from the
+        library in a single transaction.  Returns the number of doc ids held in the reserved block. """
+
+        shortfall = n - len(self._reserved_doc_ids)
+
+        if self.library and shortfall > 0:
+            self._reserved_doc_ids.extend(self.library.reserve_doc_ids(shortfall))
+
+        return len(self._reserved_doc_ids)
+
+    def _get_new_doc_id(self):
+
+        """ Internal utility - returns next doc id from the reserved block, and falls back to incrementing the
+        library doc id counter if the reserved block is exhausted. """
+
+        if self._reserved_doc_ids:
+            return self._reserved_doc_ids.popleft()
+
+        return self.library.get_and_increment_doc_id()
+
+    def _take_doc_id_block(self, n):
+
+        """ Internal utility - takes a contiguous block of n + 1 doc ids from the front of the reserved block, and
+        returns the first id, to pass to the C parsers as unique_doc_num, which then use and increment the doc id
+        directly, rather than pulling from the library card - the extra id keeps the block safe whether the C
+        parser increments before or after each use.  Returns -1 (pull from the library card) if there are not
+        enough contiguous reserved ids. """
+
+        if n < 1 or len(self._reserved_doc_ids) < n + 1:
+            return -1
+
+        doc_id_block = [self._reserved_doc_ids.popleft() for _ in range(n + 1)]
+
+        if doc_id_block[-1] - doc_id_block[0] != n:
+            self._reserved_doc_ids.extendleft(reversed(doc_id_block))
+            return -1
+
+        return doc_id_block[0]
+
+    def _parse_work_folders(self, work_order):
+
+        """ Internal method that runs each parser over its work folder, based on the counts in the work order. """
 
         if work_order["office"] > 0:
             self.parse_office(self.office_work_folder, save_history=False)
@@ -445,15 +581,90 @@ class Parser:
             if self.copy_files_to_library:
                 self.uploads(self.voice_work_folder)
 
-        # need to systematically capture list of rejected docs
+        return work_order
 
-        processed, not_processed = self.input_ingestion_comparison(work_order["file_list"])
+    def _shard_work_folders(self, work_order, workers):
 
-        parsing_results = {"processed_files": processed,
-                           "rejected_files": not_processed,
-                           "duplicate_files": work_order["duplicate_files"]}
+        """ Internal method that splits the collated work folders into per-worker shards - each shard is a
+        copy of the parser with its own tmp workspace, and files are assigned largest-first to the shard with
+        the smallest total bytes, to balance the load across workers. """
 
-        return parsing_results
+        shards = []
+        shard_bytes = []
+
+        for i in range(workers):
+            shard_parser = copy.copy(self)
+            shard_parser._reserved_doc_ids = deque()
+            shard_parser.parser_tmp_folder = os.path.join(self.parser_tmp_folder, f"shard_{i}" + os.sep)
+            shard_parser._setup_workspace(shard_parser.parser_tmp_folder)
+
+            shards.append((shard_parser, {"pdf": 0, "office": 0, "text": 0, "ocr": 0, "voice": 0}))
+            shard_bytes.append(0)
+
+        work_folders = {"office": "office_work_folder", "pdf": "pdf_work_folder", "text": "text_work_folder",
+                        "ocr": "ocr_work_folder", "voice": "voice_work_folder"}
+
+        for parser_type, folder_attr in work_folders.items():
+
+            if work_order[parser_type] < 1:
+                continue
+
+            source_folder = getattr(self, folder_attr)
+
+            files = [f for f in os.listdir(source_folder) if os.path.isfile(os.path.join(source_folder, f))]
+            files = sorted(files, key=lambda f: os.path.getsize(os.path.join(source_folder, f)), reverse=True)
+
+            for file in files:
+                fp = os.path.join(source_folder, file)
+                i = shard_bytes.index(min(shard_bytes))
+                shard_parser, shard_order = shards[i]
+
+                shutil.move(fp, os.path.join(getattr(shard_parser, folder_attr), file))
+                shard_order[parser_type] += 1
+                shard_bytes[i] += os.path.getsize(os.path.join(getattr(shard_parser, folder_attr), file))
+
+        # drop any empty shards, e.g., more workers than files
+        shards = [(sp, so) for (sp, so) in shards if sum(so.values()) > 0]
+
+        return shards
+
+    def _parse_work_folders_in_pool(self, work_order, workers):
+
+        """ Internal method that shards the work order and parses each shard in a process pool. """
+
+        shards = self._shard_work_folders(work_order, workers)
+
+        logger.info(f"Parser - ingest - parsing {len(shards)} shards in process pool - workers - {workers}")
+
+        t0 = time.time()
+
+        # reserve doc ids upfront for all of the parsers in each shard - keeps ids unique with one library card
+        # update per shard, rather than one per file in each worker - the pdf and office C parsers each take a
+        # block of (files + 1) ids, and run from the start of their block (see _take_doc_id_block)
+        for (shard_parser, shard_order) in shards:
+
+            c_parser_ids = sum([shard_order[p] + 1 for p in ["office", "pdf"] if shard_order[p] > 0])
+
+            shard_parser.reserve_doc_ids(c_parser_ids + shard_order["text"] + shard_order["ocr"] +
+                                         shard_order["voice"])
+
+        config_state = _get_parser_worker_config_state()
+
+        with ProcessPoolExecutor(max_workers=min(workers, max(len(shards),1))) as executor:
+
+            futures = [executor.submit(_parse_work_folders_worker, shard_parser, shard_order, config_state)
+                       for (shard_parser, shard_order) in shards]
+
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    # any files in a failed shard will be reported as rejected in the final comparison
+                    logger.error(f"Parser - ingest - shard failed in worker process - {e}")
+
+        logger.info(f"Parser - ingest - completed parsing of all shards - time taken: {time.time()-t0}")
+
+        return True
 
     def ingest_to_json(self, input_folder_path):
 
@@ -691,7 +902,10 @@ class Parser:
         #   must have three conditions in place - (a) user selects, (b) ping successfully, and (c) library loaded
         if write_to_db and self.parse_to_db and self.library:
             write_to_db_on = 1
-            unique_doc_num = -1
+            # uses a block of reserved doc ids, if reserved upfront (e.g., in ingest shards) - otherwise, -1 pulls
+            # each new doc id from the library card
+            unique_doc_num = self._take_doc_id_block(len([f for f in os.listdir(fp)
+                                                          if os.path.isfile(os.path.join(fp, f))]))
         else:
             write_to_db_on = 0
             unique_doc_num = int(self.file_counter)
@@ -1425,7 +1639,10 @@ class Parser:
         #   must have three conditions in place - (a) user selects, (b) ping successfully, and (c) library loaded
         if write_to_db and self.parse_to_db and self.library:
             write_to_db_on = 1
-            unique_doc_num = -1
+            # uses a block of reserved doc ids, if reserved upfront (e.g., in ingest shards) - otherwise, -1 pulls
+            # each new doc id from the library card
+            unique_doc_num = self._take_doc_id_block(len([f for f in os.listdir(input_fp)
+                                                          if os.path.isfile(os.path.join(input_fp, f))]))
         else:
             write_to_db_on = 0
             unique_doc_num = int(self.file_counter)
@@ -2152,6 +2369,10 @@ class Parser:
         pages_added = 0
         content_type = "text"
 
+        # reserve a block of doc ids upfront - one library card update for the folder, not one per file
+        if write_to_db_on == 1:
+            self.reserve_doc_ids(len(os.listdir(input_fp)))
+
         for file in os.listdir(input_fp):
 
             # by default, will process all files with text file extensions
@@ -2168,7 +2389,7 @@ class Parser:
                 text_output = []
                 # increment and get new doc_id
                 if write_to_db_on == 1:
-                    self.library.doc_ID = self.library.get_and_increment_doc_id()
+                    self.library.doc_ID = self._get_new_doc_id()
 
                 logger.info(f"Parser - parse_text file - processing - {file}")
 
@@ -2246,9 +2467,13 @@ class Parser:
         return output
 
     def parse_pdf_by_ocr_images(self, input_fp, write_to_db=True, save_history=True,
-                                dupe_check=False,copy_to_library=False):
+                                dupe_check=False,copy_to_library=False, workers=None, write_batch_size=None):
 
-        """ Alternative PDF parser option for scanned 'image-based' PDFs where digital parsing is not an option. """
+        """ Alternative PDF parser option for scanned 'image-based' PDFs where digital parsing is not an option.
+
+        The pages of all of the files are rendered and OCR'd one page at a time, with no page images saved to
+        disk - in this process, or across a pool of workers if workers (by default, OCRConfig "workers") is
+        greater than 1 - and the new blocks are written to the library in batches of write_batch_size blocks. """
 
         output = []
 
@@ -2276,47 +2501,69 @@ class Parser:
         docs_added = 0
         pages_added = 0
 
-        content_type = "text"
+        if not write_batch_size:
+            write_batch_size = OCRConfig().get_config("write_batch_size")
 
+        files = []
         for file in os.listdir(input_fp):
 
-            # by default, will process all files with text file extensions
-            go_ahead = True
+            if file.split(".")[-1] != "pdf":
+                continue
 
-            if dupe_check:
+            #   basic_library_duplicate_check returns TRUE if it finds the file
+            if dupe_check and self.basic_library_duplicate_check(file):
+                continue
 
-                #   basic_library_duplicate_check returns TRUE if it finds the file
-                if self.basic_library_duplicate_check(file):
-                    go_ahead = False
+            files.append(file)
 
-            if go_ahead:
+        # reserve a block of doc ids upfront - one library card update for the folder, not one per file
+        if write_to_db_on == 1:
+            self.reserve_doc_ids(len(files))
 
-                ext = file.split(".")[-1]
-                if ext == "pdf":
+        ip = ImageParser(self)
 
-                    doc_fn = Utilities().secure_filename(file)
+        #   one ocr task per page - pages of all files share the worker pool, and are rendered as they are needed
+        tasks = ((file, os.path.join(input_fp, file), page_num)
+                 for file in files
+                 for page_num in range(1, ip.get_pdf_page_count(os.path.join(input_fp, file)) + 1))
 
-                    # get new doc_ID number
-                    if write_to_db_on == 1:
-                        self.library.doc_ID = self.library.get_and_increment_doc_id()
+        #   new records prepared for the db, and written in batches
+        pending_records = []
+        current_file = None
 
-                    docs_added += 1
+        for (file, page_num), blocks in ip.ocr_files(tasks, workers=workers, preserve_spacing=True):
 
-                    output_by_page = ImageParser(self).process_pdf_by_ocr(input_fp, file)
+            doc_fn = Utilities().secure_filename(file)
 
-                    for j, blocks in enumerate(output_by_page):
+            # pages are returned in order - get new doc_ID number on the first page of each file
+            if file != current_file:
 
-                        if write_to_db_on == 1:
-                            new_output, new_blocks, _ = self._write_output_to_db(blocks,doc_fn,page_num=(j+1))
-                        else:
-                            new_output, new_blocks, _ = self._write_output_to_dict(blocks,doc_fn,page_num=(j+1))
+                current_file = file
+
+                if write_to_db_on == 1:
+                    self.library.doc_ID = self._get_new_doc_id()
+
+                docs_added += 1
+
+            if write_to_db_on == 1:
+                new_output, new_blocks, _ = self._write_output_to_db(blocks,doc_fn,page_num=page_num,
+                                                                     write_to_db=False)
+                pending_records += new_output
+            else:
+                new_output, new_blocks, _ = self._write_output_to_dict(blocks,doc_fn,page_num=page_num)
+
+            output += new_output
+            blocks_added += new_blocks
+            pages_added += 1
 
-                        output += new_output
-                        blocks_added += new_blocks
-                        pages_added += 1
+            logger.info(f"Parser - parse_pdf_by_ocr_images - writing doc - page - "
+                        f"{file} - {page_num} - {len(blocks)}")
 
-                        logger.info(f"Parser - parse_pdf_by_ocr_images - writing doc - page - "
-                                    f"{file} - {j} - {len(blocks)}")
+            if len(pending_records) >= write_batch_size:
+                self.write_parsing_records(pending_records)
+                pending_records = []
+
+        self.write_parsing_records(pending_records)
 
         # update overall library counter at end of parsing
 
@@ -2332,9 +2579,10 @@ class Parser:
 
         return output
 
-    def _write_output_to_db(self, output, file, content_type="text", file_type="text",page_num=1):
+    def _write_output_to_db(self, output, file, content_type="text", file_type="text",page_num=1, write_to_db=True):
 
-        """ Internal utility for preparing parser output to write to DB. """
+        """ Internal utility for preparing parser output to write to DB - if write_to_db is False, the new
+        records are prepared with block ids, but the caller is responsible for writing them to the DB. """
 
         db_record_output = []
 
@@ -2363,7 +2611,8 @@ class Parser:
 
             counter += 1
 
-            new_db_entry = self.add_create_new_record(self.library,new_entry, meta, coords_dict)
+            new_db_entry = self.add_create_new_record(self.library,new_entry, meta, coords_dict,
+                                                      write_to_db=write_to_db)
             db_record_output.append(new_db_entry)
 
             blocks_added += 1
@@ -2471,6 +2720,17 @@ class Parser:
 
         return new_entry
 
+    def write_parsing_records(self, new_records):
+
+        """ Writes a batch of new parsing records, prepared with add_create_new_record(write_to_db=False), to the
+        library in a single transaction. """
+
+        if new_records and self.library:
+            CollectionWriter(self.library.library_name,
+                             account_name=self.library.account_name).write_many_parsing_records(new_records)
+
+        return len(new_records)
+
     def create_one_parsing_output_dict(self, block_id,new_entry, meta, coords_dict,dialog_value="false"):
 
         """ Main method to prepare a new text chunk parser output for python-based parser as dictionary. """
@@ -2547,6 +2807,10 @@ class Parser:
         docs_added = 0
         pages_added = 0
 
+        # reserve a block of doc ids upfront - one library card update for the topic list, not one per topic
+        if write_to_db_on == 1:
+            self.reserve_doc_ids(len(topic_list))
+
         for i, topic in enumerate(topic_list):
 
             fn = "wiki-topic-" + Utilities().secure_filename(topic) + ".txt"
@@ -2555,7 +2819,7 @@ class Parser:
 
             # increment and get new doc_id
             if write_to_db_on == 1:
-                self.library.doc_ID = self.library.get_and_increment_doc_id()
+                self.library.doc_ID = self._get_new_doc_id()
 
             # topic_results = {"search_results": topic_query_results, "articles": articles_output,
             #                  "text_chunks": text_chunks}
@@ -2602,9 +2866,14 @@ class Parser:
 
         return output
 
-    def parse_image(self, input_folder, write_to_db=True, save_history=True, dupe_check=False,copy_to_library=False):
+    def parse_image(self, input_folder, write_to_db=True, save_history=True, dupe_check=False,copy_to_library=False,
+                    workers=None, write_batch_size=None):
+
+        """ Main entry point for OCR based parsing of image files.
 
-        """ Main entry point for OCR based parsing of image files. """
+        The images are OCR'd in this process, or across a pool of workers if workers (by default, OCRConfig
+        "workers") is greater than 1 - if OCRConfig "checksum_cache" is True, images already OCR'd (by checksum)
+        are not OCR'd again.  The new blocks are written to the library in batches of write_batch_size blocks. """
 
         output = []
 
@@ -2631,37 +2900,51 @@ class Parser:
         docs_added = 0
         pages_added = 0
 
+        if not write_batch_size:
+            write_batch_size = OCRConfig().get_config("write_batch_size")
+
+        files = []
         for file in os.listdir(input_folder):
 
-            # by default, will process all files with text file extensions
-            go_ahead = True
+            #   basic_library_duplicate_check returns TRUE if it finds the file
+            if dupe_check and self.basic_library_duplicate_check(file):
+                continue
 
-            if dupe_check:
+            files.append(file)
 
-                #   basic_library_duplicate_check returns TRUE if it finds the file
-                if self.basic_library_duplicate_check(file):
-                    go_ahead = False
+        # reserve a block of doc ids upfront - one library card update for the folder, not one per file
+        if write_to_db_on == 1:
+            self.reserve_doc_ids(len(files))
 
-            if go_ahead:
+        #   new records prepared for the db, and written in batches
+        pending_records = []
 
-                # increment and get new doc_id
-                if write_to_db_on == 1:
-                    self.library.doc_ID = self.library.get_and_increment_doc_id()
+        tasks = [(file, os.path.join(input_folder, file), None) for file in files]
 
-                ip_output = ImageParser(self).process_ocr(input_folder, file)
+        for file, ip_output in ImageParser(self).ocr_files(tasks, workers=workers):
 
-                if write_to_db_on == 1:
-                    new_output, new_blocks, new_pages = self._write_output_to_db(ip_output,file,content_type="text",
-                                                                                 file_type="ocr")
-                else:
-                    new_output, new_blocks, new_pages = self._write_output_to_dict(ip_output,file, content_type="text",
-                                                                                   file_type="ocr")
-                # return output value in either case
-                output += new_output
+            # increment and get new doc_id
+            if write_to_db_on == 1:
+                self.library.doc_ID = self._get_new_doc_id()
 
-                docs_added += 1
-                blocks_added += new_blocks
-                pages_added += new_pages
+                new_output, new_blocks, new_pages = self._write_output_to_db(ip_output,file,content_type="text",
+                                                                             file_type="ocr", write_to_db=False)
+                pending_records += new_output
+            else:
+                new_output, new_blocks, new_pages = self._write_output_to_dict(ip_output,file, content_type="text",
+                                                                               file_type="ocr")
+            # return output value in either case
+            output += new_output
+
+            docs_added += 1
+            blocks_added += new_blocks
+            pages_added += new_pages
+
+            if len(pending_records) >= write_batch_size:
+                self.write_parsing_records(pending_records)
+                pending_records = []
+
+        self.write_parsing_records(pending_records)
 
         if write_to_db_on == 1:
             dummy = self.library.set_incremental_docs_blocks_images(added_docs=docs_added, added_blocks=blocks_added,
@@ -2676,9 +2959,14 @@ class Parser:
         return output
 
     def parse_voice(self, input_folder, write_to_db=True, save_history=True, dupe_check=False,copy_to_library=False,
-                    chunk_by_segment=True, remove_segment_markers=True, real_time_progress=True):
+                    chunk_by_segment=True, remove_segment_markers=True, real_time_progress=True, workers=None,
+                    write_batch_size=500):
+
+        """ Main entry point for parsing voice files.
 
-        """ Main entry point for parsing voice wav files. """
+        The files are decoded in memory (with no intermediate .wav files) by a pool of workers - by default,
+        GGUFConfigs "whisper_workers" - and transcribed with one loaded WhisperCPP model.  The transcript blocks
+        are written to the library in batches of write_batch_size blocks. """
 
         output = []
 
@@ -2705,90 +2993,109 @@ class Parser:
         docs_added = 0
         pages_added = 0
 
+        if not workers:
+            from llmware.gguf_configs import GGUFConfigs
+            workers = GGUFConfigs().get_config("whisper_workers")
+
+        files = []
         for file in os.listdir(input_folder):
 
-            # by default, will process all files with text file extensions
-            go_ahead = True
+            #   basic_library_duplicate_check returns TRUE if it finds the file
+            if dupe_check and self.basic_library_duplicate_check(file):
+                continue
 
-            if dupe_check:
+            files.append(file)
 
-                #   basic_library_duplicate_check returns TRUE if it finds the file
-                if self.basic_library_duplicate_check(file):
-                    go_ahead = False
-
-            if go_ahead:
+        # reserve a block of doc ids upfront - one library card update for the folder, not one per file
+        if write_to_db_on == 1:
+            self.reserve_doc_ids(len(files))
 
-                #   increment and get new doc_id
-                if write_to_db_on == 1:
-                    self.library.doc_ID = self.library.get_and_increment_doc_id()
+        #   new records prepared for the db, and written in batches
+        pending_records = []
 
-                logger.info(f"Parser - parse_voice file - processing - {file}")
+        vp = VoiceParser(self,
+                         chunk_size=self.chunk_size,
+                         max_chunk_size=self.max_chunk_size,
+                         chunk_by_segment=chunk_by_segment,
+                         remove_segment_markers=remove_segment_markers,
+                         real_time_progress=real_time_progress)
 
-                vp_output = VoiceParser(self,
-                                        chunk_size=self.chunk_size,
-                                        max_chunk_size=self.max_chunk_size,
-                                        chunk_by_segment=chunk_by_segment,
-                                        remove_segment_markers=remove_segment_markers,
-                                        real_time_progress=real_time_progress).add_voice_file(input_folder, file)
+        for file, vp_output in vp.add_voice_files(input_folder, files, workers=workers):
 
-                if not chunk_by_segment:
-                    text_chunks_only = []
-                    for chunks in vp_output:
-                        text_chunks_only.append(chunks["text"])
+            #   increment and get new doc_id
+            if write_to_db_on == 1:
+                self.library.doc_ID = self._get_new_doc_id()
 
-                    if write_to_db_on == 1:
-                        new_output, new_blocks, new_pages = self._write_output_to_db(text_chunks_only, file,
-                                                                                     content_type="text",
-                                                                                     file_type="voice-wav")
-                    else:
-                        new_output, new_blocks, new_pages = self._write_output_to_dict(text_chunks_only, file,
-                                                                                       content_type="text",
-                                                                                       file_type="voice-wav")
+            logger.info(f"Parser - parse_voice file - processed - {file}")
 
-                    output += new_output
-                    docs_added += 1
-                    blocks_added += new_blocks
-                    pages_added += new_pages
-                    self.file_counter += 1
+            if not chunk_by_segment:
+                text_chunks_only = []
+                for chunks in vp_output:
+                    text_chunks_only.append(chunks["text"])
 
+                if write_to_db_on == 1:
+                    new_output, new_blocks, new_pages = self._write_output_to_db(text_chunks_only, file,
+                                                                                 content_type="text",
+                                                                                 file_type="voice-wav",
+                                                                                 write_to_db=False)
+                    pending_records += new_output
                 else:
+                    new_output, new_blocks, new_pages = self._write_output_to_dict(text_chunks_only, file,
+                                                                                   content_type="text",
+                                                                                   file_type="voice-wav")
 
-                    for i, blocks in enumerate(vp_output):
+                output += new_output
+                docs_added += 1
+                blocks_added += new_blocks
+                pages_added += new_pages
+                self.file_counter += 1
 
-                        # iterate thru each block -> add to metadata
-                        speaker_name = blocks["speaker"]
+            else:
 
-                        meta = {"author": speaker_name, "modified_date": "", "created_date": "", "creator_tool": ""}
+                for i, blocks in enumerate(vp_output):
 
-                        coords_dict = {"coords_x": blocks["start_time"], "coords_y": blocks["end_time"],
-                                       "coords_cx": blocks["start_segment"], "coords_cy": blocks["end_segment"]}
+                    # iterate thru each block -> add to metadata
+                    speaker_name = blocks["speaker"]
 
-                        text_entry = blocks["text"]
+                    meta = {"author": speaker_name, "modified_date": "", "created_date": "", "creator_tool": ""}
 
-                        format_type = "voice-wav"
+                    coords_dict = {"coords_x": blocks["start_time"], "coords_y": blocks["end_time"],
+                                   "coords_cx": blocks["start_segment"], "coords_cy": blocks["end_segment"]}
 
-                        new_entry = ("text", format_type, (1, 0), i, "", "", file,
-                                     "", text_entry, "", "", text_entry, text_entry, "", text_entry,
-                                     "", "", "", "", "")
+                    text_entry = blocks["text"]
 
-                        #TODO: adding dialog and diarization roles in speech parsing
+                    format_type = "voice-wav"
 
-                        if write_to_db_on == 1:
-                            entry_output = self.add_create_new_record(self.library, new_entry, meta, coords_dict,
-                                                                      dialog_value="false")
-                            self.library.block_ID += 1
-                        else:
-                            entry_output = self.create_one_parsing_output_dict(i,new_entry,meta,coords_dict,
-                                                                               dialog_value="false")
-                            self.parser_output.append(entry_output)
+                    new_entry = ("text", format_type, (1, 0), i, "", "", file,
+                                 "", text_entry, "", "", text_entry, text_entry, "", text_entry,
+                                 "", "", "", "", "")
 
-                        # return output in either case
-                        output.append(entry_output)
+                    #TODO: adding dialog and diarization roles in speech parsing
+
+                    if write_to_db_on == 1:
+                        entry_output = self.add_create_new_record(self.library, new_entry, meta, coords_dict,
+                                                                  dialog_value="false", write_to_db=False)
+                        pending_records.append(entry_output)
+                        self.library.block_ID += 1
+                    else:
+                        entry_output = self.create_one_parsing_output_dict(i,new_entry,meta,coords_dict,
+                                                                           dialog_value="false")
+                        self.parser_output.append(entry_output)
+
+                    # return output in either case
+                    output.append(entry_output)
+
+                blocks_added += len(vp_output)
+                pages_added += 0
+                docs_added += 1
+                self.file_counter += 1
 
-                    blocks_added += len(vp_output)
-                    pages_added += 0
-                    docs_added += 1
-                    self.file_counter += 1
+            if len(pending_records) >= write_batch_size:
+                self.write_parsing_records(pending_records)
+                pending_records = []
+
+        if pending_records:
+            self.write_parsing_records(pending_records)
 
         if write_to_db_on == 1:
             dummy = self.library.set_incremental_docs_blocks_images(added_docs=docs_added, added_blocks=blocks_added,
@@ -2831,6 +3138,10 @@ class Parser:
         dialog_transcripts_added = 0
         counter = 0
 
+        # reserve a block of doc ids upfront - one library card update for the folder, not one per file
+        if write_to_db_on == 1:
+            self.reserve_doc_ids(len([f for f in os.listdir(input_folder) if f.endswith(".json")]))
+
         for file in os.listdir(input_folder):
 
             # by default, will process all files with text file extensions
@@ -2848,7 +3159,7 @@ class Parser:
 
                     # increment and get new doc_id
                     if write_to_db_on == 1:
-                        self.library.doc_ID = self.library.get_and_increment_doc_id()
+                        self.library.doc_ID = self._get_new_doc_id()
 
                     logger.info(f"Parser - parse_dialog - dialog file - {file}")
 
@@ -2956,7 +3267,7 @@ class Parser:
 
             # increment and get new doc_id
             if write_to_db_on == 1:
-                self.library.doc_ID = self.library.get_and_increment_doc_id()
+                self.library.doc_ID = self._get_new_doc_id()
 
             entries, img_counter = website.website_main_processor(website.image_counter,
                                                                   output_index=False)
@@ -4559,13 +4870,18 @@ class Parser:
         return output
 
     def ocr_images_in_library(self, add_to_library=False, chunk_size=400, min_size=10,
-                              realtime_progress=True):
+                              realtime_progress=True, workers=None, write_batch_size=None):
 
         """ Assumes that a Library is passed in the Parser constructor, and that the Library already contains
         some parsed content with at least some images found.   This method will identify the images extracted
         across the entire library, and then run an OCR against each image looking for text to extract, apply
         text chunking rules, and then save the new OCR-extracted text in the library database.
 
+        The images are OCR'd in this process, or across a pool of workers if workers (by default, OCRConfig
+        "workers") is greater than 1, and the new text blocks are written in batches of write_batch_size blocks.
+        Image blocks that already have OCR text blocks in the library are skipped, and if OCRConfig
+        "checksum_cache" is True, images already OCR'd (by checksum) are not OCR'd again.
+
         Output, by default, is verbose and displays real-time progress from the OCR to be able to evaluate the
         quality before confirming `add_to_library = True`.   To remove the verbose screen output, set
         `realtime_progress = False`. """
@@ -4586,6 +4902,9 @@ class Parser:
                                            "\n        -ubuntu:  sudo apt install libtesseract-dev"
                                            "\n        -windows: use GUI download installer")
 
+        if not write_batch_size:
+            write_batch_size = OCRConfig().get_config("write_batch_size")
+
         library_name = self.library.library_name
         image_path = self.library.image_path
 
@@ -4595,80 +4914,169 @@ class Parser:
 
         #   query the collection DB by content_type == "image"
         image_blocks = CollectionRetrieval(library_name).filter_by_key("content_type", "image")
-        doc_update_list = {}
-        new_text_created = 0
 
-        #   iterate through the image blocks found
-        for i, block in enumerate(image_blocks):
+        #   links back to image blocks that have already been OCR'd into the library - see special_field1 below
+        already_linked = set()
+        if add_to_library:
+            already_linked = set(CollectionRetrieval(library_name).get_distinct_list("special_field1"))
+
+        tasks = []
+        for block in image_blocks:
+
+            #   each doc_ID is unique for the library collection, and block_IDs are unique only for the document
+            if f"document-{block['doc_ID']}&block-{block['block_ID']}" in already_linked:
+                continue
 
             #   "external_files" points to the image name that will be found in the image_path above for the library
-            img_name = block["external_files"]
+            tasks.append((block, os.path.join(image_path, block["external_files"]), None))
 
-            #   each doc_ID is unique for the library collection
-            doc_id = block["doc_ID"]
+        if realtime_progress:
+            logger.info(f"Parser - ocr_images_in_library - images to ocr - {len(tasks)} - "
+                        f"skipped (already in library) - {len(image_blocks) - len(tasks)}")
 
-            #   block_IDs are unique only for the document, and generally run in sequential ascending order
-            block_id = block["block_ID"]
+        doc_update_list = {}
+        new_text_created = 0
+        pending_records = []
 
-            #   note: _id not used, but it is a good lookup key that can be easily inserted in special_field1 below
-            bid = block["_id"]
+        #   preserve_spacing == True will keep \n \r \t and other white space
+        #   preserve_spacing == False collapses the white space into a single space for 'more dense' text only
+        ip = ImageParser(text_chunk_size=chunk_size)
 
-            #   preserve_spacing == True will keep \n \r \t and other white space
-            #   preserve_spacing == False collapses the white space into a single space for 'more dense' text only
-            output = ImageParser(text_chunk_size=chunk_size).process_ocr(image_path, img_name, preserve_spacing=False)
+        for block, output in ip.ocr_files(tasks, workers=workers, preserve_spacing=False):
+
+            doc_id = block["doc_ID"]
+            block_id = block["block_ID"]
 
             if realtime_progress:
                 logger.info(f"Parser - ocr_images_in_library - realtime progress- ocr output: {output}")
 
             #   good to do a test run with 'add_to_library' == False before writing to the collection
-            if add_to_library:
+            if not add_to_library:
+                continue
 
-                for text_chunk in output:
+            for text_chunk in output:
 
-                    if text_chunk.strip():
+                # optional to keep only more substantial chunks of text
+                if not text_chunk.strip() or len(text_chunk) <= min_size:
+                    continue
 
-                        # optional to keep only more substantial chunks of text
-                        if len(text_chunk) > min_size:
-
-                            #   ad hoc tracker to keep incrementing the block_id for every new image in a particular doc
-                            if doc_id in doc_update_list:
-                                new_block_id = doc_update_list[doc_id]
-                                doc_update_list.update({doc_id: new_block_id + 1})
-                            else:
-                                new_block_id = 100000
-                                doc_update_list.update({doc_id: new_block_id + 1})
+                #   ad hoc tracker to keep incrementing the block_id for every new image in a particular doc
+                new_block_id = doc_update_list.get(doc_id, 100000)
+                doc_update_list.update({doc_id: new_block_id + 1})
 
-                            new_block = block
+                new_block = dict(block)
 
-                            #   feel free to adapt these attributes to fit for purpose
-                            new_block.update({"block_ID": new_block_id})
-                            new_block.update({"content_type": "text"})
-                            new_block.update({"embedding_flags": {}})
-                            new_block.update({"text_search": text_chunk})
+                #   feel free to adapt these attributes to fit for purpose
+                new_block.update({"block_ID": new_block_id})
+                new_block.update({"content_type": "text"})
+                new_block.update({"embedding_flags": {}})
+                new_block.update({"text_search": text_chunk})
 
-                            #   writes a special entry in 'special_field1' of the database
-                            #   this special entry captures the link back to the original 'image' block
-                            #   it can be unpacked by splitting on '&' and '-' to retrieve the doc_id and block_id
+                #   writes a special entry in 'special_field1' of the database
+                #   this special entry captures the link back to the original 'image' block
+                #   it can be unpacked by splitting on '&' and '-' to retrieve the doc_id and block_id
+                new_block.update({"special_field1": f"document-{doc_id}&block-{block_id}"})
 
-                            output = f"document-{doc_id}&block-{block_id}"
-                            new_block.update({"special_field1": output})
+                #   new _id will be assigned by the database directly
+                if "_id" in new_block:
+                    del new_block["_id"]
 
-                            #   new _id will be assigned by the database directly
-                            if "_id" in new_block:
-                                del new_block["_id"]
+                if realtime_progress:
+                    logger.info(f"Parser - ocr_images_in_library - new text block - {new_text_created} - "
+                                f"{doc_id} - {block_id} - {text_chunk} - {new_block}")
 
-                            if realtime_progress:
-                                logger.info(f"Parser - ocr_images_in_library - new text block - {new_text_created} - "
-                                            f"{doc_id} - {block_id} - {text_chunk} - {new_block}")
+                pending_records.append(new_block)
+                new_text_created += 1
 
-                            #   creates the new record
-                            CollectionWriter(library_name).write_new_parsing_record(new_block)
+            if len(pending_records) >= write_batch_size:
+                CollectionWriter(library_name).write_many_parsing_records(pending_records)
+                pending_records = []
 
-                            new_text_created += 1
+        if pending_records:
+            CollectionWriter(library_name).write_many_parsing_records(pending_records)
 
         return new_text_created
 
 
+class OCRCache:
+
+    """ OCRCache is a persistent cache of OCR text, keyed by the sha256 checksum of the image file (or of the pdf
+    file, page and dpi) and the tesseract language, so that images that have already been OCR'd - e.g., when a
+    folder is ingested again, or the same scanned document is added to several libraries - are not OCR'd again.
+    The cache is a SQLite db, by default in the llmware path - settings are in OCRConfig. """
+
+    def __init__(self, lang="eng"):
+
+        self.lang = lang
+
+        cache_folder_path = OCRConfig().get_config("cache_folder_path")
+        if not cache_folder_path:
+            cache_folder_path = LLMWareConfig().get_llmware_path()
+
+        os.makedirs(cache_folder_path, exist_ok=True)
+
+        self.cache_db_path = os.path.join(cache_folder_path, OCRConfig().get_config("db_name"))
+
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(self.cache_db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS ocr_cache "
+                          "(checksum TEXT, lang TEXT, text TEXT, PRIMARY KEY (checksum, lang))")
+        self.conn.commit()
+
+    @staticmethod
+    def file_checksum(fp, read_size=1 << 20):
+
+        """ Returns the sha256 checksum of the file at fp. """
+
+        h = hashlib.sha256()
+
+        with open(fp, "rb") as f:
+            for data in iter(lambda: f.read(read_size), b""):
+                h.update(data)
+
+        return h.hexdigest()
+
+    def get(self, checksum):
+
+        """ Returns the cached OCR text for the checksum, or None if not found. """
+
+        row = self.conn.execute("SELECT text FROM ocr_cache WHERE checksum = ? AND lang = ?",
+                                (checksum, self.lang)).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        return row[0]
+
+    def put_many(self, rows):
+
+        """ Adds a list of (checksum, text) to the cache. """
+
+        self.conn.executemany("INSERT OR REPLACE INTO ocr_cache (checksum, lang, text) VALUES (?, ?, ?)",
+                              [(checksum, self.lang, text) for checksum, text in rows])
+        self.conn.commit()
+
+        return len(rows)
+
+    def clear(self):
+
+        """ Removes all entries in the cache. """
+
+        self.conn.execute("DELETE FROM ocr_cache")
+        self.conn.commit()
+
+        return True
+
+    def close(self):
+        self.conn.close()
+
+
 class ImageParser:
 
     """ ImageParser for handling OCR of scanned documents - may be called directly, or through Parser.
@@ -4744,42 +5152,147 @@ class ImageParser:
 
         return text_list_out
 
-    def process_pdf_by_ocr(self, input_fp, file):
+    def get_pdf_page_count(self, fp):
+
+        """ Returns the number of pages in the pdf file at fp. """
 
-        """ Handles special case of running page-by-page OCR on a scanned PDF document. """
+        try:
+            from pdf2image import pdfinfo_from_path
+            from pdf2image.exceptions import PDFInfoNotInstalledError
+        except ImportError:
+            raise DependencyNotInstalledException("pdf2image")
 
-        text_output_by_page = []
+        try:
+            return int(pdfinfo_from_path(fp)["Pages"])
+        except PDFInfoNotInstalledError:
+            raise OCRDependenciesNotFoundException("poppler")
+
+    def ocr_files(self, tasks, workers=None, dpi=None, lang=None, preserve_spacing=False):
+
+        """ Runs OCR over an iterable of tasks, in this process or across a pool of worker processes if workers
+        (by default, OCRConfig "workers") is greater than 1 - each task is a tuple of (key, file path, page_num),
+        with page_num None for an image file, or the page number for a page of a pdf file.  Yields (key, text
+        chunks) for each task, in order.
+
+        With a pool, at most 2 * workers tasks are in flight, so pdf pages are rendered in the workers as they
+        are needed, and not saved to disk.  If OCRConfig "checksum_cache" is True, images already OCR'd (by checksum) are looked
+        up in the OCRCache, and are not OCR'd again. """
 
         try:
             import pytesseract
-            from pytesseract.pytesseract import TesseractNotFoundError
         except ImportError:
             raise DependencyNotInstalledException("pytesseract")
 
-        try:
-            from pdf2image import convert_from_path
-            from pdf2image.exceptions import PDFInfoNotInstalledError
-        except ImportError:
-            raise DependencyNotInstalledException("pdf2image")
+        if not workers:
+            workers = OCRConfig().get_config("workers")
+
+        if not dpi:
+            dpi = OCRConfig().get_config("dpi")
+
+        if not lang:
+            lang = OCRConfig().get_config("lang")
+
+        cache = None
+        if OCRConfig().get_config("checksum_cache"):
+            cache = OCRCache(lang=lang)
+
+        executor = None
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_ocr_worker_init)
+
+        pending = deque()
+        new_cache_rows = []
+        file_checksums = {}
 
-        # decompose pdf into set of images by page
         try:
-            images = convert_from_path(os.path.join(input_fp,file))
-        except PDFInfoNotInstalledError as e:
-            raise OCRDependenciesNotFoundException("poppler")
-        for j, image in enumerate(images):
+            for key, fp, page_num in tasks:
+
+                checksum = None
+                text = None
 
-            # run ocr over page image
+                if cache:
+
+                    #   keep only the checksum of the latest file - the pages of a pdf are consecutive tasks
+                    if fp not in file_checksums:
+                        file_checksums = {fp: OCRCache.file_checksum(fp)}
+
+                    checksum = file_checksums[fp]
+                    if page_num is not None:
+                        checksum = f"{checksum}-{page_num}-{dpi}"
+
+                    text = cache.get(checksum)
+
+                if text is not None:
+                    pending.append((key, None, (text, None)))
+                elif executor:
+                    pending.append((key, checksum, executor.submit(_ocr_worker, fp, page_num, dpi, lang)))
+                else:
+                    pending.append((key, checksum, _ocr_worker(fp, page_num, dpi, lang)))
+
+                while len(pending) >= 2 * workers:
+                    yield self._get_ocr_result(pending.popleft(), new_cache_rows, preserve_spacing)
+
+                if cache and len(new_cache_rows) >= 100:
+                    cache.put_many(new_cache_rows)
+                    new_cache_rows = []
+
+            while pending:
+                yield self._get_ocr_result(pending.popleft(), new_cache_rows, preserve_spacing)
+
+        finally:
+
+            if executor:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+            if cache:
+                if new_cache_rows:
+                    cache.put_many(new_cache_rows)
+                cache.close()
+
+    def _get_ocr_result(self, pending_task, new_cache_rows, preserve_spacing=False):
+
+        """ Internal utility - waits for the result of one pending ocr task, and returns (key, text chunks) - new
+        ocr text is added to new_cache_rows, if the task has a checksum. """
+
+        key, checksum, result = pending_task
+
+        if not isinstance(result, tuple):
             try:
-                text = pytesseract.image_to_string(image)
-            except TesseractNotFoundError as e:
-                raise OCRDependenciesNotFoundException("tesseract")
-            # will chop up the long text into individual blocks
-            text_chunks = TextChunker(text_chunk=text,
-                                      max_char_size=self.text_chunk_size,
-                                      look_back_char_range=self.look_back_range).convert_text_to_chunks()
+                result = result.result()
+            except Exception as e:
+                logger.warning(f"ImageParser - could not ocr - {key} - {e}")
+                result = ("", None)
+                checksum = None
+
+        text, missing_dependency = result
+
+        if missing_dependency:
+            raise OCRDependenciesNotFoundException(missing_dependency)
 
-            text_output_by_page.append(text_chunks)
+        if checksum:
+            new_cache_rows.append((checksum, text))
+
+        if not preserve_spacing:
+            text = text.replace("\n", " ")
+
+        # will chop up the long text into individual blocks
+        text_chunks = TextChunker(text_chunk=text,
+                                  max_char_size=self.text_chunk_size,
+                                  look_back_char_range=self.look_back_range).convert_text_to_chunks()
+
+        return key, text_chunks
+
+    def process_pdf_by_ocr(self, input_fp, file, workers=None):
+
+        """ Handles special case of running page-by-page OCR on a scanned PDF document - the pages are rendered
+        and OCR'd one page at a time, in this process or across a pool of workers (see ocr_files). """
+
+        fp = os.path.join(input_fp, file)
+
+        tasks = [(j, fp, j + 1) for j in range(self.get_pdf_page_count(fp))]
+
+        text_output_by_page = [text_chunks for j, text_chunks in self.ocr_files(tasks, workers=workers,
+                                                                                 preserve_spacing=True)]
 
         return text_output_by_page
 
@@ -4867,12 +5380,12 @@ class ImageParser:
             ext = files.split(".")[-1]
             if ext == "pdf":
                 try:
-                    # decomposes pdf into set of image .png files
-                    try:
-                        images = convert_from_path(os.path.join(input_fp,files))
-                    except PDFInfoNotInstalledError as e:
-                        raise OCRDependenciesNotFoundException("poppler")
-                    for j, image in enumerate(images):
+                    # decomposes pdf into set of image .png files - one page at a time, rather than holding
+                    # all of the page images in memory
+                    page_count = self.get_pdf_page_count(os.path.join(input_fp,files))
+                    for j in range(page_count):
+
+                        image = convert_from_path(os.path.join(input_fp,files), first_page=j+1, last_page=j+1)[0]
 
                         # saves .png images in target output folder
                         fn = str(i) + "_" + str(j) + ".png"
@@ -4959,19 +5472,82 @@ class VoiceParser:
 
         return response
 
+    def add_voice_files(self, input_fp, files, workers=2, sr=16000):
+
+        """ Parses a list of voice files in input_fp - yields (file name, output) for each file, in order, with
+        the same output as add_voice_file.
+
+        The files are decoded in memory, and resampled to sr, by a pool of workers, with at most workers
+        decoded files waiting in memory - and transcribed with one loaded speech model. """
+
+        from llmware.models import ModelCatalog
+
+        self.speech_model = ModelCatalog().load_model(self.selected_speech_model_name)
+
+        inference_dict = {"remove_segment_markers": self.remove_segment_markers, "workers": workers}
+
+        file_iter = iter(files)
+        pending = deque()
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+
+                for fn in file_iter:
+                    pending.append((fn, executor.submit(Utilities().decode_media_file,
+                                                        os.path.join(input_fp, fn), sr)))
+                    if len(pending) >= workers:
+                        break
+
+                while pending:
+
+                    fn, future = pending.popleft()
+
+                    # keep the pool busy with the next file while this one is transcribed
+                    next_fn = next(file_iter, None)
+                    if next_fn is not None:
+                        pending.append((next_fn, executor.submit(Utilities().decode_media_file,
+                                                                 os.path.join(input_fp, next_fn), sr)))
+
+                    try:
+                        samples = future.result()
+                    except Exception as e:
+                        logger.warning(f"VoiceParser - could not decode file - {fn} - {e}")
+                        samples = None
+
+                    if samples is None or len(samples) == 0:
+                        yield fn, []
+                        continue
+
+                    response = self.speech_model.transcribe_samples(samples, inference_dict=inference_dict)
+
+                    yield fn, self.chunk_transcript(response)
+
+        finally:
+            #   still exploring the best way to release memory once processing completed
+            self.speech_model.__dealloc__()
+            del self.speech_model
+            self.speech_model = None
+
     def add_voice_file(self, input_fp, fn):
 
         """ Parse voice file. """
 
-        output = []
-
         #   16000 is standard default encoding rate for .wav -> may need further test/experiment
         response = self.voice_to_text(input_fp, fn, 16000)
 
+        return self.chunk_transcript(response)
+
+    def chunk_transcript(self, response):
+
+        """ Converts the transcription response into text blocks - by aggregating segments within the chunk size
+        parameters (chunk_by_segment), or by chunking the full text. """
+
+        output = []
+
         if not self.chunk_by_segment:
 
             # this is initial strategy- deprecating for chunk_by_segment
-            text_out = response["text"]
+            text_out = response["llm_response"]
             # will chop up the long text into individual blocks
             text_chunks = TextChunker(text_chunk=text_out,
                                       max_char_size=self.text_chunk_size,
@@ -34,6 +34,8 @@ from datetime import datetime
 import random
 import logging
 import sys
+import time
+from itertools import islice, chain
 
 try:
     from pymongo import MongoClient, ReturnDocument
@@ -51,7 +53,8 @@ try:
 except ImportError:
     pass
 
-from llmware.configs import LLMWareConfig, PostgresConfig, LLMWareTableSchema, SQLiteConfig, AWSS3Config
+from llmware.configs import LLMWareConfig, PostgresConfig, LLMWareTableSchema, SQLiteConfig, AWSS3Config, \
+    StateHistoryConfig
 
 from llmware.exceptions import LLMWareException, UnsupportedCollectionDatabaseException, InvalidNameException
 
@@ -168,6 +171,13 @@ class CollectionRetrieval:
         """Counts entries returned by filter dict"""
         return self._retriever.count_documents(filter_dict)
 
+    def iter_batches(self, selected_keys=None, filter_dict=None, batch_size=1000, sort_keys=None):
+        """Streams the collection as a generator of batches (lists) of dict entries, fetched from the db
+        batch_size rows at a time, with optional projection of only the selected_keys, filter_dict of
+        {key: value} or {key: {"$in": [values]}}, and sort_keys - runs in constant memory over the collection"""
+        return self._retriever.iter_batches(selected_keys=selected_keys, filter_dict=filter_dict,
+                                            batch_size=batch_size, sort_keys=sort_keys)
+
     def close(self):
         """Close underlying DB connection - handled by underlying DB resource"""
         return self._retriever.close()
@@ -256,6 +266,16 @@ class CollectionWriter:
         """Inserts new parsing record to the DB resource """
         return self._writer.write_new_parsing_record(new_record)
 
+    def write_many_parsing_records(self, new_records):
+        """Inserts a list of new parsing records to the DB resource in a single transaction"""
+        return self._writer.write_many_parsing_records(new_records)
+
+    def write_many_records(self, key_list, rows, chunk_size=10000):
+        """Bulk insert of rows (an iterable of tuples with values in the order of key_list), in chunks of
+        chunk_size rows per transaction - uses insert_many on Mongo, COPY FROM STDIN on Postgres, and executemany
+        on SQLite - returns the number of rows written"""
+        return self._writer.write_many_records(key_list, rows, chunk_size=chunk_size)
+
     def destroy_collection(self, confirm_destroy=False):
         """Drops the collection associated with the library"""
         return self._writer.destroy_collection(confirm_destroy=confirm_destroy)
@@ -300,6 +320,12 @@ class CollectionWriter:
 
         return self._writer.get_and_increment_doc_id(library_name)
 
+    def reserve_doc_ids(self, library_name, n):
+
+        """Reserves a contiguous block of n doc_ids in a single atomic update - returns range of reserved ids"""
+
+        return self._writer.reserve_doc_ids(library_name, n)
+
     def set_incremental_docs_blocks_images(self, library_name, added_docs=0, added_blocks=0, added_images=0,
                                            added_pages=0, added_tables=0):
 
@@ -365,6 +391,33 @@ class MongoWriter:
         """ Writes new parsing record into Mongo DB """
         return self.write_new_record(new_record)
 
+    def write_many_parsing_records(self, new_records):
+        """ Writes list of new parsing records into Mongo DB with insert_many """
+        if new_records:
+            self.collection.insert_many(new_records, ordered=True)
+        return len(new_records)
+
+    def write_many_records(self, key_list, rows, chunk_size=10000):
+        """Bulk insert of rows into Mongo collection with insert_many, chunk_size rows at a time"""
+
+        rows_written = 0
+        chunk = []
+
+        for row in rows:
+
+            chunk.append(dict(zip(key_list, row)))
+
+            if len(chunk) >= chunk_size:
+                self.collection.insert_many(chunk, ordered=False)
+                rows_written += len(chunk)
+                chunk = []
+
+        if chunk:
+            self.collection.insert_many(chunk, ordered=False)
+            rows_written += len(chunk)
+
+        return rows_written
+
     def destroy_collection(self, confirm_destroy=False):
 
         """Drops collection for library"""
@@ -521,6 +574,26 @@ class MongoWriter:
 
         return unique_doc_id
 
+    def reserve_doc_ids(self, library_name, n):
+
+        """reserves a contiguous block of n doc_ids with a single atomic $inc on the library card"""
+
+        library_counts = self.collection.find_one_and_update(
+            {"library_name": library_name},
+            {"$inc": {"unique_doc_id": n}},
+            return_document=ReturnDocument.AFTER
+        )
+
+        if not library_counts:
+            return range(0)
+
+        last_doc_id = library_counts.get("unique_doc_id", -1)
+
+        if last_doc_id < 0:
+            return range(0)
+
+        return range(last_doc_id - n + 1, last_doc_id + 1)
+
     def set_incremental_docs_blocks_images(self, library_name, added_docs=0, added_blocks=0, added_images=0,
                                            added_pages=0, added_tables=0):
 
@@ -658,6 +731,21 @@ class MongoRetrieval:
 
         return cursor
 
+    def iter_batches(self, selected_keys=None, filter_dict=None, batch_size=1000, sort_keys=None):
+
+        """Streams the collection in batches - uses the Mongo cursor batch_size, and projection of selected_keys"""
+
+        projection = None
+        if selected_keys:
+            projection = {key: 1 for key in selected_keys}
+
+        cursor = self.collection.find(filter_dict or {}, projection).batch_size(batch_size).max_time_ms(1800000)
+
+        if sort_keys:
+            cursor = cursor.sort([(key, 1) for key in sort_keys])
+
+        return DBCursor(cursor, self, "mongo").iter_batches(batch_size=batch_size)
+
     def basic_query(self, query):
 
         """Basic text index query in MongoDB"""
@@ -1044,6 +1132,23 @@ class PGRetrieval:
 
         return cursor
 
+    def iter_batches(self, selected_keys=None, filter_dict=None, batch_size=1000, sort_keys=None):
+
+        """Streams the collection in batches - uses a server-side (named) cursor, so rows are fetched from
+        Postgres batch_size at a time, with projection of only the selected_keys columns"""
+
+        sql_query, params, key_list = DBCursor.build_sql_stream_query(self.library_name, self.schema,
+                                                                      selected_keys=selected_keys,
+                                                                      filter_dict=filter_dict,
+                                                                      sort_keys=sort_keys,
+                                                                      id_column="_id", placeholder="%s")
+
+        server_cursor = self.conn.cursor(name="llmware_stream_" + uuid.uuid4().hex)
+        server_cursor.itersize = batch_size
+        server_cursor.execute(sql_query, params)
+
+        return DBCursor(server_cursor, self, "postgres", key_list=key_list).iter_batches(batch_size=batch_size)
+
     def _prep_query(self, query):
 
         """ Simple query text preparation - will add more options over time """
@@ -1236,34 +1341,34 @@ class PGRetrieval:
 
         sql_query = f"SELECT * FROM {self.library_name}"
 
-        conditions_clause = " WHERE"
+        #   values are passed as query parameters, and not inlined in the sql
+        conditions = []
+        params = []
+
         for key, value in key_dict.items():
 
             #   handles passing a filter with 'mongo' style $in key range
             if isinstance(value,dict):
                 if "$in" in value:
-                    value = value["$in"]
+                    value = list(value["$in"])
 
                     logger.debug(f"update: Postgres - filter_by_key_dict - value - {value}")
 
-                    if isinstance(value,list):
-                        v_str = "("
-                        for entry in value:
-                            v_str += str(entry) + ","
-                        if v_str.endswith(","):
-                            v_str = v_str[:-1]
-                        v_str += ")"
-                        conditions_clause += f" {key} IN {v_str} AND "
+                    if value:
+                        conditions.append(f"{key} IN ({', '.join(['%s'] * len(value))})")
+                        params += value
+                    else:
+                        conditions.append("1 = 0")
             else:
+                conditions.append(f"{key} = %s")
+                params.append(value)
 
-                conditions_clause += f" {key} = '{value}' AND "
+        if conditions:
+            sql_query += " WHERE " + " AND ".join(conditions)
 
-        if conditions_clause.endswith(' AND '):
-            conditions_clause = conditions_clause[:-5]
-        if len(conditions_clause) > len(" WHERE"):
-            sql_query += conditions_clause + ";"
+        sql_query += ";"
 
-        results = self.conn.cursor().execute(sql_query)
+        results = self.conn.cursor().execute(sql_query, params)
 
         output = self.unpack(results)
 
@@ -1275,22 +1380,7 @@ class PGRetrieval:
 
         """Filter by key in value range, e.g., {"doc_ID": [1,2,3,4,5]}"""
 
-        value_range_str = "("
-        for v in value_range:
-            value_range_str += "'" + str(v) + "'" + ", "
-        if value_range_str.endswith(", "):
-            value_range_str = value_range_str[:-2]
-        value_range_str += ")"
-
-        sql_query = f"SELECT * from {self.library_name} WHERE {key} IN {value_range_str};"
-
-        results = self.conn.cursor().execute(sql_query)
-
-        output = self.unpack(results)
-
-        self.conn.close()
-
-        return output
+        return self.filter_by_key_dict({key: {"$in": list(value_range)}})
 
     def filter_by_key_ne_value(self, key, value):
 
@@ -1595,9 +1685,9 @@ class PGWriter:
 
         return 1
 
-    def write_new_parsing_record(self, rec):
+    def _parsing_record_insert_sql(self):
 
-        """ Writes new parsing record dictionary into Postgres """
+        """ Insert statement for a parsing record in Postgres """
 
         sql_string = f"INSERT INTO {self.library_name}"
         sql_string += " (block_ID, doc_ID, content_type, file_type, master_index, master_index2, " \
@@ -1609,7 +1699,13 @@ class PGWriter:
         sql_string += " VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, " \
                       "%s, %s, %s, %s, %s, %s, %s, %s, %s, %s);"
 
-        # now unpack the new_record into parameters
+        return sql_string
+
+    @staticmethod
+    def _parsing_record_values(rec):
+
+        """ Unpacks a parsing record dictionary into the insert parameters """
+
         insert_arr = (rec["block_ID"], rec["doc_ID"],rec["content_type"], rec["file_type"], rec["master_index"],
                       rec["master_index2"], rec["coords_x"], rec["coords_y"], rec["coords_cx"], rec["coords_cy"],
                       rec["author_or_speaker"], rec["added_to_collection"], rec["file_source"], rec["table"],
@@ -1620,7 +1716,13 @@ class PGWriter:
 
         # note: sets embedding_flag value (last parameter) to "{}" = str({})
 
-        results = self.conn.cursor().execute(sql_string,insert_arr)
+        return insert_arr
+
+    def write_new_parsing_record(self, rec):
+
+        """ Writes new parsing record dictionary into Postgres """
+
+        results = self.conn.cursor().execute(self._parsing_record_insert_sql(), self._parsing_record_values(rec))
 
         self.conn.commit()
 
@@ -1628,6 +1730,56 @@ class PGWriter:
 
         return True
 
+    def write_many_parsing_records(self, new_records):
+
+        """ Writes list of new parsing record dictionaries into Postgres in one transaction """
+
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.executemany(self._parsing_record_insert_sql(),
+                                   [self._parsing_record_values(rec) for rec in new_records])
+            self.conn.commit()
+        finally:
+            self.conn.close()
+
+        return len(new_records)
+
+    def write_many_records(self, key_list, rows, chunk_size=10000):
+
+        """Bulk insert of rows with COPY FROM STDIN - each chunk of chunk_size rows is copied and committed
+        as one transaction"""
+
+        copy_sql = f"COPY {self.library_name} ({', '.join(key_list)}) FROM STDIN"
+
+        rows_written = 0
+        chunk = []
+
+        def copy_chunk(chunk_rows):
+            with self.conn.cursor() as cursor:
+                with cursor.copy(copy_sql) as copy:
+                    for chunk_row in chunk_rows:
+                        copy.write_row(chunk_row)
+            self.conn.commit()
+
+        try:
+            for row in rows:
+
+                chunk.append(row)
+
+                if len(chunk) >= chunk_size:
+                    copy_chunk(chunk)
+                    rows_written += len(chunk)
+                    chunk = []
+
+            if chunk:
+                copy_chunk(chunk)
+                rows_written += len(chunk)
+
+        finally:
+            self.conn.close()
+
+        return rows_written
+
     def destroy_collection(self, confirm_destroy=False):
 
         """Drops table from database"""
@@ -1869,6 +2021,35 @@ class PGWriter:
 
         return val_out
 
+    def reserve_doc_ids(self, library_name, n):
+
+        """Reserves contiguous block of n unique doc IDs in one transaction"""
+
+        val_out = -1
+
+        val_array = (int(n), str(library_name))
+
+        sql_instruction = f"UPDATE library " \
+                          f"SET unique_doc_id = unique_doc_id + %s " \
+                          f"WHERE library_name = %s " \
+                          f"RETURNING unique_doc_id"
+
+        result = self.conn.cursor().execute(sql_instruction, val_array)
+
+        output = list(result)
+        if len(output) > 0:
+            val = output[0]
+            if len(val) > 0:
+                val_out = val[0]
+
+        self.conn.commit()
+        self.conn.close()
+
+        if val_out < 0:
+            return range(0)
+
+        return range(val_out - n + 1, val_out + 1)
+
     def set_incremental_docs_blocks_images(self, library_name, added_docs=0, added_blocks=0, added_images=0,
                                            added_pages=0, added_tables=0):
 
@@ -2121,6 +2302,21 @@ class SQLiteRetrieval:
 
         return cursor
 
+    def iter_batches(self, selected_keys=None, filter_dict=None, batch_size=1000, sort_keys=None):
+
+        """Streams the collection in batches - rows are pulled with fetchmany, with projection of only the
+        selected_keys columns"""
+
+        sql_query, params, key_list = DBCursor.build_sql_stream_query(self.library_name, self.schema,
+                                                                      selected_keys=selected_keys,
+                                                                      filter_dict=filter_dict,
+                                                                      sort_keys=sort_keys,
+                                                                      id_column="rowid", placeholder="?")
+
+        results = self.conn.cursor().execute(sql_query, params)
+
+        return DBCursor(results, self, "sqlite", key_list=key_list).iter_batches(batch_size=batch_size)
+
     def _prep_query(self, query):
 
         """ Basic preparation of text search query for SQLite - will evolve over time. """
@@ -2317,39 +2513,34 @@ class SQLiteRetrieval:
 
         sql_query = f"SELECT rowid, * FROM {self.library_name}"
 
-        conditions_clause = " WHERE"
+        #   values are passed as query parameters, and not inlined in the sql
+        conditions = []
+        params = []
+
         for key, value in key_dict.items():
 
             #   handles passing a filter with 'mongo' style $in key range
             if isinstance(value,dict):
                 if "$in" in value:
-                    value = value["$in"]
+                    value = list(value["$in"])
 
                     logger.debug(f"update: SQLite - filter_by_key_dict - value - {value}")
 
-                    if isinstance(value,list):
-                        v_str = "("
-                        for entry in value:
-                            v_str += str(entry) + ","
-                        if v_str.endswith(","):
-                            v_str = v_str[:-1]
-                        v_str += ")"
-                        conditions_clause += f" {key} IN {v_str} AND "
+                    if value:
+                        conditions.append(f"{key} IN ({', '.join(['?'] * len(value))})")
+                        params += value
+                    else:
+                        conditions.append("1 = 0")
             else:
-                if isinstance(value, int):
-                    conditions_clause += f" {key} = {value} AND "
-                else:
-                    conditions_clause += f" {key} = '{value}' AND "
-
-            # conditions_clause += f" {key} = {value} AND "
+                conditions.append(f"{key} = ?")
+                params.append(value)
 
-        if conditions_clause.endswith(" AND "):
-            conditions_clause = conditions_clause[:-5]
+        if conditions:
+            sql_query += " WHERE " + " AND ".join(conditions)
 
-        if len(conditions_clause) > len(" WHERE"):
-            sql_query += conditions_clause + ";"
+        sql_query += ";"
 
-        results = self.conn.cursor().execute(sql_query)
+        results = self.conn.cursor().execute(sql_query, params)
 
         output = self.unpack(results)
 
@@ -2361,25 +2552,7 @@ class SQLiteRetrieval:
 
         """Filter by key in value range, e.g., {"doc_ID": [1,2,3,4,5]}"""
 
-        value_range_str = "("
-
-        for v in value_range:
-            value_range_str += "'" + str(v) + "'" + ", "
-
-        if value_range_str.endswith(", "):
-            value_range_str = value_range_str[:-2]
-
-        value_range_str += ")"
-
-        sql_query = f"SELECT rowid, * from {self.library_name} WHERE {key} IN {value_range_str};"
-
-        results = self.conn.cursor().execute(sql_query)
-
-        output = self.unpack(results)
-
-        self.conn.close()
-
-        return output
+        return self.filter_by_key_dict({key: {"$in": list(value_range)}})
 
     def filter_by_key_ne_value(self, key, value):
 
@@ -2702,9 +2875,9 @@ class SQLiteWriter:
 
         return 1
 
-    def write_new_parsing_record(self, rec):
+    def _parsing_record_insert_sql(self):
 
-        """ Writes new parsing record dictionary into SQLite """
+        """ Insert statement for a parsing record in SQLite """
 
         sql_string = f"INSERT INTO {self.library_name}"
         sql_string += " (block_ID, doc_ID, content_type, file_type, master_index, master_index2, " \
@@ -2715,7 +2888,13 @@ class SQLiteWriter:
         sql_string += " VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, " \
                       "$19, $20, $21, $22, $23, $24, $25, $26, $27, $28);"
 
-        # now unpack the new_record into parameters
+        return sql_string
+
+    @staticmethod
+    def _parsing_record_values(rec):
+
+        """ Unpacks a parsing record dictionary into the insert parameters """
+
         insert_arr = (rec["block_ID"], rec["doc_ID"],rec["content_type"], rec["file_type"], rec["master_index"],
                       rec["master_index2"], rec["coords_x"], rec["coords_y"], rec["coords_cx"], rec["coords_cy"],
                       rec["author_or_speaker"], rec["added_to_collection"], rec["file_source"], rec["table"],
@@ -2726,7 +2905,13 @@ class SQLiteWriter:
 
         # note: sets embedding flag - parameter $28 to "" by default
 
-        results = self.conn.cursor().execute(sql_string,insert_arr)
+        return insert_arr
+
+    def write_new_parsing_record(self, rec):
+
+        """ Writes new parsing record dictionary into SQLite """
+
+        results = self.conn.cursor().execute(self._parsing_record_insert_sql(), self._parsing_record_values(rec))
 
         self.conn.commit()
 
@@ -2734,6 +2919,51 @@ class SQLiteWriter:
 
         return True
 
+    def write_many_parsing_records(self, new_records):
+
+        """ Writes list of new parsing record dictionaries into SQLite in one transaction """
+
+        try:
+            self.conn.executemany(self._parsing_record_insert_sql(),
+                                  [self._parsing_record_values(rec) for rec in new_records])
+            self.conn.commit()
+        finally:
+            self.conn.close()
+
+        return len(new_records)
+
+    def write_many_records(self, key_list, rows, chunk_size=10000):
+
+        """Bulk insert of rows with executemany - each chunk of chunk_size rows is inserted and committed
+        as one transaction"""
+
+        sql_instruction = f"INSERT INTO {self.library_name} ({', '.join(key_list)}) " \
+                          f"VALUES ({', '.join(['?'] * len(key_list))});"
+
+        rows_written = 0
+        chunk = []
+
+        try:
+            for row in rows:
+
+                chunk.append(row)
+
+                if len(chunk) >= chunk_size:
+                    self.conn.executemany(sql_instruction, chunk)
+                    self.conn.commit()
+                    rows_written += len(chunk)
+                    chunk = []
+
+            if chunk:
+                self.conn.executemany(sql_instruction, chunk)
+                self.conn.commit()
+                rows_written += len(chunk)
+
+        finally:
+            self.conn.close()
+
+        return rows_written
+
     def destroy_collection(self, confirm_destroy=False):
 
         """Drops table"""
@@ -2965,6 +3195,35 @@ class SQLiteWriter:
 
         return val_out
 
+    def reserve_doc_ids(self, library_name, n):
+
+        """Reserves contiguous block of n unique doc IDs in one transaction"""
+
+        val_out = -1
+
+        val_array = (int(n), str(library_name))
+
+        sql_instruction = f"UPDATE library " \
+                          f"SET unique_doc_id = unique_doc_id + ? " \
+                          f"WHERE library_name = ? " \
+                          f"RETURNING unique_doc_id"
+
+        result = self.conn.cursor().execute(sql_instruction, val_array)
+
+        output = list(result)
+        if len(output) > 0:
+            val = output[0]
+            if len(val) > 0:
+                val_out = val[0]
+
+        self.conn.commit()
+        self.conn.close()
+
+        if val_out < 0:
+            return range(0)
+
+        return range(val_out - n + 1, val_out + 1)
+
     def set_incremental_docs_blocks_images(self, library_name, added_docs=0, added_blocks=0, added_images=0,
                                            added_pages=0, added_tables=0):
 
@@ -3140,8 +3399,10 @@ class DBCursor:
 
     """Wrapper class around database cursors to handle specific cursor management across DBs"""
 
-    def __init__(self, cursor, collection_retriever, db_name, close_when_exhausted=True, return_dict=True, schema=None):
+    def __init__(self, cursor, collection_retriever, db_name, close_when_exhausted=True, return_dict=True, schema=None,
+                 key_list=None):
 
+        self.db_cursor = cursor
         self.cursor = iter(cursor)
         self.collection_retriever = collection_retriever
         self.db_name = db_name
@@ -3149,6 +3410,9 @@ class DBCursor:
         self.return_dict = return_dict
         self.schema = schema
 
+        # optional - output keys matching the columns of each row, if the query selected specific columns
+        self.key_list = key_list
+
     def pull_one(self):
 
         """Calls next on the iterable cursor to pull one new row off the cursor and return to calling function"""
@@ -3163,36 +3427,125 @@ class DBCursor:
                 self.collection_retriever.close()
 
         if new_row and self.return_dict and not isinstance(new_row,dict):
+            if self.key_list:
+                return dict(zip(self.key_list, new_row))
             return self.collection_retriever.unpack([new_row])[0]
 
         return new_row
 
-    def pull_all(self):
+    def pull_many(self, batch_size=1000):
 
-        """Exhausts remaining cursor and returns to calling function"""
+        """Pulls up to batch_size rows off the cursor - uses fetchmany on SQL cursors - returns empty list when
+        the cursor is exhausted"""
 
-        output = []
+        if hasattr(self.db_cursor, "fetchmany"):
+            rows = self.db_cursor.fetchmany(batch_size)
+        else:
+            rows = list(islice(self.cursor, batch_size))
+
+        if not rows:
+            if self.close_when_exhausted:
+                self.collection_retriever.close()
+            return []
+
+        if self.return_dict and not isinstance(rows[0], dict):
+            if self.key_list:
+                return [dict(zip(self.key_list, row)) for row in rows]
+            return self.collection_retriever.unpack(rows)
+
+        return list(rows)
+
+    def iter_batches(self, batch_size=1000):
+
+        """Generator of batches (lists) of entries, until the cursor is exhausted"""
 
         while True:
 
-            new_entry = self.pull_one()
+            batch = self.pull_many(batch_size)
 
-            if not new_entry:
+            if not batch:
                 break
-            else:
-                output.append(new_entry)
 
-        """   
-        for entries in self.cursor:
+            yield batch
 
-            if self.return_dict and not isinstance(entries,dict):
-                output.append(self.collection_retriever.unpack(entries))
-            else:
-                output.append(entries)
-        """
+    def pull_all(self):
+
+        """Exhausts remaining cursor and returns to calling function"""
+
+        output = []
+
+        for batch in self.iter_batches():
+            output += batch
 
         return output
 
+    @staticmethod
+    def build_sql_stream_query(table_name, schema, selected_keys=None, filter_dict=None, sort_keys=None,
+                               id_column="_id", placeholder="%s"):
+
+        """Builds a parameterized SELECT with only the columns for the selected_keys - returns the sql query,
+        the params, and the list of output keys matching the selected columns.  The filter_dict accepts
+        {key: value} and 'mongo' style {key: {"$in": [values]}} conditions."""
+
+        key_to_column = {}
+
+        for column in schema:
+
+            if column == "PRIMARY KEY":
+                continue
+
+            key = column
+            if column == "text_block":
+                key = "text"
+            if column == "table_block":
+                key = "table"
+            if column == "_id":
+                column = id_column
+
+            key_to_column.update({key: column})
+
+        if "_id" not in key_to_column:
+            key_to_column.update({"_id": id_column})
+
+        if not selected_keys:
+            selected_keys = list(key_to_column.keys())
+
+        key_list = []
+        for key in selected_keys:
+            if key in key_to_column and key not in key_list:
+                key_list.append(key)
+            elif key not in key_to_column:
+                logger.debug(f"update: DBCursor - selected key not found in schema - {key}")
+
+        sql_query = f"SELECT {', '.join([key_to_column[key] for key in key_list])} FROM {table_name}"
+
+        conditions = []
+        params = []
+
+        if filter_dict:
+            for key, value in filter_dict.items():
+
+                column = key_to_column.get(key, key)
+
+                if isinstance(value, dict) and "$in" in value:
+                    values = list(value["$in"])
+                    if values:
+                        conditions.append(f"{column} IN ({', '.join([placeholder] * len(values))})")
+                        params += values
+                    else:
+                        conditions.append("1 = 0")
+                else:
+                    conditions.append(f"{column} = {placeholder}")
+                    params.append(value)
+
+        if conditions:
+            sql_query += " WHERE " + " AND ".join(conditions)
+
+        if sort_keys:
+            sql_query += " ORDER BY " + ", ".join([key_to_column.get(key, key) for key in sort_keys])
+
+        return sql_query, params, key_list
+
 
 class CustomTable:
 
@@ -3948,6 +4301,132 @@ class CustomTable:
 
         return rows_completed
 
+    def _get_best_guess_column_type(self, values, data_type="integer"):
+
+        """ Data type for a column, based on a sample of its values - uses the 'safest' among the types found,
+        with the same decision tree as test_and_remediate_schema. """
+
+        samples_dt_list = [self._get_best_guess_value_type(v) for v in values]
+
+        if "text" in samples_dt_list or data_type == "text" or not samples_dt_list:
+            dt = "text"
+        elif "float" in samples_dt_list or data_type == "float":
+            dt = "float"
+        else:
+            dt = "integer"
+            if self.db == "postgres":
+                dt = "bigint"
+
+        return dt
+
+    def bulk_load_csv(self, fp, fn, table_name=None, column_names=None, data_type_map=None, header_row=True,
+                      delimiter=',', encoding='utf-8-sig', sample_rows=1000, chunk_size=10000):
+
+        """ Bulk loads a CSV file into a table - intended for large files, as an alternative to load_csv +
+        insert_rows, which holds the full file in memory, and inserts one row per transaction.
+
+        -- the CSV is streamed, and only the first sample_rows rows are held in memory, to infer the data type
+        of each column (unless passed in the optional data_type_map)
+
+        -- the rows are inserted in chunks of chunk_size rows per transaction - with COPY FROM STDIN on Postgres,
+        executemany on SQLite, and insert_many on Mongo
+
+        -- as in load_csv, the column names are taken from the header row (or passed as column_names), rows with
+        a different number of elements are skipped, and empty values are loaded as "0"
+
+        Returns a dictionary with the rows loaded, skipped rows, schema, and rows per second. """
+
+        if table_name:
+            self.table_name = table_name
+
+        t0 = time.time()
+
+        record_file = open(os.path.join(fp, fn), encoding=encoding, errors='ignore')
+        c = csv.reader(record_file, dialect='excel', doublequote=False, delimiter=delimiter)
+
+        try:
+
+            if header_row:
+                hrow = next(c, None)
+                if hrow is None:
+                    raise LLMWareException(message=f"Exception: not sufficient content found in the CSV to load "
+                                                   f"into DB table - found 0 rows")
+
+            if not column_names:
+
+                if not header_row:
+                    raise LLMWareException(message="Exception: can not determine the column names of the "
+                                                   "spreadsheet - no 'column_names' passed, and there is no "
+                                                   "header_row to use in the csv.  To try to derive from the "
+                                                   "CSV first row, set header_row = True.")
+
+                column_names = []
+                for entry in hrow:
+                    header_entry = re.sub("[\xfe\xff]", "", entry)
+                    header_entry = re.sub(" ", "_", header_entry)
+                    column_names.append(header_entry)
+
+            column_size = len(column_names)
+
+            #   sample of rows used to infer the column data types
+            sample = list(islice(c, sample_rows))
+
+            if not sample:
+                raise LLMWareException(message=f"Exception: not sufficient content found in the CSV to load "
+                                               f"into DB table - found no data rows")
+
+            conforming_sample = [row for row in sample if len(row) == column_size]
+
+            schema = {}
+            for i, name in enumerate(column_names):
+                if data_type_map and name in data_type_map:
+                    schema.update({name: data_type_map[name]})
+                else:
+                    schema.update({name: self._get_best_guess_column_type([row[i] for row in conforming_sample
+                                                                          if row[i]])})
+
+            self.schema = schema
+            self.rows = []
+
+            if not self.build_table():
+                raise LLMWareException(message=f"Exception: unable to confirm build_table - table_name - "
+                                               f"{self.table_name} - schema - {self.schema}")
+
+            #   column names may have been remediated in build_table - same order as the csv columns
+            key_list = [key for key in self.schema.keys() if key != "PRIMARY KEY"]
+
+            skipped_rows = []
+
+            def stream_rows():
+                for x, row in enumerate(chain(sample, c)):
+                    if len(row) != column_size:
+                        skipped_rows.append(x)
+                        continue
+                    # handle missing or null values
+                    yield tuple([entry if entry else "0" for entry in row])
+
+            conn = self.get_connection(type="write")
+            rows_loaded = conn.write_many_records(key_list, stream_rows(), chunk_size=chunk_size)
+
+        finally:
+            record_file.close()
+
+        elapsed_time = time.time() - t0
+
+        if skipped_rows:
+            logger.warning(f"warning: CustomTable - bulk_load_csv - skipped {len(skipped_rows)} rows that do not "
+                           f"match the number of columns in the schema - {column_size}")
+
+        output = {"rows": rows_loaded, "columns": column_size, "schema": self.schema,
+                  "skipped_rows": len(skipped_rows),
+                  "time": round(elapsed_time, 3),
+                  "rows_per_second": round(rows_loaded / max(elapsed_time, 1e-6), 1)}
+
+        logger.info(f"update: CustomTable - bulk_load_csv - loaded {rows_loaded} rows into {self.table_name} - "
+                    f"{output['rows_per_second']} rows per second")
+
+        return output
+
     def get_schema(self, table_name=None):
 
         """ Returns the schema for the table_name provided.  If no table_name provided, then it will pull from
@@ -4449,6 +4928,300 @@ class ParserState:
         return output
 
 
+class StateHistoryStore:
+
+    """Implements a sqlite store for prompt and query state histories, as an alternative to one jsonl file per
+    state, which is used by PromptState and QueryState if StateHistoryConfig "store" is set to "sqlite".
+
+    Each record is saved as a row, keyed by (state_id, seq), with the full record as json, and a small set of
+    indexed columns extracted from the record - lookups by state id or by a filter on the indexed keys use the
+    indexes, rather than reading and parsing every state file, and updates are made in place on the matching
+    rows.  The states can be exported to (and imported from) the jsonl file format at any time.
+
+    A connection is opened for each operation, and closed at the end of it, so that prompt and query state
+    objects, which are created freely, do not hold open connections.
+
+    Parameters
+    ----------
+    history_type : str, default="prompt"
+        Either "prompt" or "query" - each history type is kept in its own table.
+
+    Returns
+    -------
+    state_history_store : StateHistoryStore
+        A new ``StateHistoryStore`` object.
+    """
+
+    #   keys extracted from each record into indexed columns - values are stored as json, so that a filter
+    #   matches on the same value and type as a comparison on the record
+    indexed_keys = {"prompt": ["prompt_id", "model", "time_stamp", "event_type", "rating", "human_rating",
+                               "human_assessed_accuracy"],
+                    "query": ["query", "doc_ID", "file_source"]}
+
+    #   db files with tables & indexes already created in this process
+    _initialized = set()
+
+    def __init__(self, history_type="prompt"):
+
+        if history_type not in self.indexed_keys:
+            raise LLMWareException(message=f"Exception: StateHistoryStore - history_type not supported - "
+                                           f"{history_type} - should be one of {list(self.indexed_keys.keys())}")
+
+        self.history_type = history_type
+        self.table_name = history_type + "_history"
+        self.keys = self.indexed_keys[history_type]
+
+        db_folder_path = StateHistoryConfig().get_config("db_folder_path")
+        if not db_folder_path:
+            db_folder_path = LLMWareConfig().get_llmware_path()
+
+        os.makedirs(db_folder_path, exist_ok=True)
+
+        self.db_path = os.path.join(db_folder_path, StateHistoryConfig().get_config("db_name"))
+
+        if (self.db_path, self.table_name) not in StateHistoryStore._initialized:
+            self._create_table()
+            StateHistoryStore._initialized.add((self.db_path, self.table_name))
+
+    def _connect(self):
+
+        """ Opens a new connection to the store db - closed by the caller at the end of the operation """
+
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _create_table(self):
+
+        """ Creates the table and indexes, if not already created """
+
+        columns = ", ".join([f'"{key}" TEXT' for key in self.keys])
+
+        conn = self._connect()
+
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table_name} (state_id TEXT, seq INTEGER, "
+                         f"{columns}, record TEXT, PRIMARY KEY (state_id, seq))")
+
+            for key in self.keys:
+                conn.execute(f'CREATE INDEX IF NOT EXISTS {self.table_name}_{key} ON {self.table_name} ("{key}")')
+
+            conn.commit()
+
+        finally:
+            conn.close()
+
+    def close(self):
+
+        """ No connection is held between operations - provided for compatibility """
+
+        return True
+
+    def _row(self, state_id, seq, record):
+
+        """ Builds the db row for a record """
+
+        row = [str(state_id), seq]
+        for key in self.keys:
+            row.append(json.dumps(record[key]) if key in record else None)
+        row.append(json.dumps(record))
+
+        return row
+
+    def save_state(self, state_id, records):
+
+        """ Saves the records as the state for state_id - records that are unchanged are left in place, changed
+        records are updated, new records are appended, and any records beyond the end of the list are removed. """
+
+        state_id = str(state_id)
+
+        conn = self._connect()
+
+        try:
+            current = {}
+            for seq, record in conn.execute(f"SELECT seq, record FROM {self.table_name} WHERE state_id = ?",
+                                            (state_id,)):
+                current.update({seq: record})
+
+            changed_rows = []
+            for seq, record in enumerate(records):
+                row = self._row(state_id, seq, record)
+                if current.get(seq) != row[-1]:
+                    changed_rows.append(row)
+
+            columns = ", ".join(["state_id", "seq"] + [f'"{key}"' for key in self.keys] + ["record"])
+
+            with conn:
+                if changed_rows:
+                    conn.executemany(f"INSERT OR REPLACE INTO {self.table_name} ({columns}) "
+                                     f"VALUES ({', '.join(['?'] * (len(self.keys) + 3))})", changed_rows)
+
+                if len(current) > len(records):
+                    conn.execute(f"DELETE FROM {self.table_name} WHERE state_id = ? AND seq >= ?",
+                                 (state_id, len(records)))
+
+        finally:
+            conn.close()
+
+        return len(changed_rows)
+
+    def lookup_by_state_id(self, state_id):
+
+        """ Returns the records for state_id, in order """
+
+        conn = self._connect()
+
+        try:
+            return [json.loads(record) for (record,) in
+                    conn.execute(f"SELECT record FROM {self.table_name} WHERE state_id = ? ORDER BY seq",
+                                 (str(state_id),))]
+        finally:
+            conn.close()
+
+    def available_states(self):
+
+        """ Returns the list of state ids in the store """
+
+        conn = self._connect()
+
+        try:
+            return [state_id for (state_id,) in
+                    conn.execute(f"SELECT DISTINCT state_id FROM {self.table_name} ORDER BY state_id")]
+        finally:
+            conn.close()
+
+    def full_history(self):
+
+        """ Iterates through all of the records in the store, ordered by state id - the connection is closed when
+        the iteration ends """
+
+        conn = self._connect()
+
+        try:
+            for (record,) in conn.execute(f"SELECT record FROM {self.table_name} ORDER BY state_id, seq"):
+                yield json.loads(record)
+        finally:
+            conn.close()
+
+    def _select_with_filter(self, filter_dict, state_id=None):
+
+        """ Iterates through (state_id, seq, record) for the records that match every key:value in the
+        filter_dict - indexed keys are matched in the db, and any other keys are matched on the record """
+
+        conditions = []
+        params = []
+
+        if state_id is not None:
+            conditions.append("state_id = ?")
+            params.append(str(state_id))
+
+        for key, value in filter_dict.items():
+            if key in self.keys:
+                conditions.append(f'"{key}" = ?')
+                params.append(json.dumps(value))
+
+        sql_query = f"SELECT state_id, seq, record FROM {self.table_name}"
+        if conditions:
+            sql_query += " WHERE " + " AND ".join(conditions)
+        sql_query += " ORDER BY state_id, seq"
+
+        conn = self._connect()
+
+        try:
+            rows = conn.execute(sql_query, params).fetchall()
+        finally:
+            conn.close()
+
+        for state_id, seq, record in rows:
+
+            record = json.loads(record)
+
+            match = True
+            for key, value in filter_dict.items():
+                if key not in record or record[key] != value:
+                    match = False
+                    break
+
+            if match:
+                yield state_id, seq, record
+
+    def lookup_with_filter(self, filter_dict):
+
+        """ Returns the records that match every key:value in the filter_dict """
+
+        return [record for state_id, seq, record in self._select_with_filter(filter_dict)]
+
+    def update_records(self, filter_dict, update_dict, state_id=None):
+
+        """ Updates in place the keys in update_dict, for the records (in state_id, if provided) that match the
+        filter_dict - keys that are not already in the record are not added - returns the number of records
+        updated """
+
+        updated_rows = []
+        for row_state_id, seq, record in list(self._select_with_filter(filter_dict, state_id=state_id)):
+            updated_record = {key: update_dict.get(key, value) for key, value in record.items()}
+            updated_rows.append(self._row(row_state_id, seq, updated_record)[2:] + [row_state_id, seq])
+
+        set_columns = ", ".join([f'"{key}" = ?' for key in self.keys] + ["record = ?"])
+
+        conn = self._connect()
+
+        try:
+            with conn:
+                conn.executemany(f"UPDATE {self.table_name} SET {set_columns} WHERE state_id = ? AND seq = ?",
+                                 updated_rows)
+        finally:
+            conn.close()
+
+        return len(updated_rows)
+
+    def export_to_jsonl(self, output_path, base_name, file_format=".jsonl", state_ids=None):
+
+        """ Writes each state to a jsonl file - output_path / base_name + state_id + file_format - in the same
+        format as the jsonl state files - returns the list of files written """
+
+        if not state_ids:
+            state_ids = self.available_states()
+
+        files_written = []
+
+        for state_id in state_ids:
+
+            fp = os.path.join(output_path, base_name + str(state_id) + file_format)
+
+            with open(fp, "w", encoding='utf-8') as outfile:
+                for record in self.lookup_by_state_id(state_id):
+                    outfile.write(json.dumps(record))
+                    outfile.write("\n")
+
+            files_written.append(fp)
+
+        return files_written
+
+    def import_from_jsonl(self, input_path, base_name, file_format=".jsonl"):
+
+        """ Loads all of the jsonl state files in input_path that start with base_name into the store - returns
+        the list of state ids loaded """
+
+        state_ids = []
+
+        for fn in sorted(os.listdir(input_path)):
+
+            if fn.startswith(base_name) and fn.endswith(file_format):
+
+                state_id = fn.split(".")[0].split("_")[-1]
+
+                records = []
+                with open(os.path.join(input_path, fn), "r", encoding='utf-8') as my_file:
+                    for lines in my_file:
+                        if lines.strip():
+                            records.append(json.loads(lines))
+
+                self.save_state(state_id, records)
+                state_ids.append(state_id)
+
+        return state_ids
+
+
 class PromptState:
 
     """ PromptState is the main class abstraction that handles persisting and lookup of Prompt interactions"""
@@ -4477,6 +5250,11 @@ class PromptState:
         self.prompt_collection = None
         self.write_to_db = False
 
+        # optional - prompt state written to an indexed sqlite store - see StateHistoryConfig
+        self.history_store = None
+        if StateHistoryConfig().get_config("store") == "sqlite":
+            self.history_store = StateHistoryStore(history_type="prompt")
+
     def get_prompt_state_fn_from_id(self, prompt_id):
 
         """Generates the prompt state filename from prompt_id """
@@ -4495,6 +5273,9 @@ class PromptState:
 
         """ Lookup by prompt id to retrieve a persisted prompt interaction """
 
+        if self.history_store:
+            return self.history_store.lookup_by_state_id(prompt_id)
+
         ai_trx_list = self.lookup_by_prompt_id_from_file(prompt_id)
         return ai_trx_list
 
@@ -4545,6 +5326,23 @@ class PromptState:
         if not prompt_path:
             prompt_path = self.prompt_path
 
+        if self.history_store:
+
+            records = self.history_store.lookup_by_state_id(prompt_id)
+
+            if not records:
+                logger.warning(f"update: PromptState - could not find previous prompt interaction state- "
+                               f"{prompt_id}")
+                return None
+
+            if clear_current_state:
+                self.prompt.interaction_history = []
+
+            self.prompt.interaction_history += records
+            self.prompt.prompt_id = prompt_id
+
+            return self.prompt.interaction_history
+
         fn = self.get_prompt_state_fn_from_id(prompt_id)
         fp = os.path.join(prompt_path, fn)
 
@@ -4589,6 +5387,9 @@ class PromptState:
 
         """ Returns the full prompt history from disk """
 
+        if self.history_store:
+            return list(self.history_store.full_history())
+
         ai_trx_list = self.full_history_from_file()
         return ai_trx_list
 
@@ -4616,6 +5417,9 @@ class PromptState:
 
         """ Enables lookup of prompt history with filter """
 
+        if self.history_store:
+            return self.history_store.lookup_with_filter(filter_dict)
+
         # default - return []
         output = []
 
@@ -4647,6 +5451,10 @@ class PromptState:
 
         """ Enables update of a prompt interaction history from file """
 
+        if self.history_store:
+            self.history_store.update_records(filter_dict, update_dict, state_id=prompt_id)
+            return 0
+
         updated_prompt_records = []
         matching_record = {}
         prompt_records = self.lookup_by_prompt_id(prompt_id)
@@ -4669,14 +5477,8 @@ class PromptState:
                 # found matching record
                 matching_record = record
 
-                # update records according to update_dict
-                updated_record = {}
-                for key, value in matching_record.items():
-                    for update_key, update_value in update_dict.items():
-                        if key == update_key:
-                            updated_record.update({key: update_value})
-                        else:
-                            updated_record.update({key:value})
+                # update records according to update_dict - only keys already in the record are updated
+                updated_record = {key: update_dict.get(key, value) for key, value in matching_record.items()}
 
                 updated_prompt_records.append(updated_record)
 
@@ -4688,6 +5490,10 @@ class PromptState:
 
         """ Saves state """
 
+        if self.history_store:
+            self.history_store.save_state(prompt_id, custom_history)
+            return self.history_store.db_path
+
         if not prompt_path:
             prompt_path = LLMWareConfig.get_prompt_path()
 
@@ -4709,6 +5515,10 @@ class PromptState:
 
         """ Saves state """
 
+        if self.history_store:
+            self.history_store.save_state(prompt_id, self.prompt.interaction_history)
+            return self.history_store.db_path
+
         if not prompt_path:
             prompt_path = LLMWareConfig.get_prompt_path()
 
@@ -4735,16 +5545,52 @@ class PromptState:
         if not prompt_path:
             prompt_path = self.prompt_path
 
-        for x in os.listdir(prompt_path):
-            if x.startswith(self.prompt_state_base_name):
-                prompt_id = self.get_prompt_id_from_prompt_state_fn(x)
-                new_entry = {"prompt_id": prompt_id, "prompt_fn": x}
-                available_states.append(new_entry)
+        if self.history_store:
+            for prompt_id in self.history_store.available_states():
+                available_states.append({"prompt_id": prompt_id, "prompt_fn": self.history_store.db_path})
+        else:
+            for x in os.listdir(prompt_path):
+                if x.startswith(self.prompt_state_base_name):
+                    prompt_id = self.get_prompt_id_from_prompt_state_fn(x)
+                    new_entry = {"prompt_id": prompt_id, "prompt_fn": x}
+                    available_states.append(new_entry)
 
         logger.info(f"update: PromptState - available states - {available_states}")
 
         return available_states
 
+    def export_history_to_jsonl(self, prompt_id_list=None, output_path=None):
+
+        """ Exports the prompt states in the sqlite history store to jsonl prompt state files in the output_path
+        (by default, the prompt path) - returns the list of files written """
+
+        if not self.history_store:
+            logger.warning("update: PromptState - export_history_to_jsonl - prompt history is already saved "
+                           "in jsonl files - no action taken")
+            return []
+
+        if not output_path:
+            output_path = self.prompt_path
+
+        return self.history_store.export_to_jsonl(output_path, self.prompt_state_base_name,
+                                                  file_format=self.prompt_state_format, state_ids=prompt_id_list)
+
+    def import_history_from_jsonl(self, prompt_path=None):
+
+        """ Loads the jsonl prompt state files in the prompt_path (by default, the prompt path) into the sqlite
+        history store - returns the list of prompt ids loaded """
+
+        if not self.history_store:
+            logger.warning("update: PromptState - import_history_from_jsonl - the sqlite history store is not "
+                           "selected in StateHistoryConfig - no action taken")
+            return []
+
+        if not prompt_path:
+            prompt_path = self.prompt_path
+
+        return self.history_store.import_from_jsonl(prompt_path, self.prompt_state_base_name,
+                                                    file_format=self.prompt_state_format)
+
     def generate_interaction_report(self, prompt_id_list, output_path=None, report_name=None):
 
         """ Prepares a csv report that can be extracted to a spreadsheet """
@@ -4767,12 +5613,7 @@ class PromptState:
 
             for i, prompt_id in enumerate(prompt_id_list):
 
-                fn = self.get_prompt_state_fn_from_id(prompt_id)
-                fp = os.path.join(self.prompt_path, fn)
-
-                my_file = open(fp, 'r', encoding='utf-8')
-                for lines in my_file:
-                    new_row = json.loads(lines)
+                for new_row in self.lookup_by_prompt_id(prompt_id):
 
                     # create new csv row
                     # strip symbols that can disrupt csv output
@@ -4874,6 +5715,11 @@ class QueryState:
             os.mkdir(self.query_path)
             os.chmod(self.query_path, 0o777)
 
+        # optional - query state written to an indexed sqlite store - see StateHistoryConfig
+        self.history_store = None
+        if StateHistoryConfig().get_config("store") == "sqlite":
+            self.history_store = StateHistoryStore(history_type="query")
+
     def get_query_state_fn_from_id(self, prompt_id):
 
         """ Generates query state filename from query id  """
@@ -4927,11 +5773,15 @@ class QueryState:
 
         available_states = []
 
-        for x in os.listdir(self.query_path):
-            if x.startswith(self.query_state_base_name):
-                query_id = self.get_query_id_from_prompt_state_fn(x)
-                new_entry = {"query_id": query_id, "query_fn": x}
-                available_states.append(new_entry)
+        if self.history_store:
+            for query_id in self.history_store.available_states():
+                available_states.append({"query_id": query_id, "query_fn": self.history_store.db_path})
+        else:
+            for x in os.listdir(self.query_path):
+                if x.startswith(self.query_state_base_name):
+                    query_id = self.get_query_id_from_prompt_state_fn(x)
+                    new_entry = {"query_id": query_id, "query_fn": x}
+                    available_states.append(new_entry)
 
         logger.info(f"update: QueryState - available saved query states - {available_states}")
 
@@ -4950,9 +5800,14 @@ class QueryState:
         fp = os.path.join(self.query_path, fn)
 
         try:
-            my_file = open(fp, 'r', encoding='utf-8')
-            for lines in my_file:
-                new_row = json.loads(lines)
+            if self.history_store:
+                records = self.history_store.lookup_by_state_id(query_id)
+                if not records:
+                    logger.warning(f"update: QueryState - could not find previous query state- {query_id}")
+            else:
+                records = (json.loads(lines) for lines in open(fp, 'r', encoding='utf-8'))
+
+            for new_row in records:
                 output.append(new_row)
 
                 if "doc_ID" in new_row:
@@ -4985,6 +5840,10 @@ class QueryState:
         if not query_id:
             query_id = self.query.query_id
 
+        if self.history_store:
+            self.history_store.save_state(query_id, self.query.results)
+            return self.history_store.db_path
+
         fn = self.get_query_state_fn_from_id(query_id)
         fp = os.path.join(self.query_path, fn)
 
@@ -23,7 +23,13 @@ embeddings were previously created for the Library.  There are also a number of
 
 import logging
 import os
-from collections import Counter
+import copy
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
 from datetime import datetime
 
 try:
@@ -31,7 +37,7 @@ try:
 except:
     pass
 
-from llmware.configs import LLMWareConfig
+from llmware.configs import LLMWareConfig, QueryCacheConfig
 from llmware.embeddings import EmbeddingHandler
 from llmware.resources import CollectionRetrieval, QueryState
 from llmware.util import Utilities, CorpTokenizer
@@ -42,6 +48,217 @@ from llmware.exceptions import LibraryObjectNotFoundException,UnsupportedEmbeddi
 logger = logging.getLogger(__name__)
 
 
+class QueryCache:
+
+    """Implements a process-wide cache of Query results, keyed by a hash of the query parameters (library, query
+    type, query text, filters, result_count and output keys), and validated against the library version - which is
+    incremented on any block write, and on any embedding install or delete - so that a stale result is never
+    returned after a library has changed.
+
+    The in-memory tier is an LRU bounded by max_entries, and an optional disk tier (a SQLite db) keeps results
+    across processes.  Results are copied on the way in and on the way out, so callers can safely mutate the
+    results.  Settings are in ``QueryCacheConfig``, and the cache is used by ``Query`` if enabled, or if the
+    Query is created with use_cache=True.
+    """
+
+    _cache = OrderedDict()
+    _lock = threading.Lock()
+
+    _stats = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def make_key(key_dict):
+
+        """ Hash of the query parameters - key_dict should be json serializable """
+
+        key_str = json.dumps(key_dict, sort_keys=True, default=str)
+        return hashlib.sha1(key_str.encode("utf-8", errors="replace")).hexdigest()
+
+    @classmethod
+    def get(cls, cache_key, library_version):
+
+        """ Returns a copy of the cached result for the key, or None if not found or if the library version has
+        changed since the result was cached """
+
+        version_str = json.dumps(library_version, sort_keys=True)
+
+        with cls._lock:
+
+            entry = cls._cache.get(cache_key)
+
+            if entry:
+                if entry[0] == version_str:
+                    cls._cache.move_to_end(cache_key)
+                    cls._stats["hits"] += 1
+                    return copy.deepcopy(entry[1])
+
+                del cls._cache[cache_key]
+                cls._stats["invalidations"] += 1
+
+        if QueryCacheConfig().get_config("disk_cache"):
+
+            result = cls._disk_get(cache_key, version_str)
+
+            if result is not None:
+
+                with cls._lock:
+                    cls._stats["hits"] += 1
+                    cls._stats["disk_hits"] += 1
+                    cls._memory_put(cache_key, version_str, result)
+
+                return copy.deepcopy(result)
+
+        with cls._lock:
+            cls._stats["misses"] += 1
+
+        return None
+
+    @classmethod
+    def put(cls, cache_key, library_version, result):
+
+        """ Adds a copy of the result to the cache, tagged with the library version """
+
+        version_str = json.dumps(library_version, sort_keys=True)
+        result = copy.deepcopy(result)
+
+        with cls._lock:
+            cls._memory_put(cache_key, version_str, result)
+
+        if QueryCacheConfig().get_config("disk_cache"):
+            cls._disk_put(cache_key, version_str, result)
+
+        return True
+
+    @classmethod
+    def _memory_put(cls, cache_key, version_str, result):
+
+        """ Adds to the in-memory LRU - assumes the lock is held by the caller """
+
+        cls._cache[cache_key] = (version_str, result)
+        cls._cache.move_to_end(cache_key)
+
+        max_entries = QueryCacheConfig().get_config("max_entries")
+
+        while max_entries and len(cls._cache) > max_entries:
+            cls._cache.popitem(last=False)
+            cls._stats["evictions"] += 1
+
+    @classmethod
+    def _get_disk_connection(cls):
+
+        disk_cache_path = QueryCacheConfig().get_config("disk_cache_path")
+        if not disk_cache_path:
+            disk_cache_path = LLMWareConfig().get_llmware_path()
+
+        os.makedirs(disk_cache_path, exist_ok=True)
+
+        conn = sqlite3.connect(os.path.join(disk_cache_path, QueryCacheConfig().get_config("db_name")), timeout=30)
+        conn.execute("CREATE TABLE IF NOT EXISTS query_cache "
+                     "(cache_key TEXT PRIMARY KEY, library_version TEXT, result TEXT, last_used INTEGER)")
+        conn.execute("CREATE INDEX IF NOT EXISTS query_cache_last_used ON query_cache (last_used)")
+
+        return conn
+
+    @classmethod
+    def _disk_get(cls, cache_key, version_str):
+
+        result = None
+
+        try:
+            conn = cls._get_disk_connection()
+
+            row = conn.execute("SELECT library_version, result FROM query_cache WHERE cache_key = ?",
+                               (cache_key,)).fetchone()
+
+            if row:
+                if row[0] == version_str:
+                    result = json.loads(row[1])
+                    conn.execute("UPDATE query_cache SET last_used = ? WHERE cache_key = ?",
+                                 (time.time_ns(), cache_key))
+                else:
+                    conn.execute("DELETE FROM query_cache WHERE cache_key = ?", (cache_key,))
+                    with cls._lock:
+                        cls._stats["invalidations"] += 1
+
+            conn.commit()
+            conn.close()
+
+        except:
+            logger.warning("warning: QueryCache - could not read from disk cache")
+
+        return result
+
+    @classmethod
+    def _disk_put(cls, cache_key, version_str, result):
+
+        try:
+            result_str = json.dumps(result)
+        except (TypeError, ValueError):
+            # result with values that are not json serializable are kept in memory only
+            return False
+
+        try:
+            conn = cls._get_disk_connection()
+
+            conn.execute("INSERT OR REPLACE INTO query_cache (cache_key, library_version, result, last_used) "
+                         "VALUES (?, ?, ?, ?)", (cache_key, version_str, result_str, time.time_ns()))
+
+            max_entries = QueryCacheConfig().get_config("disk_cache_max_entries")
+            count = conn.execute("SELECT COUNT(*) FROM query_cache").fetchone()[0]
+
+            if max_entries and count > max_entries:
+                evict_count = count - int(0.9 * max_entries)
+                conn.execute("DELETE FROM query_cache WHERE cache_key IN "
+                             "(SELECT cache_key FROM query_cache ORDER BY last_used ASC LIMIT ?)", (evict_count,))
+                with cls._lock:
+                    cls._stats["evictions"] += evict_count
+
+            conn.commit()
+            conn.close()
+
+        except:
+            logger.warning("warning: QueryCache - could not write to disk cache")
+            return False
+
+        return True
+
+    @classmethod
+    def get_stats(cls):
+
+        """ Returns dict with cache counters - hits, misses, disk_hits, evictions, invalidations, entries and
+        hit_rate """
+
+        with cls._lock:
+            stats = dict(cls._stats)
+            stats.update({"entries": len(cls._cache)})
+
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({"hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0})
+
+        return stats
+
+    @classmethod
+    def clear(cls, include_disk=False):
+
+        """ Clears the in-memory cache and resets the stats - and the disk tier, if include_disk is True """
+
+        with cls._lock:
+            cls._cache.clear()
+            for key in cls._stats:
+                cls._stats[key] = 0
+
+        if include_disk:
+            try:
+                conn = cls._get_disk_connection()
+                conn.execute("DELETE FROM query_cache")
+                conn.commit()
+                conn.close()
+            except:
+                logger.warning("warning: QueryCache - could not clear disk cache")
+
+        return True
+
+
 class Query:
 
     """Implements the query capabilities against a ``Library` object`.
@@ -84,6 +301,10 @@ class Query:
         The name of the vector store to be queried against. If it is not set, then this is determined by the
         given ``embedding_model``.
 
+    use_cache : bool, default=None
+        Sets whether query results are cached in the ``QueryCache``, and re-used until the library changes. If
+        it is not set, then this is determined by ``QueryCacheConfig``.
+
 
     Examples
     ----------
@@ -117,7 +338,7 @@ class Query:
 
     def __init__(self, library, embedding_model=None, tokenizer=None, vector_db_api_key=None,
                  query_id=None, from_hf=False, from_sentence_transformer=False,embedding_model_name=None,
-                 save_history=True, query_mode=None, vector_db=None, model_api_key=None):
+                 save_history=True, query_mode=None, vector_db=None, model_api_key=None, use_cache=None):
 
         # load user profile & instantiate core library assets linked to profile
 
@@ -254,6 +475,12 @@ class Query:
 
         self.save_history = save_history
 
+        #   query result cache - validated against the library version
+        if use_cache is None:
+            use_cache = QueryCacheConfig().get_config("enabled")
+
+        self.use_cache = use_cache
+
         if query_mode:
             self.search_mode = query_mode
 
@@ -427,12 +654,19 @@ class Query:
         if exact_mode:
             query = self.exact_query_prep(query)
 
-        # query the text collection
-        cursor = CollectionRetrieval(self.library_name,account_name=self.account_name).basic_query(query)
+        cache_ref, results_dict = self._query_cache_lookup("text_query", query, result_count=result_count,
+                                                           exhaust_full_cursor=exhaust_full_cursor)
 
-        # package results, with correct sample counts and output keys requested
-        results_dict = self._cursor_to_qr(query, cursor,result_count=result_count,exhaust_full_cursor=
-                                          exhaust_full_cursor)
+        if results_dict is None:
+
+            # query the text collection
+            cursor = CollectionRetrieval(self.library_name,account_name=self.account_name).basic_query(query)
+
+            # package results, with correct sample counts and output keys requested
+            results_dict = self._cursor_to_qr(query, cursor,result_count=result_count,exhaust_full_cursor=
+                                              exhaust_full_cursor)
+
+            self._query_cache_store(cache_ref, results_dict)
 
         if results_only:
             return results_dict["results"]
@@ -463,15 +697,24 @@ class Query:
             logger.warning("warning: Query - expected to receive document filter with keys of 'doc_ID' or "
                            "'file_source' - as a safe fall-back - will run the requested query without a filter.")
 
-        if key:
-            cursor = CollectionRetrieval(self.library_name, account_name=self.account_name). \
-                    text_search_with_key_value_range(query, key, value_range)
-        else:
-            # as fallback, if no key found, then run query without filter
-            cursor = CollectionRetrieval(self.library_name, account_name=self.account_name).basic_query(query)
+        cache_ref, result_dict = self._query_cache_lookup("text_query_with_document_filter", query,
+                                                          key=key, value_range=value_range,
+                                                          result_count=result_count,
+                                                          exhaust_full_cursor=exhaust_full_cursor)
+
+        if result_dict is None:
 
-        result_dict = self._cursor_to_qr(query, cursor, result_count=result_count,
-                                         exhaust_full_cursor=exhaust_full_cursor)
+            if key:
+                cursor = CollectionRetrieval(self.library_name, account_name=self.account_name). \
+                        text_search_with_key_value_range(query, key, value_range)
+            else:
+                # as fallback, if no key found, then run query without filter
+                cursor = CollectionRetrieval(self.library_name, account_name=self.account_name).basic_query(query)
+
+            result_dict = self._cursor_to_qr(query, cursor, result_count=result_count,
+                                             exhaust_full_cursor=exhaust_full_cursor)
+
+            self._query_cache_store(cache_ref, result_dict)
 
         if results_only:
             return result_dict["results"]
@@ -572,6 +815,45 @@ class Query:
 
         return result_dict
 
+    def _query_cache_lookup(self, query_type, query, **params):
+
+        """ Internal helper - looks up the query in the QueryCache - returns the cache reference, which is passed
+        to _query_cache_store after running the query, and the cached result dict, or None if not found. """
+
+        if not self.use_cache:
+            return None, None
+
+        #   capture the library version before running the query, so a write during the query is not missed
+        library_version = self.library.get_library_version()
+
+        if not library_version:
+            return None, None
+
+        key_dict = {"account_name": self.account_name, "library_name": self.library_name,
+                    "query_type": query_type, "query": query, "params": params,
+                    "return_keys": self.query_result_return_keys}
+
+        if query_type.startswith("semantic"):
+            key_dict.update({"embedding_model": self.embedding_model_name, "embedding_db": self.embedding_db})
+
+        cache_ref = (QueryCache.make_key(key_dict), library_version)
+
+        result_dict = QueryCache.get(*cache_ref)
+
+        if result_dict is not None and self.save_history:
+            self.register_query(result_dict)
+
+        return cache_ref, result_dict
+
+    def _query_cache_store(self, cache_ref, result_dict):
+
+        """ Internal helper - adds a query result dict to the QueryCache. """
+
+        if cache_ref:
+            QueryCache.put(cache_ref[0], cache_ref[1], result_dict)
+
+        return True
+
     def _cursor_to_qr_with_secondary_filter(self, query, cursor_results, filter_dict,
                                             result_count=20, exhaust_full_cursor=False):
 
@@ -711,6 +993,13 @@ class Query:
         if not embedding_distance_threshold:
             embedding_distance_threshold = self.semantic_distance_threshold
 
+        cache_ref, results_dict = self._query_cache_lookup("semantic_query", query, result_count=result_count,
+                                                           embedding_distance_threshold=embedding_distance_threshold,
+                                                           custom_filter=custom_filter)
+
+        if results_dict is not None:
+            return results_dict["results"] if results_only else results_dict
+
         self.load_embedding_model()
 
         # confirm that embedding model exists, or catch and raise error
@@ -750,6 +1039,8 @@ class Query:
         # Processing results
         results_dict = self._cursor_to_qr(query, qr_raw, result_count=result_count)
 
+        self._query_cache_store(cache_ref, results_dict)
+
         return results_dict["results"] if results_only else results_dict
 
     def apply_custom_filter(self, results, custom_filter):
@@ -771,10 +1062,19 @@ class Query:
         if not embedding_distance_threshold:
             embedding_distance_threshold = self.semantic_distance_threshold
 
-        #   note:  by default, retrieves a much larger set of results to try to account for filter
+        #   note:  the filter is pushed down into the vector db search for vector dbs that support pre-filtering
+        #   (FAISS, pgvector, Qdrant, LanceDB and ChromaDB) - for other vector dbs, retrieves a much larger set of
+        #   results by default, and applies the filter to the results
 
         th = self.semantic_distance_threshold
 
+        cache_ref, result_output = self._query_cache_lookup("semantic_query_with_document_filter", query,
+                                                            filter_dict=filter_dict, result_count=result_count,
+                                                            embedding_distance_threshold=embedding_distance_threshold)
+
+        if result_output is not None:
+            return result_output["results"] if results_only else result_output
+
         # confirm that embedding model exists, or catch and raise error
         if self.embedding_model:
             self.query_embedding = self.embedding_model.embedding(query)
@@ -785,7 +1085,8 @@ class Query:
             semantic_block_results = self.embeddings.search_index(self.query_embedding,
                                                                   embedding_db=self.embedding_db,
                                                                   model=self.embedding_model,
-                                                                  sample_count=result_count)
+                                                                  sample_count=result_count,
+                                                                  filter_dict=filter_dict)
 
         else:
             logger.error(f"error: Query - embedding record does not indicate embedding db- {self.embedding_db} "
@@ -808,6 +1109,8 @@ class Query:
 
         result_output = self._cursor_to_qr_with_secondary_filter(query,qr_raw,filter_dict,result_count=result_count)
 
+        self._query_cache_store(cache_ref, result_output)
+
         if results_only:
             return result_output["results"]
 
@@ -1066,17 +1369,18 @@ class Query:
         else:
             page_dict = {"doc_ID": {"$in":doc_id_list}, "master_index": {"$in": page_list}}
 
-        cursor_results = CollectionRetrieval(self.library_name,
-                                             account_name=self.account_name).filter_by_key_dict(page_dict)
+        batches = CollectionRetrieval(self.library_name,
+                                      account_name=self.account_name).iter_batches(filter_dict=page_dict)
 
         output = []
 
-        for x in cursor_results:
+        for batch in batches:
+            for x in batch:
 
-            x.update({"matches": []})
-            x.update({"page_num": x["master_index"]})
+                x.update({"matches": []})
+                x.update({"page_num": x["master_index"]})
 
-            output.append(x)
+                output.append(x)
 
         return output
 
@@ -1084,35 +1388,61 @@ class Query:
 
         """ Gets the whole library - and will return as a list in-memory. """
 
-        match_results_cursor = CollectionRetrieval(self.library_name,
-                                                   account_name=self.account_name).get_whole_collection()
+        qr = []
+
+        for batch in self.stream_library(selected_keys=selected_keys):
+            qr += batch
 
-        match_results = match_results_cursor.pull_all()
+        return qr
 
-        qr = []
+    def stream_library(self, selected_keys=None, filter_dict=None, batch_size=1000):
+
+        """ Generator that streams the library (or the subset selected by the optional filter_dict) in batches
+        of blocks, pulled from the text collection batch_size at a time, with only the selected keys - use to
+        iterate or export a large library in constant memory, e.g.,
+
+            for batch in Query(library).stream_library(selected_keys=["text", "doc_ID", "block_ID"]):
+                for block in batch:
+                    ...
+        """
 
         # option to retrieve only user selected keys
         if not selected_keys:
             selected_keys = self.library.default_keys
 
-        for i, block in enumerate(match_results):
+        # _id and master_index are always pulled to package the results
+        db_keys = list(selected_keys)
+        for key in ["_id", "master_index"]:
+            if key not in db_keys:
+                db_keys.append(key)
 
-            new_row = {}
-            new_row.update({"_id": str(block["_id"])})
-            new_row.update({"matches": []})
-            new_row.update({"page_num": block["master_index"]})
-            new_row.update({"score": 0.0})
-            new_row.update({"similarity": 0.0})
-            new_row.update({"distance": 0.0})
+        batches = CollectionRetrieval(self.library_name,
+                                      account_name=self.account_name).iter_batches(selected_keys=db_keys,
+                                                                                   filter_dict=filter_dict,
+                                                                                   batch_size=batch_size)
 
-            for keys in selected_keys:
-                if keys in block:
-                    if keys not in new_row:
-                        new_row.update({keys:block[keys]})
+        for batch in batches:
 
-            qr.append(new_row)
+            qr = []
 
-        return qr
+            for block in batch:
+
+                new_row = {}
+                new_row.update({"_id": str(block["_id"])})
+                new_row.update({"matches": []})
+                new_row.update({"page_num": block["master_index"]})
+                new_row.update({"score": 0.0})
+                new_row.update({"similarity": 0.0})
+                new_row.update({"distance": 0.0})
+
+                for keys in selected_keys:
+                    if keys in block:
+                        if keys not in new_row:
+                            new_row.update({keys:block[keys]})
+
+                qr.append(new_row)
+
+            yield qr
 
     def export_all_tables(self, query="", output_fp=None):
 
@@ -1684,50 +2014,167 @@ class Query:
 
         return doc_id_list, fn_list
 
-    def expand_text_result_before(self, block, window_size=400):
+    def block_range_lookup(self, doc_block_ids):
 
-        """ Expands text result before. """
+        """ Looks up a set of blocks in a single query - takes a dict of doc_ID -> list of block_IDs, and returns a
+        dict of (doc_ID, block_ID) -> block, for the blocks found in the library. """
 
-        block_id = block["block_ID"] -1
-        doc_id = block["doc_ID"]
+        doc_ids = sorted(doc_block_ids.keys())
+        block_ids = sorted(set(bid for bids in doc_block_ids.values() for bid in bids))
 
-        before_text = ""
-        pre_blocks = []
+        found = {}
 
-        while len(before_text) < window_size and block_id >= 0:
+        if not doc_ids or not block_ids:
+            return found
 
-            before_block = self.block_lookup(block_id, doc_id)
+        if len(doc_ids) == 1:
+            kv_dict = {"doc_ID": doc_ids[0], "block_ID": {"$in": block_ids}}
+        else:
+            kv_dict = {"doc_ID": {"$in": doc_ids}, "block_ID": {"$in": block_ids}}
 
-            if before_block:
-                before_text += before_block["text"]
-                pre_blocks.append(before_block)
+        output = CollectionRetrieval(self.library_name, account_name=self.account_name).filter_by_key_dict(kv_dict)
 
-        output = {"expanded_text": before_text, "results": pre_blocks}
+        for block in output:
+
+            doc_id = int(block["doc_ID"])
+            block_id = int(block["block_ID"])
+
+            #   query on the union of block_IDs may return blocks of other docs in the selection - skip them
+            if doc_id not in doc_block_ids or block_id not in doc_block_ids[doc_id]:
+                continue
+
+            block.update({"matches": []})
+            block.update({"page_num": block["master_index"]})
+            found.update({(doc_id, block_id): block})
+
+        return found
+
+    def _expand_windows(self, blocks, window_size=400, before=True, after=True, max_rounds=10):
+
+        """ Internal helper - collects the neighboring blocks of each block in the list until the window_size (in
+        characters) is filled, or the start/end of the document is reached.  Blocks are fetched for all windows
+        in a single query per round, starting with the number of blocks expected to fill the window, and doubling
+        if a window is not filled.  Returns list of (before_blocks, after_blocks), in document order. """
+
+        #   each window - [doc_id, next block_id, step, collected blocks, collected text length, done]
+        windows = []
+        for block in blocks:
+            doc_id = int(block["doc_ID"])
+            block_id = int(block["block_ID"])
+            windows.append([doc_id, block_id - 1, -1, [], 0, not before or block_id - 1 < 0])
+            windows.append([doc_id, block_id + 1, 1, [], 0, not after])
+
+        fetched = {}
+        requested = set()
+
+        blocks_per_window = max(1, window_size // max(self.result_text_chunk_size, 1)) + 1
+
+        for rounds in range(max_rounds):
+
+            doc_block_ids = {}
+
+            for doc_id, next_id, step, _, _, done in windows:
+                if not done:
+                    for i in range(blocks_per_window):
+                        block_id = next_id + step * i
+                        if block_id < 0:
+                            break
+                        if (doc_id, block_id) not in requested:
+                            doc_block_ids.setdefault(doc_id, set()).add(block_id)
+
+            if not doc_block_ids:
+                break
+
+            fetched.update(self.block_range_lookup(doc_block_ids))
+
+            for doc_id, block_ids in doc_block_ids.items():
+                for block_id in block_ids:
+                    requested.add((doc_id, block_id))
+
+            for window in windows:
+
+                while not window[5]:
+
+                    key = (window[0], window[1])
+
+                    if key not in requested:
+                        # not yet fetched - pick up in next round
+                        break
+
+                    if key not in fetched:
+                        # start or end of the document
+                        window[5] = True
+                        break
+
+                    window[3].append(fetched[key])
+                    window[4] += len(fetched[key]["text"])
+                    window[1] += window[2]
+
+                    if window[4] >= window_size or window[1] < 0:
+                        window[5] = True
+
+            blocks_per_window *= 2
+
+        output = []
+        for i in range(0, len(windows), 2):
+            before_blocks = list(reversed(windows[i][3]))
+            after_blocks = windows[i+1][3]
+            output.append((before_blocks, after_blocks))
 
         return output
 
-    def expand_text_result_after(self, block, window_size=400):
+    def expand_text_result_before(self, block, window_size=400):
+
+        """ Expands text result before - returns the text of the preceding blocks in the document, in document
+        order, up to the window_size (in characters). """
 
-        """ Expands text result after. """
+        pre_blocks, _ = self._expand_windows([block], window_size=window_size, after=False)[0]
+
+        before_text = "".join([b["text"] for b in pre_blocks])
+
+        output = {"expanded_text": before_text, "results": pre_blocks}
+
+        return output
 
-        block_id = block["block_ID"] + 1
-        doc_id = block["doc_ID"]
+    def expand_text_result_after(self, block, window_size=400):
 
-        after_text = ""
-        post_blocks = []
+        """ Expands text result after - returns the text of the following blocks in the document, up to the
+        window_size (in characters). """
 
-        while len(after_text) < window_size:
-            after_block = self.block_lookup(block_id, doc_id)
-            if not after_block:
-                break  # Break if no block is found
+        _, post_blocks = self._expand_windows([block], window_size=window_size, before=False)[0]
 
-            after_text += after_block["text"]
-            post_blocks.append(after_block)
-            block_id += 1  # Increment block_id for next iteration
+        after_text = "".join([b["text"] for b in post_blocks])
 
         output = {"expanded_text": after_text, "results": post_blocks}
         return output
 
+    def expand_text_results(self, results, window_size=400, before=True, after=True):
+
+        """ Expands a list of query results with the text of the neighboring blocks in each document - useful to
+        assemble a larger context for each result in a RAG prompt.  The neighboring blocks for all of the results
+        are fetched together, generally in one or two queries for the whole list.  Returns a copy of each result,
+        with added keys "text_before", "text_after", and "expanded_text", which is the text before + text of
+        the result + text after. """
+
+        windows = self._expand_windows(results, window_size=window_size, before=before, after=after)
+
+        expanded_results = []
+
+        for result, (before_blocks, after_blocks) in zip(results, windows):
+
+            text_before = " ".join([b["text"] for b in before_blocks])
+            text_after = " ".join([b["text"] for b in after_blocks])
+
+            expanded_result = dict(result)
+            expanded_result.update({"text_before": text_before,
+                                    "text_after": text_after,
+                                    "expanded_text": " ".join([t for t in [text_before, result["text"],
+                                                                           text_after] if t])})
+
+            expanded_results.append(expanded_result)
+
+        return expanded_results
+
     def generate_csv_report(self):
 
         """Generates a csv report from the current query status. """
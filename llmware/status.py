@@ -18,11 +18,15 @@ a status.  For example, the callers can be an application, UI, or SQL database,
 provide a progress update on a long-running process (e.g., parsing ingestion or embedding).
 """
 
+import os
+import re
+import mmap
 import time
-from threading import Thread
+import struct
+from threading import Thread, Lock
 
 from llmware.resources import CollectionRetrieval, CollectionWriter
-from llmware.configs import LLMWareTableSchema
+from llmware.configs import LLMWareTableSchema, LLMWareConfig, StatusConfig
 
 
 class Status:
@@ -46,6 +50,20 @@ class Status:
         A new ``Status`` object.
 
     """
+
+    #   embedding progress is counted in-process, and shared by all Status objects - persisted to the status
+    #   table at most once every StatusConfig 'persist_interval_secs', and at the end of the job
+    _progress = {}
+    _last_persisted = {}
+    _progress_lock = Lock()
+
+    #   open progress channels - status_key -> (file, mmap)
+    _channels = {}
+
+    #   progress channel record - sequence, current, total, start_time, end_time
+    _channel_format = "<qqqdd"
+    _channel_size = struct.calcsize(_channel_format)
+
     def __init__ (self, account_name="llmware"):
 
         self.account_name = account_name
@@ -99,31 +117,136 @@ class Status:
             "current": 0,
             "units": "blocks" 
         }
+
+        # starts from a new progress channel - a channel left over from an earlier job is removed
+        self._close_progress_channel(status_key)
+
+        with Status._progress_lock:
+            Status._progress[status_key] = status_entry
+            Status._last_persisted[status_key] = time.time()
+
+        self._publish_progress(status_entry)
+
         CollectionWriter("status", account_name=self.account_name).replace_record({"key":status_key},status_entry)
 
         return 0
 
     def increment_embedding_status(self, library_name, embedding_model, progress):
 
-        """ Increments the embedding status throughout the embedding job - enables parallelized writing and updates """
+        """ Increments the embedding status throughout the embedding job - the progress is counted in-process,
+        published to the progress channel, and persisted to the status table at most once every
+        StatusConfig 'persist_interval_secs', or when the job is complete. """
 
         status_key = self._get_embedding_status_key(library_name, embedding_model)
 
-        status_entry = CollectionRetrieval("status", account_name=self.account_name).lookup("key", status_key)
+        with Status._progress_lock:
+
+            status_entry = Status._progress.get(status_key)
 
-        if len(status_entry) == 1:
-            status_entry = status_entry[0]
+            if not status_entry:
+                # job started in another process - pick up the last persisted status
+                status_entry = CollectionRetrieval("status", account_name=self.account_name).lookup("key", status_key)
+                if isinstance(status_entry, list) and len(status_entry) == 1:
+                    status_entry = status_entry[0]
+                Status._progress[status_key] = status_entry
+                Status._last_persisted[status_key] = 0
+
+            status_entry["current"] = status_entry["current"] + progress
+            if status_entry["current"] >= status_entry["total"]:
+                status_entry["end_time"] = time.time()
+
+            status_entry["summary"] = f"{status_entry['current']} of {status_entry['total']} {status_entry['units']}"
+
+            now = time.time()
+            persist = (status_entry["end_time"] is not None or
+                       now - Status._last_persisted[status_key] >= StatusConfig().get_config("persist_interval_secs"))
+
+            if persist:
+                Status._last_persisted[status_key] = now
+
+            status_entry = dict(status_entry)
+
+        self._publish_progress(status_entry)
+
+        if persist:
+            CollectionWriter("status", account_name=self.account_name).replace_record({"key":status_key},
+                                                                                      status_entry)
+
+        return 0
 
-        status_entry["current"] = status_entry["current"] + progress
-        if status_entry["current"] >= status_entry["total"]:
+    def finish_embedding_status(self, library_name, embedding_model):
+
+        """ Marks the end of the embedding job - sets the end_time, persists the final progress, and removes the
+        progress channel - invoked at the end of the embedding job, since blocks without text are skipped, and the
+        current count may not reach the total. """
+
+        status_key = self._get_embedding_status_key(library_name, embedding_model)
+
+        with Status._progress_lock:
+
+            status_entry = Status._progress.pop(status_key, None)
+            Status._last_persisted.pop(status_key, None)
+
+        if not status_entry:
+            return 0
+
+        if status_entry["end_time"] is None:
             status_entry["end_time"] = time.time()
 
-        status_entry["summary"] = f"{status_entry['current']} of {status_entry['total']} {status_entry['units']}"
+        self._publish_progress(status_entry)
+        self._close_progress_channel(status_key)
 
         CollectionWriter("status", account_name=self.account_name).replace_record({"key":status_key}, status_entry)
 
         return 0
 
+    def get_embedding_progress(self, library_name, embedding_model):
+
+        """ Gets the embedding progress from the progress channel, without querying the database - returns
+        a status dict, or None if no progress channel is found for the job, or if a complete record could not be
+        read. """
+
+        fp = self._get_progress_channel_path(self._get_embedding_status_key(library_name, embedding_model))
+
+        if not os.path.exists(fp):
+            return None
+
+        # unbuffered, so that each read, including the re-read of the sequence, is read from the file
+        with open(fp, "rb", buffering=0) as f:
+
+            # retry if the record was read while being written
+            for attempts in range(100):
+
+                f.seek(0)
+                record = f.read(Status._channel_size)
+
+                if len(record) < Status._channel_size:
+                    return None
+
+                sequence, current, total, start_time, end_time = struct.unpack(Status._channel_format, record)
+
+                # the record is complete only if no write started or ended while it was read - the sequence is
+                # even, and unchanged when read again after the fields
+                if sequence % 2 == 0:
+                    f.seek(0)
+                    if struct.unpack("<q", f.read(8))[0] == sequence:
+                        break
+
+                time.sleep(0.001)
+
+            else:
+                return None
+
+        status_entry = {"key": self._get_embedding_status_key(library_name, embedding_model),
+                        "summary": f"{current} of {total} blocks",
+                        "start_time": start_time,
+                        "end_time": end_time if end_time > 0 else None,
+                        "total": total,
+                        "current": current,
+                        "units": "blocks"}
+
+        return status_entry
+
     def tail_embedding_status(self, library_name, model_name, poll_seconds=0.2):
 
         """ Can be invoked in tests to poll and check and print out embedding status """
@@ -134,19 +257,103 @@ class Status:
 
     def _tail_embedding_status(self, library_name, model_name, poll_seconds=0.2):
 
-        """ Display of embedding status """
+        """ Display of embedding status - reads the progress channel if available, and otherwise, polls the
+        status table """
 
         current_summary = ""
         while True:
-            status_dict = self.get_embedding_status(library_name, model_name)
+
+            status_dict = None
+            if StatusConfig().get_config("progress_channel"):
+                status_dict = self.get_embedding_progress(library_name, model_name)
+
+            if not status_dict:
+                status_dict = self.get_embedding_status(library_name, model_name)
+                if isinstance(status_dict, list):
+                    status_dict = status_dict[0] if status_dict else None
+
             if status_dict:
                 if current_summary != status_dict["summary"]:  # If the status has changed, print it
                     current_summary = status_dict["summary"]
                     print(current_summary)
-                    if status_dict["current"] >= status_dict["total"]:  # If the job is done exit
-                        return     
+                # If the job is done exit
+                if status_dict["current"] >= status_dict["total"] or status_dict["end_time"]:
+                    return     
             time.sleep(poll_seconds)
 
+    def _get_progress_channel_path(self, status_key):
+
+        """ Gets the file path of the progress channel for the status key """
+
+        channel_path = StatusConfig().get_config("progress_channel_path")
+        if not channel_path:
+            channel_path = os.path.join(LLMWareConfig().get_tmp_path(), "status_channels")
+
+        safe_key = re.sub(r"[^\w\-.]", "_", status_key)
+
+        return os.path.join(channel_path, safe_key + ".progress")
+
+    def _publish_progress(self, status_entry):
+
+        """ Writes the progress to the memory-mapped progress channel file - the sequence number is odd while
+        the record is being written, so readers can detect and retry a partial read """
+
+        if not StatusConfig().get_config("progress_channel"):
+            return False
+
+        status_key = status_entry["key"]
+
+        try:
+
+            with Status._progress_lock:
+
+                if status_key not in Status._channels:
+
+                    fp = self._get_progress_channel_path(status_key)
+                    os.makedirs(os.path.dirname(fp), exist_ok=True)
+
+                    f = open(fp, "a+b")
+                    f.truncate(Status._channel_size)
+                    Status._channels[status_key] = (f, mmap.mmap(f.fileno(), Status._channel_size))
+
+                f, channel = Status._channels[status_key]
+
+                sequence = struct.unpack_from("<q", channel, 0)[0]
+                if sequence % 2 == 1:
+                    sequence += 1
+
+                struct.pack_into("<q", channel, 0, sequence + 1)
+
+                struct.pack_into(Status._channel_format, channel, 0, sequence + 1,
+                                 int(status_entry["current"]), int(status_entry["total"]),
+                                 float(status_entry["start_time"] or 0), float(status_entry["end_time"] or 0))
+
+                struct.pack_into("<q", channel, 0, sequence + 2)
+
+        except (OSError, ValueError):
+            return False
+
+        return True
+
+    def _close_progress_channel(self, status_key):
+
+        """ Closes the progress channel for the status key, and removes the channel file - readers then fall back
+        to the status table """
+
+        with Status._progress_lock:
+
+            if status_key in Status._channels:
+                f, channel = Status._channels.pop(status_key)
+                channel.close()
+                f.close()
+
+            try:
+                os.remove(self._get_progress_channel_path(status_key))
+            except OSError:
+                pass
+
+        return True
+
     # Generate and return a unique key for status, combining the library_name and embedding_model
     def _get_embedding_status_key(self, library_name, embedding_model):
 
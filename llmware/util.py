@@ -19,7 +19,7 @@ class, along with a whole word (white space) tokenizer (CorpTokenizer) class, Te
 
 
 import csv
-from collections import Counter
+from collections import Counter, OrderedDict
 import sys
 import os
 import random
@@ -31,6 +31,7 @@ from tokenizers import Tokenizer
 from datetime import datetime
 from ctypes import *
 import shutil
+import threading
 
 import logging
 
@@ -234,6 +235,13 @@ class Utilities:
         """ Retrieves an instance of default tokenizer. In most cases, this is the GPT2 tokenizer, which is a
         good proxy for OpenAI and OpenAI-like GPTNeo models. """
 
+        #   loaded once per process and then shared through the tokenizer registry
+        return _TokenizerRegistry.get_tokenizer(("default", "gpt2"), self._load_default_tokenizer)
+
+    def _load_default_tokenizer(self):
+
+        """ Loads the default gpt2 tokenizer from the local model repo, pulling from the global repo if needed. """
+
         # gpt2 tokenizer is used in several places as a default tokenizer
 
         # check for llmware path & create if not already set up
@@ -1022,6 +1030,64 @@ class Utilities:
 
         return outfile_path
 
+    def decode_media_file(self, path_to_file, sr=16000):
+
+        """ Utility method that decodes an audio (or video) file in memory into a 1-d float32 array of mono
+        samples at the sample rate sr, with no intermediate .wav file - safe to run in parallel.
+
+        Files that can be read by soundfile (e.g., wav, flac, ogg, and on recent versions, mp3) are decoded with
+        soundfile and resampled with soxr - other formats are decoded by ffmpeg, with the output piped to stdout.
+
+        Returns None if the file can not be decoded.
+        """
+
+        import numpy as np
+
+        try:
+            import soundfile as sf
+            import soxr
+        except ImportError:
+            raise LLMWareException("decode_media_file requires dependencies of soundfile and soxr, "
+                                   "e.g., `pip install soundfile` and `pip install soxr`")
+
+        try:
+            data, file_sr = sf.read(path_to_file, dtype="float32", always_2d=True)
+
+            # downmix to mono
+            data = data.mean(axis=1, dtype=np.float32)
+
+            if file_sr != sr:
+                data = soxr.resample(data, file_sr, sr, quality="soxr_hq")
+
+            return np.ascontiguousarray(data, dtype=np.float32)
+
+        except Exception:
+            logger.debug(f"update: decode_media_file - file not readable by soundfile - will try ffmpeg - "
+                         f"{path_to_file}")
+
+        import subprocess
+
+        ffmpeg = shutil.which("ffmpeg")
+
+        if not ffmpeg:
+            logger.warning(f"warning: could not decode file @ {path_to_file} - the file format is not supported "
+                           f"by soundfile, and ffmpeg was not found.  ffmpeg is a core audio/video processing "
+                           f"library that can be installed with apt (linux) ; brew (mac) ; or downloaded "
+                           f"directly (windows).")
+            return None
+
+        cmd = [ffmpeg, "-nostdin", "-loglevel", "error", "-i", path_to_file,
+               "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(sr), "-"]
+
+        try:
+            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"warning: could not decode file @ {path_to_file} with ffmpeg - "
+                           f"{e.stderr.decode('utf-8', errors='ignore')}")
+            return None
+
+        return np.frombuffer(result.stdout, dtype=np.float32)
+
     def secure_filename(self, fn):
 
         """ New utility method to remove os.sep from proposed filenames. """
@@ -1685,6 +1751,12 @@ class LocalTokenizer:
 
         return self.tokenizer.encode(seq, add_special_tokens=False).ids
 
+    def encode_batch(self, seqs):
+
+        """ Encode a list of sequences in a single call and return a list of token id lists. """
+
+        return [enc.ids for enc in self.tokenizer.encode_batch(seqs, add_special_tokens=False)]
+
     def decode(self, seq, strip_bos_token=True):
 
         """ Decode a list of tokens and return the decoded string. """
@@ -1701,6 +1773,53 @@ class LocalTokenizer:
         return decoded
 
 
+class _TokenizerRegistry:
+
+    """ _TokenizerRegistry is a process-wide cache of instantiated tokenizers, keyed by tokenizer file or
+    tokenizer name, so that repeated token counting and logit analysis calls share a single tokenizer instance,
+    rather than re-loading the tokenizer from file on each call. """
+
+    _tokenizers = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_tokenizer(cls, key, loader_fn):
+
+        """ Returns the cached tokenizer for key - if not found, then calls loader_fn() to create the
+        tokenizer and adds it to the registry. """
+
+        tokenizer = cls._tokenizers.get(key, None)
+
+        if tokenizer is None:
+            with cls._lock:
+                tokenizer = cls._tokenizers.get(key, None)
+                if tokenizer is None:
+                    tokenizer = loader_fn()
+                    cls._tokenizers.update({key: tokenizer})
+
+        return tokenizer
+
+    @classmethod
+    def get_local_tokenizer(cls, tokenizer_fn=None, tokenizer_name=None):
+
+        """ Returns a cached LocalTokenizer by tokenizer file or tokenizer name. """
+
+        key = ("local", tokenizer_fn, tokenizer_name)
+
+        return cls.get_tokenizer(key, lambda: LocalTokenizer(tokenizer_fn=tokenizer_fn,
+                                                             tokenizer_name=tokenizer_name))
+
+    @classmethod
+    def clear(cls):
+
+        """ Removes all tokenizers from the registry. """
+
+        with cls._lock:
+            cls._tokenizers = {}
+
+        return True
+
+
 class Sources:
 
     """Implements a source batching designed to build a set of 'source materials' for a source_client_obj, which
@@ -1734,6 +1853,12 @@ class Sources:
 
     """
 
+    #   process-wide cache of token counts by (tokenizer, text) - shared across Sources instances, since a new
+    #   Sources object is created for each source added to a Prompt
+    _token_count_cache = OrderedDict()
+    _token_count_cache_size = 10000
+    _token_count_lock = threading.Lock()
+
     def __init__(self, source_client_obj, tokenizer=None,context_window_size=1000,batch_separator="\n"):
 
         self.source_client= source_client_obj
@@ -1787,7 +1912,7 @@ class Sources:
                     if "tokenizer_local" in self.source_client.llm_model_card:
                         tokenizer_fn = self.source_client.llm_model_card["tokenizer_local"]
                         try:
-                            self.tokenizer = LocalTokenizer(tokenizer_fn=tokenizer_fn)
+                            self.tokenizer = _TokenizerRegistry.get_local_tokenizer(tokenizer_fn=tokenizer_fn)
                             return True
                         except:
                             pass
@@ -1800,7 +1925,7 @@ class Sources:
             #   relative to the context window, but there should be any other detrimental impacts
 
             default_tokenizer = "tokenizer_ll2.json"
-            self.tokenizer = LocalTokenizer(tokenizer_fn=default_tokenizer)
+            self.tokenizer = _TokenizerRegistry.get_local_tokenizer(tokenizer_fn=default_tokenizer)
             return True
 
         return False
@@ -1809,18 +1934,54 @@ class Sources:
 
         """ Token counter utility """
 
+        return self.token_counts([text_sample])[0]
+
+    def token_counts(self, text_samples):
+
+        """ Returns a list with the token count for each text sample - counts are looked up in the token count
+        cache, and any samples not found are tokenized together in a single batch encode call. """
+
         if not self.tokenizer:
             self.resolve_tokenizer()
 
-        if self.tokenizer:
-            # toks = self.tokenizer.encode(text_sample).ids
-            toks = self.tokenizer.encode(text_sample)
-        else:
-            toks = ""
+        if not self.tokenizer:
             logger.warning(f"Sources - could not identify a tokenizer - batch size allocation compared to "
                            f"context window may not be possible.")
+            return [0] * len(text_samples)
+
+        counts = [None] * len(text_samples)
+        missing = {}
 
-        return len(toks)
+        with self._token_count_lock:
+            for i, text in enumerate(text_samples):
+                key = (self.tokenizer, text)
+                if key in self._token_count_cache:
+                    self._token_count_cache.move_to_end(key)
+                    counts[i] = self._token_count_cache[key]
+                else:
+                    if text not in missing:
+                        missing.update({text: []})
+                    missing[text].append(i)
+
+        if missing:
+
+            missing_texts = list(missing.keys())
+
+            if hasattr(self.tokenizer, "encode_batch"):
+                missing_counts = [len(toks) for toks in self.tokenizer.encode_batch(missing_texts)]
+            else:
+                missing_counts = [len(self.tokenizer.encode(text)) for text in missing_texts]
+
+            with self._token_count_lock:
+                for text, count in zip(missing_texts, missing_counts):
+                    for i in missing[text]:
+                        counts[i] = count
+                    self._token_count_cache[(self.tokenizer, text)] = count
+
+                while len(self._token_count_cache) > self._token_count_cache_size:
+                    self._token_count_cache.popitem(last=False)
+
+        return counts
 
     def tokenize (self, text_sample):
 
@@ -1852,13 +2013,8 @@ class Sources:
         batches = []
         meta = []
 
-        samples = []
-
-        for i, q in enumerate(retrieval_material):
-
-            # simple deduplication check to remove identical entries - more 'cleaning' options can be offered over time
-            if q not in samples:
-                samples.append(q)
+        # simple deduplication check to remove identical entries - more 'cleaning' options can be offered over time
+        samples = self._dedup_samples(retrieval_material)
 
         # default
         current_batch = ""
@@ -1889,9 +2045,12 @@ class Sources:
 
         samples_chunked = []
 
+        #   token counts for all samples in one batch tokenization pass
+        sample_token_counts = self.token_counts([sample["text"] for sample in samples])
+
         for x in range(0,len(samples)):
 
-            t = self.token_counter(samples[x]["text"])
+            t = sample_token_counts[x]
 
             if t > self.context_window_size:
                 chunks = self.chunk_large_sample(samples[x])
@@ -1899,11 +2058,14 @@ class Sources:
             else:
                 samples_chunked.append(samples[x])
 
+        if len(samples_chunked) != len(samples):
+            sample_token_counts = self.token_counts([sample["text"] for sample in samples_chunked])
+
         samples = samples_chunked
 
         for x in range(0, len(samples)):
 
-            t = self.token_counter(samples[x]["text"])
+            t = sample_token_counts[x]
 
             if "file_source" in samples[x]:
                 source_fn = samples[x]["file_source"]
@@ -2061,6 +2223,29 @@ class Sources:
 
         return new_sources
 
+    def _dedup_samples(self, retrieval_material):
+
+        """ Removes identical entries from the retrieval material, preserving order - entries are bucketed by
+        a hash of the text, and only compared with entries that have the same text. """
+
+        samples = []
+        seen = {}
+
+        for q in retrieval_material:
+
+            text_key = None
+            if isinstance(q, dict) and isinstance(q.get("text", None), str):
+                text_key = q["text"]
+
+            if text_key not in seen:
+                seen.update({text_key: []})
+
+            if q not in seen[text_key]:
+                seen[text_key].append(q)
+                samples.append(q)
+
+        return samples
+
     def chunk_large_sample(self, sample):
 
         """ If single sample bigger than the context window, then break up into smaller chunks """
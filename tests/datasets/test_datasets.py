@@ -1,5 +1,7 @@
 import os
-from llmware.dataset_tools import Datasets
+import json
+import tempfile
+from llmware.dataset_tools import Datasets, ShardedExporter
 from llmware.library import Library
 from llmware.retrieval import Query
 from llmware.parsers import Parser
@@ -70,3 +72,69 @@ def test_build_aws_transcribe_ds():
     assert generative_curated_ds["batches"] > 0
 
     library.delete_library()
+
+
+def test_build_text_ds_streaming():
+
+    # Setup library
+    library = Library().create_new_library("test_datasets_streaming")
+    sample_files_path = Setup().load_sample_files()
+    library.add_files(os.path.join(sample_files_path,"SmallLibrary"))
+
+    #   no validation or testing split, so that all samples are written to the training files
+    ds = Datasets(library, validation_split=0.0, testing_split=0.0)
+
+    def read_samples(dataset_dict):
+        ds_folder = os.path.join(ds.work_folder, ds.ds_base_name + dataset_dict["ds_id"])
+        samples = []
+        for fn in dataset_dict["training_files"]:
+            if fn.endswith(".jsonl"):
+                with open(os.path.join(ds_folder, fn), "r", encoding="utf-8") as f:
+                    samples += [json.loads(line)["text"] for line in f]
+        return samples
+
+    #   blocks streamed from the db in doc_ID order, with small stream batches
+    ds.stream_batch_size = 25
+    streamed_ds = ds.build_text_ds(min_tokens=100, max_tokens=300)
+
+    #   same blocks passed in memory as query results
+    all_blocks = Query(library).get_whole_library(selected_keys=["doc_ID", "content_type", "file_source", "text"])
+    text_blocks = [block for block in all_blocks if block["content_type"] in ["text", "table"]]
+    in_memory_ds = ds.build_text_ds(min_tokens=100, max_tokens=300, qr=text_blocks)
+
+    assert streamed_ds["training_samples"] > 0
+    assert read_samples(streamed_ds) == read_samples(in_memory_ds)
+
+    library.delete_library()
+
+
+def test_sharded_export_rewrites_changed_shards():
+
+    export_dir = tempfile.mkdtemp()
+
+    def rows(count, offset=0):
+        return ({"_id": i + offset, "text": f"row {i + offset}"} for i in range(count))
+
+    manifest = ShardedExporter(export_dir, shard_size=100, workers=2).export(rows(250))
+    assert [shard["rows"] for shard in manifest["shards"]] == [100, 100, 50]
+    assert all(shard["fingerprint"] for shard in manifest["shards"])
+
+    #   same rows - the shards are not re-written
+    first_shard = os.path.join(export_dir, manifest["shards"][0]["file_name"])
+    modified_time = os.path.getmtime(first_shard)
+
+    manifest_rerun = ShardedExporter(export_dir, shard_size=100, workers=2).export(rows(250))
+    assert os.path.getmtime(first_shard) == modified_time
+    assert [s["sha256"] for s in manifest_rerun["shards"]] == [s["sha256"] for s in manifest["shards"]]
+
+    #   fewer, different rows - e.g., after documents are deleted - the first shard is re-written, and the
+    #   shards beyond the end of the rows are removed
+    manifest_changed = ShardedExporter(export_dir, shard_size=100, workers=2).export(rows(50, offset=7))
+
+    assert manifest_changed["total_rows"] == 50
+    assert [shard["rows"] for shard in manifest_changed["shards"]] == [50]
+    assert sorted(os.listdir(export_dir)) == sorted([manifest_changed["shards"][0]["file_name"],
+                                                     "shard_manifest.json"])
+
+    with open(first_shard, "r", encoding="utf-8") as f:
+        assert json.loads(f.readline())["_id"] == 7
@@ -11,7 +11,7 @@ from llmware.exceptions import UnsupportedEmbeddingDatabaseException
 from llmware.models import ModelCatalog
 from llmware.retrieval import Query
 from llmware.setup import Setup
-from llmware.configs import LLMWareConfig
+from llmware.configs import LLMWareConfig, EmbeddingCacheConfig
 from llmware.resources import CloudBucketManager
 from tests.embeddings.utils import qdrant_installed
 
@@ -75,6 +75,81 @@ def test_lancedb_embedding_and_query():
     library.delete_library(confirm_delete=True)
 
 
+def test_numpy_mmap_embedding_and_query():
+
+    sample_files_path = Setup().load_sample_files()
+    library = Library().create_new_library("test_embedding_numpy_mmap")
+    library.add_files(os.path.join(sample_files_path,"SmallLibrary"))
+    results = generic_embedding_and_query(library, "numpy_mmap")
+    assert len(results) > 0
+    library.delete_library(confirm_delete=True)
+
+
+def test_embedding_cache_on_re_embedding():
+
+    # the embedding cache is off by default
+    EmbeddingCacheConfig().set_config("enabled", True)
+
+    try:
+        sample_files_path = Setup().load_sample_files()
+        library = Library().create_new_library("test_embedding_cache")
+        library.add_files(os.path.join(sample_files_path,"SmallLibrary"))
+
+        model=ModelCatalog().load_model("mini-lm-sbert")
+        embedding_handler = EmbeddingHandler(library=library)
+        embedding_handler.create_new_embedding(embedding_db="numpy_mmap", model=model, doc_ids=[1, 2])
+        embedding_handler.delete_index(embedding_db="numpy_mmap", embedding_dims=model.embedding_dims, model_name=model.model_name)
+
+        # second embedding of the same blocks is served from the embedding cache
+        embedding_summary = embedding_handler.create_new_embedding(embedding_db="numpy_mmap", model=model, doc_ids=[1, 2])
+        assert embedding_summary["embedding_cache_hit_rate"] == 1.0
+
+        embedding_handler.delete_index(embedding_db="numpy_mmap", embedding_dims=model.embedding_dims, model_name=model.model_name)
+        library.delete_library(confirm_delete=True)
+    finally:
+        EmbeddingCacheConfig().set_config("enabled", False)
+
+
+def test_quantized_embedding_and_query():
+
+    from llmware.configs import VectorQuantizationConfig
+
+    sample_files_path = Setup().load_sample_files()
+
+    VectorQuantizationConfig().set_config("quantization", "int8")
+
+    try:
+        for embedding_db in ["numpy_mmap", "faiss"]:
+            library = Library().create_new_library(f"test_embedding_quantized_{embedding_db}")
+            library.add_files(os.path.join(sample_files_path,"SmallLibrary"))
+            results = generic_embedding_and_query(library, embedding_db)
+            assert len(results) > 0
+            library.delete_library(confirm_delete=True)
+    finally:
+        VectorQuantizationConfig().set_config("quantization", None)
+
+
+def test_faiss_embedding_and_filtered_query():
+
+    sample_files_path = Setup().load_sample_files()
+    library = Library().create_new_library("test_embedding_faiss_filter")
+    library.add_files(os.path.join(sample_files_path,"SmallLibrary"))
+
+    model=ModelCatalog().load_model("mini-lm-sbert")
+    embedding_handler = EmbeddingHandler(library=library)
+    embedding_summary = embedding_handler.create_new_embedding(embedding_db="faiss", model=model)
+
+    # filter is applied inside the FAISS search, so all results are from the selected document
+    query_results = Query(library).semantic_query_with_document_filter("pact", {"doc_ID": [2]}, result_count=5)
+
+    assert len(query_results) == 5
+    for result in query_results:
+        assert result["doc_ID"] == 2
+
+    embedding_handler.delete_index(embedding_db="faiss",embedding_dims=embedding_summary["embedding_dims"], model_name=model.model_name)
+    library.delete_library(confirm_delete=True)
+
+
 @pytest.mark.skipif(not qdrant_installed(), reason="Qdrant client is not installed")
 def test_qdrant_embedding_and_query():
     os.environ["USER_MANAGED_QDRANT_LOCATION"] = ":memory:"
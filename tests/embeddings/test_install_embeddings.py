@@ -3,6 +3,7 @@
 
 
 import os
+import struct
 from llmware.library import Library
 from llmware.retrieval import Query
 from llmware.setup import Setup
@@ -108,6 +109,46 @@ def test_install_vector_embeddings():
     return 0
 
 
+def test_embedding_status_progress_channel():
 
+    library_name = "status_progress_test"
+    embedding_model = "mini-lm-sbert"
+
+    status = Status()
+    status.new_embedding_status(library_name, embedding_model, 1000)
+
+    # progress is counted in-process - and read from the progress channel without querying the db
+    for i in range(10):
+        status.increment_embedding_status(library_name, embedding_model, 50)
+
+    progress = status.get_embedding_progress(library_name, embedding_model)
+    assert progress["current"] == 500
+    assert progress["end_time"] is None
+
+    # end of job persists the final count to the status table, even if below the total
+    status.finish_embedding_status(library_name, embedding_model)
+
+    persisted = status.get_embedding_status(library_name, embedding_model)
+    if isinstance(persisted, list):
+        persisted = persisted[0]
+
+    assert int(persisted["current"]) == 500
+    assert persisted["end_time"] is not None
+
+    # the progress channel is removed at the end of the job - readers fall back to the status table
+    assert status.get_embedding_progress(library_name, embedding_model) is None
+
+    # a new job starts from a new progress channel, not the counts left over from an earlier job
+    status.new_embedding_status(library_name, embedding_model, 200)
+    progress = status.get_embedding_progress(library_name, embedding_model)
+    assert progress["current"] == 0
+    assert progress["total"] == 200
+    status.finish_embedding_status(library_name, embedding_model)
 
+    # a record that is never completely written - odd sequence number - is not returned
+    fp = status._get_progress_channel_path(status._get_embedding_status_key(library_name, embedding_model))
+    with open(fp, "wb") as f:
+        f.write(struct.pack(Status._channel_format, 1, 10, 200, 0.0, 0.0))
 
+    assert status.get_embedding_progress(library_name, embedding_model) is None
+    os.remove(fp)
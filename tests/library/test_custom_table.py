@@ -0,0 +1,88 @@
+""" Tests bulk loading of a CSV file into a CustomTable, and into SQLTables. """
+
+
+import csv
+import os
+import tempfile
+
+from llmware.agents import SQLTables
+from llmware.resources import CustomTable
+
+
+def test_custom_table_bulk_load_csv():
+
+    fp = tempfile.mkdtemp()
+    fn = "bulk_load_test.csv"
+
+    with open(os.path.join(fp, fn), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["customer id", "amount", "name"])
+        for i in range(1, 25001):
+            writer.writerow([i, i * 1.5, f"customer_{i}"])
+        # malformed row - skipped
+        writer.writerow([1, 2])
+
+    ct = CustomTable(db="sqlite", table_name="bulk_load_test")
+    report = ct.bulk_load_csv(fp, fn, sample_rows=500, chunk_size=5000)
+
+    assert report["rows"] == 25000
+    assert report["skipped_rows"] == 1
+    assert report["schema"]["customer_id"] == "integer"
+    assert report["schema"]["amount"] == "float"
+    assert report["schema"]["name"] == "text"
+
+    # sqlite returns the count row
+    assert ct.count_documents({})[0] == 25000
+
+    ct.delete_table(confirm=True)
+    os.remove(os.path.join(fp, fn))
+
+
+def test_sql_tables_bulk_load_csv():
+
+    fp = tempfile.mkdtemp()
+    fn = "sql_tables_bulk_load_test.csv"
+
+    with open(os.path.join(fp, fn), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["customer_id", "amount", "name"])
+        for i in range(1, 5001):
+            writer.writerow([i, i * 1.5, f"customer_{i}"])
+        # malformed row - skipped
+        writer.writerow([1, 2])
+
+    sql_tables = SQLTables()
+    if sql_tables.table_exists_check("sql_tables_bulk_load_test"):
+        sql_tables.delete_table("sql_tables_bulk_load_test", confirm_delete=True)
+
+    report = sql_tables.bulk_load_csv(fp, fn, "sql_tables_bulk_load_test", sample_rows=200, chunk_size=1000)
+
+    assert report["rows"] == 5000
+    assert report["skipped_rows"] == 1
+
+    table_schema = sql_tables.get_table_schema("sql_tables_bulk_load_test")
+    assert "customer_id integer" in table_schema
+    assert "amount real" in table_schema
+    assert "name text" in table_schema
+
+    count = list(sql_tables.query_db("SELECT COUNT(*) FROM sql_tables_bulk_load_test;"))[0][0]
+    assert count == 5000
+
+    # loading into an existing table appends the rows, with the existing columns
+    report = sql_tables.bulk_load_csv(fp, fn, "sql_tables_bulk_load_test")
+    assert report["rows"] == 5000
+
+    count = list(sql_tables.query_db("SELECT COUNT(*) FROM sql_tables_bulk_load_test;"))[0][0]
+    assert count == 10000
+
+    sql_tables.delete_table("sql_tables_bulk_load_test", confirm_delete=True)
+
+    # create_new_table_from_csv uses bulk_load_csv, and closes the connection when done
+    SQLTables().create_new_table_from_csv(fp, fn, "sql_tables_bulk_load_test")
+
+    sql_tables = SQLTables()
+    count = list(sql_tables.query_db("SELECT COUNT(*) FROM sql_tables_bulk_load_test;"))[0][0]
+    assert count == 5000
+
+    sql_tables.delete_table("sql_tables_bulk_load_test", confirm_delete=True)
+    os.remove(os.path.join(fp, fn))
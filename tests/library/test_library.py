@@ -10,6 +10,8 @@ import os
 import tempfile
 from llmware.configs import LLMWareConfig
 from llmware.library import Library, LibraryCatalog
+from llmware.resources import CollectionRetrieval
+from llmware.retrieval import Query, QueryCache
 from llmware.setup import Setup
 
 
@@ -54,3 +56,235 @@ def test_core_library_functions():
     assert library_name not in all_library_names
 
 
+
+
+def test_parallel_add_files():
+
+    # Library creation
+    library_name = "LibraryParallelABC"
+    library = Library().create_new_library(library_name)
+
+    sample_files_path = Setup().load_sample_files()
+    input_path = os.path.join(sample_files_path, "SmallLibrary")
+
+    # Parse in process pool across 2 shards
+    output = library.add_files(input_path, workers=2)
+
+    assert output["docs_added"] == len(os.listdir(input_path))
+    assert output["rejected_files"] == []
+
+    # doc ids must be unique across shards - one doc_ID per file, for the pdf and office files parsed in
+    # separate worker processes
+    doc_ids_by_file = {}
+    for batch in CollectionRetrieval(library_name).iter_batches(selected_keys=["doc_ID", "file_source"]):
+        for block in batch:
+            doc_ids_by_file.setdefault(block["file_source"], set()).add(block["doc_ID"])
+
+    assert len(doc_ids_by_file) == output["docs_added"]
+    assert all(len(doc_ids) == 1 for doc_ids in doc_ids_by_file.values())
+
+    all_doc_ids = [doc_id for doc_ids in doc_ids_by_file.values() for doc_id in doc_ids]
+    assert len(set(all_doc_ids)) == len(all_doc_ids)
+
+    # all of the doc ids were reserved from the library card upfront
+    library_card = library.get_library_card()
+    assert max(all_doc_ids) <= library_card["unique_doc_id"]
+
+    library.delete_library(confirm_delete=True)
+
+
+def test_reserve_doc_ids():
+
+    library_name = "LibraryReserveABC"
+    library = Library().create_new_library(library_name)
+
+    first_id = library.get_and_increment_doc_id()
+
+    # reserved block is contiguous, and starts after the last issued id
+    doc_id_block = library.reserve_doc_ids(10)
+    assert list(doc_id_block) == list(range(first_id + 1, first_id + 11))
+
+    # next single id continues after the reserved block
+    assert library.get_and_increment_doc_id() == first_id + 11
+
+    library.delete_library(confirm_delete=True)
+
+
+def test_query_cache_invalidation():
+
+    library_name = "LibraryQueryCacheABC"
+    library = Library().create_new_library(library_name)
+
+    sample_files_path = Setup().load_sample_files()
+    library.add_files(os.path.join(sample_files_path,"SmallLibrary"))
+
+    QueryCache.clear()
+
+    query = Query(library, use_cache=True)
+
+    first_results = query.text_query("pact", result_count=5)
+    assert len(first_results) > 0
+
+    # callers mutating results do not change the cached copy
+    first_results[0]["matches"] = "mutated"
+
+    second_results = query.text_query("pact", result_count=5)
+    assert second_results[0]["matches"] != "mutated"
+    assert QueryCache.get_stats()["hits"] == 1
+
+    # any block write bumps the library version, and the cached result is not returned
+    version = library.get_library_version()["version"]
+    library.update_block(first_results[0]["doc_ID"], first_results[0]["block_ID"], "special_field1", "updated")
+    assert library.get_library_version()["version"] == version + 1
+
+    query.text_query("pact", result_count=5)
+    stats = QueryCache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["invalidations"] == 1
+
+    QueryCache.clear()
+    library.delete_library(confirm_delete=True)
+
+
+def test_query_cache_invalidation_on_add_files():
+
+    library_name = "LibraryQueryCacheAddABC"
+    library = Library().create_new_library(library_name)
+
+    sample_files_path = Setup().load_sample_files()
+    library.add_files(os.path.join(sample_files_path,"SmallLibrary"))
+
+    QueryCache.clear()
+
+    query = Query(library, use_cache=True)
+
+    query.text_query("salary", result_count=5)
+    query.text_query("salary", result_count=5)
+    assert QueryCache.get_stats()["hits"] == 1
+
+    # pdf blocks are written by the C parser - the ingest still bumps the library version
+    version = library.get_library_version()["version"]
+    library.add_files(os.path.join(sample_files_path,"Agreements"))
+    assert library.get_library_version()["version"] > version
+
+    results = query.text_query("salary", result_count=5)
+    stats = QueryCache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["invalidations"] == 1
+    assert len(results) > 0
+
+    QueryCache.clear()
+    library.delete_library(confirm_delete=True)
+
+
+def test_expand_text_results():
+
+    library_name = "LibraryExpandABC"
+    library = Library().create_new_library(library_name)
+
+    sample_files_path = Setup().load_sample_files()
+    library.add_files(os.path.join(sample_files_path,"SmallLibrary"))
+
+    query = Query(library)
+    results = query.text_query("pact", result_count=10)
+
+    expanded_results = query.expand_text_results(results, window_size=400)
+    assert len(expanded_results) == len(results)
+
+    for result, expanded in zip(results, expanded_results):
+        assert result["text"] in expanded["expanded_text"]
+        assert "text_before" not in result
+
+    # before window walks back from the block, and returns the text in document order
+    block = next(r for r in results if r["block_ID"] > 2)
+    before = query.expand_text_result_before(block, window_size=400)
+    block_ids = [b["block_ID"] for b in before["results"]]
+    assert block_ids == sorted(block_ids)
+    assert block_ids[-1] == block["block_ID"] - 1
+
+    library.delete_library(confirm_delete=True)
+
+
+def test_stream_library():
+
+    library_name = "LibraryStreamABC"
+    library = Library().create_new_library(library_name)
+
+    sample_files_path = Setup().load_sample_files()
+    library.add_files(os.path.join(sample_files_path,"SmallLibrary"))
+
+    query = Query(library)
+
+    # batches are bounded by batch_size, and only the selected keys are returned
+    streamed = []
+    for batch in query.stream_library(selected_keys=["text", "doc_ID", "block_ID"], batch_size=50):
+        assert 0 < len(batch) <= 50
+        streamed += batch
+
+    assert "file_source" not in streamed[0]
+    assert len(streamed) == len(query.get_whole_library())
+
+    library.delete_library(confirm_delete=True)
+
+
+def test_export_library_to_shards():
+
+    library_name = "LibraryShardsABC"
+    library = Library().create_new_library(library_name)
+
+    sample_files_path = Setup().load_sample_files()
+    library.add_files(os.path.join(sample_files_path,"SmallLibrary"))
+
+    export_dir = tempfile.mkdtemp()
+
+    manifest = library.export_library_to_shards(export_dir, "lib_shards", shard_size=100, workers=2,
+                                                compression="gzip")
+
+    assert manifest["complete"]
+    assert manifest["total_rows"] == sum([shard["rows"] for shard in manifest["shards"]])
+    assert all([shard["file_name"].endswith(".jsonl.gz") for shard in manifest["shards"]])
+
+    # re-running the same export skips the completed (full) shards, and produces the same manifest
+    shard_path = os.path.join(export_dir, "lib_shards", manifest["shards"][0]["file_name"])
+    modified_time = os.path.getmtime(shard_path)
+
+    manifest_rerun = library.export_library_to_shards(export_dir, "lib_shards", shard_size=100, workers=2,
+                                                      compression="gzip")
+
+    assert os.path.getmtime(shard_path) == modified_time
+    assert [s["sha256"] for s in manifest_rerun["shards"]] == [s["sha256"] for s in manifest["shards"]]
+
+    library.delete_library(confirm_delete=True)
+
+
+def test_filter_by_key_dict_parameterized():
+
+    """ Filter values are passed as query parameters - quotes in values, e.g., in a file name, do not break
+    the query, and can not change it. """
+
+    active_db = LLMWareConfig().get_active_db()
+    LLMWareConfig().set_active_db("sqlite")
+
+    library_name = "LibraryFilterABC"
+    library = Library().create_new_library(library_name)
+
+    sample_files_path = Setup().load_sample_files()
+    library.add_files(os.path.join(sample_files_path,"SmallLibrary"))
+
+    file_source = CollectionRetrieval(library_name).get_distinct_list("file_source")[0]
+
+    results = CollectionRetrieval(library_name).filter_by_key_dict(
+        {"file_source": {"$in": [file_source, "O'Brien's notes.pdf"]}})
+
+    assert len(results) > 0
+    assert all(block["file_source"] == file_source for block in results)
+
+    assert CollectionRetrieval(library_name).filter_by_key_dict({"file_source": "x' OR '1'='1"}) == []
+    assert CollectionRetrieval(library_name).filter_by_key_dict({"file_source": {"$in": ["x' OR '1'='1"]}}) == []
+
+    doc_id = results[0]["doc_ID"]
+    assert len(CollectionRetrieval(library_name).filter_by_key_value_range("doc_ID", [doc_id])) > 0
+
+    library.delete_library(confirm_delete=True)
+
+    LLMWareConfig().set_active_db(active_db)
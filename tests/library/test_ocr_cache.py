@@ -0,0 +1,169 @@
+""" Tests the OCR checksum cache used to skip images that have already been OCR'd. """
+
+
+import os
+import sys
+import tempfile
+import types
+
+import llmware.parsers
+from llmware.configs import LLMWareConfig, OCRConfig
+from llmware.library import Library
+from llmware.parsers import OCRCache, ImageParser, Parser
+
+
+def test_ocr_cache_by_checksum():
+
+    fp = tempfile.mkdtemp()
+    OCRConfig().set_config("cache_folder_path", fp)
+
+    image_a = os.path.join(fp, "a.png")
+    image_b = os.path.join(fp, "b.png")
+
+    with open(image_a, "wb") as f:
+        f.write(b"same image bytes")
+
+    with open(image_b, "wb") as f:
+        f.write(b"same image bytes")
+
+    # checksum is by content, not by file name
+    assert OCRCache.file_checksum(image_a) == OCRCache.file_checksum(image_b)
+
+    cache = OCRCache(lang="eng")
+    checksum = OCRCache.file_checksum(image_a)
+
+    assert cache.get(checksum) is None
+
+    cache.put_many([(checksum, "ocr text"), (f"{checksum}-1-200", "page one text")])
+
+    assert cache.get(OCRCache.file_checksum(image_b)) == "ocr text"
+    assert cache.get(f"{checksum}-1-200") == "page one text"
+
+    # cache entries are by language
+    assert OCRCache(lang="deu").get(checksum) is None
+
+    assert cache.hits == 2
+    assert cache.misses == 1
+
+    cache.clear()
+    assert cache.get(checksum) is None
+    cache.close()
+
+    OCRConfig().set_config("cache_folder_path", "")
+
+
+def _fake_ocr(monkeypatch, calls):
+
+    """ Replaces the OCR worker - no tesseract needed - each image 'reads' as its own file contents. """
+
+    #   ocr_files checks that pytesseract is installed
+    monkeypatch.setitem(sys.modules, "pytesseract", types.ModuleType("pytesseract"))
+
+    def ocr_worker(fp, page_num=None, dpi=200, lang="eng"):
+        calls.append((os.path.basename(fp), page_num))
+        with open(fp, "r") as f:
+            text = f.read()
+        if page_num is not None:
+            text += f" page {page_num}"
+        return text, None
+
+    monkeypatch.setattr(llmware.parsers, "_ocr_worker", ocr_worker)
+
+
+def _write_images(fp, count):
+
+    files = []
+    for i in range(count):
+        fn = f"image_{i}.png"
+        with open(os.path.join(fp, fn), "w") as f:
+            f.write(f"text of image {i}")
+        files.append(fn)
+
+    return files
+
+
+def test_ocr_files_in_order(monkeypatch):
+
+    calls = []
+    _fake_ocr(monkeypatch, calls)
+
+    fp = tempfile.mkdtemp()
+    files = _write_images(fp, 5)
+
+    tasks = [(fn, os.path.join(fp, fn), None) for fn in files]
+    tasks.append(("pdf_page", os.path.join(fp, files[0]), 3))
+
+    results = list(ImageParser().ocr_files(tasks, workers=1))
+
+    assert [key for key, text_chunks in results] == files + ["pdf_page"]
+    assert results[2][1] == ["text of image 2"]
+    assert results[-1][1] == ["text of image 0 page 3"]
+    assert len(calls) == 6
+
+
+def test_ocr_files_skips_cached_checksums(monkeypatch):
+
+    calls = []
+    _fake_ocr(monkeypatch, calls)
+
+    fp = tempfile.mkdtemp()
+    files = _write_images(fp, 3)
+
+    checksum_cache = OCRConfig().get_config("checksum_cache")
+    cache_folder_path = OCRConfig().get_config("cache_folder_path")
+
+    OCRConfig().set_config("checksum_cache", True)
+    OCRConfig().set_config("cache_folder_path", fp)
+
+    try:
+        tasks = [(fn, os.path.join(fp, fn), None) for fn in files[:2]]
+        first = list(ImageParser().ocr_files(tasks, workers=1))
+        assert len(calls) == 2
+
+        #   the first two images are found in the cache - only the new image is OCR'd
+        tasks = [(fn, os.path.join(fp, fn), None) for fn in files]
+        second = list(ImageParser().ocr_files(tasks, workers=1))
+
+        assert calls[2:] == [(files[2], None)]
+        assert second[:2] == first
+        assert [key for key, text_chunks in second] == files
+
+        OCRCache(lang="eng").clear()
+
+    finally:
+        OCRConfig().set_config("checksum_cache", checksum_cache)
+        OCRConfig().set_config("cache_folder_path", cache_folder_path)
+
+
+def test_parse_image_write_batch_size(monkeypatch):
+
+    calls = []
+    _fake_ocr(monkeypatch, calls)
+
+    active_db = LLMWareConfig().get_active_db()
+    LLMWareConfig().set_active_db("sqlite")
+
+    library = Library().create_new_library("LibraryOCRBatchABC")
+
+    fp = tempfile.mkdtemp()
+    _write_images(fp, 5)
+
+    batches = []
+    write_parsing_records = Parser.write_parsing_records
+
+    def record_batch(self, new_records):
+        batches.append(len(new_records))
+        return write_parsing_records(self, new_records)
+
+    monkeypatch.setattr(Parser, "write_parsing_records", record_batch)
+
+    output = Parser(library=library).parse_image(fp, write_batch_size=2)
+
+    #   one block per image - two full batches, then the remaining block
+    assert len(output) == 5
+    assert batches == [2, 2, 1]
+    assert library.get_library_card()["blocks"] == 5
+
+    library.delete_library(confirm_delete=True)
+
+    LLMWareConfig().set_active_db(active_db)
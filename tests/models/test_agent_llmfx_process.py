@@ -71,4 +71,127 @@ def test_multistep_agent_process():
     return output
 
 
+def test_agent_process_with_model_pool():
 
+    from llmware.models import ModelResources
+
+    text = "The Mixco product is not working currently, and it is having a negative impact on my business."
+
+    #   budget of ~2 SLIM tool models - loading a third tool will evict the least-recently-used tool
+    ModelResources().set_memory_budget(max_memory_gb=2.5)
+
+    agent = LLMfx(use_model_pool=True)
+    agent.load_work(text)
+
+    agent.load_tool_list(["sentiment", "emotions", "intent"])
+
+    agent.sentiment()
+    agent.emotions()
+    agent.intent()
+
+    #   repeat calls are served from the pool, reloading any evicted tool model on demand
+    agent.sentiment()
+
+    stats = ModelResources().pool_stats()
+
+    assert stats["hits"] > 0
+    assert stats["memory_in_use"] <= stats["memory_budget"]
+    assert len(agent.response_list) == 4
+
+    for model_name in stats["models_in_pool"]:
+        ModelResources().unload_model(model_name)
+
+    ModelResources().set_memory_budget(None)
+
+
+def test_parallel_multitool_agent_process():
+
+    tickets = ["The product stopped working after the update, and support has not responded in a week.",
+               "Thanks for the quick fix - the new dashboard is great and the team loves it.",
+               "I was charged twice for my subscription this month, please refund the duplicate charge."]
+
+    agent = LLMfx(verbose=False)
+    agent.load_work(tickets)
+
+    tools = ["sentiment", "ner", "topics", "tags"]
+
+    output = agent.exec_parallel_function_calls(tools)
+
+    #   one response per (work item x tool), merged in work item order, and then tool order
+    assert len(output) == len(tickets) * len(tools)
+    assert len(agent.response_list) == len(tickets) * len(tools)
+
+    for i, response in enumerate(agent.response_list):
+        assert response["work_iteration"] == i // len(tools)
+        assert response["tool"] == tools[i % len(tools)]
+
+    for i in range(len(tickets)):
+        assert "sentiment" in agent.report[i]
+
+
+def test_model_card_index_lookup():
+
+    """ Confirms that the indexed model card lookup matches the linear scan over the model registry. """
+
+    from llmware.models import ModelCatalog, _ModelRegistry
+
+    for model in ModelCatalog().list_all_models()[:25]:
+        assert ModelCatalog().lookup_model_card(model["model_name"])["model_name"] == model["model_name"]
+        assert _ModelRegistry.lookup_model_card(model["display_name"])["display_name"] == model["display_name"]
+
+    assert ModelCatalog().lookup_model_card("not-a-registered-model") is None
+
+
+class _BatchToolStub:
+
+    """ Stub tool model with the same function_call_batch signature as ONNXGenerativeModel. """
+
+    def __init__(self, label):
+        self.label = label
+        self.batch_calls = []
+
+    def _response(self, text):
+        return {"llm_response": {self.label: [text[:10]]}, "usage": {"type": "dict"}}
+
+    def function_call(self, context, function=None, params=None, get_logits=False):
+        return self._response(context)
+
+    def function_call_batch(self, contexts, function=None, params=None, get_logits=False, batch_size=16,
+                            max_output=None):
+        self.batch_calls.append(len(contexts))
+        return [self._response(context) for context in contexts]
+
+
+def test_parallel_function_calls_with_batch_model():
+
+    import inspect
+    from llmware.models import ONNXGenerativeModel
+
+    #   the agent calls function_call_batch with get_logits - the batch signatures must agree
+    assert "get_logits" in inspect.signature(ONNXGenerativeModel.function_call_batch).parameters
+
+    tickets = ["First ticket text about a billing problem.",
+               "Second ticket text about a broken dashboard.",
+               "Third ticket text thanking the support team."]
+
+    agent = LLMfx(verbose=False, analyze_mode=False)
+    agent.load_work(tickets)
+
+    stubs = {"sentiment": _BatchToolStub("sentiment"), "topics": _BatchToolStub("topics")}
+    for tool_type, stub in stubs.items():
+        setattr(agent, tool_type + "_model", stub)
+
+    output = agent.exec_parallel_function_calls(["sentiment", "topics"])
+
+    #   one batch per tool, with all of the work items
+    assert stubs["sentiment"].batch_calls == [3]
+    assert stubs["topics"].batch_calls == [3]
+
+    assert len(output) == 6
+    for i, response in enumerate(agent.response_list):
+        assert response["work_iteration"] == i // 2
+        assert response["tool"] == ["sentiment", "topics"][i % 2]
+
+    for i, ticket in enumerate(tickets):
+        assert agent.report[i]["sentiment"] == [ticket[:10]]
+        assert agent.report[i]["topics"] == [ticket[:10]]
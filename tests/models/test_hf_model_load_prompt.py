@@ -1,7 +1,8 @@
-
+import os
 
 from llmware.models import ModelCatalog
 from llmware.prompts import Prompt
+from llmware.configs import LLMWareConfig
 
 
 def test_load_hf_model_in_prompt():
@@ -28,5 +29,53 @@ def test_load_hf_model_in_prompt():
         assert response is not None
 
 
+def test_hf_model_inference_batch():
+
+    model = ModelCatalog().load_model("llmware/bling-tiny-llama-v0", sample=False, max_output=30)
+
+    context = "The best time to visit New York City is in the Fall when the weather is nicest."
+    questions = ["When is the best time to visit New York?", "What is nicest in the Fall?",
+                 "Which city is this about?"]
+
+    responses = model.inference_batch(questions, contexts=[context] * len(questions), batch_size=2)
+
+    assert len(responses) == len(questions)
+
+    # each prompt is packaged in the same way as .inference, with its own usage
+    for question, response in zip(questions, responses):
+        single = model.inference(question, add_context=context)
+        assert len(response["llm_response"]) > 0
+        assert response["usage"]["input"] == single["usage"]["input"]
+        assert 0 < response["usage"]["output"] <= 30
+
+
+def test_hf_model_cpu_quantize():
+
+    context = "The best time to visit New York City is in the Fall when the weather is nicest."
+    question = "When is the best time to visit New York?"
+
+    model = ModelCatalog().load_model("llmware/bling-tiny-llama-v0", sample=False, max_output=30,
+                                      cpu_quantize="int8", cpu_threads=2)
+
+    response = model.inference(question, add_context=context)
+    assert len(response["llm_response"]) > 0
+
+    # quantized state dict is cached in the model repo, keyed by model revision and library versions
+    cache_path = os.path.join(LLMWareConfig().get_model_repo_path(), "bling-tiny-llama-v0",
+                              "pytorch_dynamic_int8_generative_model_state_dict.pt")
+    assert os.path.exists(cache_path)
+    assert os.path.exists(cache_path + ".json")
+
+    # the cache holds tensors only - it loads with weights_only=True
+    import torch
+    state_dict = torch.load(cache_path, weights_only=True)
+    assert len(state_dict) > 0
+
+    # re-used on the next load, with the same output as the freshly quantized model
+    cached_model = ModelCatalog().load_model("llmware/bling-tiny-llama-v0", sample=False, max_output=30,
+                                             cpu_quantize="int8")
+    assert cached_model.inference(question, add_context=context)["llm_response"] == response["llm_response"]
+
+
 
 test_load_hf_model_in_prompt()
@@ -0,0 +1,48 @@
+""" Tests saving, lookup and update of prompt history in the sqlite state history store. """
+
+
+import tempfile
+
+from llmware.configs import StateHistoryConfig
+from llmware.prompts import Prompt
+from llmware.resources import PromptState
+
+
+def test_prompt_state_history_sqlite_store():
+
+    StateHistoryConfig().set_config("store", "sqlite")
+    StateHistoryConfig().set_config("db_folder_path", tempfile.mkdtemp())
+
+    prompter = Prompt()
+    prompt_id = prompter.prompt_id
+
+    for i in range(10):
+        prompter.interaction_history.append({"prompt_id": prompt_id, "prompt": f"question {i}",
+                                             "llm_response": f"answer {i}", "evidence": "", "instruction": "",
+                                             "model": "model-a" if i % 2 == 0 else "model-b",
+                                             "time_stamp": "", "human_rating": -1, "human_feedback": "",
+                                             "human_assessed_accuracy": ""})
+
+    prompter.save_state()
+
+    assert len(PromptState(prompter).lookup_by_prompt_id(prompt_id)) == 10
+
+    # the store opens a connection per operation - state objects do not hold an open connection
+    assert not hasattr(PromptState(prompter).history_store, "conn")
+    assert len(prompter.lookup_ai_trx_with_filter({"prompt_id": prompt_id, "model": "model-b"})) == 5
+
+    PromptState(prompter).update_records(prompt_id, {"prompt": "question 3"},
+                                         {"human_rating": 5, "human_feedback": "correct"})
+
+    rated = prompter.lookup_ai_trx_with_filter({"human_rating": 5})
+    assert len(rated) == 1
+    assert rated[0]["human_feedback"] == "correct"
+
+    # jsonl export of the history store
+    files = PromptState(prompter).export_history_to_jsonl(prompt_id_list=[prompt_id])
+    assert len(files) == 1
+
+    new_prompter = Prompt().load_state(prompt_id)
+    assert len(new_prompter.interaction_history) == 10
+
+    StateHistoryConfig().set_config("store", "jsonl")
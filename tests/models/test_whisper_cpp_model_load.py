@@ -4,6 +4,7 @@
 
 import os
 from llmware.models import ModelCatalog
+from llmware.util import Utilities
 from llmware.gguf_configs import GGUFConfigs
 from llmware.setup import Setup
 
@@ -53,6 +54,58 @@ def test_whisper_cpp():
     return 0
 
 
+def test_whisper_cpp_chunked():
 
+    """ Transcribes the same files in overlapping 10 second windows on 2 whisper states, with no token details,
+    and checks that the segments are in order, with timestamps within the duration of the file """
 
+    voice_samples = Setup().load_voice_sample_files(small_only=True, over_write=False)
 
+    fp = os.path.join(voice_samples, "famous_quotes")
+
+    model = ModelCatalog().load_model("whisper-cpp-base-english")
+
+    for f in os.listdir(fp):
+
+        if f.endswith(".wav"):
+
+            response = model.inference(os.path.join(fp, f),
+                                       inference_dict={"chunk_secs": 10, "workers": 2, "token_details": False})
+
+            segments = response["segments"]
+
+            assert len(response["llm_response"]) > 0
+
+            for i, segment in enumerate(segments):
+                assert segment["tokens"] == []
+                assert segment["start"] <= response["usage"]["duration-seconds"] + 1
+                if i > 0:
+                    assert segment["start"] >= segments[i-1]["start"]
+
+    return 0
+
+
+def test_whisper_cpp_transcribe_decoded_samples():
+
+    """ Decodes the files in memory, with no intermediate .wav file, and transcribes the decoded samples """
+
+    voice_samples = Setup().load_voice_sample_files(small_only=True, over_write=False)
+
+    fp = os.path.join(voice_samples, "famous_quotes")
+
+    model = ModelCatalog().load_model("whisper-cpp-base-english")
+
+    for f in os.listdir(fp):
+
+        if f.endswith(".wav"):
+
+            samples = Utilities().decode_media_file(os.path.join(fp, f), sr=16000)
+
+            assert samples is not None and samples.dtype == "float32"
+
+            response = model.transcribe_samples(samples)
+
+            assert len(response["llm_response"]) > 0
+            assert response["usage"]["duration-seconds"] == len(samples) / 16000
+
+    return 0